@@ -21,7 +21,8 @@ datas_list = [
     ('icons/launch.png', 'icons'),
     ('icons/manual.png', 'icons'),
     ('icons/rescan.png', 'icons'),
-    ('icons/settings.png', 'icons')
+    ('icons/settings.png', 'icons'),
+    ('src/config/exe_rules.json', 'src/config')
 ]
 
 a = Analysis(['run.py'],
@@ -0,0 +1,7 @@
+"""Benchmarks reproducibles del gestor sobre bibliotecas de juegos sintéticas.
+
+Uso:
+    python -m benchmarks                    # ejecutar y comparar con la línea base
+    python -m benchmarks --save-baseline    # guardar la línea base de esta máquina
+    python -m benchmarks --games 200 --repeat 7 --only scan_games
+"""
@@ -0,0 +1,397 @@
+"""Generador de bibliotecas de juegos sintéticas (Steam / Epic / Xbox / personalizadas).
+
+Crea en disco una estructura parecida a la real para medir el escáner y el
+instalador sin depender de los juegos instalados en la máquina:
+ - Juegos "planos" (exe en la raíz), de Unreal Engine (<Juego>/Binaries/Win64)
+   y anidados (bin/x64)
+ - Ejecutables señuelo (desinstaladores, crash handlers, redistribuibles)
+ - Árboles de carpetas de relleno con profundidad configurable
+ - Estados de OptiScaler: sin mod, instalado, parcial y sólo Frame Generation
+ - Steam: libraryfolders.vdf y un appmanifest_*.acf por juego, más las
+   herramientas que no son juegos (Steamworks Common Redistributables)
+ - Epic: un manifiesto *.item del launcher por juego (y claves Uninstall)
+ - Xbox: MicrosoftGame.config y appxmanifest.xml (con gamelaunchhelper.exe) en Content
+ - El exe principal de cada juego es un PE mínimo que importa DirectX 12,
+   DirectX 11 o Vulkan, para la detección de la API gráfica
+
+Los ejecutables y DLLs se crean con truncate() (sin escribir su contenido,
+salvo la cabecera PE del exe principal), así que los tamaños son realistas
+pero la generación es rápida. La misma semilla produce siempre la misma
+biblioteca.
+
+probe_data() describe el registro, las carpetas y la GPU simulados para
+FixtureProbe, así el escáner encuentra la biblioteca igual que en Windows.
+
+Uso:
+    python -m benchmarks.library_gen DESTINO [--games 100] [--seed 1234]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+PLATFORMS = ('Steam', 'Epic', 'Xbox', 'Custom')
+LAYOUTS = ('flat', 'ue', 'nested')
+MOD_STATES = ('none', 'installed', 'partial', 'nukem')
+
+DECOY_EXES = [
+    'unins000.exe', 'CrashReportClient.exe', 'vc_redist.x64.exe',
+    'GameLauncher.exe', 'UnityCrashHandler64.exe', 'DXSETUP.exe',
+]
+# API del juego -> (importaciones, importaciones diferidas) de su exe principal
+GAME_IMPORTS = {
+    'dx12': (['KERNEL32.dll', 'USER32.dll', 'dxgi.dll'], ['d3d12.dll']),
+    'dx11': (['KERNEL32.dll', 'USER32.dll', 'd3d11.dll', 'dxgi.dll'], []),
+    'vulkan': (['KERNEL32.dll', 'USER32.dll', 'vulkan-1.dll'], []),
+}
+GAME_APIS = tuple(GAME_IMPORTS)
+FILLER_EXTENSIONS = ('.pak', '.dat', '.json', '.txt', '.bin')
+_WORDS = [
+    'Shadow', 'Iron', 'Crimson', 'Last', 'Star', 'Dawn', 'Frontier', 'Echo',
+    'Legends', 'Rift', 'Horizon', 'Storm', 'Titan', 'Nova', 'Ember', 'Vault',
+]
+
+KB = 1024
+MB = 1024 * 1024
+
+
+@dataclass
+class LibrarySpec:
+    """Parámetros de la biblioteca sintética."""
+    games: int = 100                   # juegos en total, repartidos entre plataformas
+    platforms: Tuple[str, ...] = PLATFORMS
+    depth: int = 3                     # niveles de carpetas de relleno por juego
+    dirs_per_level: int = 2
+    files_per_dir: int = 3
+    decoys: int = 2                    # ejecutables señuelo por juego
+    layout_weights: Dict[str, float] = field(default_factory=lambda: {'flat': 0.3, 'ue': 0.5, 'nested': 0.2})
+    mod_weights: Dict[str, float] = field(default_factory=lambda: {
+        'none': 0.6, 'installed': 0.25, 'partial': 0.1, 'nukem': 0.05
+    })
+    seed: int = 1234
+
+
+@dataclass
+class GeneratedGame:
+    platform: str
+    name: str
+    root: str          # carpeta del juego (la que ve el escáner)
+    exe_dir: str       # carpeta donde está el ejecutable principal
+    exe_name: str
+    layout: str
+    mod_state: str
+    appid: str = ''    # sólo Steam
+    api: str = ''      # clave de GAME_IMPORTS que importa el exe principal
+
+
+@dataclass
+class GeneratedLibrary:
+    root: str
+    spec: LibrarySpec
+    games: List[GeneratedGame] = field(default_factory=list)
+
+    @property
+    def xbox_dir(self) -> str:
+        return os.path.join(self.root, 'XboxGames')
+
+    @property
+    def epic_manifests_dir(self) -> str:
+        return os.path.join(self.root, 'Epic', 'Manifests')
+
+    @property
+    def custom_dirs(self) -> List[str]:
+        return [os.path.join(self.root, 'Custom')]
+
+    def by_platform(self, platform: str) -> List[GeneratedGame]:
+        return [g for g in self.games if g.platform == platform]
+
+    def probe_data(self, uninstall_noise: int = 300, epic_manifests: bool = True) -> Dict[str, Any]:
+        """Registro / carpetas / GPU simulados que apuntan a esta biblioteca (formato FixtureProbe).
+
+        Steam se encuentra por InstallPath y Epic por sus manifiestos o, con
+        epic_manifests=False, por las claves de desinstalación, mezcladas con
+        `uninstall_noise` entradas de otros programas como en un PC real.
+        """
+        uninstall = r"HKLM\SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+        registry: Dict[str, Dict[str, Any]] = {
+            r"HKLM\SOFTWARE\WOW6432Node\Valve\Steam": {'InstallPath': os.path.join(self.root, 'Steam')},
+        }
+        for i in range(uninstall_noise):
+            registry[f"{uninstall}\\{{NOISE-{i:04d}}}"] = {'Publisher': f"Vendor {i % 37}",
+                                                            'InstallLocation': f"C:\\Apps\\App{i}"}
+        for i, game in enumerate(self.by_platform('Epic')):
+            registry[f"{uninstall}\\EpicGame{i:04d}"] = {'Publisher': 'Epic Games, Inc.',
+                                                         'InstallLocation': game.root}
+        folders = {'xbox_games': self.xbox_dir}
+        if epic_manifests:
+            folders['epic_manifests'] = self.epic_manifests_dir
+        return {
+            'registry': registry,
+            'folders': folders,
+            'gpus': ['AMD Radeon RX 7800 XT'],
+        }
+
+
+def _touch(path: str, size: int = 0) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        if size:
+            f.truncate(size)
+
+
+def write_pe_exe(path: str, size: int, imports: List[str], delay_imports: List[str] = (),
+                 machine: str = 'x64') -> None:
+    """Exe mínimo: cabecera PE, una sección .idata con la tabla de importaciones
+    (y la de carga diferida) y el resto del tamaño sin escribir."""
+    pe64 = machine != 'x86'
+    machine_id = {'x64': 0x8664, 'x86': 0x014C, 'arm64': 0xAA64}[machine]
+    opt, opt_size = 0x58, (240 if pe64 else 224)
+    section_rva, raw_ptr = 0x1000, 0x400
+    n_import, n_delay = len(imports) + 1, (len(delay_imports) + 1 if delay_imports else 0)
+    names_at = n_import * 20 + n_delay * 32
+    names, name_rvas = b'', []
+    for dll in list(imports) + list(delay_imports):
+        name_rvas.append(section_rva + names_at + len(names))
+        names += dll.encode('ascii') + b'\0'
+    body = b''.join(struct.pack('<5I', 0, 0, 0, name_rvas[i], 0) for i in range(len(imports))) + bytes(20)
+    if delay_imports:
+        body += b''.join(struct.pack('<8I', 1, name_rvas[len(imports) + i], 0, 0, 0, 0, 0, 0)
+                         for i in range(len(delay_imports))) + bytes(32)
+    body += names
+    raw_size = (len(body) + 0x1FF) & ~0x1FF
+
+    header = bytearray(raw_ptr)
+    header[0:2] = b'MZ'
+    struct.pack_into('<I', header, 0x3C, 0x40)
+    header[0x40:0x44] = b'PE\0\0'
+    struct.pack_into('<HHIIIHH', header, 0x44, machine_id, 1, 0, 0, 0, opt_size, 0x22)
+    if pe64:
+        struct.pack_into('<H', header, opt, 0x20B)
+        struct.pack_into('<Q', header, opt + 24, 0x140000000)
+        struct.pack_into('<I', header, opt + 108, 16)
+        dirs = opt + 112
+    else:
+        struct.pack_into('<H', header, opt, 0x10B)
+        struct.pack_into('<I', header, opt + 28, 0x400000)
+        struct.pack_into('<I', header, opt + 92, 16)
+        dirs = opt + 96
+    struct.pack_into('<II', header, dirs + 1 * 8, section_rva, n_import * 20)
+    if delay_imports:
+        struct.pack_into('<II', header, dirs + 13 * 8, section_rva + n_import * 20, n_delay * 32)
+    table = opt + opt_size
+    header[table:table + 8] = b'.idata\0\0'
+    struct.pack_into('<IIII', header, table + 8, raw_size, section_rva, raw_size, raw_ptr)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(body.ljust(raw_size, b'\0'))
+        f.truncate(max(size, raw_ptr + raw_size))
+
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    keys = sorted(weights)
+    return rng.choices(keys, weights=[weights[k] for k in keys])[0]
+
+
+def _game_name(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {index:04d}"
+
+
+def _filler_tree(rng: random.Random, base: str, spec: LibrarySpec, level: int = 0) -> None:
+    for i in range(spec.files_per_dir):
+        _touch(os.path.join(base, f"data_{level}_{i}{rng.choice(FILLER_EXTENSIONS)}"), rng.randint(1, 64) * KB)
+    if level >= spec.depth:
+        return
+    for i in range(spec.dirs_per_level):
+        _filler_tree(rng, os.path.join(base, f"Content{level}_{i}"), spec, level + 1)
+
+
+def _exe_location(game_root: str, name: str, layout: str) -> Tuple[str, str]:
+    compact = name.replace(' ', '')
+    if layout == 'ue':
+        return os.path.join(game_root, compact, 'Binaries', 'Win64'), f"{compact}-Win64-Shipping.exe"
+    if layout == 'nested':
+        return os.path.join(game_root, 'bin', 'x64'), f"{compact}.exe"
+    return game_root, f"{compact}.exe"
+
+
+def write_mod_state(exe_dir: str, state: str) -> None:
+    """Deja en exe_dir los archivos de un estado de OptiScaler."""
+    if state == 'installed':
+        _touch(os.path.join(exe_dir, 'dxgi.dll'), 2 * MB)
+        _touch(os.path.join(exe_dir, 'OptiScaler.ini'), 8 * KB)
+        with open(os.path.join(exe_dir, 'version.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': '0.7.9', 'tag': 'v0.7.9', 'source': 'OptiScaler',
+                       'spoof_dll': 'dxgi.dll'}, f)
+    elif state == 'partial':
+        _touch(os.path.join(exe_dir, 'OptiScaler.ini'), 8 * KB)
+    elif state == 'nukem':
+        _touch(os.path.join(exe_dir, 'dlssg_to_fsr3_amd_is_better.dll'), 1 * MB)
+
+
+def _platform_root(root: str, platform: str) -> str:
+    return {
+        'Steam': os.path.join(root, 'Steam', 'steamapps', 'common'),
+        'Epic': os.path.join(root, 'Epic Games'),
+        'Xbox': os.path.join(root, 'XboxGames'),
+        'Custom': os.path.join(root, 'Custom'),
+    }[platform]
+
+
+STEAM_TOOLS = [('228980', 'Steamworks Common Redistributables', 'Steamworks Shared')]
+
+
+def write_app_manifest(steamapps: str, appid: str, name: str, installdir: str, buildid: int) -> None:
+    """appmanifest_<appid>.acf mínimo (los campos que lee el escáner)."""
+    with open(os.path.join(steamapps, f"appmanifest_{appid}.acf"), 'w', encoding='utf-8') as f:
+        f.write('"AppState"\n{\n'
+                f'\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name}"\n\t"StateFlags"\t\t"4"\n'
+                f'\t"installdir"\t\t"{installdir}"\n\t"buildid"\t\t"{buildid}"\n'
+                '\t"LastUpdated"\t\t"1700000000"\n}\n')
+
+
+def _write_steam_metadata(root: str, spec: LibrarySpec) -> None:
+    """libraryfolders.vdf + herramientas de Steam (con exes señuelo grandes)."""
+    steamapps = os.path.join(root, 'Steam', 'steamapps')
+    steam_root = os.path.join(root, 'Steam').replace('\\', '\\\\')
+    with open(os.path.join(steamapps, 'libraryfolders.vdf'), 'w', encoding='utf-8') as f:
+        f.write(f'"libraryfolders"\n{{\n\t"0"\n\t{{\n\t\t"path"\t\t"{steam_root}"\n\t}}\n}}\n')
+    for appid, name, installdir in STEAM_TOOLS:
+        tool_dir = os.path.join(steamapps, 'common', installdir)
+        for redist in ('_CommonRedist/vcredist/2022/VC_redist.x64.exe', '_CommonRedist/DirectX/Jun2010/DXSETUP.exe'):
+            _touch(os.path.join(tool_dir, *redist.split('/')), 25 * MB)
+        write_app_manifest(steamapps, appid, name, installdir, 1)
+
+
+def write_epic_manifest(manifests_dir: str, app_name: str, name: str, install_location: str,
+                        launch_executable: str) -> None:
+    """<id>.item mínimo del launcher de Epic (los campos que lee el escáner)."""
+    os.makedirs(manifests_dir, exist_ok=True)
+    data = {
+        'FormatVersion': 0, 'bIsIncompleteInstall': False, 'AppName': app_name, 'MainGameAppName': app_name,
+        'DisplayName': name, 'InstallLocation': install_location, 'LaunchExecutable': launch_executable,
+        'AppVersionString': '1.0.0-CL-1000', 'AppCategories': ['public', 'games', 'applications'],
+    }
+    with open(os.path.join(manifests_dir, f"{app_name.upper()}.item"), 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent='\t')
+
+
+def write_xbox_manifests(content_dir: str, name: str, exe_path: str) -> None:
+    """MicrosoftGame.config (exe real) + appxmanifest.xml (lanzador GDK) en Content."""
+    relative = os.path.relpath(exe_path, content_dir).replace(os.sep, '\\')
+    identity = name.replace(' ', '')
+    with open(os.path.join(content_dir, 'MicrosoftGame.config'), 'w', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<Game configVersion="1">\n'
+                f'  <Identity Name="Synthetic.{identity}" Publisher="CN=Synthetic" Version="1.0.0.0"/>\n'
+                f'  <ExecutableList>\n    <Executable Name="{relative}" TargetDeviceFamily="PC" Id="Game"/>\n'
+                f'  </ExecutableList>\n  <ShellVisuals DefaultDisplayName="{name}"/>\n</Game>\n')
+    with open(os.path.join(content_dir, 'appxmanifest.xml'), 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                '<Package xmlns="http://schemas.microsoft.com/appx/manifest/foundation/windows10">\n'
+                f'  <Identity Name="Synthetic.{identity}" Version="1.0.0.0"/>\n'
+                '  <Applications><Application Id="Game" Executable="gamelaunchhelper.exe"/></Applications>\n'
+                '</Package>\n')
+    _touch(os.path.join(content_dir, 'gamelaunchhelper.exe'), 200 * KB)
+
+
+def generate_game(rng: random.Random, root: str, platform: str, index: int, spec: LibrarySpec) -> GeneratedGame:
+    """Crea un juego en la biblioteca de su plataforma."""
+    name = _game_name(rng, index)
+    game_root = os.path.join(_platform_root(root, platform), name)
+    if platform == 'Xbox':
+        # Xbox: el escáner entra en <Juego>/Content
+        scan_root = os.path.join(game_root, 'Content')
+    else:
+        scan_root = game_root
+    layout = _pick(rng, spec.layout_weights)
+    exe_dir, exe_name = _exe_location(scan_root, name, layout)
+    api = GAME_APIS[index % len(GAME_APIS)]
+    write_pe_exe(os.path.join(exe_dir, exe_name), rng.randint(20, 80) * MB, *GAME_IMPORTS[api])
+    if layout == 'ue':
+        # Lanzador pequeño en la raíz (como en UE) y binarios del motor
+        _touch(os.path.join(scan_root, f"{name.replace(' ', '')}.exe"), 300 * KB)
+        _touch(os.path.join(scan_root, 'Engine', 'Binaries', 'ThirdParty', 'DbgHelp', 'dbghelp.dll'), 1 * MB)
+    for i in range(spec.decoys):
+        decoy = DECOY_EXES[(index + i) % len(DECOY_EXES)]
+        target = scan_root if i % 2 == 0 else exe_dir
+        _touch(os.path.join(target, decoy), rng.randint(1, 90) * MB)
+    _filler_tree(rng, os.path.join(scan_root, 'Data'), spec)
+    mod_state = _pick(rng, spec.mod_weights)
+    write_mod_state(exe_dir, mod_state)
+    appid = ''
+    if platform == 'Steam':
+        appid = str(1000000 + index)
+        write_app_manifest(os.path.dirname(_platform_root(root, platform)), appid, name, name,
+                           rng.randint(1000000, 9999999))
+    if platform == 'Xbox':
+        write_xbox_manifests(scan_root, name, os.path.join(exe_dir, exe_name))
+    if platform == 'Epic':
+        # Los juegos de UE declaran el lanzador de la raíz, como en el launcher real
+        launch = f"{name.replace(' ', '')}.exe" if layout == 'ue' else os.path.relpath(
+            os.path.join(exe_dir, exe_name), game_root)
+        write_epic_manifest(os.path.join(root, 'Epic', 'Manifests'), f"{index:04x}{name.replace(' ', '')}",
+                            name, game_root, launch.replace(os.sep, '/'))
+    return GeneratedGame(platform, name, game_root if platform != 'Xbox' else scan_root,
+                         exe_dir, exe_name, layout, mod_state, appid, api)
+
+
+def generate_library(root: str | os.PathLike, spec: LibrarySpec | None = None) -> GeneratedLibrary:
+    """Genera (o regenera) la biblioteca sintética en root."""
+    spec = spec or LibrarySpec()
+    root = os.fspath(root)
+    rng = random.Random(spec.seed)
+    library = GeneratedLibrary(root=root, spec=spec)
+    for platform in PLATFORMS:
+        os.makedirs(_platform_root(root, platform), exist_ok=True)
+    _write_steam_metadata(root, spec)
+    for index in range(spec.games):
+        platform = spec.platforms[index % len(spec.platforms)]
+        library.games.append(generate_game(rng, root, platform, index, spec))
+    return library
+
+
+def make_mod_source(root: str | os.PathLike) -> str:
+    """Carpeta de OptiScaler falsa (misma estructura que una release extraída) para instalar."""
+    source = os.path.join(os.fspath(root), 'OptiScaler_0.7.9')
+    _touch(os.path.join(source, 'OptiScaler.dll'), 12 * MB)
+    _touch(os.path.join(source, 'OptiScaler.ini'), 24 * KB)
+    for name in ('amd_fidelityfx_dx12.dll', 'amd_fidelityfx_vk.dll', 'libxess.dll', 'nvngx.dll',
+                 'fakenvapi.dll', 'dlssg_to_fsr3_amd_is_better.dll', 'fsr3_config.json'):
+        _touch(os.path.join(source, name), 2 * MB if name.endswith('.dll') else 2 * KB)
+    _touch(os.path.join(source, 'setup_windows.bat'), 1 * KB)
+    for i in range(20):
+        _touch(os.path.join(source, 'D3D12_Optiscaler', f"D3D12Core_{i}.dll"), 256 * KB)
+    _touch(os.path.join(source, 'Licenses', 'LICENSE.txt'), 4 * KB)
+    return source
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera una biblioteca de juegos sintética")
+    parser.add_argument('dest')
+    parser.add_argument('--games', type=int, default=LibrarySpec.games)
+    parser.add_argument('--depth', type=int, default=LibrarySpec.depth)
+    parser.add_argument('--decoys', type=int, default=LibrarySpec.decoys)
+    parser.add_argument('--seed', type=int, default=LibrarySpec.seed)
+    args = parser.parse_args(argv)
+    library = generate_library(args.dest, LibrarySpec(games=args.games, depth=args.depth,
+                                                      decoys=args.decoys, seed=args.seed))
+    fixture = Path(args.dest) / 'probe_fixture.json'
+    fixture.write_text(json.dumps(library.probe_data(), indent=1), encoding='utf-8')
+    print(f"Biblioteca generada en {Path(args.dest).resolve()}: {len(library.games)} juegos")
+    print(f"Fixture de plataforma: {fixture.resolve()} (usar con OPTISCALER_PROBE_FIXTURE)")
+    for platform in PLATFORMS:
+        print(f"  {platform}: {len(library.by_platform(platform))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
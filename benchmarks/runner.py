@@ -0,0 +1,377 @@
+"""Ejecución de los benchmarks, línea base y detección de regresiones.
+
+Cada benchmark se ejecuta `repeat` veces sobre la misma biblioteca sintética
+(misma semilla) y se toma la mediana. Con --save-baseline se guardan las
+medianas en benchmarks/baseline.json junto con la máquina y los parámetros;
+en las siguientes ejecuciones se compara cada mediana con la línea base y se
+marca como regresión si es más lenta que baseline * (1 + threshold).
+
+El código de salida es 1 si hay regresiones (útil en CI).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.library_gen import (  # noqa: E402
+    GAME_APIS, GAME_IMPORTS, GeneratedLibrary, LibrarySpec, generate_library, make_mod_source, write_mod_state,
+    write_pe_exe
+)
+from src.core import scanner  # noqa: E402
+from src.core.binary_delta import make_delta  # noqa: E402
+from src.core.installer import inject_fsr_mod, uninstall_fsr_mod  # noqa: E402
+from src.core.mod_detector import compute_game_mod_status  # noqa: E402
+from src.core.pe_imports import detect_exe_api  # noqa: E402
+from src.core.platform_probe import FixtureProbe  # noqa: E402
+from src.core.scan_index import ScanIndex  # noqa: E402
+from src.utils.tracing import configure_tracing  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25   # 25 % más lento que la línea base = regresión
+MIN_REGRESSION_S = 0.005   # diferencias menores son ruido aunque superen el umbral
+
+
+def _quiet_log(level: str, msg: str) -> None:
+    pass
+
+
+@dataclass
+class Context:
+    """Estado compartido por los benchmarks de una ejecución."""
+    library: GeneratedLibrary
+    mod_source: str
+    work_dir: str
+    optiscaler_dir: str
+    probe: FixtureProbe
+    scan_index: ScanIndex
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[Any], Any]
+    # setup(ctx) -> argumento de run; no se mide (p.ej. preparar carpetas limpias)
+    setup: Optional[Callable[[Context], Any]] = None
+    description: str = ''
+
+
+@dataclass
+class Result:
+    name: str
+    runs: List[float]
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.runs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'median_s': self.median,
+            'min_s': min(self.runs),
+            'mean_s': statistics.fmean(self.runs),
+            'stdev_s': statistics.stdev(self.runs) if len(self.runs) > 1 else 0.0,
+            'runs': len(self.runs),
+        }
+
+
+def bench_scan_games(ctx: Context) -> int:
+    games = scanner.scan_games(_quiet_log, ctx.library.custom_dirs, use_cache=False, probe=ctx.probe,
+                               index=ctx.scan_index)
+    return len(games)
+
+
+def _cold_index(ctx: Context) -> Any:
+    path = os.path.join(ctx.work_dir, 'scan_index_cold.json')
+    if os.path.exists(path):
+        os.remove(path)
+    return ctx, ScanIndex(path)
+
+
+def bench_scan_games_cold(args) -> int:
+    ctx, index = args
+    games = scanner.scan_games(_quiet_log, ctx.library.custom_dirs, use_cache=False, probe=ctx.probe,
+                               index=index)
+    return len(games)
+
+
+def _registry_only(ctx: Context) -> Any:
+    probe = FixtureProbe(**ctx.library.probe_data(epic_manifests=False))
+    return probe, ScanIndex(os.path.join(ctx.work_dir, 'scan_index_registry.json'))
+
+
+def bench_epic_registry_paths(args) -> int:
+    probe, index = args
+    return len(scanner.get_dynamic_epic_paths(_quiet_log, probe, index))
+
+
+def bench_find_executable_path(ctx: Context) -> None:
+    for game in ctx.library.games:
+        scanner.find_executable_path(game.root, _quiet_log)
+
+
+def _cold_pe_index(ctx: Context) -> Any:
+    path = os.path.join(ctx.work_dir, 'scan_index_pe.json')
+    if os.path.exists(path):
+        os.remove(path)
+    return ctx, ScanIndex(path)
+
+
+def bench_detect_exe_api(args) -> int:
+    ctx, index = args
+    detected = 0
+    for game in ctx.library.games:
+        if detect_exe_api(os.path.join(game.exe_dir, game.exe_name), index) is not None:
+            detected += 1
+    return detected
+
+
+def bench_check_mod_status(ctx: Context) -> None:
+    for game in ctx.library.games:
+        scanner.check_mod_status(game.exe_dir)
+
+
+def bench_compute_game_mod_status(ctx: Context) -> None:
+    base = Path(ctx.optiscaler_dir)
+    for game in ctx.library.games:
+        compute_game_mod_status(Path(game.exe_dir), base)
+
+
+INSTALL_TARGETS = 10
+
+
+def _fresh_targets(ctx: Context, state: str) -> List[str]:
+    """Carpetas de juego limpias (o con OptiScaler instalado) para instalar/desinstalar."""
+    base = os.path.join(ctx.work_dir, 'install_targets')
+    shutil.rmtree(base, ignore_errors=True)
+    targets = []
+    for i in range(INSTALL_TARGETS):
+        target = os.path.join(base, f"Game{i:02d}")
+        os.makedirs(target)
+        api = GAME_APIS[i % len(GAME_APIS)]
+        write_pe_exe(os.path.join(target, f"Game{i:02d}.exe"), 32 * 1024 * 1024, *GAME_IMPORTS[api])
+        if state == 'installed':
+            inject_fsr_mod(ctx.mod_source, target, _quiet_log, index=ctx.scan_index)
+        else:
+            write_mod_state(target, state)
+        targets.append(target)
+    return targets
+
+
+def bench_inject_fsr_mod(args) -> None:
+    ctx, targets = args
+    for target in targets:
+        if not inject_fsr_mod(ctx.mod_source, target, _quiet_log, index=ctx.scan_index):
+            raise RuntimeError(f"inject_fsr_mod falló en {target}")
+
+
+def bench_uninstall_fsr_mod(targets: List[str]) -> None:
+    for target in targets:
+        uninstall_fsr_mod(target, _quiet_log)
+
+
+DELTA_OLD_BYTES = 4 * 1024 * 1024
+DELTA_NEW_DATA_BYTES = 512 * 1024
+
+
+def _delta_inputs(ctx: Context) -> Any:
+    """Par viejo/nuevo acotado: el nuevo desplaza el viejo, lo parchea y añade datos sin parecido."""
+    rng = random.Random(ctx.library.spec.seed)
+    old = rng.randbytes(DELTA_OLD_BYTES)
+    patched = bytearray(old)
+    for offset in range(0, len(patched), 256 * 1024):
+        patched[offset:offset + 16] = rng.randbytes(16)
+    return old, rng.randbytes(DELTA_NEW_DATA_BYTES) + bytes(patched[:1024]) + b'shift' + bytes(patched[1024:])
+
+
+def bench_make_delta(args) -> int:
+    old, new = args
+    return len(make_delta(old, new))
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark('scan_games', bench_scan_games, lambda ctx: ctx,
+              description='Re-escaneo completo de Steam/Epic/Xbox/personalizadas (índice de escaneo caliente)'),
+    Benchmark('scan_games_cold', bench_scan_games_cold, _cold_index,
+              description='Primer escaneo completo, con el índice de escaneo vacío'),
+    Benchmark('epic_registry_paths', bench_epic_registry_paths, _registry_only,
+              description='Rutas de Epic sin manifiestos: recorrido del registro (índice vacío)'),
+    Benchmark('find_executable_path', bench_find_executable_path, lambda ctx: ctx,
+              description='Búsqueda del ejecutable en cada juego'),
+    Benchmark('detect_exe_api', bench_detect_exe_api, _cold_pe_index,
+              description='API gráfica de cada juego leyendo las importaciones de su exe (índice vacío)'),
+    Benchmark('check_mod_status', bench_check_mod_status, lambda ctx: ctx,
+              description='Estado del mod (escáner) en cada juego'),
+    Benchmark('compute_game_mod_status', bench_compute_game_mod_status, lambda ctx: ctx,
+              description='Estado del mod con version.json en cada juego'),
+    Benchmark('inject_fsr_mod', bench_inject_fsr_mod, lambda ctx: (ctx, _fresh_targets(ctx, 'none')),
+              description=f'Instalación en {INSTALL_TARGETS} juegos limpios'),
+    Benchmark('uninstall_fsr_mod', bench_uninstall_fsr_mod, lambda ctx: _fresh_targets(ctx, 'installed'),
+              description=f'Desinstalación de {INSTALL_TARGETS} juegos con OptiScaler'),
+    Benchmark('make_delta', bench_make_delta, _delta_inputs,
+              description=f'Delta de auto-actualización sobre {DELTA_OLD_BYTES // (1024 * 1024)} MB con datos nuevos y desplazados'),
+]
+
+
+def run_benchmarks(ctx: Context, repeat: int = DEFAULT_REPEAT, only: Optional[List[str]] = None,
+                   warmup: bool = True, echo: Callable[[str], None] = print) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    for bench in BENCHMARKS:
+        if only and bench.name not in only:
+            continue
+        runs = []
+        for i in range(repeat + (1 if warmup else 0)):
+            arg = bench.setup(ctx) if bench.setup else ctx
+            started = time.perf_counter()
+            bench.run(arg)
+            elapsed = time.perf_counter() - started
+            if warmup and i == 0:
+                # La primera pasada calienta la caché de disco del SO
+                continue
+            runs.append(elapsed)
+        results[bench.name] = Result(bench.name, runs)
+        echo(f"  {bench.name:<26} {results[bench.name].median * 1000:10.2f} ms (mediana de {repeat})")
+    return results
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        'node': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def _spec_dict(spec: LibrarySpec) -> Dict[str, Any]:
+    # Ida y vuelta por JSON: las tuplas se guardan como listas
+    return json.loads(json.dumps(asdict(spec)))
+
+
+def save_baseline(results: Dict[str, Result], spec: LibrarySpec, path: Path = BASELINE_FILE) -> None:
+    data = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': machine_info(),
+        'spec': _spec_dict(spec),
+        'results': {name: result.to_dict() for name, result in results.items()},
+    }
+    path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Filas del informe: nombre, línea base, actual, variación y si es regresión."""
+    rows = []
+    base_results = baseline.get('results', {})
+    for name, result in results.items():
+        base = base_results.get(name)
+        row = {'name': name, 'current_s': result.median, 'baseline_s': None,
+               'change': None, 'regression': False}
+        if base and base.get('median_s'):
+            row['baseline_s'] = base['median_s']
+            row['change'] = result.median / base['median_s'] - 1
+            row['regression'] = (row['change'] > threshold
+                                 and result.median - base['median_s'] > MIN_REGRESSION_S)
+        rows.append(row)
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]], baseline: Dict[str, Any], spec: LibrarySpec,
+                  threshold: float) -> str:
+    lines = [f"Comparación con la línea base ({baseline.get('created_at', '?')}), umbral +{threshold:.0%}:"]
+    if baseline.get('machine') != machine_info():
+        lines.append("  AVISO: la línea base es de otra máquina/entorno; las diferencias pueden no ser regresiones")
+    if baseline.get('spec') != _spec_dict(spec):
+        lines.append("  AVISO: la línea base se generó con otros parámetros de biblioteca")
+    lines.append(f"  {'benchmark':<26} {'base (ms)':>10} {'actual (ms)':>12} {'cambio':>9}")
+    for row in rows:
+        base = f"{row['baseline_s'] * 1000:10.2f}" if row['baseline_s'] is not None else f"{'-':>10}"
+        change = f"{row['change']:+8.1%}" if row['change'] is not None else f"{'nuevo':>8}"
+        flag = '  << REGRESIÓN' if row['regression'] else ''
+        lines.append(f"  {row['name']:<26} {base} {row['current_s'] * 1000:12.2f} {change}{flag}")
+    regressions = sum(1 for row in rows if row['regression'])
+    lines.append(f"{regressions} regresión(es)" if regressions else "Sin regresiones")
+    return '\n'.join(lines)
+
+
+def build_context(work_dir: str, spec: LibrarySpec) -> Context:
+    library = generate_library(os.path.join(work_dir, 'library'), spec)
+    mod_root = os.path.join(work_dir, 'mod_source')
+    probe = FixtureProbe(**library.probe_data())
+    return Context(library=library, mod_source=make_mod_source(mod_root),
+                   work_dir=work_dir, optiscaler_dir=mod_root, probe=probe,
+                   scan_index=ScanIndex(os.path.join(work_dir, 'scan_index.json')))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Benchmarks del escáner y el instalador")
+    parser.add_argument('--games', type=int, default=LibrarySpec.games)
+    parser.add_argument('--depth', type=int, default=LibrarySpec.depth)
+    parser.add_argument('--decoys', type=int, default=LibrarySpec.decoys)
+    parser.add_argument('--seed', type=int, default=LibrarySpec.seed)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--only', nargs='*', help="Nombres de benchmarks a ejecutar")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Variación máxima tolerada antes de marcar regresión (0.25 = 25%%)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--json', type=Path, help="Guardar también los resultados en este archivo")
+    parser.add_argument('--trace', action='store_true', help="Mantener el tracing activo (por defecto se desactiva)")
+    parser.add_argument('--keep', action='store_true', help="No borrar la biblioteca generada")
+    args = parser.parse_args(argv)
+
+    spec = LibrarySpec(games=args.games, depth=args.depth, decoys=args.decoys, seed=args.seed)
+    if not args.trace:
+        configure_tracing(enabled=False)
+    work_dir = tempfile.mkdtemp(prefix='optiscaler_bench_')
+    try:
+        print(f"Generando biblioteca sintética ({spec.games} juegos, semilla {spec.seed}) en {work_dir}...")
+        ctx = build_context(work_dir, spec)
+        results = run_benchmarks(ctx, max(1, args.repeat), args.only)
+    finally:
+        if args.keep:
+            print(f"Biblioteca conservada en {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        args.json.write_text(json.dumps({n: r.to_dict() for n, r in results.items()}, indent=2), encoding='utf-8')
+    if args.save_baseline:
+        save_baseline(results, spec, args.baseline)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No hay línea base en {args.baseline}; ejecuta con --save-baseline para crearla.")
+        return 0
+    rows = compare(results, baseline, args.threshold)
+    print(format_report(rows, baseline, spec, args.threshold))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
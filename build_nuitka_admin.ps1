@@ -23,6 +23,7 @@ if (-not (Test-Path -Path "dist")) {
   --enable-plugin=tk-inter `
   --include-package=src `
   --include-data-dir=icons=icons `
+  --include-data-files=src/config/exe_rules.json=src/config/exe_rules.json `
   --windows-uac-admin `
   --assume-yes-for-downloads `
   --nofollow-import-to=more_itertools `
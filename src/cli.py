@@ -0,0 +1,320 @@
+"""Interfaz de línea de comandos sin GUI (escanear, instalar, actualizar, desinstalar).
+
+Uso:
+    python -m src.cli scan [--folder DIR]...
+    python -m src.cli games                    (índice del servicio; escanea si no hay)
+    python -m src.cli daemon start|stop|status
+    python -m src.cli skipped [--clear]        (carpetas sin juego que el escáner omite)
+    python -m src.cli install JUEGO... [--version V | --source DIR] [--dll dxgi.dll] [--nukem [DIR]]
+    python -m src.cli uninstall JUEGO...
+    python -m src.cli update [JUEGO...]        (sin juegos: todos los del escaneo)
+
+Cada línea de stdout es un objeto JSON con un campo "event":
+    log       {"level", "message"}           mensajes de los módulos core
+    progress  {"stage", "fraction"}          avance de la operación
+    game      {"path", "ok", ...}            resultado de un juego
+    folder    {"path", "cost_ms", ...}       carpeta omitida (comando skipped)
+    result    {"command", "ok", ...}         resumen final (siempre la última línea)
+
+Código de salida: 0 si todo fue bien, 1 si algo falló, 2 por argumentos
+inválidos y 130 si se canceló con Ctrl+C (se deshace el juego en curso).
+
+Los ajustes por defecto (DLL, GPU, modos, carpetas personalizadas) se leen de
+injector_config.json, igual que en la GUI. Este módulo sólo importa src.core y
+src.config: nunca carga customtkinter, pygame ni PIL. Si el servicio de índice
+(src.core.index_daemon) está en marcha, scan/games/update lo usan en lugar de
+escanear en este proceso (--no-daemon lo evita).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .config.paths import DLSSG_TO_FSR3_DIR, OPTISCALER_DIR
+from .config.settings import SPOOFING_DLL_NAMES
+from .core.config_manager import load_config
+from .core.tasks import TaskRunner, check_cancelled
+from .utils.error_handling import OperationCancelled
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+# Intervalo de espera del hilo principal (Ctrl+C se atiende entre esperas)
+WAIT_INTERVAL_S = 0.1
+
+
+class JsonLinesEmitter:
+    """Escribe eventos como JSON lines; seguro entre hilos."""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        line = json.dumps({'event': event, 'ts': round(time.time(), 3), **fields},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def log(self, level: str, message: str) -> None:
+        """log_func compatible con los módulos core."""
+        self.emit('log', level=level, message=str(message))
+
+    def progress(self, stage: str, fraction: float) -> None:
+        """ProgressCallback compatible con OptiScalerUpdater."""
+        self.emit('progress', stage=stage, fraction=round(float(fraction), 4))
+
+
+def _run_task(fn: Callable[[], Dict[str, Any]], name: str, out: JsonLinesEmitter) -> Dict[str, Any]:
+    """Ejecuta fn en el TaskRunner para que Ctrl+C la cancele de forma cooperativa."""
+    runner = TaskRunner(max_workers=1, log_func=out.log)
+    handle = runner.submit(fn, name=name)
+    try:
+        while not handle.wait(WAIT_INTERVAL_S):
+            pass
+    except KeyboardInterrupt:
+        out.log('WARN', "⏹ Cancelando... (se deshace el juego en curso)")
+        handle.cancel()
+        handle.wait()
+    finally:
+        runner.shutdown(cancel=False)
+    if isinstance(handle.error, OperationCancelled) or (handle.cancelled and handle.result is None):
+        return {'ok': False, 'cancelled': True}
+    if handle.error is not None:
+        return {'ok': False, 'error': str(handle.error)}
+    return handle.result
+
+
+def _daemon(args):
+    if getattr(args, 'no_daemon', False):
+        return None
+    from .core.index_daemon import connect
+    return connect()
+
+
+def _scan(args, out: JsonLinesEmitter, folders: List[str], cached: bool = False) -> List[tuple]:
+    """Escaneo en el servicio de índice si está en marcha (con cached, su índice actual)."""
+    client = _daemon(args)
+    if client is not None:
+        try:
+            with client:
+                out.log('INFO', "Usando el servicio de índice")
+                return client.games() if cached else client.scan(folders)
+        except Exception as e:
+            out.log('WARN', f"Servicio de índice no disponible, escaneando localmente: {e}")
+    from .core.scanner import scan_games
+    return scan_games(out.log, folders, use_cache=False)
+
+
+def _emit_games(out: JsonLinesEmitter, games: List[tuple]) -> None:
+    for path, display_name, mod_status, exe_name, platform_tag in games:
+        out.emit('game', path=path, name=display_name, platform=platform_tag,
+                 exe=exe_name, mod_status=mod_status, ok=True)
+
+
+def _game_dirs(paths: List[str]) -> List[str]:
+    return [os.path.normpath(os.path.abspath(p)) for p in paths]
+
+
+def _resolve_source(args, out: JsonLinesEmitter) -> Optional[str]:
+    if args.source:
+        return args.source
+    from .core.version_catalog import get_version_catalog
+    catalog = get_version_catalog()
+    source = catalog.path_for(args.version) if args.version else catalog.latest_path()
+    if source is None:
+        out.log('ERROR', f"No se encontró OptiScaler {args.version or ''} en {OPTISCALER_DIR}. Descárgalo primero.")
+        return None
+    return str(source)
+
+
+# ----------------------------------------------------------------------
+# Comandos
+# ----------------------------------------------------------------------
+def cmd_scan(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    folders = list(cfg.get('custom_game_folders') or []) + list(args.folder or [])
+    games = _scan(args, out, folders)
+    _emit_games(out, games)
+    return {'ok': True, 'games': len(games)}
+
+
+def cmd_games(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    games = _scan(args, out, list(cfg.get('custom_game_folders') or []), cached=True)
+    _emit_games(out, games)
+    return {'ok': True, 'games': len(games)}
+
+
+def cmd_daemon(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    from .core.index_daemon import connect, spawn_daemon
+    client = spawn_daemon() if args.action == 'start' else connect()
+    if client is None:
+        if args.action == 'start':
+            out.log('ERROR', "No se pudo iniciar el servicio de índice")
+        return {'ok': args.action != 'start', 'running': False}
+    with client:
+        status = client.status()
+        if args.action == 'stop':
+            client.shutdown()
+            return {'ok': True, 'running': False, 'pid': status['pid']}
+    return dict(status, ok=True, running=True)
+
+
+def cmd_skipped(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    from .core.scan_index import get_scan_index
+    index = get_scan_index()
+    if args.clear:
+        count = index.clear_skipped()
+        index.save()
+        return {'ok': True, 'cleared': count}
+    entries = index.skipped()
+    for entry in entries:
+        out.emit('folder', path=entry['path'], platform=entry.get('platform'),
+                 reason=entry.get('reason'), cost_ms=entry.get('cost_ms'))
+    return {'ok': True, 'folders': len(entries),
+            'cost_ms': round(sum(e.get('cost_ms', 0) for e in entries), 1)}
+
+
+def cmd_install(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    from .core.installer import inject_fsr_mod, install_combined_mods
+    from .core.scan_index import get_scan_index
+    source = _resolve_source(args, out)
+    if not source:
+        return {'ok': False, 'error': 'no_mod_source'}
+    options = dict(
+        spoof_dll_name=args.dll or cfg.get('last_spoof_name', 'dxgi.dll'),
+        gpu_choice=args.gpu or cfg.get('gpu_choice', 2),
+        fg_mode_selected=args.fg_mode or cfg.get('fg_mode', 'Automático'),
+        upscale_mode_selected=args.upscale_mode or cfg.get('upscale_mode', 'Automático'),
+        sharpness_selected=float(cfg.get('sharpness', 0.8)),
+        overlay_selected=bool(cfg.get('overlay', False)),
+        mb_selected=bool(cfg.get('motion_blur', True)),
+        index=get_scan_index(),
+        # --dll es una elección explícita; la de la configuración sólo si no es la de por defecto
+        spoof_dll_explicit=True if args.dll else None,
+    )
+    if options['spoof_dll_name'] not in SPOOFING_DLL_NAMES:
+        out.log('ERROR', f"DLL de inyección no válida: {options['spoof_dll_name']}")
+        return {'ok': False, 'error': 'invalid_dll'}
+    games = _game_dirs(args.games)
+    succeeded, failed = [], []
+    for index, game_dir in enumerate(games, 1):
+        check_cancelled()
+        out.progress(f"Instalando {index}/{len(games)}: {os.path.basename(game_dir)}", (index - 1) / len(games))
+        if args.nukem is not None:
+            ok = install_combined_mods(source, args.nukem, game_dir, out.log, install_nukem=True, **options)
+        else:
+            ok = inject_fsr_mod(source, game_dir, out.log, **options)
+        (succeeded if ok else failed).append(game_dir)
+        out.emit('game', path=game_dir, ok=bool(ok))
+    options['index'].save()
+    out.progress('Instalación completada', 1.0)
+    return {'ok': not failed, 'source': source, 'installed': succeeded, 'failed': failed}
+
+
+def cmd_uninstall(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    from .core.installer import uninstall_fsr_mod
+    games = _game_dirs(args.games)
+    succeeded, failed = [], []
+    for index, game_dir in enumerate(games, 1):
+        check_cancelled()
+        out.progress(f"Desinstalando {index}/{len(games)}: {os.path.basename(game_dir)}", (index - 1) / len(games))
+        ok, backups = uninstall_fsr_mod(game_dir, out.log)
+        (succeeded if ok else failed).append(game_dir)
+        out.emit('game', path=game_dir, ok=bool(ok), backups=len(backups or []))
+    out.progress('Desinstalación completada', 1.0)
+    return {'ok': not failed, 'uninstalled': succeeded, 'failed': failed}
+
+
+def cmd_update(args, cfg: Dict[str, Any], out: JsonLinesEmitter) -> Dict[str, Any]:
+    from pathlib import Path
+    from .core.updater import OptiScalerUpdater
+    if args.games:
+        games = _game_dirs(args.games)
+    else:
+        folders = list(cfg.get('custom_game_folders') or [])
+        games = [path for path, *_ in _scan(args, out, folders, cached=True)]
+    updater = OptiScalerUpdater(Path(OPTISCALER_DIR), log_func=out.log)
+    summary = updater.perform_full_update([Path(g) for g in games], out.progress)
+    reports = summary.get('games_updated') or {}
+    for game_dir, report in reports.items():
+        out.emit('game', path=game_dir, **{k: v for k, v in report.items() if k != 'game_dir'})
+    failed = [g for g, r in reports.items() if not r.get('ok')]
+    ok = not failed and (summary.get('updated') or summary.get('reason') == 'already_latest')
+    return dict(summary, ok=bool(ok), games_updated=sorted(reports), failed=failed)
+
+
+COMMANDS = {
+    'scan': cmd_scan,
+    'games': cmd_games,
+    'daemon': cmd_daemon,
+    'skipped': cmd_skipped,
+    'install': cmd_install,
+    'uninstall': cmd_uninstall,
+    'update': cmd_update,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src.cli',
+                                     description="Gestor OptiScaler sin interfaz gráfica (salida JSON lines)")
+    parser.add_argument('--config', help="injector_config.json alternativo")
+    parser.add_argument('--no-daemon', action='store_true', help="No usar el servicio de índice aunque esté en marcha")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    scan = sub.add_parser('scan', help="Escanear Steam, Epic, Xbox y carpetas personalizadas")
+    scan.add_argument('--folder', action='append', help="Carpeta personalizada adicional (repetible)")
+
+    sub.add_parser('games', help="Lista de juegos del servicio de índice (escanea si no está en marcha)")
+
+    daemon = sub.add_parser('daemon', help="Servicio de índice en segundo plano")
+    daemon.add_argument('action', choices=('start', 'stop', 'status'))
+
+    skipped = sub.add_parser('skipped', help="Carpetas sin juego que el escáner ya no recorre")
+    skipped.add_argument('--clear', action='store_true', help="Volver a comprobarlas en el próximo escaneo")
+
+    install = sub.add_parser('install', help="Instalar OptiScaler en las carpetas indicadas")
+    install.add_argument('games', nargs='+', help="Carpeta del ejecutable de cada juego")
+    install.add_argument('--version', help="Versión descargada a usar (por defecto la más reciente)")
+    install.add_argument('--source', help="Carpeta de OptiScaler extraída (ignora --version)")
+    install.add_argument('--dll', choices=SPOOFING_DLL_NAMES, help="DLL de inyección")
+    install.add_argument('--gpu', type=int, choices=(1, 2), help="1=NVIDIA, 2=AMD/Intel")
+    install.add_argument('--fg-mode', help="Modo de Frame Generation")
+    install.add_argument('--upscale-mode', help="Modo de calidad de reescalado")
+    install.add_argument('--nukem', nargs='?', const=str(DLSSG_TO_FSR3_DIR), metavar='DIR',
+                         help="Instalar también dlssg-to-fsr3 (carpeta opcional)")
+
+    uninstall = sub.add_parser('uninstall', help="Eliminar OptiScaler de las carpetas indicadas")
+    uninstall.add_argument('games', nargs='+')
+
+    update = sub.add_parser('update', help="Descargar la última versión y actualizar los juegos")
+    update.add_argument('games', nargs='*', help="Carpetas a actualizar (por defecto, todos los juegos escaneados)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, stream=None) -> int:
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    out = JsonLinesEmitter(stream)
+    cfg = load_config(args.config)
+    started = time.perf_counter()
+    result = _run_task(lambda: COMMANDS[args.command](args, cfg, out), args.command, out)
+    out.emit('result', command=args.command, elapsed_s=round(time.perf_counter() - started, 3), **result)
+    if result.get('cancelled'):
+        return EXIT_CANCELLED
+    return EXIT_OK if result.get('ok') else EXIT_FAILED
+
+
+if __name__ == '__main__':
+    sys.exit(main())
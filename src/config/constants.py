@@ -79,4 +79,6 @@ TARGET_MOD_FILES = [
 ]
 
 TARGET_MOD_DIRS = ['D3D12_Optiscaler', 'DlssOverrides', 'Licenses']
+# Extensiones de archivos sueltos que se copian desde la carpeta del mod al juego
+MOD_FILE_EXTENSIONS = ('.dll', '.json', '.ini', '.bat', '.asi', '.cfg', '.txt', '.log', '.dat', '.sh', '.bin', '.reg')
 GENERIC_SPOOF_FILES = ['dxgi.dll', 'd3d12.dll', 'winmm.dll', 'dinput8.dll']
\ No newline at end of file
@@ -73,6 +73,7 @@ LOG_DIR = APP_DIR / "logs"
 XBOX_GAMES_DIR = Path(r"C:\XboxGames")
 STEAM_COMMON_DIR = Path(r"C:\Program Files (x86)\Steam\steamapps\common")
 EPIC_COMMON_DIR = Path(r"C:\Program Files\Epic Games")
+EPIC_MANIFESTS_DIR = Path(os.environ.get('PROGRAMDATA', r"C:\ProgramData")) / "Epic" / "EpicGamesLauncher" / "Data" / "Manifests"
 NVIDIA_CHECK_FILE = Path(r"C:\Windows\system32\nvapi64.dll")
 
 # Executable search paths
@@ -87,6 +88,11 @@ RECURSIVE_EXE_PATTERNS = [
     '**/*Game/Binaries/Win64/*.exe', '**/x64/*.exe'
 ]
 
+# Reglas de búsqueda de ejecutables (motores, patrones, lista negra, profundidad).
+# Un exe_rules.json en APP_DIR sustituye al incluido con la aplicación.
+EXE_RULES_FILE = Path(__file__).resolve().parent / "exe_rules.json"
+USER_EXE_RULES_FILE = APP_DIR / "exe_rules.json"
+
 
 def initialize_directories():
     """Create all required directories if they don't exist."""
@@ -11,6 +11,10 @@ from pathlib import Path
 from typing import Optional, Tuple
 import shutil
 
+from ..utils.error_handling import OperationCancelled
+from ..utils.paths import get_app_executable
+from .tasks import write_chunks
+
 
 def get_current_version() -> str:
     """Obtiene la versión actual de la aplicación."""
@@ -84,6 +88,59 @@ def _is_newer_version(current: str, latest: str) -> bool:
         return latest > current
 
 
+def _find_delta_asset(assets: list, current_version: str, latest_version: str) -> Optional[dict]:
+    """Busca el parche '<nombre>-<actual>-to-<nueva>.delta' publicado en la release."""
+    suffix = f"{current_version}-to-{latest_version}.delta"
+    for asset in assets:
+        if asset.get("name", "").endswith(suffix):
+            return asset
+    return None
+
+
+def _try_delta_update(delta_asset: dict, exe_asset: dict, current_exe: str, temp_file: str,
+                      logger=None, progress_callback=None) -> bool:
+    """
+    Intenta construir el nuevo ejecutable aplicando un delta a una copia del actual.
+    
+    Returns:
+        bool: True si temp_file contiene el nuevo ejecutable verificado
+    """
+    from .binary_delta import apply_delta, DeltaPatchError
+    
+    try:
+        if logger:
+            logger("INFO", f"Descargando parche: {delta_asset['name']} ({delta_asset.get('size', 0) / 1024 / 1024:.2f} MB)")
+        if progress_callback:
+            progress_callback(0, 1, False, "Descargando parche...")
+        response = requests.get(delta_asset["browser_download_url"], timeout=30)
+        response.raise_for_status()
+        
+        # Aplicar sobre una copia: el ejecutable en uso no se toca
+        base_copy = temp_file + ".base"
+        shutil.copy2(current_exe, base_copy)
+        try:
+            result_sha = apply_delta(base_copy, response.content, temp_file)
+        finally:
+            try:
+                os.remove(base_copy)
+            except OSError:
+                pass
+        
+        # Verificar también contra el digest publicado del .exe completo
+        digest = exe_asset.get("digest") or ""
+        if digest.startswith("sha256:") and digest.split(":", 1)[1].lower() != result_sha:
+            os.remove(temp_file)
+            raise DeltaPatchError("El hash no coincide con el ejecutable publicado")
+        
+        if logger:
+            logger("OK", f"Parche aplicado y verificado ({exe_asset.get('size', 0) / 1024 / 1024:.2f} MB sin descargar)")
+        return True
+    except (requests.RequestException, DeltaPatchError, OSError) as e:
+        if logger:
+            logger("WARN", f"No se pudo usar el parche ({e}); se descargará el ejecutable completo")
+        return False
+
+
 def download_and_install_update(release_info: dict, logger=None, progress_callback=None) -> bool:
     """
     Descarga e instala la actualización.
@@ -115,41 +172,47 @@ def download_and_install_update(release_info: dict, logger=None, progress_callba
         file_size = exe_asset["size"]
         file_name = exe_asset["name"]
         
-        if logger:
-            logger("INFO", f"Descargando actualización: {file_name} ({file_size / 1024 / 1024:.2f} MB)")
-        
         # Crear directorio temporal
         temp_dir = tempfile.gettempdir()
         temp_file = os.path.join(temp_dir, file_name)
         
-        # Descargar archivo
-        response = requests.get(download_url, stream=True, timeout=30)
-        response.raise_for_status()
+        # En onefile, sys.executable es la copia temporal: parchear/sustituir el .exe real
+        current_exe = get_app_executable()
         
-        downloaded = 0
-        with open(temp_file, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    
-                    if progress_callback:
-                        progress = downloaded / file_size if file_size > 0 else 0
-                        progress_callback(
-                            downloaded,
-                            file_size,
-                            False,
-                            f"Descargando... {progress * 100:.1f}%"
-                        )
+        # Parche binario opcional (si la release lo publica para nuestra versión)
+        latest_version = release_info.get("tag_name", "").lstrip("v")
+        delta_asset = _find_delta_asset(assets, get_current_version(), latest_version)
+        patched = bool(current_exe and delta_asset and _try_delta_update(
+            delta_asset, exe_asset, current_exe, temp_file, logger, progress_callback
+        ))
         
-        if logger:
-            logger("OK", f"Descarga completada: {temp_file}")
+        if not patched:
+            if logger:
+                logger("INFO", f"Descargando actualización: {file_name} ({file_size / 1024 / 1024:.2f} MB)")
+            
+            # Descargar archivo
+            response = requests.get(download_url, stream=True, timeout=30)
+            response.raise_for_status()
+            
+            def on_chunk(downloaded):
+                if progress_callback:
+                    progress = downloaded / file_size if file_size > 0 else 0
+                    progress_callback(
+                        downloaded,
+                        file_size,
+                        False,
+                        f"Descargando... {progress * 100:.1f}%"
+                    )
+            
+            write_chunks(response.iter_content(chunk_size=8192), temp_file, on_chunk)
+            
+            if logger:
+                logger("OK", f"Descarga completada: {temp_file}")
         
         if progress_callback:
             progress_callback(file_size, file_size, False, "Preparando actualización...")
         
         # Preparar script de actualización
-        current_exe = sys.executable if getattr(sys, 'frozen', False) else None
         
         if not current_exe or not current_exe.endswith('.exe'):
             if logger:
@@ -214,6 +277,12 @@ del /f /q "%~f0"
         
         return True
         
+    except OperationCancelled:
+        if logger:
+            logger("WARN", "Actualización cancelada")
+        if progress_callback:
+            progress_callback(0, 1, True, "Actualización cancelada")
+        return False
     except requests.RequestException as e:
         if logger:
             logger("ERROR", f"Error descargando actualización: {e}")
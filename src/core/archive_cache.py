@@ -0,0 +1,241 @@
+"""Caché acotada de archivos descargados (.7z/.zip) con expulsión LRU.
+
+Los archivos de release se conservan en CACHE_DIR/archives tras extraerlos,
+indexados por id de asset de GitHub y por el sha256 publicado, que se
+verifica antes de aceptarlos. Una descarga repetida reutiliza el archivo y
+el total se mantiene bajo un presupuesto en bytes. El index.json se reescribe
+de forma atómica; si la caché falla, se descarga como siempre.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config.paths import CACHE_DIR
+
+# Presupuesto por defecto (configurable con 'archive_cache_max_mb')
+DEFAULT_ARCHIVE_CACHE_MAX_MB = 1024
+ARCHIVE_CACHE_DIR = CACHE_DIR / "archives"
+
+_index_lock = Lock()
+
+
+def parse_digest(digest: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Separa un digest de GitHub ('sha256:<hex>') en (algoritmo, hex)."""
+    if not digest or ':' not in digest:
+        return None, None
+    algo, _, value = digest.partition(':')
+    algo = algo.strip().lower()
+    if algo not in hashlib.algorithms_available:
+        return None, None
+    return algo, value.strip().lower()
+
+
+def file_digest(path: str | Path, algo: str = 'sha256', chunk_size: int = 1024 * 1024) -> str:
+    """Calcula el hash de un archivo leyendo por bloques."""
+    h = hashlib.new(algo)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def verify_digest(path: str | Path, digest: Optional[str]) -> bool:
+    """Comprueba un archivo contra el digest publicado (True si no hay digest)."""
+    algo, expected = parse_digest(digest)
+    if not algo:
+        return True
+    try:
+        return file_digest(path, algo) == expected
+    except OSError:
+        return False
+
+
+def get_archive_cache_budget() -> int:
+    """Lee el presupuesto de la caché (bytes) desde injector_config.json."""
+    try:
+        from .config_manager import load_config
+        max_mb = float(load_config().get('archive_cache_max_mb', DEFAULT_ARCHIVE_CACHE_MAX_MB))
+    except Exception:
+        max_mb = DEFAULT_ARCHIVE_CACHE_MAX_MB
+    return max(0, int(max_mb * 1024 * 1024))
+
+
+class ArchiveCache:
+    """Caché LRU de archivos de release indexada por asset id + digest."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None,
+                 log_func: Optional[Callable[[str, str], None]] = None) -> None:
+        self.root = Path(root) if root else ARCHIVE_CACHE_DIR
+        self.max_bytes = get_archive_cache_budget() if max_bytes is None else max_bytes
+        self.log = log_func or (lambda level, msg: None)
+        self.index_file = self.root / "index.json"
+
+    # ------------------------------------------------------------------
+    # Index helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def asset_key(asset: Dict[str, Any]) -> Optional[str]:
+        """Clave estable de un asset: '<id>-<digest[:16]>' o '<id>-<size>'."""
+        asset_id = asset.get('id')
+        if not asset_id:
+            return None
+        _, digest_hex = parse_digest(asset.get('digest'))
+        suffix = digest_hex[:16] if digest_hex else f"s{asset.get('size', 0)}"
+        return f"{asset_id}-{suffix}"
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, self.index_file)
+
+    def _entry_path(self, key: str, entry: Dict[str, Any]) -> Path:
+        return self.root / key / entry.get('name', '')
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def lookup(self, asset: Dict[str, Any]) -> Optional[Path]:
+        """Devuelve la ruta del archivo cacheado para el asset (y lo marca como usado)."""
+        key = self.asset_key(asset)
+        if not key:
+            return None
+        with _index_lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if not entry:
+                return None
+            path = self._entry_path(key, entry)
+            try:
+                if path.stat().st_size != entry.get('size'):
+                    raise OSError("size mismatch")
+            except OSError:
+                # Entrada huérfana o archivo truncado: olvidarla
+                index.pop(key, None)
+                shutil.rmtree(self.root / key, ignore_errors=True)
+                self._save_index(index)
+                return None
+            entry['last_used'] = time.time()
+            self._save_index(index)
+        self.log('INFO', f"Archivo en caché: {entry.get('name')}")
+        return path
+
+    def store(self, asset: Dict[str, Any], archive_path: str | Path, move: bool = True) -> Optional[Path]:
+        """Guarda un archivo descargado en la caché.
+
+        El archivo se verifica contra el digest del asset antes de aceptarlo.
+        Con move=True el archivo original se mueve (evita copiar cientos de MB).
+
+        Returns:
+            Path | None: Ruta dentro de la caché o None si no se cacheó.
+        """
+        key = self.asset_key(asset)
+        archive_path = Path(archive_path)
+        if not key or not archive_path.is_file():
+            return None
+        try:
+            size = archive_path.stat().st_size
+            if size > self.max_bytes:
+                return None
+            if not verify_digest(archive_path, asset.get('digest')):
+                self.log('WARN', f"Digest no coincide para {archive_path.name}; no se guarda en caché")
+                return None
+            dest_dir = self.root / key
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest = dest_dir / (asset.get('name') or archive_path.name)
+            if move:
+                shutil.move(str(archive_path), dest)
+            else:
+                shutil.copy2(archive_path, dest)
+            with _index_lock:
+                index = self._load_index()
+                index[key] = {
+                    'name': dest.name,
+                    'size': size,
+                    'asset_id': asset.get('id'),
+                    'digest': asset.get('digest'),
+                    'stored_at': time.time(),
+                    'last_used': time.time(),
+                }
+                self._evict(index, keep=key)
+                self._save_index(index)
+            return dest
+        except Exception as e:
+            self.log('WARN', f"No se pudo guardar {archive_path.name} en caché: {e}")
+            return None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Copia del índice {clave: entrada}."""
+        with _index_lock:
+            return dict(self._load_index())
+
+    def remove(self, key: str) -> int:
+        """Elimina una entrada concreta y devuelve los bytes liberados."""
+        with _index_lock:
+            index = self._load_index()
+            entry = index.pop(key, None)
+            if entry is None:
+                return 0
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            self._save_index(index)
+        return entry.get('size', 0)
+
+    def _evict(self, index: Dict[str, Dict[str, Any]], keep: Optional[str] = None) -> int:
+        """Expulsa entradas menos usadas hasta cumplir el presupuesto. Llamar con el lock."""
+        total = sum(e.get('size', 0) for e in index.values())
+        freed = 0
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            total -= entry.get('size', 0)
+            freed += entry.get('size', 0)
+            index.pop(key, None)
+            self.log('INFO', f"Caché de archivos: expulsado {entry.get('name')}")
+        return freed
+
+    def trim(self, max_bytes: Optional[int] = None) -> int:
+        """Aplica el presupuesto (o uno nuevo) y devuelve los bytes liberados."""
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        with _index_lock:
+            index = self._load_index()
+            freed = self._evict(index)
+            if freed:
+                self._save_index(index)
+        return freed
+
+    def total_size(self) -> int:
+        """Tamaño total (bytes) de los archivos en caché."""
+        with _index_lock:
+            return sum(e.get('size', 0) for e in self._load_index().values())
+
+    def clear(self) -> None:
+        """Vacía la caché por completo."""
+        with _index_lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+__all__ = [
+    'ArchiveCache', 'DEFAULT_ARCHIVE_CACHE_MAX_MB', 'ARCHIVE_CACHE_DIR',
+    'parse_digest', 'file_digest', 'verify_digest', 'get_archive_cache_budget'
+]
@@ -0,0 +1,207 @@
+"""Parches binarios (delta) en Python puro para la auto-actualización.
+
+El delta se genera en la release y se aplica sobre una copia del ejecutable
+actual; el sha256 de origen y de resultado se verifica y, si no coincide, el
+parche se descarta.
+
+Formato (.delta): cabecera sin comprimir (MAGIC + tamaño/sha256 del binario
+viejo y del nuevo) seguida de un flujo de operaciones comprimido con lzma:
+    b'C' <offset:u64> <length:u32>  -> copiar del binario viejo
+    b'I' <length:u32> <bytes>       -> insertar bytes nuevos
+
+Uso en release:
+    python -m src.core.binary_delta diff viejo.exe nuevo.exe salida.delta
+"""
+
+from __future__ import annotations
+
+import hashlib
+import lzma
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Tuple
+
+from ..utils.error_handling import DeltaPatchError
+
+MAGIC = b'OSMDELT1'
+HEADER = struct.Struct('<8sQQ32s32s')
+COPY_OP = struct.Struct('<QI')
+INSERT_OP = struct.Struct('<I')
+
+DEFAULT_BLOCK_SIZE = 64
+# Tras una coincidencia se prueba byte a byte durante DENSE_WINDOW bytes; en
+# tramos largos sin coincidencias se salta block_size - 1 bytes (coprimo con
+# block_size), así cualquier tramo común de al menos block_size² bytes se sigue
+# encontrando y un binario de 100 MB sin parecido cuesta ~1/63 de las búsquedas
+DENSE_WINDOW = 4096
+MAX_OP_LENGTH = 0xFFFFFFFF
+READ_CHUNK = 1024 * 1024
+
+
+def _sha256_file(path: str | Path) -> bytes:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def make_delta(old: bytes, new: bytes, block_size: int = DEFAULT_BLOCK_SIZE) -> bytes:
+    """Genera el delta old -> new (bloques de old indexados + extensión de coincidencias).
+
+    Los bloques de old se indexan cada block_size bytes; new se recorre byte a
+    byte cerca de la última coincidencia y a saltos en los tramos sin ellas
+    (ver DENSE_WINDOW). La extensión hacia atrás recupera el inicio de una
+    coincidencia encontrada tras un salto.
+    """
+    index = {}
+    for off in range(0, len(old) - block_size + 1, block_size):
+        index.setdefault(old[off:off + block_size], off)
+
+    ops = bytearray()
+
+    def emit_insert(start: int, end: int) -> None:
+        while start < end:
+            length = min(end - start, MAX_OP_LENGTH)
+            ops.extend(b'I' + INSERT_OP.pack(length))
+            ops.extend(new[start:start + length])
+            start += length
+
+    n, n_old = len(new), len(old)
+    sparse_step = max(1, block_size - 1)
+    literal_start = i = 0
+    while i + block_size <= n:
+        off = index.get(new[i:i + block_size])
+        if off is None:
+            i += 1 if i - literal_start < DENSE_WINDOW else sparse_step
+            continue
+        # Extender hacia atrás (dentro del literal pendiente) y hacia delante
+        start_new, start_old = i, off
+        while (start_new - block_size >= literal_start and start_old >= block_size
+               and new[start_new - block_size:start_new] == old[start_old - block_size:start_old]):
+            start_new -= block_size
+            start_old -= block_size
+        while start_new > literal_start and start_old > 0 and new[start_new - 1] == old[start_old - 1]:
+            start_new -= 1
+            start_old -= 1
+        end_new, end_old = i + block_size, off + block_size
+        while (end_new + block_size <= n and end_old + block_size <= n_old
+               and new[end_new:end_new + block_size] == old[end_old:end_old + block_size]):
+            end_new += block_size
+            end_old += block_size
+        while end_new < n and end_old < n_old and new[end_new] == old[end_old]:
+            end_new += 1
+            end_old += 1
+
+        emit_insert(literal_start, start_new)
+        pos_new, pos_old = start_new, start_old
+        while pos_new < end_new:
+            length = min(end_new - pos_new, MAX_OP_LENGTH)
+            ops.extend(b'C' + COPY_OP.pack(pos_old, length))
+            pos_new += length
+            pos_old += length
+        literal_start = i = end_new
+    emit_insert(literal_start, n)
+
+    header = HEADER.pack(MAGIC, len(old), len(new),
+                         hashlib.sha256(old).digest(), hashlib.sha256(new).digest())
+    return header + lzma.compress(bytes(ops))
+
+
+def read_delta_header(delta: bytes) -> Tuple[int, int, str, str]:
+    """Devuelve (tamaño viejo, tamaño nuevo, sha256 viejo, sha256 nuevo) de un delta."""
+    if len(delta) < HEADER.size:
+        raise DeltaPatchError("Delta truncado")
+    magic, old_size, new_size, old_sha, new_sha = HEADER.unpack_from(delta)
+    if magic != MAGIC:
+        raise DeltaPatchError("Formato de delta no reconocido")
+    return old_size, new_size, old_sha.hex(), new_sha.hex()
+
+
+def apply_delta(old_path: str | Path, delta: bytes, out_path: str | Path) -> str:
+    """Aplica un delta a old_path escribiendo out_path.
+
+    Verifica el sha256 del origen antes y el del resultado después; si algo no
+    coincide se borra out_path y se lanza DeltaPatchError.
+
+    Returns:
+        str: sha256 (hex) del archivo generado.
+    """
+    old_size, new_size, old_sha, new_sha = read_delta_header(delta)
+    if os.path.getsize(old_path) != old_size or _sha256_file(old_path).hex() != old_sha:
+        raise DeltaPatchError("El delta no corresponde a este ejecutable")
+    try:
+        ops = lzma.decompress(delta[HEADER.size:])
+    except lzma.LZMAError as e:
+        raise DeltaPatchError(f"Delta corrupto: {e}")
+
+    h = hashlib.sha256()
+    written = 0
+    try:
+        with open(old_path, 'rb') as src, open(out_path, 'wb') as dst:
+            pos = 0
+            while pos < len(ops):
+                op = ops[pos:pos + 1]
+                pos += 1
+                if op == b'C':
+                    offset, length = COPY_OP.unpack_from(ops, pos)
+                    pos += COPY_OP.size
+                    if offset + length > old_size:
+                        raise DeltaPatchError("Operación de copia fuera de rango")
+                    src.seek(offset)
+                    remaining = length
+                    while remaining:
+                        chunk = src.read(min(remaining, READ_CHUNK))
+                        if not chunk:
+                            raise DeltaPatchError("Lectura incompleta del ejecutable")
+                        dst.write(chunk)
+                        h.update(chunk)
+                        remaining -= len(chunk)
+                    written += length
+                elif op == b'I':
+                    (length,) = INSERT_OP.unpack_from(ops, pos)
+                    pos += INSERT_OP.size
+                    chunk = ops[pos:pos + length]
+                    if len(chunk) != length:
+                        raise DeltaPatchError("Delta truncado")
+                    pos += length
+                    dst.write(chunk)
+                    h.update(chunk)
+                    written += length
+                else:
+                    raise DeltaPatchError(f"Operación desconocida en el delta: {op!r}")
+        result_sha = h.hexdigest()
+        if written != new_size or result_sha != new_sha:
+            raise DeltaPatchError("El resultado del delta no coincide con el hash esperado")
+        return result_sha
+    except Exception as e:
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        if isinstance(e, struct.error):
+            raise DeltaPatchError(f"Delta truncado: {e}") from e
+        raise
+
+
+__all__ = ['make_delta', 'apply_delta', 'read_delta_header', 'DeltaPatchError']
+
+
+def main(argv=None) -> int:
+    """CLI de release: diff OLD NEW OUT."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if len(argv) != 4 or argv[0] != 'diff':
+        print("Uso: python -m src.core.binary_delta diff VIEJO NUEVO SALIDA.delta")
+        return 2
+    _, old, new, out = argv
+    delta = make_delta(Path(old).read_bytes(), Path(new).read_bytes())
+    Path(out).write_bytes(delta)
+    print(f"Delta escrito: {out} ({len(delta) / 1024 / 1024:.2f} MB, nuevo {os.path.getsize(new) / 1024 / 1024:.2f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
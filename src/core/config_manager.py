@@ -25,6 +25,9 @@ def default_config() -> Dict[str, Any]:
         "overlay": False,
         "motion_blur": True,
         "custom_game_folders": [],
+        "archive_cache_max_mb": 1024,
+        "profiling_mode": "off",
+        "index_daemon": False,
         "cache_dir": CACHE_DIR
     }
 
@@ -0,0 +1,99 @@
+"""Biblioteca de Epic Games a partir de los manifiestos del launcher.
+
+Los manifiestos *.item (JSON) de EpicGamesLauncher\\Data\\Manifests se leen
+con un único listado de carpeta, sin recorrer el registro, y dan la carpeta,
+el ejecutable de lanzamiento y la versión de cada instalación. Se descartan
+DLC, motores/plugins e instalaciones incompletas, y el lanzador de un
+proyecto de Unreal Engine se resuelve a su ejecutable real
+(<Proyecto>.exe -> <Proyecto>/Binaries/Win64/<Proyecto>-Win64-Shipping.exe).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Carpetas donde UE deja el ejecutable real junto al lanzador de la raíz
+_UE_BINARIES = (('Binaries', 'Win64', '-Win64-Shipping.exe'), ('Binaries', 'WinGDK', '-WinGDK-Shipping.exe'))
+
+
+@dataclass
+class EpicApp:
+    app_name: str
+    display_name: str
+    install_location: str
+    launch_executable: str = ''      # relativo a install_location
+    version: str = ''
+    categories: List[str] = field(default_factory=list)
+    main_game_app_name: str = ''
+    incomplete: bool = False
+
+    @property
+    def install_path(self) -> str:
+        return os.path.normpath(self.install_location)
+
+    @property
+    def is_game(self) -> bool:
+        """Juego instalado y completo (no DLC, motor ni plugin)."""
+        if self.incomplete or not self.launch_executable:
+            return False
+        if self.main_game_app_name and self.main_game_app_name != self.app_name:
+            return False
+        return not self.categories or 'games' in self.categories
+
+    def resolve_executable(self) -> Optional[Tuple[str, str]]:
+        """(carpeta de inyección, exe) según el manifiesto, o None si el exe no existe.
+
+        Sólo comprueba rutas concretas (sin recorrer la carpeta): si LaunchExecutable
+        es el lanzador de UE de la raíz, se usa el -Shipping.exe de su proyecto.
+        """
+        exe_path = os.path.normpath(os.path.join(self.install_location, self.launch_executable))
+        if not os.path.isfile(exe_path):
+            return None
+        exe_dir, exe_name = os.path.split(exe_path)
+        if os.path.normcase(exe_dir) == os.path.normcase(self.install_path):
+            project = os.path.splitext(exe_name)[0]
+            for sub, platform, suffix in _UE_BINARIES:
+                shipping_dir = os.path.join(exe_dir, project, sub, platform)
+                if os.path.isfile(os.path.join(shipping_dir, project + suffix)):
+                    return shipping_dir, project + suffix
+        return exe_dir, exe_name
+
+
+def read_epic_manifests(manifests_dir: Optional[str]) -> List[EpicApp]:
+    """Instalaciones descritas por los *.item de manifests_dir ([] si no hay)."""
+    apps: List[EpicApp] = []
+    if not manifests_dir:
+        return apps
+    try:
+        names = os.listdir(manifests_dir)
+    except OSError:
+        return apps
+    for name in names:
+        if not name.lower().endswith('.item'):
+            continue
+        try:
+            with open(os.path.join(manifests_dir, name), 'r', encoding='utf-8-sig') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict) or not data.get('InstallLocation'):
+            continue
+        app_name = str(data.get('AppName') or os.path.splitext(name)[0])
+        apps.append(EpicApp(
+            app_name=app_name,
+            display_name=str(data.get('DisplayName') or app_name),
+            install_location=str(data['InstallLocation']),
+            launch_executable=str(data.get('LaunchExecutable') or ''),
+            version=str(data.get('AppVersionString') or ''),
+            categories=[str(c).lower() for c in data.get('AppCategories') or []],
+            main_game_app_name=str(data.get('MainGameAppName') or ''),
+            incomplete=bool(data.get('bIsIncompleteInstall')),
+        ))
+    apps.sort(key=lambda a: a.display_name.lower())
+    return apps
+
+
+__all__ = ['EpicApp', 'read_epic_manifests']
@@ -0,0 +1,183 @@
+"""Reglas de búsqueda del ejecutable de un juego, cargadas de un archivo de datos.
+
+Se leen de src/config/exe_rules.json (o de APP_DIR/exe_rules.json si existe) y
+se compilan una vez: la lista negra como una única regex, los patrones por
+prioridad (el mejor de los marcados como "final" detiene el recorrido), las
+estructuras por motor (Unreal Engine, Unity, id Tech, RE Engine) que
+localizan el exe con unos pocos globs, la profundidad máxima por carpeta y
+las carpetas que nunca se recorren (redistribuibles, anti-cheat, vídeos...).
+
+Formato del JSON (todas las claves son opcionales):
+    {
+      "max_depth": 4,
+      "direct_subfolders": ["Binaries/Win64", "bin"],
+      "patterns": [{"regex": "-win64-shipping\\\\.exe$", "final": true}, {"regex": ""}],
+      "blacklist": ["unins", "^origin\\\\.exe$"],
+      "prune_dirs": ["_commonredist"],
+      "engines": [{"name": "Unity", "markers": ["UnityPlayer.dll"], "exe_globs": ["*.exe"],
+                   "require_sibling": "{stem}_Data", "max_depth": 1}],
+      "depth_overrides": [{"folder": "forza*", "max_depth": 2}]
+    }
+Los patrones y la lista negra son regex que se buscan en el nombre del exe en
+minúsculas; "folder" es un patrón fnmatch sobre el nombre de la carpeta del juego.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import glob
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.paths import EXE_RULES_FILE, USER_EXE_RULES_FILE
+
+
+@dataclass
+class ExePattern:
+    regex: 're.Pattern[str]'
+    final: bool = False          # una coincidencia basta: no seguir recorriendo
+
+
+@dataclass
+class EngineRule:
+    name: str
+    markers: List[str]                   # globs relativos a la carpeta del juego
+    exe_globs: List[str]                 # por prioridad
+    require_sibling: str = ''            # p.ej. "{stem}_Data" (Unity)
+    max_depth: Optional[int] = None
+
+
+@dataclass
+class ExeRules:
+    max_depth: int = 4
+    direct_subfolders: List[str] = field(default_factory=list)
+    patterns: List[ExePattern] = field(default_factory=list)
+    blacklist: Optional['re.Pattern[str]'] = None
+    prune_dirs: frozenset = frozenset()
+    engines: List[EngineRule] = field(default_factory=list)
+    depth_overrides: List[Tuple[str, int]] = field(default_factory=list)
+    source: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = '') -> 'ExeRules':
+        """Compila las reglas; ValueError si una regex no es válida."""
+        try:
+            blacklist = [str(k).lower() for k in data.get('blacklist', [])]
+            return cls(
+                max_depth=int(data.get('max_depth', 4)),
+                direct_subfolders=[str(p) for p in data.get('direct_subfolders', [])],
+                patterns=[ExePattern(re.compile(str(p.get('regex', '')).lower()), bool(p.get('final')))
+                          for p in data.get('patterns', [{'regex': ''}])],
+                blacklist=re.compile('|'.join(f"(?:{k})" for k in blacklist)) if blacklist else None,
+                prune_dirs=frozenset(str(d).lower() for d in data.get('prune_dirs', [])),
+                engines=[EngineRule(name=str(e['name']), markers=list(e.get('markers', [])),
+                                    exe_globs=list(e.get('exe_globs', [])),
+                                    require_sibling=str(e.get('require_sibling', '')),
+                                    max_depth=e.get('max_depth'))
+                         for e in data.get('engines', [])],
+                depth_overrides=[(str(o['folder']).lower(), int(o['max_depth']))
+                                 for o in data.get('depth_overrides', [])],
+                source=source,
+            )
+        except (KeyError, TypeError, re.error) as e:
+            raise ValueError(f"Reglas de ejecutables inválidas ({source or 'dict'}): {e}") from e
+
+    @classmethod
+    def load(cls, path: str | Path) -> 'ExeRules':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), source=str(path))
+
+    def is_blacklisted(self, exe_name: str) -> bool:
+        return bool(self.blacklist and self.blacklist.search(exe_name.lower()))
+
+    def priority(self, exe_name: str) -> Optional[int]:
+        """Índice del primer patrón que coincide (menor = mejor), o None."""
+        lower = exe_name.lower()
+        for index, pattern in enumerate(self.patterns):
+            if pattern.regex.search(lower):
+                return index
+        return None
+
+    def is_final(self, priority: int) -> bool:
+        """True si un exe de esta prioridad detiene el recorrido: es el mejor
+        patrón, o es "final" y ningún patrón mejor es también "final" (un
+        -Win64-Shipping no detiene la búsqueda de un -WinGDK-Shipping)."""
+        if priority == 0:
+            return True
+        return self.patterns[priority].final and not any(p.final for p in self.patterns[:priority])
+
+    def should_prune(self, dir_name: str) -> bool:
+        return dir_name.lower() in self.prune_dirs
+
+    def depth_for(self, game_path: str, engine: Optional[EngineRule] = None) -> int:
+        """Profundidad máxima de recorrido para la carpeta de un juego."""
+        folder = os.path.basename(os.path.normpath(game_path)).lower()
+        for pattern, depth in self.depth_overrides:
+            if fnmatch.fnmatchcase(folder, pattern):
+                return depth
+        if engine is not None and engine.max_depth is not None:
+            return int(engine.max_depth)
+        return self.max_depth
+
+    def detect_engine(self, game_path: str) -> Optional[EngineRule]:
+        for engine in self.engines:
+            if any(glob.glob(os.path.join(glob.escape(game_path), marker)) for marker in engine.markers):
+                return engine
+        return None
+
+    def engine_executable(self, game_path: str, engine: EngineRule) -> Optional[Tuple[str, str]]:
+        """(carpeta, exe) según la estructura del motor; el más grande del primer glob con candidatos."""
+        for pattern in engine.exe_globs:
+            best, best_size = None, -1
+            for exe_path in glob.glob(os.path.join(glob.escape(game_path), pattern)):
+                exe_dir, exe_name = os.path.split(exe_path)
+                if self.is_blacklisted(exe_name):
+                    continue
+                if engine.require_sibling:
+                    sibling = engine.require_sibling.format(stem=os.path.splitext(exe_name)[0])
+                    if not os.path.isdir(os.path.join(exe_dir, sibling)):
+                        continue
+                try:
+                    size = os.path.getsize(exe_path)
+                except OSError:
+                    continue
+                if size > best_size:
+                    best, best_size = (exe_dir, exe_name), size
+            if best:
+                return best
+        return None
+
+
+_rules: Optional[ExeRules] = None
+_rules_lock = threading.Lock()
+
+
+def get_exe_rules() -> ExeRules:
+    """Reglas compartidas: APP_DIR/exe_rules.json si existe y es válido, si no las incluidas."""
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            for path in (USER_EXE_RULES_FILE, EXE_RULES_FILE):
+                try:
+                    _rules = ExeRules.load(path)
+                    break
+                except (OSError, ValueError):
+                    continue
+            else:
+                _rules = ExeRules.from_dict({'patterns': [{'regex': ''}]}, source='builtin')
+        return _rules
+
+
+def set_exe_rules(rules: Optional[ExeRules]) -> None:
+    """Sustituye las reglas compartidas (None: se recargan del archivo en el próximo uso)."""
+    global _rules
+    with _rules_lock:
+        _rules = rules
+
+
+__all__ = ['ExeRules', 'EngineRule', 'ExePattern', 'get_exe_rules', 'set_exe_rules']
@@ -2,6 +2,7 @@
 
 import os
 import json
+import shutil
 import sys
 import urllib.request
 import subprocess
@@ -28,8 +29,21 @@ from ..config.paths import (
     SEVEN_ZIP_PATH,
     CACHE_DIR
 )
-from ..utils.error_handling import error_handler, FSRException
+from ..utils.error_handling import error_handler, FSRException, OperationCancelled
 from ..utils.paths import normalize_path, create_directory
+from .archive_cache import ArchiveCache
+from .tasks import current_token, write_chunks
+from ..utils.metrics import get_metrics, timed
+from ..utils.tracing import current_span, span, traced
+from .version_catalog import get_version_catalog
+
+# Release catalog settings
+RELEASE_CATALOG_CACHE_KEY = "releases_catalog"
+RELEASE_CATALOG_SCHEMA = 1
+RELEASES_PER_PAGE = 100
+RELEASES_MAX_PAGES = 10
+RELEASES_CACHE_MAX_AGE = timedelta(hours=1)
+RELEASES_FULL_REFRESH_AGE = timedelta(days=7)
 
 class GitHubClient:
     """Client for interacting with GitHub API."""
@@ -47,6 +61,7 @@ class GitHubClient:
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'FSR-Injector'
         })
+        self.session.hooks['response'].append(self._record_response)
         
         # Configurar según el tipo de repositorio
         if repo_type == "nukem":
@@ -65,7 +80,16 @@ class GitHubClient:
         self.repo_type = repo_type
         self.cache_dir = os.path.join(CACHE_DIR, "github", repo_type)
         create_directory(self.cache_dir)
+        # Archivos descargados que se conservan para reinstalar sin red
+        self.archive_cache = ArchiveCache(log_func=self.logger)
         
+    def _record_response(self, response, *args, **kwargs):
+        """Count HTTP responses per repository and status (session response hook)."""
+        kind = 'api' if response.url.startswith(self.api_base) else 'download'
+        get_metrics().counter('github_requests_total', 'HTTP requests made by the GitHub client').inc(
+            repo=self.repo_type, kind=kind, status=response.status_code)
+        return response
+
     def _get_api_url(self, endpoint: str) -> str:
         """Get full API URL for endpoint.
         
@@ -122,43 +146,158 @@ class GitHubClient:
         except Exception as e:
             self.logger('WARN', f"Failed to write cache: {e}")
         
+    # ------------------------------------------------------------------
+    # Release catalog (compact, incrementally refreshed releases cache)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _compact_release(release: Dict) -> Dict:
+        """Reduce a GitHub release payload to the fields the app actually uses.
+
+        Keys keep the GitHub names so callers can use compact and raw
+        releases interchangeably. Release bodies are dropped; only a flag
+        telling whether the notes point to an external download is kept.
+
+        Args:
+            release: Release dictionary as returned by the GitHub API
+
+        Returns:
+            Compact, JSON-serializable release dictionary
+        """
+        body = (release.get('body') or '').lower()
+        return {
+            'id': release.get('id', 0),
+            'tag_name': release.get('tag_name', ''),
+            'name': release.get('name') or release.get('tag_name', ''),
+            'published_at': release.get('published_at') or release.get('created_at') or '',
+            'created_at': release.get('created_at') or '',
+            'prerelease': bool(release.get('prerelease', False)),
+            'html_url': release.get('html_url', ''),
+            'zipball_url': release.get('zipball_url', ''),
+            'external_download': 'nexus' in body,
+            'assets': [
+                {
+                    'id': asset.get('id', 0),
+                    'name': asset.get('name', ''),
+                    'size': asset.get('size', 0),
+                    'browser_download_url': asset.get('browser_download_url', ''),
+                    'digest': asset.get('digest'),
+                    'updated_at': asset.get('updated_at', ''),
+                }
+                for asset in release.get('assets', [])
+            ],
+        }
+
+    @staticmethod
+    def _sort_releases(releases: List[Dict]) -> List[Dict]:
+        """Sort releases newest first (ISO dates sort lexicographically)."""
+        return sorted(
+            releases,
+            key=lambda r: (r.get('published_at') or '', r.get('id') or 0),
+            reverse=True
+        )
+
+    def _load_release_catalog(self) -> Optional[Dict]:
+        """Load the compact release catalog if it exists and has a known schema."""
+        catalog = self._get_cached_response(RELEASE_CATALOG_CACHE_KEY)
+        if not isinstance(catalog, dict) or catalog.get('schema') != RELEASE_CATALOG_SCHEMA:
+            return None
+        if not isinstance(catalog.get('releases'), list):
+            return None
+        return catalog
+
+    def _fetch_release_pages(self, since_id: Optional[int] = None) -> List[Dict]:
+        """Fetch releases page by page, newest first.
+
+        Args:
+            since_id: If given, stop as soon as a release with an id lower or
+                equal to this one shows up (it is already in the catalog)
+
+        Returns:
+            List of compact releases newer than ``since_id``
+
+        Raises:
+            requests.exceptions.RequestException: If a page request fails
+        """
+        fetched = []
+        for page in range(1, RELEASES_MAX_PAGES + 1):
+            response = self.session.get(
+                self._get_api_url("releases"),
+                params={'per_page': RELEASES_PER_PAGE, 'page': page},
+                timeout=10
+            )
+            response.raise_for_status()
+            batch = response.json()
+            for release in batch:
+                if since_id is not None and release.get('id', 0) <= since_id:
+                    return fetched
+                fetched.append(self._compact_release(release))
+            if len(batch) < RELEASES_PER_PAGE:
+                break
+        return fetched
+
+    def _save_release_catalog(self, releases: List[Dict], full_refresh_at: str) -> Dict:
+        """Persist the release catalog and return it."""
+        catalog = {
+            'schema': RELEASE_CATALOG_SCHEMA,
+            'repo': f"{self.owner}/{self.repo}",
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'full_refresh_at': full_refresh_at,
+            'newest_id': max((r.get('id') or 0 for r in releases), default=0),
+            'releases': releases,
+        }
+        self._cache_response(RELEASE_CATALOG_CACHE_KEY, catalog)
+        return catalog
+
     @error_handler()
-    def get_releases(self, use_cache: bool = True) -> List[Dict]:
+    def get_releases(self, use_cache: bool = True, full_refresh: bool = False) -> List[Dict]:
         """Get list of releases from GitHub.
-        
+
+        Releases are kept in a compact catalog on disk. A fresh catalog is
+        returned directly; otherwise only releases newer than the newest
+        cached id are requested and merged in. A full refresh (to pick up
+        edited or deleted releases) happens when forced or when the last one
+        is older than ``RELEASES_FULL_REFRESH_AGE``.
+
         Args:
-            use_cache: Whether to use cached data
-            
+            use_cache: Whether to return the cached catalog while it is fresh
+            full_refresh: Refetch every page instead of only the new releases
+
         Returns:
-            List of release dictionaries
+            List of compact release dictionaries, newest first
         """
-        if use_cache:
-            cached = self._get_cached_response("releases", timedelta(hours=1))
-            if cached:
-                return cached
-                
+        catalog = self._load_release_catalog()
+        if catalog and not full_refresh:
+            now = datetime.now()
+            try:
+                fetched_at = datetime.fromisoformat(catalog.get('fetched_at', ''))
+                last_full = datetime.fromisoformat(catalog.get('full_refresh_at', ''))
+            except ValueError:
+                fetched_at = last_full = datetime.min
+            if use_cache and now - fetched_at <= RELEASES_CACHE_MAX_AGE:
+                return catalog['releases']
+            full_refresh = now - last_full > RELEASES_FULL_REFRESH_AGE
+
         try:
-            response = self.session.get(self._get_api_url("releases"))
-            response.raise_for_status()
-            releases = response.json()
-            
-            # Sort releases by date
-            for release in releases:
-                # Parse date string to datetime for sorting
-                release['published_at_dt'] = datetime.strptime(
-                    release['published_at'],
-                    '%Y-%m-%dT%H:%M:%SZ'
-                )
-            releases.sort(key=lambda x: x['published_at_dt'], reverse=True)
-            
-            # Cache the response
-            if use_cache:
-                self._cache_response("releases", releases)
-            
+            if catalog and not full_refresh:
+                newer = self._fetch_release_pages(since_id=catalog.get('newest_id', 0))
+                known_ids = {r.get('id') for r in newer}
+                releases = newer + [r for r in catalog['releases'] if r.get('id') not in known_ids]
+                full_refresh_at = catalog.get('full_refresh_at', '')
+                if newer:
+                    self.logger('INFO', f"Release catalog: {len(newer)} new release(s)")
+            else:
+                releases = self._fetch_release_pages()
+                full_refresh_at = datetime.now().isoformat(timespec='seconds')
+
+            releases = self._sort_releases(releases)
+            self._save_release_catalog(releases, full_refresh_at)
             return releases
-            
+
         except requests.exceptions.RequestException as e:
             self.logger('ERROR', f"Failed to fetch releases: {e}")
+            if catalog:
+                self.logger('WARN', "Using cached release catalog")
+                return catalog['releases']
             return []
             
     @error_handler()
@@ -309,40 +448,54 @@ class GitHubClient:
             download_url = asset['browser_download_url']
             expected_size = asset['size']
             
+            # Re-extract from the archive cache when this asset was downloaded before
+            cached_file = self.archive_cache.lookup(asset)
+            if cached_file:
+                if progress_callback:
+                    progress_callback(expected_size, expected_size, False,
+                                      "Using cached archive...")
+                self._extract_release(str(cached_file), progress_callback)
+                self._register_extracted(asset, release_info)
+                if progress_callback:
+                    progress_callback(1, 1, True, "Extraction from cache complete!")
+                return True
+            
             # Download file with progress reporting to OPTISCALER_DIR
             local_file = os.path.join(OPTISCALER_DIR, asset['name'])
             
             response = self.session.get(download_url, stream=True)
             response.raise_for_status()
             
-            with open(local_file, 'wb') as f:
-                downloaded = 0
-                chunk_size = 8192
-                
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback:
-                            progress = min(downloaded / expected_size, 1.0)
-                            progress_callback(downloaded, expected_size, False,
-                                           f"Downloading release... {progress:.1%}")
+            def on_chunk(downloaded):
+                if progress_callback:
+                    progress = min(downloaded / expected_size, 1.0)
+                    progress_callback(downloaded, expected_size, False,
+                                      f"Downloading release... {progress:.1%}")
+            
+            # Cancellable: a partial download never replaces local_file
+            write_chunks(response.iter_content(chunk_size=8192), local_file, on_chunk)
                                            
             # Extract the archive
             self._extract_release(local_file, progress_callback)
+            self._register_extracted(asset, release_info)
             
-            # Clean up downloaded archive
-            try:
-                os.remove(local_file)
-            except Exception as e:
-                self.logger('WARN', f"Failed to clean up downloaded file: {e}")
+            # Keep the archive in the cache (or clean it up if it can't be cached)
+            if not self.archive_cache.store(asset, local_file):
+                try:
+                    os.remove(local_file)
+                except Exception as e:
+                    self.logger('WARN', f"Failed to clean up downloaded file: {e}")
                 
             if progress_callback:
                 progress_callback(1, 1, True, "Download and extraction complete!")
                 
             return True
             
+        except OperationCancelled:
+            self.logger('WARN', "Release download cancelled")
+            if progress_callback:
+                progress_callback(0, 1, True, "Download cancelled")
+            raise
         except requests.RequestException as e:
             error_msg = f"Failed to download release: {e}"
             self.logger('ERROR', error_msg)
@@ -356,6 +509,16 @@ class GitHubClient:
                 progress_callback(0, 1, True, f"Download failed: {e}")
             raise FSRException(error_msg)
             
+    def _register_extracted(self, asset: Dict, release_info: Dict) -> None:
+        """Record an extracted release in the local version catalog."""
+        extract_path = os.path.join(OPTISCALER_DIR, os.path.splitext(asset['name'])[0])
+        try:
+            get_version_catalog().register(extract_path, tag=release_info.get('tag_name'))
+        except Exception as e:
+            self.logger('WARN', f"Failed to update version catalog: {e}")
+            
+    @traced('extract')
+    @timed('extract_seconds', 'Archive extraction time', source='github')
     def _extract_release(self, archive_path: str, progress_callback: Optional[Callable] = None) -> bool:
         """Extract downloaded release archive.
         
@@ -369,6 +532,7 @@ class GitHubClient:
         Raises:
             FSRException: If extraction fails
         """
+        current_span().set(archive=os.path.basename(archive_path))
         try:
             # Use SEVEN_ZIP_PATH from paths module
             if not os.path.exists(SEVEN_ZIP_PATH):
@@ -381,6 +545,7 @@ class GitHubClient:
             extract_path = os.path.join(OPTISCALER_DIR, extract_dir)
             
             # Create extraction directory
+            existed = os.path.isdir(extract_path)
             os.makedirs(extract_path, exist_ok=True)
             
             if progress_callback:
@@ -405,7 +570,15 @@ class GitHubClient:
             )
             
             # Monitor extraction and check progress
+            token = current_token()
             while True:
+                if token is not None and token.cancelled:
+                    # Don't leave a half-extracted version behind
+                    process.kill()
+                    process.wait()
+                    if not existed:
+                        shutil.rmtree(extract_path, ignore_errors=True)
+                    raise OperationCancelled("Extraction cancelled")
                 line = process.stdout.readline()
                 if not line and process.poll() is not None:
                     break
@@ -511,8 +684,9 @@ class GitHubClient:
                 self.logger('INFO', f"  - {asset.get('name', 'unknown')}")
             
             # Verificar si el release indica descarga externa (ej: Nexus Mods)
-            body = release_info.get('body', '').lower()
-            if not assets and ('nexus' in body or 'nexusmods' in body):
+            body = (release_info.get('body') or '').lower()
+            external_download = release_info.get('external_download') or 'nexus' in body
+            if not assets and external_download:
                 nexus_msg = (
                     "⚠️ Los binarios de dlssg-to-fsr3 se han movido a Nexus Mods.\n\n"
                     "Para descargar manualmente:\n"
@@ -576,29 +750,29 @@ class GitHubClient:
             os.makedirs(MOD_SOURCE_DIR, exist_ok=True)
             download_path = os.path.join(MOD_SOURCE_DIR, file_name)
             
-            self.logger('INFO', f"Descargando {file_name}...")
-            
-            # Descargar archivo
-            response = self.session.get(download_url, stream=True)
-            response.raise_for_status()
-            
-            downloaded = 0
-            with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback:
-                            progress = min(downloaded / expected_size, 1.0)
-                            progress_callback(
-                                downloaded, 
-                                expected_size, 
-                                False,
-                                f"Descargando dlssg-to-fsr3... {progress:.1%}"
-                            )
-                            
-            self.logger('OK', f"Descarga completada: {file_name}")
+            cached_file = self.archive_cache.lookup(asset)
+            if cached_file:
+                download_path = str(cached_file)
+            else:
+                self.logger('INFO', f"Descargando {file_name}...")
+                
+                # Descargar archivo
+                response = self.session.get(download_url, stream=True)
+                response.raise_for_status()
+                
+                def on_chunk(downloaded):
+                    if progress_callback:
+                        progress = min(downloaded / expected_size, 1.0)
+                        progress_callback(
+                            downloaded, 
+                            expected_size, 
+                            False,
+                            f"Descargando dlssg-to-fsr3... {progress:.1%}"
+                        )
+                
+                write_chunks(response.iter_content(chunk_size=8192), download_path, on_chunk)
+                                
+                self.logger('OK', f"Descarga completada: {file_name}")
             
             # Extraer ZIP
             if progress_callback:
@@ -607,22 +781,30 @@ class GitHubClient:
             import zipfile
             os.makedirs(extract_dir, exist_ok=True)
             
-            with zipfile.ZipFile(download_path, 'r') as zip_ref:
+            with span('extract', archive=os.path.basename(download_path)), \
+                    get_metrics().timer('extract_seconds', 'Archive extraction time', source='github'), \
+                    zipfile.ZipFile(download_path, 'r') as zip_ref:
                 zip_ref.extractall(extract_dir)
                 
             self.logger('OK', f"Extracción completada en: {extract_dir}")
             
-            # Limpiar archivo descargado
-            try:
-                os.remove(download_path)
-            except Exception as e:
-                self.logger('WARN', f"No se pudo eliminar archivo temporal: {e}")
+            # Conservar en caché (o limpiar el archivo descargado)
+            if not cached_file and not self.archive_cache.store(asset, download_path):
+                try:
+                    os.remove(download_path)
+                except Exception as e:
+                    self.logger('WARN', f"No se pudo eliminar archivo temporal: {e}")
                 
             if progress_callback:
                 progress_callback(1, 1, True, "¡Descarga y extracción completas!")
                 
             return True
             
+        except OperationCancelled:
+            self.logger('WARN', "Descarga cancelada")
+            if progress_callback:
+                progress_callback(0, 1, True, "Descarga cancelada")
+            raise
         except requests.RequestException as e:
             error_msg = f"Error al descargar release: {e}"
             self.logger('ERROR', error_msg)
@@ -666,21 +848,17 @@ class GitHubClient:
             # Obtener tamaño si está disponible
             total_size = int(response.headers.get('content-length', 0))
             
-            downloaded = 0
-            with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback and total_size > 0:
-                            progress = min(downloaded / total_size, 1.0)
-                            progress_callback(
-                                downloaded,
-                                total_size,
-                                False,
-                                f"Descargando código fuente... {progress:.1%}"
-                            )
+            def on_chunk(downloaded):
+                if progress_callback and total_size > 0:
+                    progress = min(downloaded / total_size, 1.0)
+                    progress_callback(
+                        downloaded,
+                        total_size,
+                        False,
+                        f"Descargando código fuente... {progress:.1%}"
+                    )
+            
+            write_chunks(response.iter_content(chunk_size=8192), download_path, on_chunk)
             
             self.logger('OK', f"Descarga completada: {filename}")
             
@@ -691,7 +869,9 @@ class GitHubClient:
             import zipfile
             os.makedirs(extract_dir, exist_ok=True)
             
-            with zipfile.ZipFile(download_path, 'r') as zip_ref:
+            with span('extract', archive=os.path.basename(download_path)), \
+                    get_metrics().timer('extract_seconds', 'Archive extraction time', source='github'), \
+                    zipfile.ZipFile(download_path, 'r') as zip_ref:
                 zip_ref.extractall(extract_dir)
             
             self.logger('OK', f"Extracción completada en: {extract_dir}")
@@ -707,6 +887,11 @@ class GitHubClient:
             
             return True
             
+        except OperationCancelled:
+            self.logger('WARN', "Descarga cancelada")
+            if progress_callback:
+                progress_callback(0, 1, True, "Descarga cancelada")
+            raise
         except Exception as e:
             error_msg = f"Error al descargar desde archivo fuente: {e}"
             self.logger('ERROR', error_msg)
@@ -772,21 +957,18 @@ class GitHubClient:
             # Crear directorio si no existe
             os.makedirs(os.path.dirname(destination_path), exist_ok=True)
             
-            downloaded = 0
-            with open(destination_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback:
-                            progress = min(downloaded / expected_size, 1.0) if expected_size > 0 else 0
-                            progress_callback(
-                                downloaded,
-                                expected_size,
-                                False,
-                                f"Descargando OptiPatcher {version}... {progress:.1%}"
-                            )
+            def on_chunk(downloaded):
+                if progress_callback:
+                    progress = min(downloaded / expected_size, 1.0) if expected_size > 0 else 0
+                    progress_callback(
+                        downloaded,
+                        expected_size,
+                        False,
+                        f"Descargando OptiPatcher {version}... {progress:.1%}"
+                    )
+            
+            # Si se cancela, el OptiPatcher.asi anterior queda intacto
+            write_chunks(response.iter_content(chunk_size=8192), destination_path, on_chunk)
             
             self.logger('OK', f"OptiPatcher descargado correctamente ({original_filename} → OptiPatcher.asi): {destination_path}")
             
@@ -804,6 +986,11 @@ class GitHubClient:
             
             return True
             
+        except OperationCancelled:
+            self.logger('WARN', "Descarga cancelada")
+            if progress_callback:
+                progress_callback(0, 1, True, "Descarga cancelada")
+            raise
         except requests.RequestException as e:
             error_msg = f"Error al descargar OptiPatcher: {e}"
             self.logger('ERROR', error_msg)
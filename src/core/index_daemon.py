@@ -0,0 +1,494 @@
+"""Servicio local opcional que mantiene caliente el índice de juegos.
+
+Conserva en memoria el resultado del escaneo, el catálogo de versiones y los
+metadatos de releases de GitHub entre ejecuciones de la GUI y la CLI. Sondea
+el mtime de las bibliotecas: un juego añadido o eliminado provoca un
+re-escaneo y un cambio en los archivos del mod actualiza el estado del juego.
+
+Las consultas llegan por multiprocessing.connection (socket Unix, named pipe
+en Windows o TCP en 127.0.0.1) con clave de autenticación, como JSON
+({"op": ..., ...} -> {"ok": true, "result": ...}). La dirección y la clave se
+publican en APP_DIR/index_daemon.json, legible sólo por el usuario.
+
+Uso:
+    python -m src.core.index_daemon            (primer plano)
+    connect() -> IndexClient | None            (None si no hay servicio)
+"""
+
+from __future__ import annotations
+
+import getpass
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.paths import APP_DIR
+from ..utils.error_handling import IndexDaemonError
+from ..utils.paths import get_app_executable
+from .platform_probe import PlatformProbe, get_platform_probe
+from .tasks import check_cancelled
+
+PROTOCOL_VERSION = 1
+DAEMON_INFO_FILE = APP_DIR / "index_daemon.json"
+UNIX_SOCKET_PATH = APP_DIR / "index_daemon.sock"
+
+# Sondeo de las bibliotecas (segundos)
+WATCH_INTERVAL_S = 5.0
+# Antigüedad máxima de los metadatos de releases en memoria
+RELEASES_TTL_S = 3600.0
+# Espera máxima al arrancar el servicio en segundo plano
+SPAWN_TIMEOUT_S = 5.0
+# Espera máxima de una respuesta; las operaciones que pueden escanear esperan más
+REQUEST_TIMEOUT_S = 30.0
+SCAN_TIMEOUT_S = 600.0
+SCAN_OPS = ('games', 'scan')
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class LibraryIndex:
+    """Estado caliente del servicio: juegos, raíces vigiladas y releases."""
+
+    def __init__(self, log_func: Optional[Callable[[str, str], None]] = None,
+                 probe: Optional[PlatformProbe] = None) -> None:
+        self.log = log_func or (lambda level, msg: None)
+        self.probe = probe
+        self.games: List[tuple] = []
+        self.custom_folders: List[str] = []
+        self.scanned_at: Optional[float] = None
+        self.generation = 0
+        self.events = {'rescans': 0, 'status_updates': 0, 'removed': 0}
+        self._roots: Dict[str, Optional[int]] = {}
+        self._game_mtimes: Dict[str, Optional[int]] = {}
+        self._releases: Optional[List[Dict[str, Any]]] = None
+        self._releases_at = 0.0
+        # _lock protege el estado (se retiene poco); _scan_lock evita dos escaneos a la vez
+        self._lock = threading.RLock()
+        self._scan_lock = threading.Lock()
+
+    def _library_roots(self) -> List[str]:
+        """Carpetas cuyo contenido (juegos) decide si hay que re-escanear."""
+        from .scanner import get_dynamic_epic_paths, get_dynamic_steam_paths
+        probe = self.probe or get_platform_probe()
+        quiet = lambda level, msg: None
+        roots = get_dynamic_steam_paths(quiet, probe) + get_dynamic_epic_paths(quiet, probe)
+        for folder in ('xbox_games', 'epic_manifests'):
+            path = probe.known_folder(folder)
+            if path:
+                roots.append(path)
+        return [os.path.normpath(r) for r in roots + list(self.custom_folders)]
+
+    def rescan(self, custom_folders: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Escaneo completo; sustituye el índice y las marcas de la vigilancia.
+
+        El escaneo se hace sin retener _lock: mientras dura, games/status
+        siguen respondiendo con el índice anterior.
+        """
+        from .scanner import scan_games
+        with self._scan_lock:
+            with self._lock:
+                if custom_folders is not None:
+                    self.custom_folders = list(custom_folders)
+                folders = list(self.custom_folders)
+            games = [tuple(g) for g in scan_games(self.log, folders, use_cache=False, probe=self.probe)]
+            roots = {root: _mtime(root) for root in self._library_roots()}
+            game_mtimes = {g[0]: _mtime(g[0]) for g in games}
+            with self._lock:
+                self.games = games
+                self._roots = roots
+                self._game_mtimes = game_mtimes
+                self.scanned_at = time.time()
+                self.generation += 1
+                self.events['rescans'] += 1
+                return self.snapshot()
+
+    def ensure_scanned(self) -> None:
+        if self.scanned_at is not None:
+            return
+        with self._scan_lock:
+            # Otro hilo pudo terminar el primer escaneo mientras se esperaba
+            if self.scanned_at is not None:
+                return
+        self.rescan()
+
+    def poll(self) -> bool:
+        """Aplica los cambios detectados desde el último sondeo; True si el índice cambió."""
+        from .scanner import check_mod_status
+        with self._lock:
+            if self.scanned_at is None:
+                return False
+            roots = dict(self._roots)
+            games = list(self.games)
+            game_mtimes = dict(self._game_mtimes)
+            generation = self.generation
+        if any(_mtime(root) != stamp for root, stamp in roots.items()):
+            self.log('INFO', "Cambios en las bibliotecas: re-escaneando...")
+            self.rescan()
+            return True
+        # path -> (mtime, juego actualizado o None si ya no existe)
+        updates: Dict[str, Tuple[Optional[int], Optional[tuple]]] = {}
+        for game in games:
+            path = game[0]
+            stamp = _mtime(path)
+            if stamp == game_mtimes.get(path):
+                continue
+            updates[path] = (stamp, None if stamp is None else
+                             (path, game[1], check_mod_status(path)) + tuple(game[3:]))
+        if not updates:
+            return False
+        with self._lock:
+            if self.generation != generation:
+                return True  # un re-escaneo sustituyó el índice mientras tanto
+            kept = []
+            for game in self.games:
+                if game[0] not in updates:
+                    kept.append(game)
+                    continue
+                stamp, updated = updates[game[0]]
+                if updated is None:
+                    self._game_mtimes.pop(game[0], None)
+                    self.events['removed'] += 1
+                else:
+                    self._game_mtimes[game[0]] = stamp
+                    kept.append(updated)
+                    self.events['status_updates'] += 1
+            self.games = kept
+            self.generation += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'games': [list(g) for g in self.games],
+                'custom_folders': list(self.custom_folders),
+                'scanned_at': self.scanned_at,
+                'generation': self.generation,
+            }
+
+    def releases(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Releases de OptiScaler (caché de disco de GitHubClient + memoria con TTL)."""
+        with self._lock:
+            fresh = self._releases is not None and time.time() - self._releases_at < RELEASES_TTL_S
+            if fresh and not refresh:
+                return self._releases
+        from .github import GitHubClient
+        releases = GitHubClient(logger=self.log).get_releases(use_cache=not refresh)
+        with self._lock:
+            self._releases, self._releases_at = releases, time.time()
+        return releases
+
+
+def _listen(socket_path: Path = UNIX_SOCKET_PATH) -> Tuple[Listener, str, bytes]:
+    """Named pipe / socket Unix por usuario; TCP local si no se pueden usar."""
+    authkey = secrets.token_bytes(32)
+    if sys.platform == 'win32':
+        preferred = ('AF_PIPE', rf"\\.\pipe\optiscaler-index-{getpass.getuser()}")
+    elif hasattr(socket, 'AF_UNIX'):
+        preferred = ('AF_UNIX', str(socket_path))
+    else:
+        preferred = None
+    if preferred:
+        family, address = preferred
+        try:
+            if family == 'AF_UNIX' and os.path.exists(address):
+                os.remove(address)  # socket huérfano de un servicio anterior
+            return Listener(address, family=family, authkey=authkey), family, authkey
+        except OSError:
+            pass  # p.ej. ruta demasiado larga para AF_UNIX
+    return Listener(('127.0.0.1', 0), family='AF_INET', authkey=authkey), 'AF_INET', authkey
+
+
+class IndexDaemon:
+    """Servidor: un hilo por conexión y un hilo de vigilancia."""
+
+    def __init__(self, index: Optional[LibraryIndex] = None,
+                 log_func: Optional[Callable[[str, str], None]] = None,
+                 info_file: Path = DAEMON_INFO_FILE,
+                 watch_interval: float = WATCH_INTERVAL_S,
+                 socket_path: Path = UNIX_SOCKET_PATH) -> None:
+        self.log = log_func or (lambda level, msg: None)
+        self.index = index or LibraryIndex(self.log)
+        self.info_file = Path(info_file)
+        self.socket_path = Path(socket_path)
+        self.watch_interval = watch_interval
+        self.started = time.time()
+        self._stop = threading.Event()
+        self._listener: Optional[Listener] = None
+        self._authkey = b''
+        self._ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Peticiones
+    # ------------------------------------------------------------------
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get('op')
+        if op == 'ping':
+            return {'pid': os.getpid(), 'protocol': PROTOCOL_VERSION}
+        if op == 'games':
+            self.index.ensure_scanned()
+            return self.index.snapshot()
+        if op == 'scan':
+            return self.index.rescan(request.get('custom_folders'))
+        if op == 'catalog':
+            from .version_catalog import get_version_catalog
+            return get_version_catalog().entries()
+        if op == 'releases':
+            return self.index.releases(bool(request.get('refresh')))
+        if op == 'status':
+            snapshot = self.index.snapshot()
+            return {'pid': os.getpid(), 'uptime_s': round(time.time() - self.started, 1),
+                    'games': len(snapshot['games']), 'generation': snapshot['generation'],
+                    'scanned_at': snapshot['scanned_at'], 'events': dict(self.index.events)}
+        if op == 'shutdown':
+            threading.Thread(target=self.stop, daemon=True).start()
+            return True
+        raise IndexDaemonError(f"Operación desconocida: {op}")
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while not self._stop.is_set():
+                try:
+                    request = json.loads(conn.recv_bytes().decode('utf-8'))
+                except (EOFError, OSError):
+                    return
+                except ValueError as e:
+                    request, error = None, f"Petición no válida: {e}"
+                try:
+                    if request is None:
+                        raise IndexDaemonError(error)
+                    response = {'ok': True, 'result': self.handle(request)}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                try:
+                    conn.send_bytes(json.dumps(response, ensure_ascii=False, default=str).encode('utf-8'))
+                except OSError:
+                    return
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def _watch(self) -> None:
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.index.poll()
+            except Exception as e:
+                self.log('WARN', f"Vigilancia de bibliotecas: {e}")
+
+    def _write_info(self, family: str) -> None:
+        address = self._listener.address
+        info = {'pid': os.getpid(), 'protocol': PROTOCOL_VERSION, 'family': family,
+                'address': list(address) if isinstance(address, tuple) else address,
+                'authkey': self._authkey.hex()}
+        self.info_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.info_file.with_suffix('.tmp')
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(tmp, self.info_file)
+
+    def serve_forever(self, warm: bool = True) -> None:
+        """Escucha hasta stop(); con warm, escanea al arrancar (en segundo plano)."""
+        self._listener, family, self._authkey = _listen(self.socket_path)
+        self._write_info(family)
+        self.log('INFO', f"Servicio de índice escuchando en {self._listener.address} ({family})")
+        threading.Thread(target=self._watch, name='index-watch', daemon=True).start()
+        if warm:
+            threading.Thread(target=self.index.ensure_scanned, name='index-warm', daemon=True).start()
+        self._ready.set()
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    continue
+                if self._stop.is_set():
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._cleanup()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._listener is not None:
+            # Desbloquear accept() con una conexión propia
+            try:
+                Client(self._listener.address, authkey=self._authkey).close()
+            except Exception:
+                pass
+
+    def _cleanup(self) -> None:
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+        try:
+            with open(self.info_file, 'r', encoding='utf-8') as f:
+                if json.load(f).get('pid') == os.getpid():
+                    os.remove(self.info_file)
+        except (OSError, ValueError):
+            pass
+        self.log('INFO', "Servicio de índice detenido")
+
+
+class IndexClient:
+    """Conexión a un IndexDaemon; segura entre hilos (una petición a la vez)."""
+
+    def __init__(self, conn, timeout: float = REQUEST_TIMEOUT_S) -> None:
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.timeout = timeout
+
+    def request(self, op: str, timeout: Optional[float] = None, **params: Any) -> Any:
+        """Envía una petición y espera la respuesta (como mucho `timeout` segundos).
+
+        Se comprueba la cancelación de la tarea actual mientras se espera. Si
+        se agota el tiempo o se cancela, la conexión se cierra (la respuesta
+        tardía la desincronizaría) y hay que volver a conectar.
+
+        Raises:
+            IndexDaemonError: Si el servicio no responde a tiempo o devuelve un error
+            OperationCancelled: Si se cancela la tarea que espera
+        """
+        if timeout is None:
+            timeout = SCAN_TIMEOUT_S if op in SCAN_OPS else self.timeout
+        with self._lock:
+            self._conn.send_bytes(json.dumps(dict(params, op=op)).encode('utf-8'))
+            deadline = time.monotonic() + timeout
+            try:
+                while not self._conn.poll(min(0.25, max(0.0, deadline - time.monotonic()))):
+                    check_cancelled()
+                    if time.monotonic() >= deadline:
+                        raise IndexDaemonError(f"El servicio no respondió a '{op}' en {timeout:.0f} s")
+            except BaseException:
+                self._conn.close()
+                raise
+            response = json.loads(self._conn.recv_bytes().decode('utf-8'))
+        if not response.get('ok'):
+            raise IndexDaemonError(response.get('error', 'error desconocido'))
+        return response.get('result')
+
+    def games(self) -> List[tuple]:
+        """Lista de juegos en el mismo formato que scan_games()."""
+        return [tuple(g) for g in self.request('games')['games']]
+
+    def scan(self, custom_folders: Optional[List[str]] = None) -> List[tuple]:
+        return [tuple(g) for g in self.request('scan', custom_folders=custom_folders)['games']]
+
+    def catalog(self) -> List[Dict[str, Any]]:
+        return self.request('catalog')
+
+    def releases(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        return self.request('releases', refresh=refresh)
+
+    def status(self) -> Dict[str, Any]:
+        return self.request('status')
+
+    def shutdown(self) -> None:
+        self.request('shutdown')
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "IndexClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def connect(info_file: Path = DAEMON_INFO_FILE) -> Optional[IndexClient]:
+    """Cliente del servicio en marcha, o None (sin esperar) si no hay ninguno."""
+    try:
+        with open(info_file, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get('protocol') != PROTOCOL_VERSION:
+            return None
+        address = info['address']
+        if info['family'] == 'AF_INET':
+            address = tuple(address)
+        conn = Client(address, family=info['family'], authkey=bytes.fromhex(info['authkey']))
+    except (OSError, ValueError, KeyError, EOFError, AuthenticationError):
+        return None
+    return IndexClient(conn)
+
+
+def spawn_daemon(timeout: float = SPAWN_TIMEOUT_S, info_file: Path = DAEMON_INFO_FILE) -> Optional[IndexClient]:
+    """Arranca el servicio en un proceso independiente (si no está ya) y se conecta."""
+    client = connect(info_file)
+    if client is not None:
+        return client
+    # El .exe distribuido, no la copia temporal de onefile (se borra al cerrar la GUI)
+    app_exe = get_app_executable()
+    if app_exe:
+        command = [app_exe, '--index-daemon']
+        cwd = os.path.dirname(app_exe)
+    else:
+        command = [sys.executable, '-m', 'src.core.index_daemon']
+        cwd = str(Path(__file__).resolve().parents[2])
+    kwargs: Dict[str, Any] = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL,
+                              'stderr': subprocess.DEVNULL, 'cwd': cwd}
+    if sys.platform == 'win32':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    subprocess.Popen(command, **kwargs)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        client = connect(info_file)
+        if client is not None:
+            return client
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    from .config_manager import load_config
+    parser = argparse.ArgumentParser(description="Servicio de índice de juegos de OptiScaler")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL_S, help="Segundos entre sondeos")
+    parser.add_argument('--no-warm', action='store_true', help="No escanear al arrancar")
+    args = parser.parse_args(argv)
+
+    def log(level: str, msg: str) -> None:
+        print(f"[{level}] {msg}", flush=True)
+
+    if connect() is not None:
+        log('WARN', "El servicio de índice ya está en marcha")
+        return 1
+    index = LibraryIndex(log)
+    index.custom_folders = list(load_config().get('custom_game_folders') or [])
+    daemon = IndexDaemon(index, log, watch_interval=args.interval)
+    try:
+        daemon.serve_forever(warm=not args.no_warm)
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+
+__all__ = [
+    'LibraryIndex', 'IndexDaemon', 'IndexClient', 'connect', 'spawn_daemon',
+    'DAEMON_INFO_FILE', 'PROTOCOL_VERSION', 'WATCH_INTERVAL_S'
+]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
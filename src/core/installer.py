@@ -12,13 +12,13 @@ import urllib.request
 import configparser
 from datetime import datetime
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 from ..config.constants import (
     SEVEN_ZIP_EXE_NAME, SEVEN_ZIP_DOWNLOAD_URL,
     TARGET_MOD_FILES, TARGET_MOD_DIRS, GENERIC_SPOOF_FILES, MOD_CHECK_FILES,
     GITHUB_API_URL, NUKEM_REQUIRED_FILES, NUKEM_OPTIONAL_FILES,
-    MOD_CHECK_FILES_OPTISCALER, MOD_CHECK_FILES_NUKEM
+    MOD_CHECK_FILES_OPTISCALER, MOD_CHECK_FILES_NUKEM, MOD_FILE_EXTENSIONS
 )
 from ..config.paths import (
     MOD_SOURCE_DIR,
@@ -30,6 +30,14 @@ from ..config.settings import (
     FG_MODE_MAP, UPSCALE_MODE_MAP, UPSCALER_MAP,
     FG_MODE_MAP_INVERSE, UPSCALE_MODE_MAP_INVERSE, UPSCALER_MAP_INVERSE
 )
+from .archive_cache import ArchiveCache
+from .pe_imports import PEInfo, detect_exe_api
+from .scan_index import ScanIndex
+from .scanner import get_best_exe_in_folder
+from .tasks import check_cancelled, write_chunks
+from ..utils.metrics import get_metrics, timed
+from ..utils.tracing import current_span, span, traced
+from ..utils.error_handling import OperationCancelled
 
 try:
     import requests
@@ -65,24 +73,48 @@ def _infer_version_from_source(source_dir: str) -> str | None:
     return None
 
 
-def _write_game_version_json(target_dir: str, source_dir: str, log_func) -> None:
+def _catalog_folder(source_dir: str) -> str | None:
+    """Carpeta de versión del catálogo (primer nivel bajo OPTISCALER_DIR) que
+    contiene `source_dir`; check_mod_source_files puede devolver una subcarpeta
+    anidada (p.ej. OptiScaler_0.7.9/OptiScaler). Fuera de OPTISCALER_DIR, su nombre."""
+    if not source_dir:
+        return None
+    source = os.path.normpath(os.path.abspath(source_dir))
+    base = os.path.normpath(os.path.abspath(str(OPTISCALER_DIR)))
+    try:
+        rel = os.path.relpath(source, base)
+    except ValueError:
+        rel = os.pardir  # otra unidad (Windows)
+    if rel == os.curdir or rel == os.pardir or rel.startswith(os.pardir + os.sep):
+        return os.path.basename(source)
+    return rel.split(os.sep, 1)[0]
+
+
+def _write_game_version_json(target_dir: str, source_dir: str, log_func, spoof_dll_name: str | None = None) -> None:
     """Escribe version.json en la carpeta del juego con metadatos de instalación."""
     data = {
         'source': 'OptiScaler',
         'installed_at': datetime.now().isoformat(timespec='seconds')
     }
+    if spoof_dll_name:
+        # Nombre real de OptiScaler.dll en el juego (lo usa el actualizador)
+        data['spoof_dll'] = spoof_dll_name
+    # Carpeta del catálogo de la que se instaló (la referencia que usa la limpieza de versiones)
+    source_folder = _catalog_folder(source_dir)
     global_meta = _read_global_optiscaler_version() or {}
     if 'version' in global_meta:
         data['version'] = global_meta.get('version')
         data['tag'] = global_meta.get('tag')
         data['source_url'] = global_meta.get('source_url')
-        data['source_folder'] = global_meta.get('folder')
+        data['source_folder'] = source_folder or global_meta.get('folder')
     else:
         # Fallback a inferir desde carpeta de origen
-        ver = _infer_version_from_source(source_dir)
+        ver = _infer_version_from_source(source_folder or '')
         if ver:
             data['version'] = ver
             data['tag'] = f"v{ver}"
+        if source_folder:
+            data['source_folder'] = source_folder
     try:
         with open(os.path.join(target_dir, 'version.json'), 'w', encoding='utf-8') as f:
             import json
@@ -202,7 +234,10 @@ def check_mod_source_files(mod_source_dir: str, log_func) -> Tuple[str, bool]:
     return source_dir, True
 
 
+@traced('extract')
+@timed('extract_seconds', 'Archive extraction time', source='installer')
 def extract_mod_archive(archive_path: str, extract_path: str, log_func) -> bool:
+    current_span().set(archive=os.path.basename(archive_path))
     if not os.path.exists(SEVEN_ZIP_PATH):
         log_func('ERROR', f"¡No se encontró {SEVEN_ZIP_EXE_NAME} en {SEVEN_ZIP_PATH}!")
         return False
@@ -273,12 +308,14 @@ def configure_and_rename_dll(target_dir: str, spoof_dll_name: str, log_func) ->
         return False
 
 
-def update_optiscaler_ini(target_dir: str, gpu_choice: int, fg_mode_selected: str, upscaler_selected: str, upscale_mode_selected: str, sharpness_selected: float, overlay_selected: bool, mb_selected: bool, log_func, auto_hdr: bool = True, nvidia_hdr_override: bool = False, hdr_rgb_range: float = 100.0, log_level: str = "Info", open_console: bool = False, log_to_file: bool = True, quality_override_enabled: bool = False, quality_ratio: float = 1.5, balanced_ratio: float = 1.7, performance_ratio: float = 2.0, ultra_perf_ratio: float = 3.0, cas_enabled: bool = False, cas_type: str = "RCAS", cas_sharpness: float = 0.5, nvngx_dx12: bool = True, nvngx_dx11: bool = True, nvngx_vulkan: bool = True, overlay_mode: str = "Desactivado", overlay_show_fps: bool = True, overlay_show_frametime: bool = True, overlay_show_messages: bool = True, overlay_position: str = "Superior Izquierda", overlay_scale: float = 1.0, overlay_font_size: int = 14) -> bool:
+def update_optiscaler_ini(target_dir: str, gpu_choice: int, fg_mode_selected: str, upscaler_selected: str, upscale_mode_selected: str, sharpness_selected: float, overlay_selected: bool, mb_selected: bool, log_func, auto_hdr: bool = True, nvidia_hdr_override: bool = False, hdr_rgb_range: float = 100.0, log_level: str = "Info", open_console: bool = False, log_to_file: bool = True, quality_override_enabled: bool = False, quality_ratio: float = 1.5, balanced_ratio: float = 1.7, performance_ratio: float = 2.0, ultra_perf_ratio: float = 3.0, cas_enabled: bool = False, cas_type: str = "RCAS", cas_sharpness: float = 0.5, nvngx_dx12: bool = True, nvngx_dx11: bool = True, nvngx_vulkan: bool = True, overlay_mode: str = "Desactivado", overlay_show_fps: bool = True, overlay_show_frametime: bool = True, overlay_show_messages: bool = True, overlay_position: str = "Superior Izquierda", overlay_scale: float = 1.0, overlay_font_size: int = 14, apis=None) -> bool:
     """Actualiza OptiScaler.ini con las opciones seleccionadas.
 
     Ajustado para coincidir con la estructura real del INI:
       - FrameGen -> FGType
-      - Upscalers -> Dx12Upscaler (por ahora; se podría extender a Dx11/Vulkan)
+      - Upscalers -> Dx12Upscaler / Dx11Upscaler / VulkanUpscaler (sólo las de `apis`
+        si se sabe con certeza que el juego no usa las demás, p.ej. {'vulkan'};
+        si no, las tres)
       - Sharpness -> sección [Sharpness] Sharpness
     Valores previos escritos en secciones inexistentes se mantienen como fallback para compatibilidad.
     """
@@ -330,26 +367,15 @@ def update_optiscaler_ini(target_dir: str, gpu_choice: int, fg_mode_selected: st
         
         changed_local = False
         
-        # Dx12
-        dx12_code = _map_upscaler_to_api(upscaler_code, 'dx12')
-        if config.get('Upscalers', 'Dx12Upscaler', fallback='auto') != dx12_code:
-            config.set('Upscalers', 'Dx12Upscaler', dx12_code)
-            log_func('INFO', f"OptiScaler.ini: [Upscalers] Dx12Upscaler -> {dx12_code}")
-            changed_local = True
-        
-        # Dx11
-        dx11_code = _map_upscaler_to_api(upscaler_code, 'dx11')
-        if config.get('Upscalers', 'Dx11Upscaler', fallback='auto') != dx11_code:
-            config.set('Upscalers', 'Dx11Upscaler', dx11_code)
-            log_func('INFO', f"OptiScaler.ini: [Upscalers] Dx11Upscaler -> {dx11_code}")
-            changed_local = True
-        
-        # Vulkan
-        vulkan_code = _map_upscaler_to_api(upscaler_code, 'vulkan')
-        if config.get('Upscalers', 'VulkanUpscaler', fallback='auto') != vulkan_code:
-            config.set('Upscalers', 'VulkanUpscaler', vulkan_code)
-            log_func('INFO', f"OptiScaler.ini: [Upscalers] VulkanUpscaler -> {vulkan_code}")
-            changed_local = True
+        # Sólo las APIs que usa el juego (apis detectadas en su exe); si no se sabe, todas
+        for api, key in (('dx12', 'Dx12Upscaler'), ('dx11', 'Dx11Upscaler'), ('vulkan', 'VulkanUpscaler')):
+            if apis is not None and api not in apis:
+                continue
+            api_code = _map_upscaler_to_api(upscaler_code, api)
+            if config.get('Upscalers', key, fallback='auto') != api_code:
+                config.set('Upscalers', key, api_code)
+                log_func('INFO', f"OptiScaler.ini: [Upscalers] {key} -> {api_code}")
+                changed_local = True
         
         if changed_local:
             changes_made = True
@@ -677,6 +703,59 @@ def read_optiscaler_ini(target_dir: str, log_func):
         return defaults
 
 
+_API_LABELS = {'dx12': 'DirectX 12', 'dx11': 'DirectX 11', 'vulkan': 'Vulkan', 'dxgi': 'DXGI',
+               'dx9': 'DirectX 9', 'opengl': 'OpenGL'}
+
+
+def _detect_game_api(target_dir: str, exe_name: Optional[str], log_func,
+                     index: Optional[ScanIndex] = None) -> Optional[PEInfo]:
+    """PEInfo del exe del juego (el indicado o el mejor de target_dir), o None.
+
+    El resultado queda en `index` (o en el índice compartido); guardarlo es
+    cosa de quien llama.
+    """
+    if not exe_name:
+        exe_name, _ = get_best_exe_in_folder(target_dir, log_func, allow_blacklisted=False)
+        if not exe_name:
+            return None
+    info = detect_exe_api(os.path.join(target_dir, exe_name), index)
+    if info is None:
+        return None
+    apis = ', '.join(_API_LABELS[api] for api in sorted(info.apis)) or 'desconocida'
+    log_func('INFO', f"API gráfica de {exe_name}: {apis} ({info.machine})")
+    if not info.is_64bit:
+        log_func('WARN', f"⚠️ {exe_name} es de 32 bits: OptiScaler sólo funciona con juegos de 64 bits.")
+    return info
+
+
+DEFAULT_SPOOF_DLL = "dxgi.dll"
+
+
+def _spoof_dll_for_game(info: Optional[PEInfo], spoof_dll_name: str, log_func,
+                        explicit: Optional[bool] = None) -> str:
+    """DLL de inyección para el juego: si nunca cargaría la elegida (dxgi/d3d12 en
+    un juego sólo Vulkan) se cambia la DLL por defecto, pero una elección
+    explícita del usuario se respeta y sólo se avisa.
+
+    explicit: None = explícita si no es DEFAULT_SPOOF_DLL.
+    """
+    if info is None or spoof_dll_name.lower() not in ('dxgi.dll', 'd3d12.dll'):
+        return spoof_dll_name
+    recommended = info.recommended_spoof_dll
+    if not recommended or recommended == 'dxgi.dll':
+        return spoof_dll_name
+    if explicit is None:
+        explicit = spoof_dll_name.lower() != DEFAULT_SPOOF_DLL
+    if explicit:
+        log_func('WARN', f"El juego no parece usar DirectX: se mantiene {spoof_dll_name} (elegida por el usuario), "
+                         f"aunque {recommended} podría funcionar mejor.")
+        return spoof_dll_name
+    log_func('WARN', f"El juego no usa DirectX: se inyecta como {recommended} en lugar de {spoof_dll_name}.")
+    return recommended
+
+
+@traced('install')
+@timed('install_seconds', 'Time to install OptiScaler into one game')
 def inject_fsr_mod(mod_source_dir: str, target_dir: str, log_func, spoof_dll_name: str = "dxgi.dll", gpu_choice: int = 2, fg_mode_selected: str = "Automático",
                    upscaler_selected: str = "Automático", upscale_mode_selected: str = "Automático", sharpness_selected: float = 0.8, overlay_selected: bool = False, mb_selected: bool = True, 
                    auto_hdr: bool = True, nvidia_hdr_override: bool = False, hdr_rgb_range: float = 100.0, log_level: str = "Info", open_console: bool = False, log_to_file: bool = True,
@@ -685,80 +764,97 @@ def inject_fsr_mod(mod_source_dir: str, target_dir: str, log_func, spoof_dll_nam
                    nvngx_dx12: bool = True, nvngx_dx11: bool = True, nvngx_vulkan: bool = True,
                    overlay_mode: str = "Desactivado", overlay_show_fps: bool = True, overlay_show_frametime: bool = True, 
                    overlay_show_messages: bool = True, overlay_position: str = "Superior Izquierda", 
-                   overlay_scale: float = 1.0, overlay_font_size: int = 14) -> bool:
+                   overlay_scale: float = 1.0, overlay_font_size: int = 14, exe_name: Optional[str] = None,
+                   index: Optional[ScanIndex] = None, spoof_dll_explicit: Optional[bool] = None) -> bool:
     source_dir, source_ok = check_mod_source_files(mod_source_dir, log_func)
     if not source_ok:
         return False
+    pe_info = _detect_game_api(target_dir, exe_name, log_func, index)
+    spoof_dll_name = _spoof_dll_for_game(pe_info, spoof_dll_name, log_func, spoof_dll_explicit)
+    current_span().set(target=target_dir, dll=spoof_dll_name,
+                       api=pe_info.primary_api if pe_info else None)
     try:
         log_func('TITLE', "Iniciando proceso de COPIA, RENOMBRADO y CONFIGURACIÓN...")
         copied_files = 0
         created_backups = []
-        mod_extensions = ('.dll', '.json', '.ini', '.bat', '.asi', '.cfg', '.txt', '.log', '.dat', '.sh', '.bin', '.reg')
-        for item_name in os.listdir(source_dir):
-            source_item_path = os.path.join(source_dir, item_name)
-            target_item_path = os.path.join(target_dir, item_name)
-            is_mod_file = os.path.isfile(source_item_path) and (item_name.lower().endswith(mod_extensions) or item_name in TARGET_MOD_FILES)
-            if is_mod_file:
-                if os.path.exists(target_item_path):
-                    backup_path = target_item_path + ".bak"
+        created_files = []  # archivos nuevos (sin backup) para deshacer al cancelar
+        mod_extensions = MOD_FILE_EXTENSIONS
+        bytes_counter = get_metrics().counter('install_bytes_total', 'Bytes deployed to game folders, by operation and mode')
+
+        def counting_copy(src, dst):
+            result = shutil.copy2(src, dst)
+            bytes_counter.inc(os.path.getsize(src), op='install', mode='copied')
+            return result
+
+        with span('install.copy_files') as copy_span:
+            for item_name in os.listdir(source_dir):
+                check_cancelled()
+                source_item_path = os.path.join(source_dir, item_name)
+                target_item_path = os.path.join(target_dir, item_name)
+                is_mod_file = os.path.isfile(source_item_path) and (item_name.lower().endswith(mod_extensions) or item_name in TARGET_MOD_FILES)
+                if is_mod_file:
+                    if os.path.exists(target_item_path):
+                        backup_path = target_item_path + ".bak"
+                        try:
+                            if os.path.exists(backup_path): os.remove(backup_path)
+                            os.rename(target_item_path, backup_path)
+                            log_func('WARN', f"Archivo existente {item_name} renombrado a {item_name}.bak")
+                            created_backups.append(backup_path)
+                        except PermissionError:
+                            log_func('ERROR', f"ACCESO DENEGADO al archivo '{item_name}'. Cierra el juego/launcher.")
+                            return False
+                        except Exception as e:
+                            log_func('ERROR', f"No se pudo crear backup de {item_name}: {e}. Se intentará sobrescribir.")
                     try:
-                        if os.path.exists(backup_path): os.remove(backup_path)
-                        os.rename(target_item_path, backup_path)
-                        log_func('WARN', f"Archivo existente {item_name} renombrado a {item_name}.bak")
-                        created_backups.append(backup_path)
+                        if not os.path.exists(target_item_path):
+                            created_files.append(target_item_path)
+                        counting_copy(source_item_path, target_dir)
+                        copied_files += 1
+                        log_func('INFO', f"  -> Copiando archivo: {item_name}")
                     except PermissionError:
-                        log_func('ERROR', f"ACCESO DENEGADO al archivo '{item_name}'. Cierra el juego/launcher.")
+                        log_func('ERROR', f"ACCESO DENEGADO al copiar '{item_name}'. Cierra el juego/launcher.")
                         return False
+            copy_span.set(files=copied_files)
+        # Último punto de cancelación: a partir de aquí se sustituyen carpetas
+        check_cancelled()
+        with span('install.copy_dirs'):
+            for dir_name in TARGET_MOD_DIRS:
+                source_path = os.path.join(source_dir, dir_name)
+                target_path = os.path.join(target_dir, dir_name)
+                if os.path.isdir(source_path):
+                    try:
+                        if os.path.exists(target_path):
+                            shutil.rmtree(target_path)
+                            log_func('WARN', f"  -> Eliminando carpeta existente: {dir_name}")
+                        shutil.copytree(source_path, target_path, copy_function=counting_copy)
+                        log_func('INFO', f"  -> Copiando carpeta recursiva: {dir_name}")
+                    except PermissionError:
+                        # En juegos de Xbox/Windows Store, es común que haya permisos restringidos
+                        # Las carpetas son opcionales, así que continuamos sin fallar
+                        log_func('WARN', f"⚠️ No se pudo copiar carpeta '{dir_name}' (permisos restringidos)")
+                        log_func('WARN', f"   El mod puede funcionar sin esta carpeta. Si hay problemas, ejecuta como admin.")
                     except Exception as e:
-                        log_func('ERROR', f"No se pudo crear backup de {item_name}: {e}. Se intentará sobrescribir.")
-                try:
-                    shutil.copy2(source_item_path, target_dir)
-                    copied_files += 1
-                    log_func('INFO', f"  -> Copiando archivo: {item_name}")
-                except PermissionError:
-                    log_func('ERROR', f"ACCESO DENEGADO al copiar '{item_name}'. Cierra el juego/launcher.")
-                    return False
-        for dir_name in TARGET_MOD_DIRS:
-            source_path = os.path.join(source_dir, dir_name)
-            target_path = os.path.join(target_dir, dir_name)
-            if os.path.isdir(source_path):
-                try:
-                    if os.path.exists(target_path):
-                        shutil.rmtree(target_path)
-                        log_func('WARN', f"  -> Eliminando carpeta existente: {dir_name}")
-                    shutil.copytree(source_path, target_path)
-                    log_func('INFO', f"  -> Copiando carpeta recursiva: {dir_name}")
-                except PermissionError:
-                    # En juegos de Xbox/Windows Store, es común que haya permisos restringidos
-                    # Las carpetas son opcionales, así que continuamos sin fallar
-                    log_func('WARN', f"⚠️ No se pudo copiar carpeta '{dir_name}' (permisos restringidos)")
-                    log_func('WARN', f"   El mod puede funcionar sin esta carpeta. Si hay problemas, ejecuta como admin.")
-                except Exception as e:
-                    log_func('WARN', f"⚠️ Error al copiar carpeta '{dir_name}': {e}")
-                    log_func('WARN', f"   Continuando con la instalación...")
+                        log_func('WARN', f"⚠️ Error al copiar carpeta '{dir_name}': {e}")
+                        log_func('WARN', f"   Continuando con la instalación...")
         if copied_files == 0 and not os.path.exists(os.path.join(target_dir, 'OptiScaler.dll')):
              log_func('WARN', "No se encontraron archivos relevantes para copiar.")
              return False
-        if not configure_and_rename_dll(target_dir, spoof_dll_name, log_func):
+        with span('install.rename_dll', dll=spoof_dll_name):
+            renamed = configure_and_rename_dll(target_dir, spoof_dll_name, log_func)
+        if not renamed:
              log_func('ERROR', "Fallo al renombrar DLL principal. Intentando restaurar backups de copia...")
-             restored_count = 0
-             for bak_file in created_backups:
-                 original_file = bak_file[:-4]
-                 try:
-                     if os.path.exists(original_file): os.remove(original_file)
-                     os.rename(bak_file, original_file)
-                     log_func('INFO', f"Backup de copia {os.path.basename(bak_file)} restaurado.")
-                     restored_count += 1
-                 except Exception as e_restore:
-                     log_func('ERROR', f"Fallo al restaurar backup de copia {os.path.basename(bak_file)}: {e_restore}")
-             if restored_count > 0:
-                 log_func('WARN', f"Se restauraron {restored_count} archivos copiados desde backup.")
+             _restore_copy_backups(created_backups, log_func)
              return False
         # Map UI strings to INI codes
         fg_code = FG_MODE_MAP.get(fg_mode_selected, 'auto')
         upscaler_code = UPSCALER_MAP.get(upscaler_selected, 'auto')
         upscale_code = UPSCALE_MODE_MAP.get(upscale_mode_selected, 'auto')
-        if not update_optiscaler_ini(target_dir, gpu_choice, fg_code, upscaler_code, upscale_code, sharpness_selected, overlay_selected, mb_selected, log_func, auto_hdr, nvidia_hdr_override, hdr_rgb_range, log_level, open_console, log_to_file, quality_override_enabled, quality_ratio, balanced_ratio, performance_ratio, ultra_perf_ratio, cas_enabled, cas_type, cas_sharpness, nvngx_dx12, nvngx_dx11, nvngx_vulkan, overlay_mode, overlay_show_fps, overlay_show_frametime, overlay_show_messages, overlay_position, overlay_scale, overlay_font_size):
+        with span('install.patch_ini'):
+            ini_ok = update_optiscaler_ini(target_dir, gpu_choice, fg_code, upscaler_code, upscale_code, sharpness_selected, overlay_selected, mb_selected, log_func, auto_hdr, nvidia_hdr_override, hdr_rgb_range, log_level, open_console, log_to_file, quality_override_enabled, quality_ratio, balanced_ratio, performance_ratio, ultra_perf_ratio, cas_enabled, cas_type, cas_sharpness, nvngx_dx12, nvngx_dx11, nvngx_vulkan, overlay_mode, overlay_show_fps, overlay_show_frametime, overlay_show_messages, overlay_position, overlay_scale, overlay_font_size,
+                                           apis=pe_info.upscaler_apis if pe_info else None)
+        get_metrics().counter('install_ini_patches_total', 'OptiScaler.ini patches, by result').inc(
+            result='ok' if ini_ok else 'error')
+        if not ini_ok:
             log_func('ERROR', "Fallo al configurar OptiScaler.ini. La inyección puede no funcionar como se espera.")
         setup_bat_path = os.path.join(target_dir, 'setup_windows.bat')
         if os.path.exists(setup_bat_path): os.remove(setup_bat_path)
@@ -776,10 +872,19 @@ def inject_fsr_mod(mod_source_dir: str, target_dir: str, log_func, spoof_dll_nam
         log_func('OK', f"Inyección completa y configurada. Total de archivos copiados: {copied_files}")
         # Escribir version.json por juego (tracking)
         try:
-            _write_game_version_json(target_dir, source_dir, log_func)
+            _write_game_version_json(target_dir, source_dir, log_func, spoof_dll_name)
         except Exception:
             pass
         return True
+    except OperationCancelled:
+        log_func('WARN', "Instalación cancelada. Deshaciendo los cambios en este juego...")
+        for path in created_files:
+            try:
+                if os.path.exists(path): os.remove(path)
+            except Exception as e_remove:
+                log_func('ERROR', f"No se pudo eliminar {os.path.basename(path)}: {e_remove}")
+        _restore_copy_backups(created_backups, log_func)
+        raise
     except PermissionError:
         log_func('ERROR', "ACCESO DENEGADO. Asegúrese de que el juego o su launcher están CERRADOS.")
         return False
@@ -788,6 +893,23 @@ def inject_fsr_mod(mod_source_dir: str, target_dir: str, log_func, spoof_dll_nam
         return False
 
 
+def _restore_copy_backups(created_backups, log_func) -> int:
+    """Restaura los .bak creados durante la copia; devuelve cuántos se restauraron."""
+    restored_count = 0
+    for bak_file in created_backups:
+        original_file = bak_file[:-4]
+        try:
+            if os.path.exists(original_file): os.remove(original_file)
+            os.rename(bak_file, original_file)
+            log_func('INFO', f"Backup de copia {os.path.basename(bak_file)} restaurado.")
+            restored_count += 1
+        except Exception as e_restore:
+            log_func('ERROR', f"Fallo al restaurar backup de copia {os.path.basename(bak_file)}: {e_restore}")
+    if restored_count > 0:
+        log_func('WARN', f"Se restauraron {restored_count} archivos copiados desde backup.")
+    return restored_count
+
+
 def restore_original_dll(target_dir: str, log_func) -> bool:
     if not target_dir or not os.path.isdir(target_dir):
         log_func('ERROR', "La Carpeta de Destino del Juego no es válida.")
@@ -1205,7 +1327,10 @@ def install_combined_mods(
     sharpness_selected: float = 0.8,
     overlay_selected: bool = False,
     mb_selected: bool = True,
-    install_nukem: bool = True
+    install_nukem: bool = True,
+    exe_name: Optional[str] = None,
+    index: Optional[ScanIndex] = None,
+    spoof_dll_explicit: Optional[bool] = None
 ) -> bool:
     """Instala OptiScaler (upscaling) y opcionalmente dlssg-to-fsr3 (frame generation).
     
@@ -1228,6 +1353,10 @@ def install_combined_mods(
         overlay_selected: Habilitar overlay
         mb_selected: Habilitar motion blur
         install_nukem: Si True, instala dlssg-to-fsr3 además de OptiScaler
+        exe_name: Exe del juego en target_dir (para detectar su API gráfica)
+        index: Índice del escáner donde se guarda la API detectada
+        spoof_dll_explicit: True si el usuario eligió spoof_dll_name (no se cambia
+            aunque el juego no use DirectX); None = explícita si no es la de por defecto
         
     Returns:
         bool: True si la instalación fue exitosa
@@ -1275,7 +1404,10 @@ def install_combined_mods(
         overlay_show_messages=True,
         overlay_position="Superior Izquierda",
         overlay_scale=1.0,
-        overlay_font_size=14
+        overlay_font_size=14,
+        exe_name=exe_name,
+        index=index,
+        spoof_dll_explicit=spoof_dll_explicit
     )
     
     if not optiscaler_ok:
@@ -1306,7 +1438,7 @@ def install_combined_mods(
 
     # Escribir version.json por juego tras instalación combinada
     try:
-        _write_game_version_json(target_dir, optiscaler_source_dir, log_func)
+        _write_game_version_json(target_dir, optiscaler_source_dir, log_func, spoof_dll_name)
     except Exception:
         pass
         
@@ -1347,24 +1479,30 @@ def download_mod_release(release_info, progress_callback, log_func):
         download_path = os.path.join(MOD_SOURCE_DIR, file_name)
         if not os.path.exists(MOD_SOURCE_DIR):
             os.makedirs(MOD_SOURCE_DIR)
-        log_func('TITLE', f"Descargando {file_name}...")
-        with requests.get(download_url, stream=True) as r:
-            r.raise_for_status()
-            downloaded_size = 0
-            with open(download_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
-                    progress_callback(downloaded_size, total_size, False, None)
-        log_func('OK', f"Descarga completada: {file_name}")
+        archive_cache = ArchiveCache(log_func=log_func)
+        cached_file = archive_cache.lookup(asset)
+        if cached_file:
+            download_path = str(cached_file)
+            progress_callback(total_size, total_size, False, None)
+        else:
+            log_func('TITLE', f"Descargando {file_name}...")
+            with requests.get(download_url, stream=True) as r:
+                r.raise_for_status()
+                write_chunks(r.iter_content(chunk_size=8192), download_path,
+                             lambda downloaded: progress_callback(downloaded, total_size, False, None))
+            log_func('OK', f"Descarga completada: {file_name}")
         extract_path = os.path.join(MOD_SOURCE_DIR, file_name.replace('.7z', ''))
         if extract_mod_archive(download_path, extract_path, log_func):
             log_func('OK', f"Extracción completada en: {extract_path}")
-            try: os.remove(download_path)
-            except Exception: pass
+            if not cached_file and not archive_cache.store(asset, download_path):
+                try: os.remove(download_path)
+                except Exception: pass
             progress_callback(total_size, total_size, True, f"¡Completado! Listo para usar: {file_name.replace('.7z', '')}")
         else:
             raise Exception("Fallo en la extracción. Revise el log.")
+    except OperationCancelled:
+        log_func('WARN', "Descarga cancelada.")
+        progress_callback(0, 0, True, "Descarga cancelada")
     except Exception as e:
         log_func('ERROR', f"Fallo en la descarga/extracción: {e}")
         progress_callback(0, 0, True, f"Error: {e}")
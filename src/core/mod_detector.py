@@ -70,7 +70,11 @@ def check_installation_complete(game_dir: Path) -> bool:
         'd3d11.dll',       # Spoof D3D11
         'd3d12.dll',       # Spoof D3D12
         'winmm.dll',       # Spoof WinMM
-        'version.dll'      # Spoof Version
+        'version.dll',     # Spoof Version
+        'dbghelp.dll',     # Resto de opciones de SPOOFING_OPTIONS
+        'wininet.dll',
+        'winhttp.dll',
+        'OptiScaler.asi'
     ]
     
     for dll in possible_dlls:
@@ -0,0 +1,227 @@
+"""API gráfica de un juego a partir de la tabla de importaciones de su exe.
+
+La cabecera PE y los nombres de las DLLs importadas (también las de carga
+diferida) se leen mapeando el exe con mmap: sólo se tocan las páginas de las
+cabeceras y del directorio de importaciones, así que un exe de 80 MB cuesta
+lo mismo que uno de 80 KB. De ahí salen la API (Direct3D 11/12, Vulkan), la
+DLL de inyección y las claves de upscaler de OptiScaler.ini, y el resultado
+se guarda en el índice del escáner por (tamaño, mtime) del exe.
+
+Sólo se ven las DLLs importadas estáticamente o en diferido: un juego que
+carga d3d12.dll con LoadLibrary sólo mostrará dxgi.dll (ver `apis`).
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+from .scan_index import ScanIndex, get_scan_index
+
+MACHINES = {0x8664: 'x64', 0x014C: 'x86', 0xAA64: 'arm64'}
+
+# DLL importada -> API que delata
+API_DLLS = {
+    'd3d12.dll': 'dx12',
+    'd3d11.dll': 'dx11',
+    'vulkan-1.dll': 'vulkan',
+    'dxgi.dll': 'dxgi',
+    'd3d9.dll': 'dx9',
+    'opengl32.dll': 'opengl',
+}
+# APIs con clave propia en [Upscalers] de OptiScaler.ini
+UPSCALER_APIS = ('dx12', 'dx11', 'vulkan')
+
+_IMPORT_DIR = 1
+_DELAY_IMPORT_DIR = 13
+_MAX_DESCRIPTORS = 4096
+_MAX_NAME = 256
+
+
+@dataclass(frozen=True)
+class PEInfo:
+    machine: str                       # 'x64', 'x86', 'arm64' o '0x....' si es otra
+    imports: FrozenSet[str] = field(default_factory=frozenset)   # nombres en minúsculas
+
+    @property
+    def is_64bit(self) -> bool:
+        return self.machine in ('x64', 'arm64')
+
+    @property
+    def apis(self) -> FrozenSet[str]:
+        """APIs gráficas importadas ('dxgi' sola indica D3D11/12 cargado dinámicamente)."""
+        return frozenset(API_DLLS[name] for name in self.imports if name in API_DLLS)
+
+    @property
+    def upscaler_apis(self) -> Optional[FrozenSet[str]]:
+        """APIs de [Upscalers] a configurar, o None si no se sabe (se configuran todas).
+
+        Sólo se descartan APIs cuando el juego no importa ni d3d12.dll ni
+        dxgi.dll: con dxgi.dll, d3d12.dll puede cargarse con LoadLibrary.
+        """
+        if self.apis & {'dx12', 'dxgi'}:
+            return None
+        apis = self.apis.intersection(UPSCALER_APIS)
+        return frozenset(apis) if apis else None
+
+    @property
+    def primary_api(self) -> Optional[str]:
+        for api in ('dx12', 'vulkan', 'dx11', 'dxgi', 'dx9', 'opengl'):
+            if api in self.apis:
+                return api
+        return None
+
+    @property
+    def recommended_spoof_dll(self) -> Optional[str]:
+        """DLL de inyección que el juego seguro que carga, o None si no se puede decidir."""
+        if self.apis & {'dx12', 'dx11', 'dxgi'}:
+            return 'dxgi.dll'
+        if 'vulkan' in self.apis:
+            return 'winmm.dll'       # un juego sólo Vulkan nunca carga dxgi.dll
+        return None
+
+
+def _rva_to_offset(sections, rva: int) -> Optional[int]:
+    for va, vsize, raw_ptr, raw_size in sections:
+        if va <= rva < va + max(vsize, raw_size):
+            offset = rva - va
+            return raw_ptr + offset if offset < raw_size else None
+    return None
+
+
+def _c_string(data, offset: Optional[int]) -> Optional[str]:
+    if offset is None or offset >= len(data):
+        return None
+    end = data.find(b'\0', offset, offset + _MAX_NAME)
+    if end <= offset:
+        return None
+    return data[offset:end].decode('ascii', 'replace').lower()
+
+
+def parse_pe_imports(data) -> PEInfo:
+    """PEInfo de un exe ya en memoria (bytes o mmap).
+
+    Raises:
+        ValueError: Si no es un PE válido
+    """
+    size = len(data)
+    if size < 0x40 or data[:2] != b'MZ':
+        raise ValueError("PE: falta la cabecera MZ")
+    pe = struct.unpack_from('<I', data, 0x3C)[0]
+    if pe + 24 > size or data[pe:pe + 4] != b'PE\0\0':
+        raise ValueError("PE: falta la firma PE")
+    machine_id, n_sections, _, _, _, opt_size, _ = struct.unpack_from('<HHIIIHH', data, pe + 4)
+    machine = MACHINES.get(machine_id, f"0x{machine_id:04x}")
+    opt = pe + 24
+    if opt + opt_size > size or opt_size < 2:
+        raise ValueError("PE: cabecera opcional truncada")
+    magic = struct.unpack_from('<H', data, opt)[0]
+    if magic == 0x20B:
+        image_base = struct.unpack_from('<Q', data, opt + 24)[0]
+        n_dirs_at, dirs_at = opt + 108, opt + 112
+    elif magic == 0x10B:
+        image_base = struct.unpack_from('<I', data, opt + 28)[0]
+        n_dirs_at, dirs_at = opt + 92, opt + 96
+    else:
+        raise ValueError(f"PE: cabecera opcional desconocida (0x{magic:x})")
+    if dirs_at > opt + opt_size:
+        raise ValueError("PE: cabecera opcional truncada")
+    n_dirs = min(struct.unpack_from('<I', data, n_dirs_at)[0], (opt + opt_size - dirs_at) // 8)
+
+    sections = []
+    table = opt + opt_size
+    for i in range(min(n_sections, 96)):
+        at = table + i * 40
+        if at + 40 > size:
+            break
+        vsize, va, raw_size, raw_ptr = struct.unpack_from('<IIII', data, at + 8)
+        sections.append((va, vsize, raw_ptr, raw_size))
+
+    def directory(index):
+        if index >= n_dirs:
+            return 0
+        return struct.unpack_from('<I', data, dirs_at + index * 8)[0]
+
+    imports = set()
+    rva = directory(_IMPORT_DIR)
+    at = _rva_to_offset(sections, rva) if rva else None
+    for _ in range(_MAX_DESCRIPTORS):
+        if at is None or at + 20 > size:
+            break
+        descriptor = data[at:at + 20]
+        if descriptor == b'\0' * 20:
+            break
+        name = _c_string(data, _rva_to_offset(sections, struct.unpack_from('<I', descriptor, 12)[0]))
+        if name:
+            imports.add(name)
+        at += 20
+
+    rva = directory(_DELAY_IMPORT_DIR)
+    at = _rva_to_offset(sections, rva) if rva else None
+    for _ in range(_MAX_DESCRIPTORS):
+        if at is None or at + 32 > size:
+            break
+        attributes, name_rva = struct.unpack_from('<II', data, at)
+        if not name_rva:
+            break
+        if not attributes & 1:
+            # Formato antiguo (VC6): direcciones virtuales en lugar de RVAs
+            name_rva -= image_base
+        name = _c_string(data, _rva_to_offset(sections, name_rva))
+        if name:
+            imports.add(name)
+        at += 32
+
+    return PEInfo(machine=machine, imports=frozenset(imports))
+
+
+def read_pe_imports(path: str) -> PEInfo:
+    """PEInfo de un exe en disco, mapeándolo en lugar de leerlo entero.
+
+    Raises:
+        OSError: Si no se puede abrir
+        ValueError: Si no es un PE válido
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < 0x40:
+            raise ValueError("PE: archivo demasiado pequeño")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_pe_imports(data)
+
+
+def detect_exe_api(exe_path: str, index: Optional[ScanIndex] = None) -> Optional[PEInfo]:
+    """PEInfo del exe, reutilizando el índice mientras no cambien tamaño ni mtime.
+
+    None si el exe no existe o no es un PE (también se recuerda, para no
+    volver a abrirlo).
+    """
+    try:
+        st = os.stat(exe_path)
+    except OSError:
+        return None
+    index = index if index is not None else get_scan_index()
+    key = f"pe:{os.path.normcase(os.path.normpath(exe_path))}"
+    stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    cached = index.get_lookup(key, stamp)
+    if cached is not None:
+        if not cached:
+            return None
+        return PEInfo(machine=cached['machine'], imports=frozenset(cached['imports']))
+    try:
+        info = read_pe_imports(exe_path)
+    except OSError:
+        return None
+    except ValueError:
+        index.put_lookup(key, stamp, {})
+        return None
+    index.put_lookup(key, stamp, {'machine': info.machine, 'imports': sorted(info.imports)})
+    return info
+
+
+__all__ = [
+    'PEInfo', 'parse_pe_imports', 'read_pe_imports', 'detect_exe_api',
+    'API_DLLS', 'UPSCALER_APIS', 'MACHINES'
+]
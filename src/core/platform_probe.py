@@ -0,0 +1,206 @@
+"""Acceso al sistema (registro, carpetas conocidas, GPUs) detrás de una interfaz.
+
+El escáner y la detección de GPU sólo usan get_platform_probe(): en Windows
+es WindowsProbe (registro con winreg, carpetas por defecto de Steam / Epic /
+Xbox, descripciones de las GPUs) y en el resto de sistemas una FixtureProbe
+con los mismos datos en memoria, vacía o cargada desde el JSON indicado en
+OPTISCALER_PROBE_FIXTURE, para ejecutar el escáner en Linux / CI o en
+benchmarks.
+
+Formato del JSON de FixtureProbe:
+    {
+      "registry": {"HKLM\\\\SOFTWARE\\\\WOW6432Node\\\\Valve\\\\Steam": {"InstallPath": "/srv/steam"}},
+      "folders": {"xbox_games": "/srv/XboxGames"},
+      "gpus": ["AMD Radeon RX 7800 XT"]
+    }
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import winreg
+except ImportError:  # winreg sólo existe en Windows
+    winreg = None
+
+from ..config.paths import EPIC_COMMON_DIR, EPIC_MANIFESTS_DIR, STEAM_COMMON_DIR, XBOX_GAMES_DIR
+
+PROBE_FIXTURE_ENV_VAR = "OPTISCALER_PROBE_FIXTURE"
+
+HKLM = "HKLM"
+HKCU = "HKCU"
+
+# Carpetas conocidas por defecto (instalaciones estándar en Windows)
+KNOWN_FOLDERS = {
+    'steam_common': str(STEAM_COMMON_DIR),
+    'epic_games': str(EPIC_COMMON_DIR),
+    'epic_manifests': str(EPIC_MANIFESTS_DIR),
+    'xbox_games': str(XBOX_GAMES_DIR),
+}
+
+GPU_CLASS_KEY = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e968-e325-11ce-bfc1-08002be10318}"
+
+
+class PlatformProbe:
+    """Interfaz común: registro, carpetas conocidas y GPUs."""
+
+    #: False si no hay registro que consultar (las comprobaciones de registro se omiten)
+    has_registry = False
+
+    def read_value(self, hive: str, key: str, name: str) -> Any:
+        """Valor `name` de la clave hive\\key, o None si no existe."""
+        raise NotImplementedError
+
+    def subkeys(self, hive: str, key: str) -> List[str]:
+        """Nombres de las subclaves de hive\\key ([] si la clave no existe)."""
+        raise NotImplementedError
+
+    def known_folder(self, name: str) -> Optional[str]:
+        """Ruta de una carpeta conocida ('steam_common', 'epic_games', 'epic_manifests', 'xbox_games')."""
+        raise NotImplementedError
+
+    def gpu_descriptions(self) -> List[str]:
+        """Descripciones (DriverDesc) de los adaptadores de vídeo."""
+        raise NotImplementedError
+
+
+class WindowsProbe(PlatformProbe):
+    """Implementación real sobre winreg."""
+
+    has_registry = True
+
+    def _hive(self, hive: str):
+        return {HKLM: winreg.HKEY_LOCAL_MACHINE, HKCU: winreg.HKEY_CURRENT_USER}[hive]
+
+    def read_value(self, hive: str, key: str, name: str) -> Any:
+        try:
+            with winreg.OpenKey(self._hive(hive), key, 0, winreg.KEY_READ) as handle:
+                return winreg.QueryValueEx(handle, name)[0]
+        except OSError:
+            return None
+
+    def subkeys(self, hive: str, key: str) -> List[str]:
+        names = []
+        try:
+            with winreg.OpenKey(self._hive(hive), key) as handle:
+                i = 0
+                while True:
+                    try:
+                        names.append(winreg.EnumKey(handle, i))
+                    except OSError:
+                        break
+                    i += 1
+        except OSError:
+            pass
+        return names
+
+    def known_folder(self, name: str) -> Optional[str]:
+        return KNOWN_FOLDERS.get(name)
+
+    def gpu_descriptions(self) -> List[str]:
+        descriptions = []
+        for subkey in self.subkeys(HKLM, GPU_CLASS_KEY):
+            desc = self.read_value(HKLM, f"{GPU_CLASS_KEY}\\{subkey}", "DriverDesc")
+            if desc:
+                descriptions.append(str(desc))
+        return descriptions
+
+
+class FixtureProbe(PlatformProbe):
+    """Implementación en memoria (tests, benchmarks, Linux).
+
+    Las rutas de registro no distinguen mayúsculas, como en Windows.
+    """
+
+    def __init__(self, registry: Optional[Dict[str, Dict[str, Any]]] = None,
+                 folders: Optional[Dict[str, str]] = None,
+                 gpus: Optional[Iterable[str]] = None) -> None:
+        self.has_registry = registry is not None
+        self._registry: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._original: Dict[str, str] = {}
+        for path, values in (registry or {}).items():
+            self.set_key(path, values)
+        self.folders = dict(folders or {})
+        self.gpus = list(gpus or [])
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return path.replace('/', '\\').strip('\\').lower()
+
+    def set_key(self, path: str, values: Dict[str, Any]) -> None:
+        """Crea (o sustituye) la clave `path` ('HKLM\\SOFTWARE\\...') con sus valores."""
+        self.has_registry = True
+        parts = path.replace('/', '\\').strip('\\').split('\\')
+        self._registry[self._norm(path)] = dict(values)
+        self._original[self._norm(path)] = '\\'.join(parts)
+        # Registrar la clave en cada ancestro para subkeys()
+        for depth in range(1, len(parts)):
+            parent = self._norm('\\'.join(parts[:depth]))
+            children = self._children.setdefault(parent, [])
+            if parts[depth] not in children:
+                children.append(parts[depth])
+
+    def read_value(self, hive: str, key: str, name: str) -> Any:
+        return self._registry.get(self._norm(f"{hive}\\{key}"), {}).get(name)
+
+    def subkeys(self, hive: str, key: str) -> List[str]:
+        return list(self._children.get(self._norm(f"{hive}\\{key}"), []))
+
+    def known_folder(self, name: str) -> Optional[str]:
+        return self.folders.get(name)
+
+    def gpu_descriptions(self) -> List[str]:
+        return list(self.gpus)
+
+    def to_dict(self) -> Dict[str, Any]:
+        registry = {self._original[k]: dict(v) for k, v in self._registry.items()}
+        return {'registry': registry if self.has_registry else None,
+                'folders': self.folders, 'gpus': self.gpus}
+
+    @classmethod
+    def from_file(cls, path: str | os.PathLike) -> "FixtureProbe":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('registry'), data.get('folders'), data.get('gpus'))
+
+
+_probe: Optional[PlatformProbe] = None
+_probe_lock = threading.Lock()
+
+
+def _default_probe() -> PlatformProbe:
+    if winreg is not None and sys.platform.startswith('win'):
+        return WindowsProbe()
+    fixture = os.environ.get(PROBE_FIXTURE_ENV_VAR)
+    if fixture:
+        return FixtureProbe.from_file(fixture)
+    return FixtureProbe()
+
+
+def get_platform_probe() -> PlatformProbe:
+    """Probe compartida de la aplicación (WindowsProbe en Windows)."""
+    global _probe
+    with _probe_lock:
+        if _probe is None:
+            _probe = _default_probe()
+        return _probe
+
+
+def set_platform_probe(probe: Optional[PlatformProbe]) -> Optional[PlatformProbe]:
+    """Sustituye la probe compartida (None = volver a la de por defecto); devuelve la anterior."""
+    global _probe
+    with _probe_lock:
+        previous, _probe = _probe, probe
+    return previous
+
+
+__all__ = [
+    'PlatformProbe', 'WindowsProbe', 'FixtureProbe', 'get_platform_probe', 'set_platform_probe',
+    'HKLM', 'HKCU', 'KNOWN_FOLDERS', 'PROBE_FIXTURE_ENV_VAR'
+]
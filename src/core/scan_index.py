@@ -0,0 +1,237 @@
+"""Índice persistente del escáner (CACHE_DIR/scan_index.json).
+
+Recuerda el ejecutable de cada juego junto a una marca de versión de la
+instalación (p.ej. el buildid de Steam), los resultados de consultas caras
+(el recorrido del registro de Epic), las carpetas ilegibles (PermissionError
+en WindowsApps) y las carpetas sin juego, para que un re-escaneo compruebe
+esas marcas en lugar de recorrer de nuevo lo que no ha cambiado. También
+guarda la lista de juegos del último escaneo, que la limpieza de versiones
+necesita antes de que se escanee en la sesión. Es un único
+JSON seguro entre hilos que se guarda de forma atómica y sólo si hubo
+cambios; un índice ilegible o de otra versión se descarta.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.paths import CACHE_DIR
+
+SCAN_INDEX_FILE = CACHE_DIR / "scan_index.json"
+SCAN_INDEX_SCHEMA = 1
+UNREADABLE_TTL = 7 * 24 * 3600   # se reintenta una carpeta ilegible tras una semana
+SKIPPED_TTL = 24 * 3600          # una carpeta sin juego se vuelve a recorrer tras un día
+SKIPPED_STAMP_DEPTH = 2          # niveles de subcarpetas cuyo mtime forma parte de la marca
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ScanIndex:
+    """Resultados reutilizables entre escaneos, por clave de juego ('steam:<appid>')."""
+
+    def __init__(self, path: Optional[str | Path] = None) -> None:
+        self.path = Path(path) if path else SCAN_INDEX_FILE
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = {'exe': {}, 'lookup': {}, 'unreadable': {}, 'skipped': {},
+                                                  'games': {}}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get('schema') != SCAN_INDEX_SCHEMA:
+                return
+            for section in self._data:
+                if isinstance(data.get(section), dict):
+                    self._data[section] = data[section]
+        except (OSError, ValueError):
+            pass
+
+    def get_exe(self, key: str, stamp: str, root: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """(carpeta de inyección, exe) si la marca coincide y el exe sigue existiendo.
+
+        Con `root`, la entrada sólo vale si la carpeta guardada está dentro de
+        él (el mismo appid puede estar en otra biblioteca o haberse movido).
+        """
+        with self._lock:
+            entry = self._data['exe'].get(key)
+        if not entry or entry.get('stamp') != stamp:
+            return None
+        if root is not None:
+            base = os.path.normcase(os.path.normpath(root))
+            path = os.path.normcase(os.path.normpath(entry['path']))
+            if path != base and not path.startswith(base.rstrip(os.sep) + os.sep):
+                return None
+        if not os.path.isfile(os.path.join(entry['path'], entry['exe'])):
+            return None
+        return entry['path'], entry['exe']
+
+    def put_exe(self, key: str, stamp: str, injection_path: str, exe_name: str) -> None:
+        with self._lock:
+            self._data['exe'][key] = {'stamp': stamp, 'path': injection_path, 'exe': exe_name,
+                                      'updated': time.time()}
+            self._dirty = True
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._data['exe'].pop(key, None) is not None:
+                self._dirty = True
+
+    def get_lookup(self, key: str, stamp: str) -> Any:
+        """Valor guardado con put_lookup, o None si no hay o la marca cambió."""
+        with self._lock:
+            entry = self._data['lookup'].get(key)
+        if not entry or entry.get('stamp') != stamp:
+            return None
+        return entry.get('value')
+
+    def put_lookup(self, key: str, stamp: str, value: Any) -> None:
+        with self._lock:
+            self._data['lookup'][key] = {'stamp': stamp, 'value': value, 'updated': time.time()}
+            self._dirty = True
+
+    def is_unreadable(self, path: str) -> bool:
+        """True si `path` falló al listarse y no ha cambiado (mtime) desde entonces."""
+        with self._lock:
+            entry = self._data['unreadable'].get(os.path.normcase(path))
+        if not entry or time.time() - entry.get('updated', 0) > UNREADABLE_TTL:
+            return False
+        return entry.get('stamp') == _mtime(path)
+
+    def mark_unreadable(self, path: str) -> None:
+        with self._lock:
+            self._data['unreadable'][os.path.normcase(path)] = {'stamp': _mtime(path), 'updated': time.time()}
+            self._dirty = True
+
+    @staticmethod
+    def _folder_stamp(path: str, extra: str) -> Optional[str]:
+        """mtime y nº de entradas de `path` más un resumen de los mtime de sus
+        subcarpetas (hasta SKIPPED_STAMP_DEPTH niveles): un exe copiado en una
+        subcarpeta ya existente (p.ej. Binaries/Win64) sólo cambia el mtime de ésta."""
+        try:
+            top = os.stat(path).st_mtime_ns
+            count = len(os.listdir(path))
+        except OSError:
+            return None
+        digest = hashlib.sha1()
+        pending = [(path, 0)]
+        while pending:
+            folder, depth = pending.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    subdirs = sorted((e for e in entries if e.is_dir(follow_symlinks=False)),
+                                     key=lambda e: e.name)
+                    for entry in subdirs:
+                        digest.update(f"{entry.path}:{entry.stat(follow_symlinks=False).st_mtime_ns};".encode('utf-8'))
+                        if depth + 1 < SKIPPED_STAMP_DEPTH:
+                            pending.append((entry.path, depth + 1))
+            except OSError:
+                continue
+        return f"{top}:{count}:{digest.hexdigest()[:12]}:{extra}"
+
+    def is_skipped(self, path: str, extra: str = '') -> bool:
+        """True si `path` no tenía juego, no ha cambiado (mtime, nº de entradas,
+        subcarpetas, `extra`) y se recorrió hace menos de SKIPPED_TTL."""
+        with self._lock:
+            entry = self._data['skipped'].get(os.path.normcase(path))
+        if not entry or time.time() - entry.get('updated', 0) > SKIPPED_TTL:
+            return False
+        stamp = self._folder_stamp(path, extra)
+        return stamp is not None and entry.get('stamp') == stamp
+
+    def mark_skipped(self, path: str, extra: str = '', name: str = '', platform: str = '',
+                     reason: str = 'no_exe', cost_ms: float = 0.0) -> None:
+        """Guarda `path` como carpeta sin juego; cost_ms es lo que tardó en recorrerse."""
+        stamp = self._folder_stamp(path, extra)
+        if stamp is None:
+            return
+        with self._lock:
+            self._data['skipped'][os.path.normcase(path)] = {
+                'stamp': stamp, 'path': path, 'name': name, 'platform': platform,
+                'reason': reason, 'cost_ms': round(cost_ms, 1), 'updated': time.time(),
+            }
+            self._dirty = True
+
+    def forget_skipped(self, path: str) -> None:
+        with self._lock:
+            if self._data['skipped'].pop(os.path.normcase(path), None) is not None:
+                self._dirty = True
+
+    def skipped(self) -> List[Dict[str, Any]]:
+        """Carpetas omitidas que aún existen, de la más cara de recorrer a la más barata."""
+        with self._lock:
+            entries = [dict(e) for e in self._data['skipped'].values()]
+        entries = [e for e in entries if os.path.isdir(e['path'])]
+        return sorted(entries, key=lambda e: e.get('cost_ms', 0), reverse=True)
+
+    def clear_skipped(self) -> int:
+        """Olvida todas las carpetas omitidas (se vuelven a recorrer); devuelve cuántas eran."""
+        with self._lock:
+            count = len(self._data['skipped'])
+            self._data['skipped'] = {}
+            self._dirty = self._dirty or count > 0
+            return count
+
+    def put_games(self, game_dirs: List[str]) -> None:
+        """Guarda las carpetas de juegos del último escaneo completo."""
+        game_dirs = list(game_dirs)
+        with self._lock:
+            if self._data['games'].get('paths') != game_dirs:
+                self._data['games'] = {'paths': game_dirs, 'updated': time.time()}
+                self._dirty = True
+
+    def game_dirs(self) -> Optional[List[str]]:
+        """Carpetas de juegos del último escaneo completo, o None si nunca se escaneó."""
+        with self._lock:
+            paths = self._data['games'].get('paths')
+        return list(paths) if isinstance(paths, list) else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data['exe'])
+
+    def save(self) -> bool:
+        """Escribe el índice si cambió; False si no se pudo escribir."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            payload = dict(self._data, schema=SCAN_INDEX_SCHEMA)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix('.tmp')
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, indent=1, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError:
+                return False
+            self._dirty = False
+            return True
+
+
+_index: Optional[ScanIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_scan_index() -> ScanIndex:
+    """Índice compartido de la aplicación."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ScanIndex()
+        return _index
+
+
+__all__ = ['ScanIndex', 'get_scan_index', 'SCAN_INDEX_FILE']
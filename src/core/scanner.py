@@ -8,25 +8,34 @@ Functions:
 - check_mod_status
 - scan_games
 - check_registry_override
+- folder_identity
 
-These use constants from src.config.
+These use constants from src.config; the executable search follows the
+rules in src/config/exe_rules.json (src.core.exe_rules). Registry reads and default library
+folders go through the platform probe (src.core.platform_probe), so the
+scanner also runs off Windows against a FixtureProbe.
 """
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import os
 import glob
-import re
-import platform
-import winreg
+import hashlib
+import time
 from functools import lru_cache
+from collections import deque
 from threading import Lock
 
-from ..config.paths import (
-    STEAM_COMMON_DIR, EPIC_COMMON_DIR, XBOX_GAMES_DIR,
-    RECURSIVE_EXE_PATTERNS, COMMON_EXE_SUBFOLDERS_DIRECT
-)
-from .settings import EXE_BLACKLIST_KEYWORDS
 from ..config.constants import MOD_CHECK_FILES, MOD_CHECK_FILES_OPTISCALER, MOD_CHECK_FILES_NUKEM
 from ..config.settings import SPOOFING_DLL_NAMES
+from ..utils.error_handling import OperationCancelled
+from ..utils.metrics import get_metrics, timed
+from ..utils.tracing import current_span, span, traced
+from .epic_library import read_epic_manifests
+from .exe_rules import ExeRules, get_exe_rules
+from .platform_probe import HKLM, PlatformProbe, get_platform_probe
+from .scan_index import ScanIndex, get_scan_index
+from .steam_library import library_folders, read_app_manifests
+from .tasks import check_cancelled, current_token
+from .xbox_library import read_xbox_manifest
 
 # Cache simple para scan_games
 _scan_cache = None
@@ -40,84 +49,105 @@ def invalidate_scan_cache():
         _scan_cache = None
 
 
-def get_dynamic_steam_paths(log_func) -> List[str]:
-    paths = {str(STEAM_COMMON_DIR)}
+def get_scan_cache():
+    """Devuelve el último resultado de scan_games (o None si no hay escaneo)."""
+    with _scan_cache_lock:
+        return list(_scan_cache) if _scan_cache is not None else None
+
+
+STEAM_REGISTRY_KEY = r"SOFTWARE\WOW6432Node\Valve\Steam"
+UNINSTALL_REGISTRY_KEY = r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+NVAPI_REGISTRY_KEY = r"SOFTWARE\NVIDIA Corporation\Global\NVAPI\Render\Software\NVAPI"
+
+
+def get_dynamic_steam_paths(log_func, probe: Optional[PlatformProbe] = None) -> List[str]:
+    probe = probe or get_platform_probe()
+    paths = set()
+    default_common = probe.known_folder('steam_common')
+    if default_common:
+        paths.add(default_common)
     try:
-        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam")
-        steam_path = winreg.QueryValueEx(key, "InstallPath")[0]
-        winreg.CloseKey(key)
-
-        main_common = os.path.join(steam_path, "steamapps", "common")
-        if os.path.isdir(main_common):
-            paths.add(main_common)
-            log_func('INFO', f"Ruta de Steam (Principal) detectada: {main_common}")
-
-        vdf_path = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
-        if os.path.exists(vdf_path):
-            with open(vdf_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            lib_paths = re.findall(r'"path"\s+"([^"]+)"', content)
-            for lib_path in lib_paths:
-                lib_path = lib_path.replace('\\\\', '\\')
-                lib_common = os.path.join(lib_path, "steamapps", "common")
-                if os.path.isdir(lib_common):
-                    paths.add(lib_common)
-                    log_func('INFO', f"Ruta de Steam (Biblioteca) detectada: {lib_common}")
-
-    except FileNotFoundError:
-        log_func('WARN', "No se encontró la instalación de Steam en el registro. Usando fallback.")
+        steam_path = probe.read_value(HKLM, STEAM_REGISTRY_KEY, "InstallPath")
+        if not steam_path:
+            log_func('WARN', "No se encontró la instalación de Steam en el registro. Usando fallback.")
+            return list(paths)
+
+        # libraryfolders.vdf: la biblioteca principal y las adicionales
+        for index, steamapps in enumerate(library_folders(steam_path)):
+            lib_common = os.path.join(steamapps, "common")
+            if os.path.isdir(lib_common):
+                paths.add(lib_common)
+                kind = "Principal" if index == 0 else "Biblioteca"
+                log_func('INFO', f"Ruta de Steam ({kind}) detectada: {lib_common}")
     except Exception as e:
         log_func('ERROR', f"Error al buscar rutas de Steam: {e}")
     return list(paths)
 
 
-def get_dynamic_epic_paths(log_func) -> List[str]:
-    paths = {str(EPIC_COMMON_DIR)}
-    try:
-        uninstall_key_path = r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
-        uninstall_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, uninstall_key_path)
+def get_dynamic_epic_paths(log_func, probe: Optional[PlatformProbe] = None, index=None) -> List[str]:
+    """Carpetas de los juegos de Epic.
 
-        i = 0
-        while True:
+    Se leen de los manifiestos del launcher (un listado de carpeta). Sólo si no
+    hay manifiestos se recorre la clave Uninstall del registro, y el resultado
+    se guarda en el ScanIndex mientras no cambie la lista de subclaves.
+    """
+    probe = probe or get_platform_probe()
+    apps = read_epic_manifests(probe.known_folder('epic_manifests'))
+    if apps:
+        paths = []
+        for app in apps:
+            if app.is_game and os.path.isdir(app.install_path) and app.install_path not in paths:
+                paths.append(app.install_path)
+                log_func('INFO', f"Ruta de Epic (Manifiesto) detectada: {app.install_path}")
+        return paths
+
+    index = index if index is not None else get_scan_index()
+    paths = set()
+    default_root = probe.known_folder('epic_games')
+    if default_root:
+        paths.add(default_root)
+    try:
+        subkeys = probe.subkeys(HKLM, UNINSTALL_REGISTRY_KEY)
+        if not subkeys:
+            log_func('WARN', "No se encontró la clave de desinstalación de Epic. Usando fallback.")
+            return list(paths)
+        stamp = hashlib.sha1('\n'.join(sorted(subkeys)).encode('utf-8', 'replace')).hexdigest()
+        cached = index.get_lookup('epic:registry', stamp)
+        if cached is not None:
+            paths.update(p for p in cached if os.path.isdir(p))
+            log_func('INFO', f"Rutas de Epic desde el índice de escaneo ({len(cached)}).")
+            return list(paths)
+        found = []
+        for subkey_name in subkeys:
+            subkey_path = f"{UNINSTALL_REGISTRY_KEY}\\{subkey_name}"
             try:
-                subkey_name = winreg.EnumKey(uninstall_key, i)
-                subkey_path = os.path.join(uninstall_key_path, subkey_name)
-
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, subkey_path) as subkey:
-                    try:
-                        publisher = str(winreg.QueryValueEx(subkey, "Publisher")[0])
-                        if "Epic Games" in publisher:
-                            install_loc = str(winreg.QueryValueEx(subkey, "InstallLocation")[0])
-                            if os.path.isfile(install_loc):
-                                install_loc = os.path.dirname(install_loc)
-                            if os.path.isdir(install_loc) and install_loc not in paths:
-                                paths.add(install_loc)
-                                log_func('INFO', f"Ruta de Epic (Juego) detectada: {install_loc}")
-                    except FileNotFoundError:
-                        pass
-                    except Exception as e:
-                        log_func('WARN', f"Error menor al leer subclave de registro: {e}")
-                i += 1
-            except OSError:
-                break
-        winreg.CloseKey(uninstall_key)
-
-    except FileNotFoundError:
-        log_func('WARN', "No se encontró la clave de desinstalación de Epic. Usando fallback.")
+                publisher = str(probe.read_value(HKLM, subkey_path, "Publisher") or '')
+                if "Epic Games" in publisher:
+                    install_loc = str(probe.read_value(HKLM, subkey_path, "InstallLocation") or '')
+                    if os.path.isfile(install_loc):
+                        install_loc = os.path.dirname(install_loc)
+                    if install_loc and os.path.isdir(install_loc) and install_loc not in paths:
+                        paths.add(install_loc)
+                        found.append(install_loc)
+                        log_func('INFO', f"Ruta de Epic (Juego) detectada: {install_loc}")
+            except Exception as e:
+                log_func('WARN', f"Error menor al leer subclave de registro: {e}")
+        index.put_lookup('epic:registry', stamp, found)
     except Exception as e:
         log_func('ERROR', f"Error al buscar rutas de Epic: {e}")
     return list(paths)
 
 
-def get_best_exe_in_folder(folder_path: str, log_func) -> Tuple[str, int]:
-    all_exes = glob.glob(os.path.join(folder_path, '*.exe'))
+def get_best_exe_in_folder(folder_path: str, log_func, rules: Optional[ExeRules] = None,
+                           allow_blacklisted: bool = True) -> Tuple[str, int]:
+    rules = rules or get_exe_rules()
+    all_exes = glob.glob(os.path.join(glob.escape(folder_path), '*.exe'))
     if not all_exes:
         return None, 0
     good_candidates = []
     bad_candidates = []
     for exe_path in all_exes:
-        exe_name_lower = os.path.basename(exe_path).lower()
-        is_blacklisted = any(keyword in exe_name_lower for keyword in EXE_BLACKLIST_KEYWORDS)
+        is_blacklisted = rules.is_blacklisted(os.path.basename(exe_path))
         try:
             size = os.path.getsize(exe_path)
         except Exception:
@@ -131,7 +161,7 @@ def get_best_exe_in_folder(folder_path: str, log_func) -> Tuple[str, int]:
         good_candidates.sort(key=lambda x: x[1], reverse=True)
         best_exe_path, best_size = good_candidates[0]
         return os.path.basename(best_exe_path), best_size
-    if bad_candidates:
+    if bad_candidates and allow_blacklisted:
         bad_candidates.sort(key=lambda x: x[1], reverse=True)
         best_bad_exe_path, best_bad_size = bad_candidates[0]
         log_func('WARN', f"  -> No se encontraron .exes 'buenos', usando el mejor de la lista negra: {os.path.basename(best_bad_exe_path)}")
@@ -139,96 +169,119 @@ def get_best_exe_in_folder(folder_path: str, log_func) -> Tuple[str, int]:
     return None, 0
 
 
-def find_executable_path(base_game_path: str, log_func) -> Tuple[str, str]:
+@traced('scan.find_executable_path')
+@timed('scan_find_executable_seconds', 'Time spent locating the executable of one game folder')
+def find_executable_path(base_game_path: str, log_func, token=None, index: Optional[ScanIndex] = None,
+                         rules: Optional[ExeRules] = None) -> Tuple[str, str]:
     """
-    OPTIMIZACIÓN: Limita profundidad de búsqueda para evitar timeouts en juegos grandes (Forza, COD).
+    Localiza la carpeta del ejecutable según las reglas de exe_rules.json (src.core.exe_rules).
     Estrategia:
-    1. Subcarpetas conocidas (bin/, binaries/, etc)
-    2. Búsqueda recursiva limitada a 4 niveles de profundidad
-    3. Root folder como último recurso
+    1. Estructura del motor (Unreal Engine, Unity, id Tech, RE Engine): unos pocos globs
+    2. Subcarpetas conocidas (Binaries/Win64, bin/x64, etc.), sólo con exes fuera de la lista negra
+    3. Recorrido por niveles con profundidad limitada (4 por defecto, ajustable por carpeta),
+       que termina en cuanto aparece el mejor exe "final" posible (ver ExeRules.is_final)
+    4. Root folder como último recurso
+
+    token: CancellationToken opcional (por defecto, el de la tarea actual);
+    se comprueba en cada carpeta recorrida.
+    index: ScanIndex opcional; las carpetas que no se pueden listar se
+    guardan en él y no se vuelven a recorrer en los siguientes escaneos.
+    rules: ExeRules a usar (por defecto, las compartidas).
     """
+    token = token or current_token()
+    rules = rules or get_exe_rules()
+    metrics = get_metrics()
+    dirs_walked = metrics.counter('scan_directories_walked_total', 'Directories visited while looking for executables')
+    exe_candidates = metrics.counter('scan_exe_candidates_total', 'Executables evaluated as game candidates')
+    unreadable = set()   # carpetas ilegibles de esta búsqueda
+
+    def on_walk_error(path: str):
+        unreadable.add(os.path.normcase(path))
+        if index is not None:
+            index.mark_unreadable(path)
+
+    def skip_dir(path: str) -> bool:
+        return os.path.normcase(path) in unreadable or (index is not None and index.is_unreadable(path))
+
     try:
-        # 1. Direct subfolders
-        for subfolder in COMMON_EXE_SUBFOLDERS_DIRECT:
+        if skip_dir(base_game_path):
+            log_func('WARN', f"  -> Carpeta sin permiso de lectura (en caché), se omite: {base_game_path}")
+            return base_game_path, None
+
+        # 1. Estructura conocida del motor
+        engine = rules.detect_engine(base_game_path)
+        if engine is not None:
+            found = rules.engine_executable(base_game_path, engine)
+            if found:
+                current_span().set(engine=engine.name)
+                log_func('INFO', f"  -> Estructura de {engine.name} detectada: {found[0]} (Exe: {found[1]})")
+                return found
+
+        # 2. Direct subfolders
+        for subfolder in rules.direct_subfolders:
             potential_path = os.path.normpath(os.path.join(base_game_path, subfolder))
             if os.path.isdir(potential_path):
-                exe_name, size = get_best_exe_in_folder(potential_path, log_func)
+                exe_name, size = get_best_exe_in_folder(potential_path, log_func, rules, allow_blacklisted=False)
                 if exe_name:
                     log_func('INFO', f"  -> Ruta inteligente (directa) encontrada: {potential_path} (Exe: {exe_name}, {size//(1024*1024)}MB)")
                     return potential_path, exe_name
 
-        # 2. BUGFIX: Búsqueda inteligente con profundidad limitada (4 niveles)
+        # 3. Recorrido por niveles: prioridad del patrón y, a igualdad, el exe más grande
         log_func('INFO', f"  -> Buscando recursivamente ejecutables en: {base_game_path}")
-        
-        # Patrones conocidos de ejecutables de juego (mayor prioridad)
-        GAME_EXE_PATTERNS = [
-            '*-WinGDK-Shipping.exe',   # Unreal Engine Xbox/Windows Store
-            '*-Win64-Shipping.exe',    # Unreal Engine PC
-            '*-Win64.exe',             # Unreal Engine variants
-            '*Game.exe',               # Patrones comunes de juego
-            '*Main.exe',
-            '*.exe'                    # Genérico (último recurso)
-        ]
-        
-        best_recursive_exe = None
-        best_recursive_size = 0
-        best_recursive_dir = None
-        best_pattern_priority = 999  # Menor = mejor prioridad
-        
-        MAX_DEPTH = 4  # OPTIMIZACIÓN: Limitar recursión para evitar timeout en juegos masivos
-        
-        def limited_glob(base_path: str, pattern: str, max_depth: int):
-            """Búsqueda recursiva con profundidad limitada."""
-            results = []
-            base_depth = base_path.count(os.sep)
-            
-            for root, dirs, files in os.walk(base_path):
-                current_depth = root.count(os.sep) - base_depth
-                if current_depth > max_depth:
-                    dirs[:] = []  # No bajar más niveles
+        max_depth = rules.depth_for(base_game_path, engine)
+        best = None   # (prioridad, -tamaño, carpeta, exe)
+        pending = deque([(base_game_path, 0)])
+        while pending:
+            current, depth = pending.popleft()
+            check_cancelled(token)
+            dirs_walked.inc()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                on_walk_error(current)
+                continue
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
                     continue
-                    
-                # Buscar archivos que coincidan con el patrón
-                for file in files:
-                    if file.lower().endswith('.exe'):
-                        # Aplicar patrón (simple matching)
-                        pattern_clean = pattern.replace('*', '').replace('.exe', '')
-                        if not pattern_clean or pattern_clean.lower() in file.lower():
-                            results.append(os.path.join(root, file))
-            return results
-        
-        for priority, pattern in enumerate(GAME_EXE_PATTERNS):
-            found_exes_paths = limited_glob(base_game_path, pattern, MAX_DEPTH)
-            
-            for exe_path in found_exes_paths:
-                exe_name_lower = os.path.basename(exe_path).lower()
-                is_blacklisted = any(keyword in exe_name_lower for keyword in EXE_BLACKLIST_KEYWORDS)
-                if is_blacklisted:
+                if is_dir:
+                    if depth < max_depth and not rules.should_prune(entry.name) and not skip_dir(entry.path):
+                        pending.append((entry.path, depth + 1))
+                    continue
+                if not entry.name.lower().endswith('.exe'):
+                    continue
+                exe_candidates.inc()
+                if rules.is_blacklisted(entry.name):
+                    continue
+                priority = rules.priority(entry.name)
+                if priority is None:
                     continue
-                    
                 try:
-                    size = os.path.getsize(exe_path)
-                    # Priorizar por patrón, luego por tamaño
-                    if priority < best_pattern_priority or (priority == best_pattern_priority and size > best_recursive_size):
-                        best_pattern_priority = priority
-                        best_recursive_size = size
-                        best_recursive_exe = os.path.basename(exe_path)
-                        best_recursive_dir = os.path.dirname(exe_path)
-                except Exception:
-                    pass
-
-        if best_recursive_exe:
-            log_func('INFO', f"  -> Ruta inteligente (recursiva) encontrada: {best_recursive_dir} (Exe: {best_recursive_exe}, {best_recursive_size//(1024*1024)}MB)")
-            return best_recursive_dir, best_recursive_exe
-
-        # 3. Root folder
-        exe_name_root, size_root = get_best_exe_in_folder(base_game_path, log_func)
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                if best is None or (priority, -size) < best[:2]:
+                    best = (priority, -size, current, entry.name)
+            if best is not None and rules.is_final(best[0]):
+                break   # ningún patrón mejor detendría el recorrido: no seguir
+
+        if best is not None:
+            _, neg_size, best_dir, best_exe = best
+            log_func('INFO', f"  -> Ruta inteligente (recursiva) encontrada: {best_dir} (Exe: {best_exe}, {-neg_size//(1024*1024)}MB)")
+            return best_dir, best_exe
+
+        # 4. Root folder
+        exe_name_root, size_root = get_best_exe_in_folder(base_game_path, log_func, rules)
         if exe_name_root:
             log_func('INFO', f"  -> No se encontraron subcarpetas, usando la raíz: {base_game_path} (Exe: {exe_name_root}, {size_root//(1024*1024)}MB)")
             return base_game_path, exe_name_root
 
         log_func('WARN', f"  -> No se encontró .exe en {base_game_path} o subcarpetas. Usando la raíz por defecto.")
         return base_game_path, None
+    except OperationCancelled:
+        raise
     except Exception as e:
         log_func('ERROR', f"  -> Error en búsqueda inteligente: {e}. Usando raíz: {base_game_path}")
         return base_game_path, None
@@ -241,6 +294,7 @@ def get_game_name(folder_name: str) -> str:
     return folder_name
 
 
+@traced('scan.check_mod_status')
 def check_mod_status(game_target_dir: str) -> str:
     """Verifica el estado de instalación de los mods.
     
@@ -293,15 +347,16 @@ def check_mod_status(game_target_dir: str) -> str:
         return "❌ AUSENTE"
 
 
-def check_registry_override(log_func) -> bool:
-    if platform.system() != "Windows":
+def check_registry_override(log_func, probe: Optional[PlatformProbe] = None) -> bool:
+    probe = probe or get_platform_probe()
+    if not probe.has_registry:
         return True
     try:
-        key_path = r"SOFTWARE\NVIDIA Corporation\Global\NVAPI\Render\Software\NVAPI"
-        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_READ)
-        value, _ = winreg.QueryValueEx(key, "DisableSignatureChecks")
-        winreg.CloseKey(key)
-
+        value = probe.read_value(HKLM, NVAPI_REGISTRY_KEY, "DisableSignatureChecks")
+        if value is None:
+            log_func('WARN', "VERIFICACIÓN REGISTRO: ❌ Clave de 'DisableSignatureChecks' NO encontrada.")
+            log_func('WARN', "¡MOD BLOQUEADO! Ejecute el archivo 'DISABLE...' REG si el mod no funciona.")
+            return False
         if value == 1:
             log_func('INFO', "VERIFICACIÓN REGISTRO: ✅ Firma de DLSS deshabilitada (OK).")
             return True
@@ -309,16 +364,33 @@ def check_registry_override(log_func) -> bool:
             log_func('WARN', "VERIFICACIÓN REGISTRO: ❌ Comprobación de firma ACTIVA (Valor = 0).")
             log_func('WARN', "¡MOD BLOQUEADO! Ejecute el archivo 'DISABLE...' REG si el mod no funciona.")
             return False
-    except FileNotFoundError:
-        log_func('WARN', "VERIFICACIÓN REGISTRO: ❌ Clave de 'DisableSignatureChecks' NO encontrada.")
-        log_func('WARN', "¡MOD BLOQUEADO! Ejecute el archivo 'DISABLE...' REG si el mod no funciona.")
-        return False
     except Exception as e:
         log_func('ERROR', f"VERIFICACIÓN REGISTRO: Fallo al leer el Registro: {e}")
         return False
 
 
-def scan_games(log_func, custom_folders=None, use_cache=True):
+def folder_identity(path: str) -> Optional[tuple]:
+    """Identidad de una carpeta: (st_dev, st_ino) tras seguir junctions y symlinks.
+
+    Si el sistema de archivos no da inodos (st_ino == 0) se usa la ruta real.
+    None si la carpeta no existe o no se puede consultar.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_ino:
+        return (st.st_dev, st.st_ino)
+    return ('path', os.path.normcase(os.path.realpath(path)))
+
+
+def _real_path(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+@traced('scan')
+@timed('scan_seconds', 'Duration of a full game scan (cached scans included)')
+def scan_games(log_func, custom_folders=None, use_cache=True, token=None, probe=None, index=None):
     """
     Escanea juegos en Steam, Epic, Xbox y carpetas personalizadas.
     
@@ -326,105 +398,234 @@ def scan_games(log_func, custom_folders=None, use_cache=True):
         log_func: Función para logging
         custom_folders: Carpetas adicionales a escanear
         use_cache: Si True, devuelve resultado cacheado si existe (útil para evitar rescans costosos)
+        token: CancellationToken opcional (por defecto, el de la tarea actual)
+        probe: PlatformProbe para registro y carpetas por defecto (por defecto, la compartida)
+        index: ScanIndex con los ejecutables ya encontrados (por defecto, el compartido)
     
     Returns:
         Lista de tuplas (path, name, status, exe_name, platform_tag)
+    
+    Raises:
+        OperationCancelled: Si se cancela; la caché de escaneo no se modifica
     """
     global _scan_cache
+    token = token or current_token()
+    probe = probe or get_platform_probe()
+    index = index if index is not None else get_scan_index()
     
     # Si hay cache válido y se permite usarlo, devolver cache
     if use_cache and _scan_cache is not None:
         log_func('INFO', "Usando caché de juegos escaneados")
+        current_span().set(cached=True, games=len(_scan_cache))
         return _scan_cache
     
     if custom_folders is None:
         custom_folders = []
     all_games = []
     processed_paths = set()
+    games_counter = get_metrics().counter('scan_games_total', 'Game folders probed by the scanner, by platform and result')
+    # Bibliotecas y carpetas de juego ya vistas, por identidad real (junctions,
+    # symlinks y rutas con otra capitalización cuentan como la misma carpeta)
+    scanned_roots = {}
+    scanned_real_roots = []
+    probed_folders = set()
+
+    def claim_root(base_dir):
+        """True si base_dir es una biblioteca nueva; False si coincide con otra o está dentro."""
+        identity = folder_identity(base_dir)
+        if identity is None:
+            return True
+        if identity in scanned_roots:
+            log_func('INFO', f"Omitiendo {base_dir}: es la misma biblioteca que {scanned_roots[identity]}")
+            return False
+        real = _real_path(base_dir)
+        for other in scanned_real_roots:
+            if real.startswith(other.rstrip(os.sep) + os.sep):
+                log_func('INFO', f"Omitiendo {base_dir}: ya incluida en otra biblioteca escaneada")
+                return False
+        scanned_roots[identity] = base_dir
+        scanned_real_roots.append(real)
+        return True
+
+    def holds_scanned_root(folder):
+        """True si folder contiene una biblioteca ya escaneada (p.ej. una carpeta
+        personalizada que incluye steamapps)."""
+        real = _real_path(folder).rstrip(os.sep) + os.sep
+        return any(other.startswith(real) for other in scanned_real_roots)
 
     def add_game_entry(path, name, status, exe_name, platform_tag):
         all_games.append((path, name, status, exe_name, platform_tag))
 
+    def probe_game(search_path, folder_name, display_name, platform_tag, cache_key=None, stamp=None,
+                   resolved=None):
+        """find_executable_path + check_mod_status de una carpeta, dentro de un span.
+
+        Con cache_key/stamp (p.ej. appid y buildid de Steam), el exe se toma del
+        ScanIndex mientras la marca no cambie, sin recorrer la carpeta. Con
+        resolved=(carpeta, exe) (p.ej. del manifiesto de Epic) no se busca.
+        Las carpetas sin exe quedan en el ScanIndex y no se recorren de nuevo
+        mientras no cambien.
+        """
+        with span('scan.game', platform=platform_tag, folder=folder_name) as game_span:
+            identity = folder_identity(search_path)
+            if identity is not None:
+                if identity in probed_folders:
+                    game_span.set(result='duplicate')
+                    games_counter.inc(platform=platform_tag, result='duplicate')
+                    return
+                probed_folders.add(identity)
+            cached = index.get_exe(cache_key, stamp, search_path) if cache_key and not resolved else None
+            if resolved:
+                final_injection_path, exe_name = resolved
+                game_span.set(manifest=True)
+            elif cached:
+                final_injection_path, exe_name = cached
+                game_span.set(cached=True)
+            elif index.is_skipped(search_path, stamp or ''):
+                log_func('INFO', f"  -> Omitiendo {folder_name}: sin .exe válido (sin cambios desde el último escaneo).")
+                game_span.set(result='skipped')
+                games_counter.inc(platform=platform_tag, result='skipped')
+                return
+            else:
+                started = time.perf_counter()
+                final_injection_path, exe_name = find_executable_path(search_path, log_func, token, index)
+                if exe_name:
+                    index.forget_skipped(search_path)
+                    if cache_key:
+                        index.put_exe(cache_key, stamp, final_injection_path, exe_name)
+                else:
+                    index.mark_skipped(search_path, stamp or '', display_name, platform_tag,
+                                       cost_ms=(time.perf_counter() - started) * 1000)
+            if not exe_name:
+                log_func('WARN', f"  -> Omitiendo {folder_name}: No se encontró .exe válido.")
+                game_span.set(result='no_exe')
+                games_counter.inc(platform=platform_tag, result='no_exe')
+                return
+            if final_injection_path in processed_paths:
+                game_span.set(result='duplicate')
+                games_counter.inc(platform=platform_tag, result='duplicate')
+                return
+            processed_paths.add(final_injection_path)
+            mod_status = check_mod_status(final_injection_path)
+            game_span.set(result='found', exe=exe_name)
+            games_counter.inc(platform=platform_tag, result='found')
+            add_game_entry(final_injection_path, display_name, mod_status, exe_name, platform_tag)
+
     # XBOX
-    if os.path.exists(XBOX_GAMES_DIR):
-        log_func('INFO', f"Escaneando Xbox: {XBOX_GAMES_DIR}")
+    xbox_dir = probe.known_folder('xbox_games')
+    if xbox_dir and os.path.exists(xbox_dir) and claim_root(xbox_dir):
+        log_func('INFO', f"Escaneando Xbox: {xbox_dir}")
         try:
-            for folder_name in os.listdir(XBOX_GAMES_DIR):
-                base_folder_path = os.path.normpath(os.path.join(XBOX_GAMES_DIR, folder_name))
-                if os.path.isdir(base_folder_path):
-                    injection_path_base = os.path.normpath(os.path.join(base_folder_path, 'Content'))
-                    if not os.path.isdir(injection_path_base):
-                        injection_path_base = base_folder_path
-                    final_injection_path, exe_name = find_executable_path(injection_path_base, log_func)
-                    if not exe_name:
-                        log_func('WARN', f"  -> Omitiendo {folder_name}: No se encontró .exe válido.")
-                        continue
-                    if final_injection_path in processed_paths: continue
-                    processed_paths.add(final_injection_path)
-                    mod_status = check_mod_status(final_injection_path)
-                    clean_name = get_game_name(folder_name)
-                    add_game_entry(final_injection_path, f"[XBOX] {clean_name}", mod_status, exe_name, "Xbox")
+            with span('scan.library', platform='Xbox', path=xbox_dir):
+                for folder_name in os.listdir(xbox_dir):
+                    check_cancelled(token)
+                    base_folder_path = os.path.normpath(os.path.join(xbox_dir, folder_name))
+                    if os.path.isdir(base_folder_path):
+                        injection_path_base = os.path.normpath(os.path.join(base_folder_path, 'Content'))
+                        if not os.path.isdir(injection_path_base):
+                            injection_path_base = base_folder_path
+                        # MicrosoftGame.config / appxmanifest.xml declaran el exe: sin recorrer Content
+                        manifest = read_xbox_manifest(injection_path_base, base_folder_path)
+                        resolved = manifest.resolve_executable() if manifest else None
+                        if resolved:
+                            log_func('INFO', f"  -> Ejecutable declarado en {os.path.basename(manifest.path)}: {resolved[1]}")
+                        probe_game(injection_path_base, folder_name, f"[XBOX] {get_game_name(folder_name)}", "Xbox",
+                                   resolved=resolved)
+        except OperationCancelled:
+            raise
         except Exception as e:
-            log_func('ERROR', f"Error al escanear {XBOX_GAMES_DIR}: {e}")
+            log_func('ERROR', f"Error al escanear {xbox_dir}: {e}")
 
     # STEAM
-    steam_dirs = get_dynamic_steam_paths(log_func)
+    steam_dirs = get_dynamic_steam_paths(log_func, probe)
     for base_dir in steam_dirs:
          base_dir = os.path.normpath(base_dir)
-         if os.path.exists(base_dir):
+         if os.path.exists(base_dir) and claim_root(base_dir):
             log_func('INFO', f"Escaneando Steam: {base_dir}")
             try:
-                for folder_name in os.listdir(base_dir):
-                    game_path = os.path.normpath(os.path.join(base_dir, folder_name))
-                    if os.path.isdir(game_path):
-                        final_injection_path, exe_name = find_executable_path(game_path, log_func)
-                        if not exe_name:
-                            log_func('WARN', f"  -> Omitiendo {folder_name}: No se encontró .exe válido.")
+                # Las apps con appmanifest_*.acf sólo se escanean si son juegos instalados;
+                # el buildid evita recorrer de nuevo un juego sin cambios
+                apps = read_app_manifests(os.path.dirname(base_dir))
+                with span('scan.library', platform='Steam', path=base_dir, manifests=len(apps)):
+                    for app in apps:
+                        check_cancelled(token)
+                        if not app.is_game:
+                            log_func('INFO', f"  -> Omitiendo {app.name}: herramienta de Steam, no es un juego.")
+                            games_counter.inc(platform='Steam', result='not_game')
+                            continue
+                        if not app.is_installed:
+                            log_func('INFO', f"  -> Omitiendo {app.name}: instalación incompleta (StateFlags={app.state_flags}).")
+                            games_counter.inc(platform='Steam', result='not_installed')
+                            continue
+                        if os.path.isdir(app.install_path):
+                            probe_game(app.install_path, app.installdir, f"[STEAM] {app.installdir}", "Steam",
+                                       cache_key=f"steam:{app.appid}", stamp=app.stamp)
+                    # Carpetas sin manifiesto (instalaciones copiadas o movidas a mano,
+                    # juegos de otras tiendas): recorrerlas como antes
+                    covered = {os.path.normcase(app.install_path) for app in apps}
+                    for folder_name in os.listdir(base_dir):
+                        check_cancelled(token)
+                        game_path = os.path.normpath(os.path.join(base_dir, folder_name))
+                        if os.path.normcase(game_path) in covered:
                             continue
-                        if final_injection_path in processed_paths: continue
-                        processed_paths.add(final_injection_path)
-                        mod_status = check_mod_status(final_injection_path)
-                        add_game_entry(final_injection_path, f"[STEAM] {folder_name}", mod_status, exe_name, "Steam")
+                        if os.path.isdir(game_path):
+                            probe_game(game_path, folder_name, f"[STEAM] {folder_name}", "Steam")
+            except OperationCancelled:
+                raise
             except Exception as e:
                 log_func('ERROR', f"Error al escanear {base_dir}: {e}")
 
     # EPIC
-    epic_dirs = get_dynamic_epic_paths(log_func)
-    for game_path in epic_dirs:
-         game_path = os.path.normpath(game_path)
-         if os.path.exists(game_path):
-             final_injection_path, exe_name = find_executable_path(game_path, log_func)
-             if not exe_name:
-                log_func('WARN', f"  -> Omitiendo {os.path.basename(game_path)}: No se encontró .exe válido.")
-                continue
-             if final_injection_path in processed_paths: continue
-             processed_paths.add(final_injection_path)
-             folder_name = os.path.basename(game_path)
-             mod_status = check_mod_status(final_injection_path)
-             add_game_entry(final_injection_path, f"[EPIC] {folder_name}", mod_status, exe_name, "Epic")
+    # Los manifiestos del launcher dan carpeta, exe y versión; el registro
+    # (get_dynamic_epic_paths) sólo se recorre si no hay manifiestos
+    epic_apps = read_epic_manifests(probe.known_folder('epic_manifests'))
+    if epic_apps:
+        with span('scan.library', platform='Epic', manifests=len(epic_apps)):
+            for app in epic_apps:
+                check_cancelled(token)
+                if not app.is_game:
+                    games_counter.inc(platform='Epic', result='not_game')
+                    continue
+                if os.path.isdir(app.install_path):
+                    folder_name = os.path.basename(app.install_path)
+                    probe_game(app.install_path, folder_name, f"[EPIC] {folder_name}", "Epic",
+                               cache_key=f"epic:{app.app_name}", stamp=app.version,
+                               resolved=app.resolve_executable())
+    else:
+        epic_dirs = get_dynamic_epic_paths(log_func, probe, index)
+        with span('scan.library', platform='Epic', games=len(epic_dirs)):
+            for game_path in epic_dirs:
+                 check_cancelled(token)
+                 game_path = os.path.normpath(game_path)
+                 if os.path.exists(game_path):
+                     folder_name = os.path.basename(game_path)
+                     probe_game(game_path, folder_name, f"[EPIC] {folder_name}", "Epic")
 
     # CUSTOM
     for base_dir in custom_folders:
         base_dir = os.path.normpath(base_dir)
-        if os.path.exists(base_dir):
+        if os.path.exists(base_dir) and claim_root(base_dir):
             log_func('INFO', f"Escaneando Carpeta Personalizada: {base_dir}")
             try:
-                for folder_name in os.listdir(base_dir):
-                    game_path = os.path.normpath(os.path.join(base_dir, folder_name))
-                    if os.path.isdir(game_path) and not folder_name.startswith('$'):
-                        final_injection_path, exe_name = find_executable_path(game_path, log_func)
-                        if not exe_name:
-                            log_func('WARN', f"  -> Omitiendo {folder_name}: No se encontró .exe válido.")
+                with span('scan.library', platform='Custom', path=base_dir):
+                    for folder_name in os.listdir(base_dir):
+                        check_cancelled(token)
+                        game_path = os.path.normpath(os.path.join(base_dir, folder_name))
+                        if os.path.isdir(game_path) and holds_scanned_root(game_path):
+                            log_func('INFO', f"  -> Omitiendo {folder_name}: contiene una biblioteca ya escaneada.")
                             continue
-                        if final_injection_path in processed_paths: continue
-                        processed_paths.add(final_injection_path)
-                        mod_status = check_mod_status(final_injection_path)
-                        add_game_entry(final_injection_path, f"[CUSTOM] {folder_name}", mod_status, exe_name, "Custom")
+                        if os.path.isdir(game_path) and not folder_name.startswith('$'):
+                            probe_game(game_path, folder_name, f"[CUSTOM] {folder_name}", "Custom")
+            except OperationCancelled:
+                raise
             except Exception as e:
                 log_func('ERROR', f"Error al escanear carpeta personalizada {base_dir}: {e}")
 
     all_games.sort(key=lambda x: x[1])
+    index.put_games([game[0] for game in all_games])
+    index.save()
     log_func('INFO', f"Escaneo completado. {len(all_games)} juegos encontrados.")
+    current_span().set(games=len(all_games))
     
     # Guardar en cache global
     with _scan_cache_lock:
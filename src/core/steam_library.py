@@ -0,0 +1,193 @@
+"""Bibliotecas de Steam a partir de sus archivos VDF/ACF.
+
+Parsea el formato KeyValues de Valve para enumerar las bibliotecas de
+libraryfolders.vdf (formato nuevo y antiguo) y leer los appmanifest de cada
+una (appid, nombre, installdir, buildid, StateFlags). Los .acf no incluyen el
+tipo de aplicación (está en appinfo.vdf, binario), así que las herramientas
+(Proton, Steam Linux Runtime, redistribuibles, SDKs, servidores dedicados) se
+reconocen por appid conocido y por nombre.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# appid -> herramienta de Steam que no es un juego
+NON_GAME_APPIDS = {
+    '228980',   # Steamworks Common Redistributables
+    '250820',   # SteamVR
+    '1070560',  # Steam Linux Runtime 1.0 (scout)
+    '1391110',  # Steam Linux Runtime 2.0 (soldier)
+    '1628350',  # Steam Linux Runtime 3.0 (sniper)
+    '1493710',  # Proton Experimental
+    '1580130',  # Proton 6.3
+    '1887720',  # Proton 7.0
+    '2348590',  # Proton 8.0
+}
+NON_GAME_NAME_RE = re.compile(
+    r'^(proton\b|steam linux runtime|steamworks\b|steamvr\b)|dedicated server|\bsdk\b|redistributables?\b',
+    re.IGNORECASE
+)
+
+# Bit de StateFlags que marca una app instalada por completo (sigue activo
+# mientras se actualiza); sin él la descarga está a medias o en cola
+STATE_FULLY_INSTALLED = 4
+
+_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|(//[^\n]*)|([^\s"{}]+)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', '\\': '\\', '"': '"'}
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(0)), text)
+
+
+def parse_vdf(text: str) -> Dict[str, Any]:
+    """Parsea texto KeyValues de Valve a diccionarios anidados.
+
+    Las claves se devuelven en minúsculas (Steam no es consistente: "AppState",
+    "appid", "LibraryFolders"...). Se ignoran los comentarios // y las
+    condiciones [$WIN32].
+
+    Raises:
+        ValueError: Si las llaves no están equilibradas
+    """
+    root: Dict[str, Any] = {}
+    stack = [root]
+    key = None
+    for match in _TOKEN_RE.finditer(text):
+        quoted, brace, comment, bare = match.groups()
+        if comment is not None or (bare and bare.startswith('[') and bare.endswith(']')):
+            continue
+        if brace == '{':
+            if key is None:
+                raise ValueError("VDF: bloque sin clave")
+            child: Dict[str, Any] = {}
+            stack[-1][key] = child
+            stack.append(child)
+            key = None
+        elif brace == '}':
+            if len(stack) == 1:
+                raise ValueError("VDF: llave de cierre sin abrir")
+            stack.pop()
+            key = None
+        else:
+            token = _unescape(quoted) if quoted is not None else bare
+            if key is None:
+                key = token.lower()
+            else:
+                stack[-1][key] = token
+                key = None
+    if len(stack) != 1:
+        raise ValueError("VDF: bloque sin cerrar")
+    return root
+
+
+def load_vdf(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_vdf(f.read())
+
+
+@dataclass
+class SteamApp:
+    appid: str
+    name: str
+    installdir: str
+    steamapps_dir: str       # <biblioteca>/steamapps
+    buildid: str = ''
+    last_updated: str = ''
+    state_flags: int = 0
+
+    @property
+    def install_path(self) -> str:
+        return os.path.normpath(os.path.join(self.steamapps_dir, 'common', self.installdir))
+
+    @property
+    def is_installed(self) -> bool:
+        return bool(self.state_flags & STATE_FULLY_INSTALLED)
+
+    @property
+    def is_game(self) -> bool:
+        if self.appid in NON_GAME_APPIDS:
+            return False
+        return not (NON_GAME_NAME_RE.search(self.name) or NON_GAME_NAME_RE.search(self.installdir))
+
+    @property
+    def stamp(self) -> str:
+        """Marca de versión de la instalación: el buildid (o la fecha de actualización si no hay)."""
+        if self.buildid and self.buildid != '0':
+            return self.buildid
+        return f"t{self.last_updated}"
+
+
+def library_folders(steam_path: str) -> List[str]:
+    """Carpetas steamapps de todas las bibliotecas (la principal primero)."""
+    main = os.path.normpath(os.path.join(steam_path, 'steamapps'))
+    folders = [main]
+    seen = {os.path.normcase(main)}
+    vdf_path = os.path.join(main, 'libraryfolders.vdf')
+    if not os.path.isfile(vdf_path):
+        return folders
+    try:
+        data = load_vdf(vdf_path)
+    except (OSError, ValueError):
+        # libraryfolders.vdf ilegible o a medio escribir: al menos la biblioteca principal
+        return folders
+    entries = data.get('libraryfolders') or {}
+    for key, value in entries.items():
+        if isinstance(value, dict):
+            lib_path = value.get('path')          # formato actual: "0" { "path" "..." }
+        elif key.isdigit():
+            lib_path = value                      # formato antiguo: "1" "D:\\SteamLibrary"
+        else:
+            lib_path = None
+        if not lib_path:
+            continue
+        steamapps = os.path.normpath(os.path.join(lib_path, 'steamapps'))
+        if os.path.normcase(steamapps) not in seen:
+            seen.add(os.path.normcase(steamapps))
+            folders.append(steamapps)
+    return folders
+
+
+def read_app_manifests(steamapps_dir: str) -> List[SteamApp]:
+    """Apps instaladas en una biblioteca según sus appmanifest_*.acf ([] si no hay)."""
+    apps = []
+    try:
+        names = os.listdir(steamapps_dir)
+    except OSError:
+        return apps
+    for name in names:
+        lower = name.lower()
+        if not (lower.startswith('appmanifest_') and lower.endswith('.acf')):
+            continue
+        try:
+            state = load_vdf(os.path.join(steamapps_dir, name)).get('appstate') or {}
+        except (OSError, ValueError):
+            continue
+        if not isinstance(state, dict) or not state.get('installdir'):
+            continue
+        try:
+            # Un manifiesto sin StateFlags se da por instalado
+            flags = int(state.get('stateflags', STATE_FULLY_INSTALLED))
+        except ValueError:
+            flags = 0
+        apps.append(SteamApp(
+            appid=str(state.get('appid', name[12:-4])),
+            name=str(state.get('name', state['installdir'])),
+            installdir=str(state['installdir']),
+            steamapps_dir=os.path.normpath(steamapps_dir),
+            buildid=str(state.get('buildid', '')),
+            last_updated=str(state.get('lastupdated', '')),
+            state_flags=flags,
+        ))
+    apps.sort(key=lambda a: a.installdir.lower())
+    return apps
+
+
+__all__ = [
+    'SteamApp', 'STATE_FULLY_INSTALLED', 'parse_vdf', 'load_vdf', 'library_folders', 'read_app_manifests',
+    'NON_GAME_APPIDS'
+]
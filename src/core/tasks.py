@@ -0,0 +1,380 @@
+"""Runtime de tareas en segundo plano y cola única de despacho a la UI.
+
+Las tareas se ejecutan en un pool acotado de hilos, con prioridad para las
+interactivas (instalar, escanear) sobre las de fondo, cancelación
+cooperativa (CancellationToken, check_cancelled) y progreso por tarea
+(TaskProgress). Los callbacks hacia la UI pasan por una sola queue.Queue que
+un único after() vacía por lotes, fusionando las actualizaciones repetidas.
+El módulo no depende de Tk: la UI sólo aporta su función `after`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import queue
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.error_handling import OperationCancelled
+from ..utils.metrics import COUNT_BUCKETS, THROUGHPUT_BUCKETS, get_metrics
+from ..utils.tracing import span
+
+DEFAULT_MAX_WORKERS = 4
+UI_PUMP_INTERVAL_MS = 30
+UI_PUMP_BATCH = 200
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+class CancellationToken:
+    """Señal de cancelación cooperativa compartida entre la UI y una tarea."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled("Operación cancelada")
+
+    def wait(self, timeout: float) -> bool:
+        """Espera hasta timeout segundos; True si se canceló (sustituye a time.sleep)."""
+        return self._event.wait(timeout)
+
+
+class TaskProgress:
+    """Progreso de una tarea (done/total/mensaje), seguro entre hilos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.done = 0
+        self.total = 0
+        self.message = ''
+
+    def update(self, done: Optional[int] = None, total: Optional[int] = None,
+               message: Optional[str] = None) -> None:
+        with self._lock:
+            if done is not None:
+                self.done = done
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+
+    def snapshot(self) -> Tuple[int, int, str]:
+        with self._lock:
+            return self.done, self.total, self.message
+
+    @property
+    def fraction(self) -> float:
+        done, total, _ = self.snapshot()
+        return min(done / total, 1.0) if total else 0.0
+
+
+class TaskHandle:
+    """Referencia a una tarea enviada: cancelación, progreso y resultado."""
+
+    def __init__(self, name: str, priority: Priority) -> None:
+        self.name = name
+        self.priority = priority
+        self.token = CancellationToken()
+        self.progress = TaskProgress()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+
+    def cancel(self) -> None:
+        self.token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+_current = threading.local()
+
+
+def current_task() -> Optional[TaskHandle]:
+    """Tarea que se está ejecutando en este hilo (None fuera del pool)."""
+    return getattr(_current, 'task', None)
+
+
+def current_token() -> Optional[CancellationToken]:
+    task = current_task()
+    return task.token if task else None
+
+
+def check_cancelled(token: Optional[CancellationToken] = None) -> None:
+    """Lanza OperationCancelled si token (o la tarea actual) se canceló."""
+    token = token or current_token()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def write_chunks(chunks: Iterable[bytes], dest: str | os.PathLike,
+                 on_chunk: Optional[Callable[[int], None]] = None,
+                 token: Optional[CancellationToken] = None) -> int:
+    """Escribe un flujo de chunks en dest comprobando la cancelación en cada uno.
+
+    Se escribe en `dest.part` y se renombra al terminar; si se cancela o falla,
+    el parcial se borra y dest no se toca.
+
+    Args:
+        on_chunk: Recibe el total de bytes escritos tras cada chunk
+
+    Returns:
+        int: Bytes escritos
+    """
+    token = token or current_token()
+    part = f"{os.fspath(dest)}.part"
+    written = 0
+    result = 'ok'
+    with span('download', file=os.path.basename(os.fspath(dest))) as download_span:
+        started = time.perf_counter()
+        try:
+            with open(part, 'wb') as f:
+                for chunk in chunks:
+                    check_cancelled(token)
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    written += len(chunk)
+                    if on_chunk:
+                        on_chunk(written)
+            os.replace(part, dest)
+        except BaseException as e:
+            result = 'cancelled' if isinstance(e, OperationCancelled) else 'error'
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            download_span.set(bytes=written, bytes_per_s=round(written / elapsed) if elapsed > 0 else None)
+            metrics = get_metrics()
+            metrics.counter('download_bytes_total', 'Bytes downloaded').inc(written)
+            metrics.counter('downloads_total', 'Downloads, by result').inc(result=result)
+            metrics.histogram('download_seconds', 'Download duration').observe(elapsed)
+            if result == 'ok' and elapsed > 0:
+                metrics.histogram('download_throughput_bytes_per_second', 'Download throughput',
+                                  buckets=THROUGHPUT_BUCKETS).observe(written / elapsed)
+    return written
+
+
+class TaskRunner:
+    """Pool acotado de hilos con cola de prioridad."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 log_func: Optional[Callable[[str, str], None]] = None) -> None:
+        self.max_workers = max(1, max_workers)
+        self.log = log_func or (lambda level, msg: None)
+        self._queue: "queue.PriorityQueue[Tuple[int, int, Any]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._active: Dict[int, TaskHandle] = {}
+        self._idle = 0
+        self._pending = 0      # encoladas y aún sin worker
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], *args, name: Optional[str] = None,
+               priority: Priority = Priority.INTERACTIVE, **kwargs) -> TaskHandle:
+        """Encola fn(*args, **kwargs); dentro de fn, current_task() devuelve el handle."""
+        handle = TaskHandle(name or getattr(fn, '__name__', 'task'), priority)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("TaskRunner detenido")
+            self._queue.put((int(priority), next(self._seq), (handle, fn, args, kwargs)))
+            self._pending += 1
+            # Un worker por tarea sin reclamar: una ráfaga se reparte hasta max_workers
+            if self._pending > self._idle and len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"task-worker-{len(self._workers) + 1}")
+                self._workers.append(worker)
+                worker.start()
+        return handle
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            _, _, item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+                if item is not None:
+                    self._pending -= 1
+            if item is None:
+                return
+            handle, fn, args, kwargs = item
+            if handle.cancelled:
+                handle._done.set()
+                continue
+            _current.task = handle
+            with self._lock:
+                self._active[id(handle)] = handle
+            try:
+                handle.result = fn(*args, **kwargs)
+            except OperationCancelled as e:
+                handle.error = e
+                self.log('WARN', f"Tarea cancelada: {handle.name}")
+            except Exception as e:
+                handle.error = e
+                self.log('ERROR', f"Error en tarea {handle.name}: {e}")
+            finally:
+                _current.task = None
+                with self._lock:
+                    self._active.pop(id(handle), None)
+                handle._done.set()
+
+    def active_tasks(self) -> List[TaskHandle]:
+        with self._lock:
+            return list(self._active.values())
+
+    def cancel_all(self) -> None:
+        """Cancela las tareas en curso (las pendientes se descartan al salir de la cola)."""
+        for handle in self.active_tasks():
+            handle.cancel()
+        pending = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for entry in pending:
+            if entry[2] is not None:
+                entry[2][0].cancel()
+            self._queue.put(entry)
+
+    def shutdown(self, cancel: bool = True, timeout: Optional[float] = None) -> None:
+        """Detiene el pool; timeout es el tiempo total de espera, no por hilo."""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        if cancel:
+            self.cancel_all()
+        for _ in workers:
+            # Centinelas al final: primero se vacía lo pendiente
+            self._queue.put((Priority.BACKGROUND + 1, next(self._seq), None))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+
+class UIDispatcher:
+    """Cola única hilo -> UI drenada por lotes desde el bucle de eventos."""
+
+    def __init__(self, log_func: Optional[Callable[[str, str], None]] = None) -> None:
+        self.log = log_func or (lambda level, msg: None)
+        self._queue: "queue.Queue[Tuple[Optional[str], Callable, tuple]]" = queue.Queue()
+        self._latest: Dict[str, Tuple[Callable, tuple]] = {}
+        self._latest_lock = threading.Lock()
+        self._after: Optional[Callable] = None
+        self.interval_ms = UI_PUMP_INTERVAL_MS
+
+    def post(self, callback: Callable, *args, key: Optional[str] = None) -> None:
+        """Programa callback(*args) en el hilo de la UI.
+
+        Con `key`, sólo se ejecuta la última publicación pendiente con esa clave
+        (útil para progreso: muchas actualizaciones -> un único redibujado).
+        """
+        if key is not None:
+            with self._latest_lock:
+                pending = key in self._latest
+                self._latest[key] = (callback, args)
+            if pending:
+                return
+        self._queue.put((key, callback, args))
+
+    def drain(self, max_items: int = UI_PUMP_BATCH) -> int:
+        """Ejecuta hasta max_items callbacks pendientes (llamar desde el hilo de la UI)."""
+        depth = self._queue.qsize()
+        if depth:
+            metrics = get_metrics()
+            metrics.gauge('ui_queue_depth', 'Callbacks waiting in the UI queue at the last drain').set(depth)
+            metrics.histogram('ui_queue_depth_observed', 'UI queue depth seen by each non-empty drain',
+                              buckets=COUNT_BUCKETS).observe(depth)
+        executed = 0
+        while executed < max_items:
+            try:
+                key, callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is not None:
+                with self._latest_lock:
+                    callback, args = self._latest.pop(key, (callback, args))
+            try:
+                callback(*args)
+            except Exception as e:
+                self.log('ERROR', f"Error en callback de UI: {e}")
+            executed += 1
+        return executed
+
+    def start_pump(self, after_func: Callable, interval_ms: Optional[int] = None) -> None:
+        """Arranca el bombeo periódico con la función after() de Tk."""
+        self._after = after_func
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        self._pump()
+
+    def stop_pump(self) -> None:
+        self._after = None
+
+    def _pump(self) -> None:
+        if self._after is None:
+            return
+        self.drain()
+        try:
+            self._after(self.interval_ms, self._pump)
+        except Exception:
+            # La ventana se destruyó
+            self._after = None
+
+
+_runner: Optional[TaskRunner] = None
+_dispatcher: Optional[UIDispatcher] = None
+_singleton_lock = threading.Lock()
+
+
+def get_task_runner(log_func: Optional[Callable[[str, str], None]] = None) -> TaskRunner:
+    """Pool compartido de la aplicación."""
+    global _runner
+    with _singleton_lock:
+        if _runner is None:
+            _runner = TaskRunner(log_func=log_func)
+        return _runner
+
+
+def get_ui_dispatcher(log_func: Optional[Callable[[str, str], None]] = None) -> UIDispatcher:
+    """Cola de despacho a la UI compartida de la aplicación."""
+    global _dispatcher
+    with _singleton_lock:
+        if _dispatcher is None:
+            _dispatcher = UIDispatcher(log_func=log_func)
+        return _dispatcher
+
+
+__all__ = [
+    'Priority', 'CancellationToken', 'TaskProgress', 'TaskHandle', 'TaskRunner',
+    'UIDispatcher', 'current_task', 'current_token', 'check_cancelled', 'write_chunks',
+    'get_task_runner', 'get_ui_dispatcher', 'OperationCancelled'
+]
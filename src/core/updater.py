@@ -11,7 +11,7 @@ Provides functionality to:
 Design goals:
  - Non-blocking: heavy operations run in threads from GUI wrapper
  - Safe write: download to temp file, verify basic integrity, then swap
- - Extensible: can support hash verification or delta updates later
+ - Delta updates: only files that differ between versions are deployed to games
  - Minimal dependencies: only 'requests' (already in requirements)
 """
 
@@ -22,16 +22,35 @@ import os
 import shutil
 import zipfile
 import subprocess
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Tuple
 
 import requests
 
+from ..config.constants import MOD_FILE_EXTENSIONS, TARGET_MOD_DIRS, TARGET_MOD_FILES
+from ..config.settings import SPOOFING_DLL_NAMES
+from ..utils.error_handling import OperationCancelled
+from ..utils.metrics import get_metrics, timed
+from .archive_cache import ArchiveCache, file_digest
+from .mod_detector import check_installation_complete, is_optiscaler_installed
+from .tasks import check_cancelled, current_token, write_chunks
+from .version_catalog import get_version_catalog
+
 # Public callback type: (stage: str, percent: float) -> None
 ProgressCallback = Callable[[str, float], None]
 
+# Juegos actualizados en paralelo (copias a disco, limitado para no saturar HDDs)
+UPDATE_MAX_WORKERS = 4
+# Lecturas de version.json en paralelo al clasificar (sólo metadatos)
+CLASSIFY_MAX_WORKERS = 16
+# Nombres posibles de OptiScaler.dll en un juego (original o spoof)
+SPOOF_DLL_CANDIDATES = ['OptiScaler.dll'] + [n for n in SPOOFING_DLL_NAMES if n != 'OptiScaler.dll']
+# Archivos que marcan la raíz del mod dentro de una versión (como check_mod_source_files)
+MOD_ROOT_MARKERS = ('OptiScaler.dll', 'dlssg_to_fsr3_amd_is_better.dll')
+
 
 @dataclass
 class ReleaseInfo:
@@ -41,6 +60,102 @@ class ReleaseInfo:
     html_url: str
     download_url: str
     tag_name: str
+    # Metadatos del asset para la caché de archivos (opcionales)
+    asset: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class GameUpdateReport:
+    """Resultado de actualizar un juego."""
+    game_dir: str
+    ok: bool = False
+    from_version: Optional[str] = None
+    to_version: Optional[str] = None
+    files_written: int = 0
+    bytes_written: int = 0
+    files_unchanged: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class UpdatePlan:
+    """Clasificación de juegos previa a una actualización (dry-run)."""
+    target_version: Optional[str]
+    source_folder: str
+    up_to_date: List[str] = field(default_factory=list)
+    outdated: List[str] = field(default_factory=list)
+    incomplete: List[str] = field(default_factory=list)
+    not_installed: List[str] = field(default_factory=list)
+    estimated_bytes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def to_update(self) -> List[str]:
+        return self.outdated + self.incomplete
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.estimated_bytes.values())
+
+
+def estimate_update_bytes(new_files: Dict[str, Dict[str, Any]],
+                          old_files: Optional[Dict[str, Dict[str, Any]]]) -> int:
+    """Bytes a escribir según el diff de manifiestos (todo si la versión previa es desconocida)."""
+    total = 0
+    old_deployed = deployable_files(old_files) if old_files else {}
+    for rel, (_, info) in deployable_files(new_files).items():
+        if rel == 'OptiScaler.ini':
+            continue
+        old = old_deployed[rel][1] if rel in old_deployed else None
+        if old is None or old.get('sha256') != info.get('sha256'):
+            total += info.get('size', 0)
+    return total
+
+
+def is_deployable_file(rel: str) -> bool:
+    """Mismo criterio que inject_fsr_mod: archivos sueltos del mod + TARGET_MOD_DIRS."""
+    parts = rel.split('/')
+    if len(parts) > 1:
+        return parts[0] in TARGET_MOD_DIRS
+    return rel.lower().endswith(MOD_FILE_EXTENSIONS) or rel in TARGET_MOD_FILES
+
+
+def mod_root_prefix(files: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Subcarpeta del manifiesto con los archivos clave del mod ('' si es la raíz).
+
+    Los archivos con una carpeta intermedia (OptiScaler_x/OptiScaler.dll) se
+    despliegan desde ahí, igual que hace check_mod_source_files al instalar.
+    None si el manifiesto no contiene el mod.
+    """
+    roots = [rel.rpartition('/')[0] for rel in files if rel.rpartition('/')[2] in MOD_ROOT_MARKERS]
+    if not roots:
+        return None
+    return min(roots, key=lambda root: (root.count('/') if root else -1, root))
+
+
+def deployable_files(files: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """{ruta en el juego: (ruta en el manifiesto, info)} de los archivos que se despliegan."""
+    prefix = mod_root_prefix(files)
+    if prefix is None:
+        return {}
+    deployed = {}
+    for rel, info in files.items():
+        if prefix:
+            if not rel.startswith(prefix + '/'):
+                continue
+            game_rel = rel[len(prefix) + 1:]
+        else:
+            game_rel = rel
+        if is_deployable_file(game_rel):
+            deployed[game_rel] = (rel, info)
+    return deployed
+
+
+def read_game_version_json(game_dir: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads((game_dir / 'version.json').read_text(encoding='utf-8'))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
 
 
 class OptiScalerUpdater:
@@ -96,11 +211,13 @@ class OptiScalerUpdater:
             tag_name = latest.get('tag_name', '').lstrip('v')
             assets = latest.get('assets', [])
             zip_asset_url = ''
+            zip_asset: Dict[str, Any] = {}
             for asset in assets:
                 name = asset.get('name', '')
                 # OptiScaler usa archivos .7z, no .zip
                 if name.lower().endswith(('.zip', '.7z')):
                     zip_asset_url = asset.get('browser_download_url', '')
+                    zip_asset = {k: asset.get(k) for k in ('id', 'name', 'size', 'digest')}
                     break
             if not zip_asset_url:
                 self.log('WARN', 'No se encontró asset ZIP/7z en la release más reciente.')
@@ -110,7 +227,8 @@ class OptiScalerUpdater:
                 body=latest.get('body', ''),
                 html_url=latest.get('html_url', ''),
                 download_url=zip_asset_url,
-                tag_name=latest.get('tag_name','')
+                tag_name=latest.get('tag_name',''),
+                asset=zip_asset
             )
         except Exception as e:
             self.log('ERROR', f"Error consultando releases GitHub: {e}")
@@ -143,26 +261,28 @@ class OptiScalerUpdater:
             with requests.get(release.download_url, stream=True, timeout=30) as r:
                 r.raise_for_status()
                 total = int(r.headers.get('content-length', '0'))
-                downloaded = 0
-                chunk_size = 8192
-                with open(dest_zip, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=chunk_size):
-                        if not chunk:
-                            continue
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total and progress:
-                            pct = 0.02 + 0.38 * (downloaded / total)
-                            progress('Descargando release...', min(pct, 0.40))
+
+                def on_chunk(downloaded: int) -> None:
+                    if total and progress:
+                        pct = 0.02 + 0.38 * (downloaded / total)
+                        progress('Descargando release...', min(pct, 0.40))
+
+                write_chunks(r.iter_content(chunk_size=8192), dest_zip, on_chunk)
             if progress:
                 progress('Descarga completada', 0.40)
             return True
+        except OperationCancelled:
+            self.log('WARN', 'Descarga de la release cancelada.')
+            self.last_error_code = 'cancelled'
+            self.last_error_message = 'Descarga cancelada'
+            return False
         except Exception as e:
             self.log('ERROR', f"Fallo al descargar release: {e}")
             self.last_error_code = 'download_failed'
             self.last_error_message = str(e)
             return False
 
+    @timed('extract_seconds', 'Archive extraction time', source='updater')
     def extract_release(self, zip_path: Path, release: ReleaseInfo, progress: ProgressCallback | None = None) -> Optional[Path]:
         """Extrae el archivo (ZIP o 7z) a una carpeta nueva OptiScaler_<version>."""
         try:
@@ -256,17 +376,32 @@ class OptiScalerUpdater:
         file_ext = '.7z' if release.download_url.endswith('.7z') else '.zip'
         tmp_archive = self.optiscaler_base_dir / f"_download_{release.version}{file_ext}"
         
-        if progress:
-            progress('Iniciando descarga...', 0.0)
-        if not self.download_release_zip(release, tmp_archive, progress):
-            return (False, self.last_error_code or 'download_failed')
-        extracted = self.extract_release(tmp_archive, release, progress)
-        try:
-            tmp_archive.unlink(missing_ok=True)
-        except Exception:
-            pass
+        archive_cache = ArchiveCache(log_func=self.log)
+        cached_archive = archive_cache.lookup(release.asset) if release.asset else None
+        if cached_archive:
+            if progress:
+                progress('Usando archivo en caché...', 0.5)
+            extracted = self.extract_release(cached_archive, release, progress)
+        else:
+            if progress:
+                progress('Iniciando descarga...', 0.0)
+            if not self.download_release_zip(release, tmp_archive, progress):
+                return (False, self.last_error_code or 'download_failed')
+            extracted = self.extract_release(tmp_archive, release, progress)
+            # Conservar el archivo en caché para reinstalaciones; si no, borrarlo
+            if not (extracted and release.asset and archive_cache.store(release.asset, tmp_archive)):
+                try:
+                    tmp_archive.unlink(missing_ok=True)
+                except Exception:
+                    pass
         if not extracted:
             return (False, self.last_error_code or 'extract_failed')
+        try:
+            get_version_catalog(self.optiscaler_base_dir).register(
+                extracted, version=release.version, tag=release.tag_name
+            )
+        except Exception as e:
+            self.log('WARN', f"No se pudo actualizar el catálogo de versiones: {e}")
         # Guardar metadata
         if not self.write_version_metadata(release, extracted):
             return (False, self.last_error_code or 'metadata_write_failed')
@@ -282,52 +417,206 @@ class OptiScalerUpdater:
         """Filtra rutas existentes (sanity)."""
         return [p for p in game_paths if p.exists() and p.is_dir()]
 
+    def classify_game(self, game_dir: Path, source_entry: Dict[str, Any]) -> tuple[str, int]:
+        """Clasifica un juego: ('up_to_date'|'outdated'|'incomplete'|'not_installed', bytes estimados)."""
+        meta = read_game_version_json(game_dir)
+        if not meta and not is_optiscaler_installed(game_dir):
+            return ('not_installed', 0)
+        catalog = get_version_catalog(self.optiscaler_base_dir)
+        old_entry = catalog.find_for_game(meta)
+        new_files = source_entry.get('files', {})
+        if not check_installation_complete(game_dir):
+            return ('incomplete', estimate_update_bytes(new_files, None))
+        if old_entry and old_entry['folder'] == source_entry['folder']:
+            return ('up_to_date', 0)
+        if not old_entry and meta.get('version') and meta.get('version') == source_entry.get('version'):
+            return ('up_to_date', 0)
+        return ('outdated', estimate_update_bytes(new_files, old_entry.get('files') if old_entry else None))
+
+    def plan_updates(self, game_dirs: List[Path], max_workers: int = CLASSIFY_MAX_WORKERS) -> Optional[UpdatePlan]:
+        """Dry-run: clasifica los juegos en paralelo leyendo sólo su version.json y archivos clave."""
+        source_entry = self._latest_source_entry()
+        if not source_entry:
+            return None
+        plan = UpdatePlan(target_version=source_entry.get('version'), source_folder=source_entry['folder'])
+        if not game_dirs:
+            return plan
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(game_dirs)))) as executor:
+            classified = list(executor.map(lambda g: self.classify_game(g, source_entry), game_dirs))
+        for game_dir, (state, estimate) in zip(game_dirs, classified):
+            getattr(plan, state).append(str(game_dir))
+            if state in ('outdated', 'incomplete'):
+                plan.estimated_bytes[str(game_dir)] = estimate
+        return plan
+
     def find_source_dll_folder(self) -> Optional[Path]:
         """Returns the newest extracted OptiScaler_* folder as source of DLLs."""
-        folders = [d for d in self.optiscaler_base_dir.glob('OptiScaler_*') if d.is_dir()]
-        if not folders:
+        # Newest by semver key from the local version catalog
+        latest = get_version_catalog(self.optiscaler_base_dir).latest_path()
+        if latest is None or not latest.is_dir():
             return None
-        # Sort by modification time descending
-        folders.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-        return folders[0]
+        return latest
 
-    def update_game(self, game_dir: Path, progress: ProgressCallback | None = None) -> bool:
-        """Copies core OptiScaler files to a single game directory."""
+    def _resolve_spoof_dll(self, game_dir: Path, meta: Dict[str, Any],
+                           old_entry: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Nombre con el que OptiScaler.dll está desplegado en el juego."""
+        if meta.get('spoof_dll'):
+            return meta['spoof_dll']
+        present = [n for n in SPOOF_DLL_CANDIDATES if (game_dir / n).is_file()]
+        # Instalaciones antiguas: la DLL con el mismo tamaño que OptiScaler.dll de su
+        # versión (o de cualquier versión descargada si no se sabe cuál era). Sin
+        # coincidencia no se adivina: dxgi.dll/winmm.dll pueden ser de ReShade o del juego.
+        entries = [old_entry] if old_entry else get_version_catalog(self.optiscaler_base_dir).entries()
+        sizes = set()
+        for entry in entries:
+            dll = deployable_files(entry.get('files', {})).get('OptiScaler.dll')
+            if dll:
+                sizes.add(dll[1].get('size'))
+        for name in present:
+            if (game_dir / name).stat().st_size in sizes:
+                return name
+        return None
+
+    @timed('update_game_seconds', 'Time to update OptiScaler in one game')
+    def deploy_to_game(self, game_dir: Path, source_entry: Dict[str, Any],
+                       progress: ProgressCallback | None = None) -> GameUpdateReport:
+        """Despliega en un juego sólo los archivos que cambian entre su versión y source_entry."""
+        catalog = get_version_catalog(self.optiscaler_base_dir)
+        source = self.optiscaler_base_dir / source_entry['folder']
+        meta = read_game_version_json(game_dir)
+        old_entry = catalog.find_for_game(meta)
+        report = GameUpdateReport(
+            game_dir=str(game_dir),
+            from_version=meta.get('version'),
+            to_version=source_entry.get('version')
+        )
+        spoof = self._resolve_spoof_dll(game_dir, meta, old_entry)
+        if not spoof:
+            report.errors.append('No se encontró la DLL de OptiScaler en el juego')
+            return report
+
+        new_files = deployable_files(source_entry.get('files', {}))
+        old_files = {rel: info for rel, (_, info) in
+                     deployable_files(old_entry.get('files', {}) if old_entry else {}).items()}
+        metrics = get_metrics()
+        bytes_counter = metrics.counter('install_bytes_total', 'Bytes deployed to game folders, by operation and mode')
+        for rel, (source_rel, info) in sorted(new_files.items()):
+            dest = game_dir / (spoof if rel == 'OptiScaler.dll' else rel)
+            exists = dest.is_file()
+            if rel == 'OptiScaler.ini' and exists:
+                # Conservar la configuración del usuario
+                report.files_unchanged += 1
+                continue
+            if exists and self._is_unchanged(dest, info, old_files.get(rel)):
+                report.files_unchanged += 1
+                bytes_counter.inc(info.get('size', 0), op='update', mode='skipped')
+                continue
+            try:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dest.with_name(dest.name + '.optiscaler_tmp')
+                shutil.copy2(source / source_rel, tmp)
+                os.replace(tmp, dest)
+                report.files_written += 1
+                report.bytes_written += info.get('size', 0)
+                bytes_counter.inc(info.get('size', 0), op='update', mode='copied')
+            except Exception as e:
+                report.errors.append(f"{rel}: {e}")
+                self.log('WARN', f"Fallo copiando {rel} a {game_dir}: {e}")
+        if report.files_written + report.files_unchanged == 0:
+            report.errors.append(f"La versión {source_entry['folder']} no contiene archivos del mod")
+        report.ok = not report.errors
+        metrics.counter('update_games_total', 'Games processed by the updater, by result').inc(
+            result='ok' if report.ok else 'error')
+
+        if report.ok:
+            meta.update({
+                'version': source_entry.get('version'),
+                'tag': source_entry.get('tag') or f"v{source_entry.get('version')}",
+                'source_folder': source_entry['folder'],
+                'spoof_dll': spoof,
+                'updated_at': datetime.now().isoformat(timespec='seconds')
+            })
+            meta.setdefault('source', 'OptiScaler')
+            try:
+                (game_dir / 'version.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+            except Exception as e:
+                self.log('WARN', f"No se pudo escribir version.json en {game_dir}: {e}")
+        if progress:
+            mb = report.bytes_written / (1024 * 1024)
+            progress(f"{game_dir.name}: {report.files_written} archivos ({mb:.1f} MB)", 0.97)
+        return report
+
+    @staticmethod
+    def _is_unchanged(dest: Path, new_info: Dict[str, Any], old_info: Optional[Dict[str, Any]]) -> bool:
+        """True si el archivo del juego ya es el de la nueva versión."""
+        if old_info is not None:
+            # Diff de manifiestos: sin leer el archivo del juego
+            return old_info.get('sha256') == new_info.get('sha256')
+        # Versión anterior desconocida: comparar con el archivo desplegado
+        try:
+            if dest.stat().st_size != new_info.get('size'):
+                return False
+            return file_digest(dest) == new_info.get('sha256')
+        except OSError:
+            return False
+
+    def _latest_source_entry(self) -> Optional[Dict[str, Any]]:
         source = self.find_source_dll_folder()
         if not source:
+            return None
+        return get_version_catalog(self.optiscaler_base_dir).find(source.name)
+
+    def update_game(self, game_dir: Path, progress: ProgressCallback | None = None) -> bool:
+        """Updates OptiScaler files in a single game directory (manifest diff)."""
+        source_entry = self._latest_source_entry()
+        if not source_entry:
             self.log('ERROR', 'No se encontró carpeta fuente de OptiScaler para actualizar juegos.')
             return False
-        files_to_copy = [
-            'OptiScaler.dll', 'OptiScaler.ini',
-            'amd_fidelityfx_dx12.dll', 'amd_fidelityfx_upscaler_dx12.dll',
-            'amd_fidelityfx_framegeneration_dx12.dll', 'amd_fidelityfx_vk.dll',
-            'libxess.dll', 'libxess_dx11.dll'
-        ]
-        copied = 0
-        for fname in files_to_copy:
-            src = source / fname
-            if not src.exists():
-                continue
-            dest = game_dir / fname
-            try:
-                shutil.copy2(src, dest)
-            except Exception as e:
-                self.log('WARN', f"Fallo copiando {fname} a {game_dir}: {e}")
-            copied += 1
-            if progress:
-                progress(f"Actualizando {game_dir.name}: {fname}", 0.72 + 0.25 * (copied / len(files_to_copy)))
-        return True
-
-    def update_multiple_games(self, game_dirs: List[Path], progress: ProgressCallback | None = None) -> Dict[str, Any]:
-        """Actualiza múltiples juegos devolviendo resultados por juego."""
-        results = {}
-        total = len(game_dirs) or 1
-        for idx, g in enumerate(game_dirs, start=1):
-            ok = self.update_game(g, progress)
-            results[g.name] = ok
+        return self.deploy_to_game(game_dir, source_entry, progress).ok
+
+    def update_multiple_games(self, game_dirs: List[Path], progress: ProgressCallback | None = None,
+                              max_workers: int = UPDATE_MAX_WORKERS,
+                              plan: Optional[UpdatePlan] = None) -> Dict[str, Any]:
+        """Actualiza en paralelo sólo los juegos desactualizados/incompletos; informe por juego."""
+        results: Dict[str, Any] = {}
+        source_entry = self._latest_source_entry()
+        if not source_entry:
+            self.log('ERROR', 'No se encontró carpeta fuente de OptiScaler para actualizar juegos.')
+            return results
+        plan = plan or self.plan_updates(game_dirs)
+        pending = set(plan.to_update)
+        game_dirs = [g for g in game_dirs if str(g) in pending]
+        if not game_dirs:
+            self.log('INFO', f"Todos los juegos ya tienen OptiScaler {plan.target_version}")
             if progress:
-                pct = 0.97 * (idx / total)
-                progress(f"Juego {idx}/{total} actualizado", pct)
+                progress('Actualización completada', 1.0)
+            return results
+        total = len(game_dirs)
+        done = 0
+        # Los hilos del executor no heredan la tarea actual: capturar su token aquí
+        token = current_token()
+
+        def deploy(game_dir: Path) -> GameUpdateReport:
+            # Cancelar entre juegos: un juego empezado se termina (cada copia es atómica)
+            check_cancelled(token)
+            return self.deploy_to_game(game_dir, source_entry)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+            futures = {executor.submit(deploy, g): g for g in game_dirs}
+            for future in as_completed(futures):
+                g = futures[future]
+                try:
+                    report = future.result()
+                except OperationCancelled:
+                    continue
+                except Exception as e:
+                    report = GameUpdateReport(game_dir=str(g), errors=[str(e)])
+                results[str(g)] = asdict(report)
+                done += 1
+                if progress:
+                    progress(f"Juego {done}/{total} actualizado", 0.97 * (done / total))
+        if token is not None and token.cancelled:
+            self.log('WARN', f"Actualización cancelada: {done}/{total} juegos actualizados")
         if progress:
             progress('Actualización completada', 1.0)
         return results
@@ -352,13 +641,16 @@ class OptiScalerUpdater:
         if not ok_install:
             return {'updated': False, 'reason': install_reason or 'install_failed'}
         valid_games = self.list_game_installations(game_paths)
-        game_results = self.update_multiple_games(valid_games, progress)
+        plan = self.plan_updates(valid_games)
+        game_results = self.update_multiple_games(valid_games, progress, plan=plan) if plan else {}
         return {
             'updated': True,
             'new_version': release.version,
-            'games_updated': game_results
+            'games_updated': game_results,
+            'games_up_to_date': plan.up_to_date if plan else [],
+            'bytes_written': sum(r['bytes_written'] for r in game_results.values())
         }
 
 __all__ = [
-    'OptiScalerUpdater', 'ReleaseInfo'
+    'OptiScalerUpdater', 'ReleaseInfo', 'GameUpdateReport', 'UpdatePlan'
 ]
@@ -0,0 +1,246 @@
+"""Catálogo local de versiones de OptiScaler descargadas.
+
+Cada versión extraída queda registrada en OPTISCALER_DIR/versions.json con
+su tag, carpeta, clave semver (0.10 > 0.9), tamaño y manifiesto de archivos,
+de modo que resolver una versión o tag a su carpeta es un acceso a
+diccionario. Las rutas de descarga y borrado lo mantienen al día; si el
+archivo no existe (instalaciones anteriores) se reconstruye una única vez
+escaneando OPTISCALER_DIR.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.paths import OPTISCALER_DIR
+from .archive_cache import file_digest
+
+CATALOG_FILENAME = "versions.json"
+CATALOG_SCHEMA = 2  # 2: manifiesto con sha256 por archivo
+
+_VERSION_RE = re.compile(r'(\d+(?:\.\d+)*)')
+_PRERELEASE_RE = re.compile(r'(?:pre|rc|beta|alpha|nightly)', re.IGNORECASE)
+
+_catalog_lock = RLock()
+_catalogs: Dict[str, "VersionCatalog"] = {}
+
+
+def normalize_version(text: str) -> str:
+    """'v0.7.9' / 'OptiScaler_0.7.9' -> '0.7.9' (cadena vacía si no hay número)."""
+    match = _VERSION_RE.search(text or '')
+    return match.group(1) if match else ''
+
+
+def version_key(text: str) -> Tuple[int, ...]:
+    """Clave de ordenación semver: números + 1 si es estable / 0 si es pre-release."""
+    version = normalize_version(text)
+    if not version:
+        return (-1,)
+    numbers = tuple(int(part) for part in version.split('.'))
+    stable = 0 if _PRERELEASE_RE.search(text.split(version, 1)[-1]) else 1
+    return numbers + (stable,)
+
+
+def build_manifest(folder: str | Path) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """Manifiesto {ruta_relativa: {'size', 'sha256'}} y tamaño total de una carpeta."""
+    folder = Path(folder)
+    files: Dict[str, Dict[str, Any]] = {}
+    total = 0
+    for root, _, names in os.walk(folder):
+        for name in names:
+            full = os.path.join(root, name)
+            try:
+                size = os.path.getsize(full)
+                digest = file_digest(full)
+            except OSError:
+                continue
+            files[Path(full).relative_to(folder).as_posix()] = {'size': size, 'sha256': digest}
+            total += size
+    return files, total
+
+
+class VersionCatalog:
+    """Índice JSON de las carpetas OptiScaler_* extraídas en base_dir."""
+
+    def __init__(self, base_dir: Optional[str | Path] = None) -> None:
+        self.base_dir = Path(base_dir) if base_dir else Path(OPTISCALER_DIR)
+        self.catalog_file = self.base_dir / CATALOG_FILENAME
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_version: Dict[str, str] = {}
+        self._loaded_mtime: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _reindex(self) -> None:
+        self._by_version = {}
+        # Las más antiguas primero para que la más reciente gane en colisiones
+        for folder, entry in sorted(self._entries.items(), key=lambda kv: kv[1].get('key', [])):
+            if entry.get('version'):
+                self._by_version[entry['version']] = folder
+            if entry.get('tag'):
+                self._by_version[entry['tag'].lower()] = folder
+            self._by_version[folder.lower()] = folder
+
+    def _load(self) -> None:
+        """Carga el catálogo si cambió en disco; lo reconstruye si no existe."""
+        with _catalog_lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        try:
+            mtime = self.catalog_file.stat().st_mtime
+        except OSError:
+            self.rebuild()
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get('schema') != CATALOG_SCHEMA:
+                raise ValueError("schema")
+            self._entries = data.get('versions', {})
+        except (OSError, ValueError):
+            self.rebuild()
+            return
+        self._loaded_mtime = mtime
+        self._reindex()
+
+    def _save(self) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.catalog_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'schema': CATALOG_SCHEMA, 'versions': self._entries}, f, indent=1)
+        os.replace(tmp, self.catalog_file)
+        self._loaded_mtime = self.catalog_file.stat().st_mtime
+        self._reindex()
+
+    def _make_entry(self, folder: Path, version: Optional[str], tag: Optional[str],
+                    added_at: Optional[float] = None) -> Dict[str, Any]:
+        files, size = build_manifest(folder)
+        version = normalize_version(version or tag or folder.name)
+        return {
+            'folder': folder.name,
+            'version': version,
+            'tag': tag or '',
+            'key': list(version_key(folder.name if not tag else tag)),
+            'size': size,
+            'files': files,
+            'added_at': added_at or time.time(),
+        }
+
+    # ------------------------------------------------------------------
+    # Maintenance (download / delete paths)
+    # ------------------------------------------------------------------
+    def rebuild(self) -> None:
+        """Reconstruye el catálogo escaneando OptiScaler* en base_dir."""
+        with _catalog_lock:
+            self._entries = {}
+            if self.base_dir.is_dir():
+                for child in self.base_dir.iterdir():
+                    if child.is_dir() and child.name.lower().startswith('optiscaler'):
+                        # Fecha de la carpeta: la reconstrucción no "rejuvenece" versiones viejas
+                        self._entries[child.name] = self._make_entry(
+                            child, None, None, added_at=child.stat().st_mtime
+                        )
+            try:
+                self._save()
+            except OSError:
+                self._reindex()
+
+    def register(self, folder: str | Path, version: Optional[str] = None,
+                 tag: Optional[str] = None) -> Dict[str, Any]:
+        """Añade (o actualiza) una carpeta extraída en el catálogo."""
+        folder = Path(folder)
+        entry = self._make_entry(folder, version, tag)
+        with _catalog_lock:
+            self._load()
+            self._entries[folder.name] = entry
+            self._save()
+        return entry
+
+    def unregister(self, folder: str | Path) -> None:
+        """Elimina una carpeta del catálogo (tras borrarla del disco)."""
+        with _catalog_lock:
+            self._load()
+            if self._entries.pop(Path(folder).name, None) is not None:
+                self._save()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def entries(self) -> List[Dict[str, Any]]:
+        """Entradas ordenadas de la más reciente a la más antigua."""
+        self._load()
+        return sorted(self._entries.values(), key=lambda e: e.get('key', []), reverse=True)
+
+    def folder_names(self) -> List[str]:
+        return [e['folder'] for e in self.entries()]
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Busca por nombre de carpeta, tag o versión ('v0.7.9', '0.7.9')."""
+        self._load()
+        if not name:
+            return None
+        folder = self._by_version.get(name.lower())
+        if folder is None:
+            # Un nombre sin número de versión no debe caer en las entradas sin versión
+            version = normalize_version(name)
+            folder = self._by_version.get(version) if version else None
+        return self._entries.get(folder) if folder else None
+
+    def _existing_path(self, entry: Optional[Dict[str, Any]]) -> Optional[Path]:
+        """Ruta de la entrada; si la carpeta se borró a mano, se olvida la entrada."""
+        if not entry:
+            return None
+        path = self.base_dir / entry['folder']
+        if path.is_dir():
+            return path
+        self.unregister(entry['folder'])
+        return None
+
+    def find_for_game(self, meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Versión instalada en un juego según su version.json (source_folder, tag o versión)."""
+        if not meta:
+            return None
+        entry = self.find(meta.get('source_folder') or '')
+        if entry is None:
+            # version.json antiguos: resolver por tag/versión
+            entry = self.find(meta.get('tag') or meta.get('version') or '')
+        return entry
+
+    def path_for(self, name: str) -> Optional[Path]:
+        return self._existing_path(self.find(name))
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        entries = self.entries()
+        return entries[0] if entries else None
+
+    def latest_path(self) -> Optional[Path]:
+        for entry in self.entries():
+            path = self._existing_path(entry)
+            if path:
+                return path
+        return None
+
+
+def get_version_catalog(base_dir: Optional[str | Path] = None) -> VersionCatalog:
+    """Instancia compartida del catálogo para base_dir (por defecto OPTISCALER_DIR)."""
+    key = str(Path(base_dir) if base_dir else Path(OPTISCALER_DIR))
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = _catalogs.setdefault(key, VersionCatalog(key))
+    return catalog
+
+
+__all__ = [
+    'VersionCatalog', 'get_version_catalog', 'version_key', 'normalize_version',
+    'build_manifest', 'CATALOG_FILENAME'
+]
@@ -0,0 +1,178 @@
+"""Limpieza de versiones de OptiScaler sin uso (recuento de referencias).
+
+La tabla carpeta -> juegos se construye con el índice de escaneo y el
+version.json de cada juego; las versiones y los .7z cacheados que ningún
+juego usa se pueden borrar, también como tarea en segundo plano. Nunca se
+borran la versión activa (OPTISCALER_DIR/version.json), las N más recientes
+ni las descargadas hace menos de `min_age_days` días.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .archive_cache import ArchiveCache
+from .mod_detector import read_version_json
+from .tasks import Priority, TaskHandle, get_task_runner
+from .version_catalog import VersionCatalog, get_version_catalog
+
+
+@dataclass
+class RetentionPolicy:
+    keep_latest: int = 2          # versiones más recientes que siempre se conservan
+    min_age_days: float = 7.0     # no borrar descargas recientes
+    include_archives: bool = True  # borrar también los .7z cacheados de esas versiones
+
+
+@dataclass
+class GCPlan:
+    references: Dict[str, List[str]] = field(default_factory=dict)  # carpeta -> juegos
+    folders: List[str] = field(default_factory=list)                 # carpetas a borrar
+    archives: List[str] = field(default_factory=list)                # claves de ArchiveCache
+    folder_bytes: int = 0
+    archive_bytes: int = 0
+    refused: str = ''     # motivo por el que no se planificó ningún borrado
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        return self.folder_bytes + self.archive_bytes
+
+
+def collect_references(game_dirs: Iterable[str], catalog: VersionCatalog) -> Dict[str, List[str]]:
+    """Tabla {carpeta de versión: [juegos]} a partir del version.json de cada juego."""
+    references: Dict[str, List[str]] = {}
+    for game_dir in game_dirs:
+        entry = catalog.find_for_game(read_version_json(Path(game_dir) / 'version.json'))
+        if entry:
+            references.setdefault(entry['folder'], []).append(str(game_dir))
+    return references
+
+
+def _default_game_dirs() -> Optional[List[str]]:
+    """Juegos del escaneo de esta sesión o, si aún no hubo, los del último
+    escaneo guardado en el ScanIndex; None si no se conoce ninguna lista."""
+    from .scanner import get_scan_cache
+    from .scan_index import get_scan_index
+    games = get_scan_cache()
+    if games is not None:
+        return [game[0] for game in games]
+    return get_scan_index().game_dirs()
+
+
+def plan_gc(game_dirs: Optional[Iterable[str]] = None,
+            policy: Optional[RetentionPolicy] = None,
+            keep: Iterable[str] = (),
+            catalog: Optional[VersionCatalog] = None,
+            archive_cache: Optional[ArchiveCache] = None) -> GCPlan:
+    """Calcula qué versiones y archivos se pueden borrar (no borra nada).
+
+    Args:
+        game_dirs: Carpetas de juegos (por defecto, el último escaneo). Si no
+            hay ninguna lista de juegos no se planifica ningún borrado (plan.refused)
+        policy: Política de retención
+        keep: Carpetas/versiones que se conservan siempre (p.ej. la seleccionada en la UI)
+    """
+    policy = policy or RetentionPolicy()
+    catalog = catalog or get_version_catalog()
+    if game_dirs is None:
+        game_dirs = _default_game_dirs()
+    if game_dirs is None:
+        # Sin lista de juegos no hay referencias: se borrarían versiones en uso
+        return GCPlan(refused="No hay ningún escaneo de juegos; escanea antes de limpiar versiones")
+
+    plan = GCPlan(references=collect_references(game_dirs, catalog))
+    pinned = set(plan.references)
+    for name in keep:
+        entry = catalog.find(name)
+        if entry:
+            pinned.add(entry['folder'])
+    active = read_version_json(catalog.base_dir / 'version.json') or {}
+    if active.get('folder'):
+        pinned.add(active['folder'])
+
+    # Conservar las N versiones más recientes (una carpeta por versión: la última extraída)
+    newest_per_version: Dict[str, Dict] = {}
+    for entry in catalog.entries():
+        current = newest_per_version.get(entry['version'])
+        if current is None or entry.get('added_at', 0) > current.get('added_at', 0):
+            newest_per_version[entry['version']] = entry
+    newest = sorted(newest_per_version.values(), key=lambda e: e.get('key', []), reverse=True)
+    pinned.update(e['folder'] for e in newest[:max(0, policy.keep_latest)])
+
+    cutoff = time.time() - policy.min_age_days * 86400
+    for entry in catalog.entries():
+        if entry['folder'] in pinned or entry.get('added_at', 0) > cutoff:
+            continue
+        plan.folders.append(entry['folder'])
+        plan.folder_bytes += entry.get('size', 0)
+
+    if policy.include_archives and plan.folders:
+        # El archivo X.7z se extrae en la carpeta X
+        doomed = set(plan.folders)
+        archive_cache = archive_cache or ArchiveCache()
+        for key, entry in archive_cache.entries().items():
+            if os.path.splitext(entry.get('name', ''))[0] in doomed:
+                plan.archives.append(key)
+                plan.archive_bytes += entry.get('size', 0)
+    return plan
+
+
+def run_gc(plan: GCPlan, log_func: Callable[[str, str], None],
+           catalog: Optional[VersionCatalog] = None,
+           archive_cache: Optional[ArchiveCache] = None) -> int:
+    """Aplica un GCPlan y devuelve los bytes liberados."""
+    catalog = catalog or get_version_catalog()
+    freed = 0
+    for folder in plan.folders:
+        entry = catalog.find(folder)
+        path = catalog.base_dir / folder
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            catalog.unregister(folder)
+            freed += entry.get('size', 0) if entry else 0
+            log_func('INFO', f"Versión sin uso eliminada: {folder}")
+        except Exception as e:
+            log_func('WARN', f"No se pudo eliminar {folder}: {e}")
+    if plan.archives:
+        archive_cache = archive_cache or ArchiveCache()
+        for key in plan.archives:
+            freed += archive_cache.remove(key)
+    log_func('OK', f"Limpieza de versiones: {freed / (1024 * 1024):.1f} MB liberados")
+    return freed
+
+
+def start_gc_job(log_func: Callable[[str, str], None],
+                 game_dirs: Optional[Iterable[str]] = None,
+                 policy: Optional[RetentionPolicy] = None,
+                 keep: Iterable[str] = (),
+                 dry_run: bool = False,
+                 on_done: Optional[Callable[[GCPlan, int], None]] = None) -> TaskHandle:
+    """Ejecuta plan_gc (+ run_gc salvo dry_run) como tarea de fondo del pool compartido."""
+    game_dirs = list(game_dirs) if game_dirs is not None else None
+    keep = list(keep)
+
+    def job():
+        try:
+            plan = plan_gc(game_dirs, policy, keep)
+            if plan.refused:
+                log_func('WARN', f"Limpieza de versiones cancelada: {plan.refused}")
+            mb = plan.reclaimable_bytes / (1024 * 1024)
+            log_func('INFO', f"Versiones sin uso: {len(plan.folders)} ({mb:.1f} MB recuperables)")
+            freed = 0 if dry_run or not (plan.folders or plan.archives) else run_gc(plan, log_func)
+            if on_done:
+                on_done(plan, freed)
+        except Exception as e:
+            log_func('ERROR', f"Error en la limpieza de versiones: {e}")
+
+    return get_task_runner(log_func).submit(job, name='version-gc', priority=Priority.BACKGROUND)
+
+
+__all__ = [
+    'RetentionPolicy', 'GCPlan', 'collect_references', 'plan_gc', 'run_gc', 'start_gc_job'
+]
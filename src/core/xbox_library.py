@@ -0,0 +1,95 @@
+"""Juegos de Xbox / Game Pass a partir de sus manifiestos.
+
+MicrosoftGame.config (GDK) y appxmanifest.xml (UWP/MSIX), en la carpeta
+Content de cada juego, declaran los ejecutables y la versión instalada. Con
+ellos se resuelve el ejecutable principal y su carpeta sin recorrer el árbol,
+que en WindowsApps suele tener carpetas sin permiso de lectura.
+"""
+
+from __future__ import annotations
+
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .exe_rules import get_exe_rules
+
+MANIFEST_NAMES = ('MicrosoftGame.config', 'appxmanifest.xml')
+
+# Lanzadores genéricos que declaran los appxmanifest de juegos GDK
+_LAUNCH_HELPERS = {'gamelaunchhelper.exe'}
+
+
+@dataclass
+class XboxManifest:
+    path: str                        # ruta del manifiesto leído
+    name: str = ''
+    version: str = ''
+    executables: List[str] = field(default_factory=list)   # relativos a la carpeta del manifiesto
+
+    @property
+    def content_dir(self) -> str:
+        return os.path.dirname(self.path)
+
+    def resolve_executable(self) -> Optional[Tuple[str, str]]:
+        """(carpeta de inyección, exe) del primer ejecutable declarado que exista.
+
+        Los lanzadores genéricos no cuentan (no indican dónde está el juego) y
+        los de la lista negra sólo se usan si no hay otro candidato.
+        """
+        rules = get_exe_rules()
+        candidates = []
+        for relative in self.executables:
+            exe_path = os.path.normpath(os.path.join(self.content_dir, relative.replace('\\', os.sep)))
+            lower = os.path.basename(exe_path).lower()
+            if lower in _LAUNCH_HELPERS:
+                continue
+            candidates.append((rules.is_blacklisted(lower), exe_path))
+        for _, exe_path in sorted(candidates, key=lambda c: c[0]):
+            if os.path.isfile(exe_path):
+                return os.path.split(exe_path)
+        return None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse(path: str) -> XboxManifest:
+    root = ET.parse(path).getroot()
+    manifest = XboxManifest(path=path)
+    for element in root.iter():
+        tag = _local(element.tag)
+        if tag == 'Identity' and not manifest.version:
+            manifest.name = element.get('Name', '')
+            manifest.version = element.get('Version', '')
+        elif tag == 'Executable' and element.get('Name'):
+            # MicrosoftGame.config: <ExecutableList><Executable Name="..." TargetDeviceFamily="PC"/>
+            if element.get('TargetDeviceFamily', 'PC').lower() == 'pc':
+                manifest.executables.append(element.get('Name'))
+        elif tag == 'Application' and element.get('Executable'):
+            # appxmanifest.xml: <Applications><Application Executable="..."/>
+            manifest.executables.append(element.get('Executable'))
+    return manifest
+
+
+def read_xbox_manifest(*folders: str) -> Optional[XboxManifest]:
+    """Primer manifiesto legible en las carpetas dadas (Content, raíz del juego).
+
+    MicrosoftGame.config tiene prioridad: en los juegos GDK el appxmanifest
+    sólo declara gamelaunchhelper.exe.
+    """
+    for name in MANIFEST_NAMES:
+        for folder in folders:
+            path = os.path.join(folder, name)
+            try:
+                manifest = _parse(path)
+            except (OSError, ET.ParseError):
+                continue
+            if manifest.executables:
+                return manifest
+    return None
+
+
+__all__ = ['XboxManifest', 'read_xbox_manifest', 'MANIFEST_NAMES']
@@ -26,13 +26,21 @@ import pygame
 import time
 
 # Imports de módulos core
-from ..core.scanner import scan_games, invalidate_scan_cache
+from ..core.scanner import scan_games
 from ..core.config_manager import load_config, save_config
 from ..core.installer import inject_fsr_mod, uninstall_fsr_mod, install_combined_mods, install_optipatcher, uninstall_optipatcher
 from ..core.mod_detector import compute_game_mod_status, get_version_badge_info
 from ..core.utils import detect_gpu_vendor, should_use_dual_mod
 from ..core.github import GitHubClient
+from ..core.version_catalog import get_version_catalog
+from ..core.tasks import Priority, check_cancelled, get_task_runner, get_ui_dispatcher
+from ..core import index_daemon
+from ..core.scan_index import get_scan_index
+from ..utils.error_handling import OperationCancelled
 from ..utils.logging import LogManager
+from ..utils.tracing import get_tracer
+from ..utils.metrics import get_metrics
+from ..utils.profiling import profiled, read_summary, set_profiling_mode
 from ..config.paths import MOD_SOURCE_DIR, OPTISCALER_DIR, DLSSG_TO_FSR3_DIR, SEVEN_ZIP_PATH, APP_DIR, get_config_dir
 from .components.windows.welcome_tutorial import WelcomeTutorial, should_show_tutorial
 from .components.windows.installation_details_window import InstallationDetailsWindow
@@ -61,6 +69,9 @@ FONT_NORMAL = 13         # Texto normal, botones
 FONT_SMALL = 11          # Detalles, labels secundarios
 FONT_TINY = 10           # Info muy pequeña
 
+# Modos de perfilado (config "profiling_mode" -> texto en Ajustes)
+PROFILING_LABELS = {"off": "Desactivado", "cpu": "CPU", "cpu,mem": "CPU + Memoria"}
+
 
 class GamingApp(ctk.CTk):
 
@@ -128,6 +139,7 @@ class GamingApp(ctk.CTk):
         }
     """Aplicación Gaming Mode - Interfaz completa."""
     
+    @profiled('startup')
     def __init__(self):
         super().__init__()
 
@@ -144,6 +156,13 @@ class GamingApp(ctk.CTk):
         self.log_manager = LogManager()
         self.log = lambda level, msg: self.log_manager.log_to_ui(level, msg)
         
+        # Tareas en segundo plano (pool acotado) y cola única hacia la UI
+        self.task_runner = get_task_runner(self.log)
+        self.ui_queue = get_ui_dispatcher(self.log)
+        self.ui_post = self.ui_queue.post
+        self.ui_queue.start_pump(self.after)
+        get_metrics().set_info(app_version=APP_VERSION)
+        
         # Variables para navegación con gamepad
         self.current_focused_widget = None
         self.focus_zone = 'sidebar'  # 'sidebar' o 'content'
@@ -167,6 +186,7 @@ class GamingApp(ctk.CTk):
         
         # Cargar configuración
         self.config = load_config()
+        set_profiling_mode(self.config.get("profiling_mode", "off"))
         
         # Asegurar que exista la lista de carpetas personalizadas
         if "custom_game_folders" not in self.config:
@@ -221,6 +241,10 @@ class GamingApp(ctk.CTk):
         self.log_level_var = ctk.StringVar(value=self.config.get("log_level", "Info"))
         self.open_console_var = ctk.BooleanVar(value=self.config.get("open_console", False))
         self.log_to_file_var = ctk.BooleanVar(value=self.config.get("log_to_file", True))
+        self.profiling_var = ctk.StringVar(value=PROFILING_LABELS.get(self.config.get("profiling_mode", "off"), "Desactivado"))
+        self.index_daemon_var = ctk.BooleanVar(value=self.config.get("index_daemon", False))
+        self.index_client = None  # IndexClient si el servicio de índice está activo
+        self._live_log_window = None  # ventana de "Ver Registro en Vivo" abierta
         
         # Quality Overrides variables
         self.quality_override_enabled_var = ctk.BooleanVar(value=self.config.get("quality_override_enabled", False))
@@ -285,6 +309,10 @@ class GamingApp(ctk.CTk):
         
         # Verificar actualizaciones de la aplicación
         self.after(1500, self.check_app_updates)
+        
+        # Lista de juegos inmediata desde el servicio de índice (si está activado)
+        if self.index_daemon_var.get():
+            self.task_runner.submit(self._load_games_from_daemon, name='index-daemon', priority=Priority.BACKGROUND)
 
     # ==================================================================================
     # ICONOS Y RECURSOS
@@ -462,15 +490,15 @@ class GamingApp(ctk.CTk):
                     self.gamepad.init()
                     self.gamepad_connected = True
                     gamepad_name = self.gamepad.get_name()
-                    self.after(0, lambda: self.log('SUCCESS', f"🎮 Gamepad conectado: {gamepad_name}"))
-                    self.after(0, self.update_gamepad_indicator)
-                    self.after(0, self.start_gamepad_input_loop)
+                    self.ui_post(lambda: self.log('SUCCESS', f"🎮 Gamepad conectado: {gamepad_name}"))
+                    self.ui_post(self.update_gamepad_indicator)
+                    self.ui_post(self.start_gamepad_input_loop)
                     
                 elif current_count == 0 and self.gamepad_connected:
                     self.gamepad_connected = False
                     self.gamepad = None
-                    self.after(0, lambda: self.log('WARNING', "🎮 Gamepad desconectado"))
-                    self.after(0, self.update_gamepad_indicator)
+                    self.ui_post(lambda: self.log('WARNING', "🎮 Gamepad desconectado"))
+                    self.ui_post(self.update_gamepad_indicator)
                 
                 last_gamepad_count = current_count
                 time.sleep(0.5)  # Check cada 500ms
@@ -2914,6 +2942,65 @@ class GamingApp(ctk.CTk):
         btn_clean_logs.pack(side="left", padx=2)
         self.setup_widget_focus(btn_clean_logs)
         
+        # Perfilado opcional (cProfile / tracemalloc) de escaneo, instalación y descargas
+        profiling_frame = ctk.CTkFrame(log_mgmt_frame, fg_color="transparent")
+        profiling_frame.pack(fill="x", padx=10, pady=(0, 8))
+        
+        ctk.CTkLabel(
+            profiling_frame,
+            text="⏱️ Perfilado:",
+            font=ctk.CTkFont(size=FONT_TINY)
+        ).pack(side="left", padx=(2, 8))
+        
+        self.profiling_combo = WideComboBox(
+            profiling_frame,
+            variable=self.profiling_var,
+            values=list(PROFILING_LABELS.values()),
+            width=160,
+            font=ctk.CTkFont(size=FONT_TINY),
+            max_visible_items=3
+        )
+        self.profiling_combo.pack(side="left", padx=2)
+        self.setup_widget_focus(self.profiling_combo)
+        self.profiling_var.trace_add('write', self._on_profiling_changed)
+        
+        btn_view_profile = ctk.CTkButton(
+            profiling_frame,
+            text="📊 Ver Último Perfil",
+            width=140,
+            height=28,
+            command=self._show_last_profile,
+            fg_color="#3a3a3a",
+            hover_color="#4a4a4a",
+            font=ctk.CTkFont(size=FONT_TINY)
+        )
+        btn_view_profile.pack(side="left", padx=2)
+        self.setup_widget_focus(btn_view_profile)
+        
+        btn_export_metrics = ctk.CTkButton(
+            profiling_frame,
+            text="📈 Exportar Métricas",
+            width=140,
+            height=28,
+            command=self._export_metrics,
+            fg_color="#3a3a3a",
+            hover_color="#4a4a4a",
+            font=ctk.CTkFont(size=FONT_TINY)
+        )
+        btn_export_metrics.pack(side="left", padx=2)
+        self.setup_widget_focus(btn_export_metrics)
+        
+        # Servicio de índice: mantiene el escaneo en memoria entre aperturas
+        self.index_daemon_check = ctk.CTkCheckBox(
+            log_mgmt_frame,
+            text="⚡ Servicio de índice en segundo plano (lista de juegos instantánea al abrir)",
+            variable=self.index_daemon_var,
+            font=ctk.CTkFont(size=FONT_TINY),
+            command=self._on_index_daemon_changed
+        )
+        self.index_daemon_check.pack(anchor="w", padx=12, pady=(0, 8))
+        self.setup_widget_focus(self.index_daemon_check)
+        
         # Info text
         ctk.CTkLabel(
             debug_wrap,
@@ -3728,7 +3815,17 @@ class GamingApp(ctk.CTk):
             height=35,
             fg_color="#2a2a2a",
             hover_color="#3a3a3a"
-        ).pack(fill="x", padx=15, pady=(10, 10))
+        ).pack(fill="x", padx=15, pady=(10, 5))
+        
+        # Limpieza de versiones sin uso
+        ctk.CTkButton(
+            mod_frame,
+            text="🧹 Liberar espacio (versiones sin uso)...",
+            command=self.cleanup_unused_versions,
+            height=35,
+            fg_color="#2a2a2a",
+            hover_color="#3a3a3a"
+        ).pack(fill="x", padx=15, pady=(0, 10))
         
         # === CARPETAS DE ESCANEO ===
         scan_frame = ctk.CTkFrame(settings_scroll, fg_color="#1a1a1a", corner_radius=8)
@@ -3748,7 +3845,16 @@ class GamingApp(ctk.CTk):
             fg_color="#3a3a3a",
             hover_color="#4a4a4a",
             font=ctk.CTkFont(size=13, weight="bold")
-        ).pack(fill="x", padx=15, pady=(5, 10))
+        ).pack(fill="x", padx=15, pady=(5, 5))
+        
+        ctk.CTkButton(
+            scan_frame,
+            text="🚫 Carpetas Omitidas (sin juego)...",
+            command=self.show_skipped_folders,
+            height=35,
+            fg_color="#2a2a2a",
+            hover_color="#3a3a3a"
+        ).pack(fill="x", padx=15, pady=(0, 10))
         
         # === REGISTRO ===
         log_frame = ctk.CTkFrame(settings_scroll, fg_color="#1a1a1a", corner_radius=8)
@@ -3760,6 +3866,15 @@ class GamingApp(ctk.CTk):
             font=ctk.CTkFont(size=14, weight="bold")
         ).pack(anchor="w", padx=15, pady=(10, 5))
         
+        ctk.CTkButton(
+            log_frame,
+            text="📜 Ver Registro en Vivo...",
+            command=self.show_live_log,
+            height=35,
+            fg_color="#2a2a2a",
+            hover_color="#3a3a3a"
+        ).pack(fill="x", padx=15, pady=(0, 5))
+        
         ctk.CTkButton(
             log_frame,
             text="💾 Guardar Log",
@@ -4453,12 +4568,8 @@ Licencia: Open Source
         self.log('INFO', "Iniciando escaneo de juegos...")
         self._scan_in_progress = True
         
-        # Deshabilitar botón durante escaneo
-        self.scan_btn.configure(state="disabled")
-        if self.icons.get("rescan"):
-            self.scan_btn.configure(text="")
-        else:
-            self.scan_btn.configure(text="⏳")
+        # Durante el escaneo el botón lo cancela (como Aplicar/Desinstalar)
+        self.scan_btn.configure(text="⏹", image=None, command=self.cancel_scan_task)
         
         # Mostrar barra de progreso solo si no es silencioso
         if not silent:
@@ -4471,62 +4582,82 @@ Licencia: Open Source
             self.set_progress_color("#00BFFF")
             self.progress_bar.start()
             
-            # Mejora #4: Animación del botón de escaneo
+            # Mejora #4: Animación del botón de escaneo (sigue siendo el de cancelar)
             self.scan_animation_running = True
             self.animate_scan_button()
         
+        @profiled('scan')
         def scan_thread():
             try:
-                # Invalidar cache para forzar rescan
-                invalidate_scan_cache()
-                
                 # Obtener carpetas personalizadas del config
                 custom_folders = self.config.get("custom_game_folders", [])
                 
-                # Ejecutar scan
-                games_list = scan_games(self.log, custom_folders=custom_folders, use_cache=False)
+                # Ejecutar scan (use_cache=False fuerza el rescan; si se cancela,
+                # la caché anterior sigue siendo válida). Con el servicio de índice
+                # activo, el escaneo lo hace el servicio y queda caliente para la CLI.
+                games_list = self._scan_via_daemon(custom_folders)
+                if games_list is None:
+                    games_list = scan_games(self.log, custom_folders=custom_folders, use_cache=False)
                 
                 # Actualizar GUI en hilo principal
-                self.after(0, lambda: self.update_games_list(games_list, silent=silent))
+                self.ui_post(lambda: self.update_games_list(games_list, silent=silent))
                 
+            except OperationCancelled:
+                self.log('WARN', "Escaneo cancelado")
+                if not silent:
+                    def show_cancelled():
+                        self.progress_bar.stop()
+                        self.progress_bar.configure(mode="determinate")
+                        self.progress_bar.set(0)
+                        self.set_progress_color("#FFA500")
+                        self.status_label.configure(text="⏹ Escaneo cancelado", text_color="#FFA500")
+                    self.ui_post(show_cancelled)
             except Exception as e:
                 self.log('ERROR', f"Error durante escaneo: {e}")
                 if not silent:
-                    self.after(0, lambda: self.show_status_error(f"Error al escanear: {e}"))
+                    self.ui_post(lambda: self.show_status_error(f"Error al escanear: {e}"))
             finally:
                 # Restaurar botón
                 def restore_button():
                     # Mejora #4: Detener animación
                     self.scan_animation_running = False
+                    if getattr(self, '_scan_animation_after', None):
+                        self.after_cancel(self._scan_animation_after)
+                        self._scan_animation_after = None
                     self._scan_in_progress = False  # BUGFIX: Liberar flag de progreso
                     if self.icons.get("rescan"):
-                        self.scan_btn.configure(state="normal", text="", image=self.icons["rescan"])
+                        self.scan_btn.configure(state="normal", text="", image=self.icons["rescan"],
+                                                command=self.scan_games_action)
                     else:
-                        self.scan_btn.configure(state="normal", text="🔄")
-                self.after(0, restore_button)
+                        self.scan_btn.configure(state="normal", text="🔄", command=self.scan_games_action)
+                self.ui_post(restore_button)
         
-        threading.Thread(target=scan_thread, daemon=True).start()
+        self.scan_task = self.task_runner.submit(scan_thread, name='scan', priority=Priority.INTERACTIVE)
     
     def animate_scan_button(self):
-        """Mejora #4: Anima el botón de escaneo con emojis rotatorios."""
-        if not hasattr(self, 'scan_animation_running') or not self.scan_animation_running:
+        """Mejora #4: Anima el botón de escaneo mientras actúa como cancelar."""
+        if not getattr(self, 'scan_animation_running', False):
             return
         
-        # Secuencia de animación
         if not hasattr(self, 'scan_animation_frame'):
             self.scan_animation_frame = 0
         
+        # El ⏹ se mantiene para que siga claro que el botón cancela
         animation_frames = ["🔄", "🔃", "⟳", "⟲"]
-        
-        # Si no hay icono, usar emoji animado
-        if not self.icons.get("rescan"):
-            current_frame = animation_frames[self.scan_animation_frame % len(animation_frames)]
-            self.scan_btn.configure(text=current_frame)
-            self.scan_animation_frame += 1
+        current_frame = animation_frames[self.scan_animation_frame % len(animation_frames)]
+        self.scan_btn.configure(text=f"⏹ {current_frame}")
+        self.scan_animation_frame += 1
         
         # Continuar animación cada 200ms
-        if self.scan_animation_running:
-            self.after(200, self.animate_scan_button)
+        self._scan_animation_after = self.after(200, self.animate_scan_button)
+    
+    def cancel_scan_task(self):
+        """Cancela el escaneo en curso (se conserva la lista anterior)."""
+        task = getattr(self, 'scan_task', None)
+        if task and not task.done and not task.cancelled:
+            task.cancel()
+            self.log('WARN', "⏹ Cancelando escaneo...")
+            self.status_label.configure(text="⏹ Cancelando escaneo...", text_color="#FFA500")
     
     def update_game_status_realtime(self, game_path, status_text, status_color, force=False):
         """Mejora #5: Actualiza el estado de un juego en la lista en tiempo real.
@@ -5042,24 +5173,10 @@ Licencia: Open Source
         Returns:
             bool: True si está disponible, False si no
         """
-        import glob
-        
-        # Buscar carpetas de OptiScaler en OPTISCALER_DIR
-        optiscaler_patterns = [
-            os.path.join(OPTISCALER_DIR, "OptiScaler*"),
-            os.path.join(OPTISCALER_DIR, "optiscaler*")
-        ]
-        
-        for pattern in optiscaler_patterns:
-            matches = glob.glob(pattern)
-            if matches:
-                # Verificar que tenga archivos del mod
-                for match in matches:
-                    if os.path.isdir(match):
-                        # Buscar archivos .dll característicos
-                        dll_files = glob.glob(os.path.join(match, "*.dll"))
-                        if dll_files:
-                            return True
+        # Consultar el catálogo local de versiones (manifiesto de archivos)
+        for entry in get_version_catalog().entries():
+            if any(name.lower().endswith('.dll') and '/' not in name for name in entry.get('files', {})):
+                return True
         
         return False
     
@@ -5069,8 +5186,6 @@ Licencia: Open Source
         Returns:
             str|None: Ruta a la carpeta del mod o None si no se encuentra
         """
-        import glob
-        
         selected_version = self.optiscaler_version_var.get()
         
         # Si es versión custom
@@ -5080,24 +5195,15 @@ Licencia: Open Source
             if os.path.exists(custom_path):
                 return custom_path
         
-        # Buscar por nombre de versión
-        patterns = [
-            os.path.join(OPTISCALER_DIR, f"*{selected_version}*"),
-            os.path.join(OPTISCALER_DIR, f"OptiScaler_{selected_version}"),
-            os.path.join(OPTISCALER_DIR, f"OptiScaler*{selected_version}*")
-        ]
+        # Buscar por carpeta, tag o versión en el catálogo local
+        catalog = get_version_catalog()
+        source = catalog.path_for(selected_version)
         
-        for pattern in patterns:
-            matches = glob.glob(pattern)
-            if matches and os.path.isdir(matches[0]):
-                return matches[0]
+        # Si no se encuentra, usar la versión más reciente
+        if source is None:
+            source = catalog.latest_path()
         
-        # Si no se encuentra, usar la primera disponible
-        all_optiscaler = glob.glob(os.path.join(OPTISCALER_DIR, "OptiScaler*"))
-        if all_optiscaler:
-            return all_optiscaler[0]
-        
-        return None
+        return str(source) if source else None
     
     def get_nukem_source_dir(self):
         """Obtiene la carpeta de dlssg-to-fsr3 desde el campo de ruta.
@@ -5118,6 +5224,14 @@ Licencia: Open Source
         # Si no hay ruta válida, retornar None
         return None
         
+    def cancel_install_task(self):
+        """Cancela la instalación/desinstalación en curso."""
+        task = getattr(self, 'install_task', None)
+        if task and not task.done and not task.cancelled:
+            task.cancel()
+            self.log('WARN', "⏹ Cancelando... (se deshace el juego en curso)")
+            self.status_label.configure(text="⏹ Cancelando...", text_color="#FFA500")
+        
     def apply_to_selected(self):
         """Aplica el mod a los juegos seleccionados."""
         if not self.selected_games:
@@ -5157,13 +5271,18 @@ Licencia: Open Source
         # Mejora #4: Iniciar contador de tiempo
         self.progress_start_time = time.time()
         
-        self.apply_btn.configure(state="disabled", text="⏳ Instalando...")
+        # Mientras dura la instalación, el botón cancela (se detiene entre juegos
+        # o entre archivos, deshaciendo el juego en curso)
+        self.apply_btn.configure(text="⏹ Cancelar", command=self.cancel_install_task)
         
+        @profiled('install')
         def install_thread():
             success_count = 0
             fail_count = 0
+            cancelled = False
             total = len(self.selected_games)
             current = 0
+            scan_index = get_scan_index()
             
             # Mejora #3: Limpiar resultados anteriores
             self.last_operation_results = {
@@ -5174,12 +5293,13 @@ Licencia: Open Source
             
             for game_path in self.selected_games:
                 try:
+                    check_cancelled()
                     game_name, _, exe_name, _ = self.games_data[game_path]
                     current += 1
                     
                     # Mejora #2 y #4: Actualizar progreso con porcentaje y tiempo estimado
-                    self.after(0, lambda c=current, t=total, n=game_name: 
-                              self.update_progress(c, t, f"⚙️ Instalando {c}/{t}: {n[:30]}{'...' if len(n) > 30 else ''}", show_time=True))
+                    self.ui_post(lambda c=current, t=total, n=game_name: 
+                              self.update_progress(c, t, f"⚙️ Instalando {c}/{t}: {n[:30]}{'...' if len(n) > 30 else ''}", show_time=True), key='progress')
                     
                     # Obtener carpeta de OptiScaler
                     mod_source_dir = self.get_optiscaler_source_dir()
@@ -5213,6 +5333,8 @@ Licencia: Open Source
                             optiscaler_source_dir=mod_source_dir,
                             nukem_source_dir=nukem_source_dir,
                             target_dir=game_path,
+                            exe_name=exe_name,
+                            index=scan_index,
                             log_func=self.log,
                             spoof_dll_name=dll_name,
                             gpu_choice=gpu_choice,
@@ -5238,6 +5360,8 @@ Licencia: Open Source
                         result = inject_fsr_mod(
                             mod_source_dir=mod_source_dir,
                             target_dir=game_path,
+                            exe_name=exe_name,
+                            index=scan_index,
                             log_func=self.log,
                             spoof_dll_name=dll_name,
                             gpu_choice=gpu_choice,
@@ -5294,15 +5418,19 @@ Licencia: Open Source
                         # Mejora #3: Guardar en lista de exitosos
                         self.last_operation_results['success'].append(game_name)
                         # Mejora #5: Actualizar estado en tiempo real (re-detectar)
-                        self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "✅ OptiScaler (Upscaling)", "#00FF88", force=False))
+                        self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "✅ OptiScaler (Upscaling)", "#00FF88", force=False))
                     else:
                         fail_count += 1
                         self.log('ERROR', f"❌ {game_name}: Fallo en instalación")
                         # Mejora #3: Guardar en lista de fallidos
                         self.last_operation_results['failed'].append((game_name, "Fallo en instalación"))
                         # Mejora #5: Actualizar estado en tiempo real (forzar error, no re-detectar)
-                        self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "❌ Fallo", "#FF4444", force=True))
+                        self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "❌ Fallo", "#FF4444", force=True))
                         
+                except OperationCancelled:
+                    cancelled = True
+                    self.log('WARN', f"⏹ Instalación cancelada ({success_count}/{total} juegos instalados)")
+                    break
                 except Exception as e:
                     fail_count += 1
                     self.log('ERROR', f"❌ Error en {game_path}: {e}")
@@ -5310,13 +5438,20 @@ Licencia: Open Source
                     game_name = self.games_data.get(game_path, ("Juego desconocido", None, None, None))[0]
                     self.last_operation_results['failed'].append((game_name, str(e)))
                     # Actualizar UI con error (forzar, no re-detectar)
-                    self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "❌ Error", "#FF4444", force=True))
+                    self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "❌ Error", "#FF4444", force=True))
             
             # Mostrar resultado en la barra de estado
             def finish_install():
-                self.apply_btn.configure(state="normal", text="✓ APLICAR")
+                self.apply_btn.configure(state="normal", text="✓ APLICAR", command=self.apply_to_selected)
                 self.progress_bar.set(1.0)
-                if fail_count == 0:
+                if cancelled:
+                    self.set_progress_color("#FFA500")
+                    self.status_label.configure(
+                        text=f"⏹ Instalación cancelada: {success_count} de {total} juego(s) instalado(s) (clic para detalles)",
+                        text_color="#FFA500",
+                        cursor="hand2"
+                    )
+                elif fail_count == 0:
                     # Mejora #3: Color verde para éxito
                     self.set_progress_color("#00FF88")
                     self.status_label.configure(
@@ -5336,12 +5471,13 @@ Licencia: Open Source
                 # Mejora #9: Cambiar a modo compacto al terminar
                 self.after(1500, self.set_progress_mode_compact)
             
-            self.after(0, finish_install)
+            scan_index.save()
+            self.ui_post(finish_install)
             
-            # Rescanear para actualizar estados (silenciosamente)
-            self.after(1000, lambda: self.scan_games_action(silent=True))
+            # Rescanear para actualizar estados (silenciosamente); after() sólo desde el hilo de Tk
+            self.ui_post(lambda: self.after(1000, lambda: self.scan_games_action(silent=True)))
         
-        threading.Thread(target=install_thread, daemon=True).start()
+        self.install_task = self.task_runner.submit(install_thread, name='install', priority=Priority.INTERACTIVE)
         
     def remove_from_selected(self):
         """Elimina el mod de los juegos seleccionados."""
@@ -5370,11 +5506,13 @@ Licencia: Open Source
         # Mejora #4: Iniciar contador de tiempo
         self.progress_start_time = time.time()
         
-        self.remove_btn.configure(state="disabled", text="⏳ Desinstalando...")
+        self.remove_btn.configure(text="⏹ Cancelar", command=self.cancel_install_task)
         
+        @profiled('uninstall')
         def uninstall_thread():
             success_count = 0
             fail_count = 0
+            cancelled = False
             total = len(self.selected_games)
             current = 0
             
@@ -5387,12 +5525,13 @@ Licencia: Open Source
             
             for game_path in self.selected_games:
                 try:
+                    check_cancelled()
                     game_name, _, _, _ = self.games_data[game_path]
                     current += 1
                     
                     # Mejora #2 y #4: Actualizar progreso con porcentaje y tiempo estimado
-                    self.after(0, lambda c=current, t=total, n=game_name: 
-                              self.update_progress(c, t, f"🗑️ Desinstalando {c}/{t}: {n[:30]}{'...' if len(n) > 30 else ''}", show_time=True))
+                    self.ui_post(lambda c=current, t=total, n=game_name: 
+                              self.update_progress(c, t, f"🗑️ Desinstalando {c}/{t}: {n[:30]}{'...' if len(n) > 30 else ''}", show_time=True), key='progress')
                     
                     result = uninstall_fsr_mod(game_path, self.log)
                     
@@ -5405,15 +5544,19 @@ Licencia: Open Source
                         # Mejora #3: Guardar en lista de exitosos
                         self.last_operation_results['success'].append(game_name)
                         # Mejora #5: Actualizar estado en tiempo real (re-detectar)
-                        self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "⭕ Ausente", "#888888", force=False))
+                        self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "⭕ Ausente", "#888888", force=False))
                     else:
                         fail_count += 1
                         self.log('ERROR', f"❌ {game_name}: Fallo en desinstalación")
                         # Mejora #3: Guardar en lista de fallidos
                         self.last_operation_results['failed'].append((game_name, "Fallo en desinstalación"))
                         # Mejora #5: Actualizar estado en tiempo real (forzar error)
-                        self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "❌ Error desinst.", "#FF4444", force=True))
+                        self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "❌ Error desinst.", "#FF4444", force=True))
                         
+                except OperationCancelled:
+                    cancelled = True
+                    self.log('WARN', f"⏹ Desinstalación cancelada ({success_count}/{total} juegos)")
+                    break
                 except Exception as e:
                     fail_count += 1
                     self.log('ERROR', f"❌ Error en {game_path}: {e}")
@@ -5421,13 +5564,20 @@ Licencia: Open Source
                     game_name = self.games_data.get(game_path, ("Juego desconocido", None, None, None))[0]
                     self.last_operation_results['failed'].append((game_name, str(e)))
                     # Actualizar UI con error (forzar)
-                    self.after(0, lambda p=game_path: self.update_game_status_realtime(p, "❌ Error", "#FF4444", force=True))
+                    self.ui_post(lambda p=game_path: self.update_game_status_realtime(p, "❌ Error", "#FF4444", force=True))
             
             # Mostrar resultado en la barra de estado
             def finish_uninstall():
-                self.remove_btn.configure(state="normal", text="❌ ELIMINAR")
+                self.remove_btn.configure(state="normal", text="❌ ELIMINAR", command=self.remove_from_selected)
                 self.progress_bar.set(1.0)
-                if fail_count == 0:
+                if cancelled:
+                    self.set_progress_color("#FFA500")
+                    self.status_label.configure(
+                        text=f"⏹ Desinstalación cancelada: {success_count} de {total} juego(s) limpiado(s) (clic para detalles)",
+                        text_color="#FFA500",
+                        cursor="hand2"
+                    )
+                elif fail_count == 0:
                     # Mejora #3: Color verde para éxito
                     self.set_progress_color("#00FF88")
                     self.status_label.configure(
@@ -5447,12 +5597,12 @@ Licencia: Open Source
                 # Mejora #9: Cambiar a modo compacto al terminar
                 self.after(1500, self.set_progress_mode_compact)
             
-            self.after(0, finish_uninstall)
+            self.ui_post(finish_uninstall)
             
-            # Rescanear para actualizar estados (silenciosamente)
-            self.after(1000, lambda: self.scan_games_action(silent=True))
+            # Rescanear para actualizar estados (silenciosamente); after() sólo desde el hilo de Tk
+            self.ui_post(lambda: self.after(1000, lambda: self.scan_games_action(silent=True)))
         
-        threading.Thread(target=uninstall_thread, daemon=True).start()
+        self.install_task = self.task_runner.submit(uninstall_thread, name='uninstall', priority=Priority.INTERACTIVE)
     
     def open_selected_folders(self):
         """Abre las carpetas de los juegos seleccionados en el explorador."""
@@ -5514,11 +5664,12 @@ Licencia: Open Source
         self.manual_apply_btn.configure(state="disabled", text="⏳ Instalando...")
         
         def install_thread():
+            scan_index = get_scan_index()
             try:
                 # Obtener carpeta de OptiScaler
                 mod_source_dir = self.get_optiscaler_source_dir()
                 if not mod_source_dir:
-                    self.after(0, lambda: messagebox.showerror("Error", "No se encontró la carpeta de OptiScaler"))
+                    self.ui_post(lambda: messagebox.showerror("Error", "No se encontró la carpeta de OptiScaler"))
                     return
                 
                 # BUGFIX: Verificar si realmente necesita Nukem (solo si fg_mode == "FSR-FG (Nukem's DLSSG)")
@@ -5529,7 +5680,7 @@ Licencia: Open Source
                     # Obtener carpeta de Nukem/dlssg-to-fsr3
                     nukem_source_dir = self.get_nukem_source_dir()
                     if not nukem_source_dir:
-                        self.after(0, lambda: messagebox.showerror("Error", "No se encontró dlssg-to-fsr3.\nDescárgalo desde el panel de Ajustes."))
+                        self.ui_post(lambda: messagebox.showerror("Error", "No se encontró dlssg-to-fsr3.\nDescárgalo desde el panel de Ajustes."))
                         return
                     
                     # Obtener configuraciones del GUI
@@ -5545,6 +5696,7 @@ Licencia: Open Source
                         optiscaler_source_dir=mod_source_dir,
                         nukem_source_dir=nukem_source_dir,
                         target_dir=folder,
+                        index=scan_index,
                         log_func=self.log,
                         spoof_dll_name=dll_name,
                         gpu_choice=gpu_choice,
@@ -5570,6 +5722,7 @@ Licencia: Open Source
                     result = inject_fsr_mod(
                         mod_source_dir=mod_source_dir,
                         target_dir=folder,
+                        index=scan_index,
                         log_func=self.log,
                         spoof_dll_name=dll_name,
                         gpu_choice=gpu_choice,
@@ -5605,21 +5758,24 @@ Licencia: Open Source
                         overlay_font_size=self.overlay_font_size_var.get()
                     )
                 
+                scan_index.save()
                 if result:
-                    self.after(0, lambda: messagebox.showinfo("Éxito", "Mod instalado correctamente"))
+                    self.ui_post(lambda: messagebox.showinfo("Éxito", "Mod instalado correctamente"))
                     from ..core.scanner import check_mod_status
                     status = check_mod_status(folder)
-                    self.after(0, lambda: self.manual_status_var.set(f"Estado actual: {status}"))
+                    self.ui_post(lambda: self.manual_status_var.set(f"Estado actual: {status}"))
                 else:
-                    self.after(0, lambda: messagebox.showerror("Error", "Error al instalar el mod"))
+                    self.ui_post(lambda: messagebox.showerror("Error", "Error al instalar el mod"))
                     
+            except OperationCancelled:
+                self.log('WARN', "Instalación manual cancelada")
             except Exception as e:
                 self.log('ERROR', f"Error en instalación manual: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Error:\n{e}"))
+                self.ui_post(lambda: messagebox.showerror("Error", f"Error:\n{e}"))
             finally:
-                self.after(0, lambda: self.manual_apply_btn.configure(state="normal", text="✅ APLICAR MOD"))
+                self.ui_post(lambda: self.manual_apply_btn.configure(state="normal", text="✅ APLICAR MOD"))
         
-        threading.Thread(target=install_thread, daemon=True).start()
+        self.install_task = self.task_runner.submit(install_thread, name='install', priority=Priority.INTERACTIVE)
             
     def uninstall_manual(self):
         """Desinstala mod de la ruta manual."""
@@ -5641,18 +5797,18 @@ Licencia: Open Source
                 uninstall_optipatcher(folder, self.log)
                 
                 if result:
-                    self.after(0, lambda: messagebox.showinfo("Éxito", "Mod desinstalado correctamente"))
-                    self.after(0, lambda: self.manual_status_var.set("Estado actual: ❌ AUSENTE"))
+                    self.ui_post(lambda: messagebox.showinfo("Éxito", "Mod desinstalado correctamente"))
+                    self.ui_post(lambda: self.manual_status_var.set("Estado actual: ❌ AUSENTE"))
                 else:
-                    self.after(0, lambda: messagebox.showerror("Error", "Error al desinstalar"))
+                    self.ui_post(lambda: messagebox.showerror("Error", "Error al desinstalar"))
                     
             except Exception as e:
                 self.log('ERROR', f"Error en desinstalación manual: {e}")
-                self.after(0, lambda: messagebox.showerror("Error", f"Error:\n{e}"))
+                self.ui_post(lambda: messagebox.showerror("Error", f"Error:\n{e}"))
             finally:
-                self.after(0, lambda: self.manual_uninstall_btn.configure(state="normal", text="🗑️ DESINSTALAR"))
+                self.ui_post(lambda: self.manual_uninstall_btn.configure(state="normal", text="🗑️ DESINSTALAR"))
         
-        threading.Thread(target=uninstall_thread, daemon=True).start()
+        self.install_task = self.task_runner.submit(uninstall_thread, name='uninstall', priority=Priority.INTERACTIVE)
         
     def on_theme_changed(self, choice):
         """Cambia el tema de la aplicación."""
@@ -5822,6 +5978,88 @@ Licencia: Open Source
         self.config["log_to_file"] = self.log_to_file_var.get()
         save_config(self.config)
     
+    def _on_profiling_changed(self, *args):
+        """Callback cuando cambia el modo de perfilado."""
+        label = self.profiling_var.get()
+        mode = next((m for m, l in PROFILING_LABELS.items() if l == label), "off")
+        self.config["profiling_mode"] = mode
+        save_config(self.config)
+        set_profiling_mode(mode)
+        self.log('INFO', f"Perfilado: {label}")
+    
+    def _show_last_profile(self):
+        """Muestra el resumen del último perfil guardado en logs/profiles."""
+        window = ctk.CTkToplevel(self)
+        window.title("Último perfil")
+        window.geometry("900x600")
+        textbox = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Consolas", size=FONT_TINY), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        try:
+            textbox.insert("1.0", read_summary())
+        except Exception as e:
+            textbox.insert("1.0", f"No se pudo leer el perfil: {e}")
+        textbox.configure(state="disabled")
+        window.transient(self)
+    
+    def _export_metrics(self):
+        """Exporta las métricas de rendimiento (JSON + textfile de Prometheus) a APP_DIR."""
+        try:
+            json_path, prom_path = get_metrics().export(str(APP_DIR))
+            self.log('OK', f"Métricas exportadas: {json_path}, {prom_path}")
+            messagebox.showinfo("Métricas", f"Métricas exportadas en:\n{json_path}\n{prom_path}")
+        except Exception as e:
+            self.log('ERROR', f"Error al exportar métricas: {e}")
+            messagebox.showerror("Error", f"No se pudieron exportar las métricas:\n{e}")
+    
+    def _on_index_daemon_changed(self):
+        """Callback al activar/desactivar el servicio de índice."""
+        enabled = self.index_daemon_var.get()
+        self.config["index_daemon"] = enabled
+        save_config(self.config)
+        if enabled:
+            self.task_runner.submit(self._load_games_from_daemon, name='index-daemon', priority=Priority.BACKGROUND)
+            return
+        client, self.index_client = self.index_client, None
+        if client is not None:
+            try:
+                client.shutdown()
+                client.close()
+            except Exception:
+                pass
+        self.log('INFO', "Servicio de índice desactivado")
+    
+    def _load_games_from_daemon(self):
+        """Arranca (o reutiliza) el servicio de índice y muestra su lista de juegos."""
+        client = index_daemon.spawn_daemon()
+        if client is None:
+            self.log('WARN', "No se pudo iniciar el servicio de índice; se usará el escaneo normal")
+            return
+        self.index_client = client
+        try:
+            games_list = client.games()
+        except Exception as e:
+            self.log('WARN', f"Servicio de índice no disponible: {e}")
+            self.index_client = None
+            return
+        self.log('INFO', f"⚡ {len(games_list)} juegos cargados desde el servicio de índice")
+        self.ui_post(lambda: self.update_games_list(games_list, silent=True))
+    
+    def _scan_via_daemon(self, custom_folders):
+        """Re-escaneo en el servicio de índice; None si no está disponible."""
+        client = self.index_client
+        if client is None:
+            return None
+        try:
+            return client.scan(custom_folders)
+        except OperationCancelled:
+            # La conexión quedó cerrada; el servicio sigue activo, se vuelve a conectar
+            self.index_client = index_daemon.connect()
+            raise
+        except Exception as e:
+            self.log('WARN', f"Servicio de índice no disponible, escaneando localmente: {e}")
+            self.index_client = None
+            return None
+    
     def _on_optipatcher_changed(self, *args):
         """Callback cuando cambia el estado de OptiPatcher."""
         self.config["optipatcher_enabled"] = self.optipatcher_enabled_var.get()
@@ -5882,8 +6120,8 @@ Licencia: Open Source
                 releases = github_client.get_releases()
                 
                 if not releases:
-                    self.after(0, lambda: self._restore_button_state())
-                    self.after(0, lambda: messagebox.showinfo(
+                    self.ui_post(lambda: self._restore_button_state())
+                    self.ui_post(lambda: messagebox.showinfo(
                         "OptiPatcher",
                         "No se pudieron obtener las releases de GitHub.\n\n"
                         "Verifica tu conexión a internet."
@@ -5919,11 +6157,11 @@ Licencia: Open Source
                         
                         if remote_date > local_date:
                             # Hay actualización disponible
-                            self.after(0, lambda v=version, d=date_str: self._show_update_available(v, d))
+                            self.ui_post(lambda v=version, d=date_str: self._show_update_available(v, d))
                         else:
                             # Ya está actualizado
-                            self.after(0, lambda: self._restore_button_state())
-                            self.after(0, lambda v=version, d=date_str: messagebox.showinfo(
+                            self.ui_post(lambda: self._restore_button_state())
+                            self.ui_post(lambda v=version, d=date_str: messagebox.showinfo(
                                 "OptiPatcher",
                                 f"✅ Ya tienes la última versión\n\n"
                                 f"Versión: {v}\n"
@@ -5931,14 +6169,14 @@ Licencia: Open Source
                             ))
                     except:
                         # Si hay error comparando, ofrecer descargar
-                        self.after(0, lambda v=version, d=date_str: self._show_update_available(v, d))
+                        self.ui_post(lambda v=version, d=date_str: self._show_update_available(v, d))
                 else:
                     # No está descargado, cambiar botón a descargar
-                    self.after(0, lambda v=version, d=date_str: self._show_download_option(v, d))
+                    self.ui_post(lambda v=version, d=date_str: self._show_download_option(v, d))
                     
             except Exception as e:
-                self.after(0, lambda: self._restore_button_state())
-                self.after(0, lambda err=str(e): messagebox.showerror(
+                self.ui_post(lambda: self._restore_button_state())
+                self.ui_post(lambda err=str(e): messagebox.showerror(
                     "Error",
                     f"Error verificando actualizaciones:\n{err}"
                 ))
@@ -5946,9 +6184,8 @@ Licencia: Open Source
         # Mostrar que está verificando
         self.optipatcher_action_btn.configure(text="⏳ Verificando...", state="disabled")
         
-        # Ejecutar en thread
-        thread = threading.Thread(target=check_in_thread, daemon=True)
-        thread.start()
+        # Ejecutar en el pool de tareas (baja prioridad)
+        self.task_runner.submit(check_in_thread, name='optipatcher-check', priority=Priority.BACKGROUND)
     
     def _restore_button_state(self):
         """Restaura el botón a su estado inicial"""
@@ -6007,7 +6244,7 @@ Licencia: Open Source
             try:
                 from src.core.github import GitHubClient
                 
-                self.after(0, lambda: self.log("🔄 Descargando OptiPatcher..."))
+                self.ui_post(lambda: self.log("🔄 Descargando OptiPatcher..."))
                 
                 # Definir ruta de destino
                 optipatcher_dir = MOD_SOURCE_DIR / "OptiPatcher"
@@ -6017,27 +6254,27 @@ Licencia: Open Source
                 result = github_client.download_optipatcher(destination_path=str(optipatcher_asi))
                 
                 if result:
-                    self.after(0, lambda: self.log("✅ OptiPatcher descargado correctamente"))
-                    self.after(0, self.update_optipatcher_status)
-                    self.after(0, self._restore_button_state)
-                    self.after(0, lambda: messagebox.showinfo(
+                    self.ui_post(lambda: self.log("✅ OptiPatcher descargado correctamente"))
+                    self.ui_post(self.update_optipatcher_status)
+                    self.ui_post(self._restore_button_state)
+                    self.ui_post(lambda: messagebox.showinfo(
                         "Descarga completada",
                         "✅ OptiPatcher descargado correctamente\n\n"
                         "Se instalará automáticamente al instalar OptiScaler en tus juegos."
                     ))
                 else:
-                    self.after(0, lambda: self.log("❌ Error descargando OptiPatcher"))
-                    self.after(0, self._restore_button_state)
-                    self.after(0, lambda: messagebox.showerror(
+                    self.ui_post(lambda: self.log("❌ Error descargando OptiPatcher"))
+                    self.ui_post(self._restore_button_state)
+                    self.ui_post(lambda: messagebox.showerror(
                         "Error",
                         "No se pudo descargar OptiPatcher.\n\n"
                         "Puedes descargarlo manualmente desde GitHub."
                     ))
                     
             except Exception as e:
-                self.after(0, lambda: self.log(f"❌ Error: {str(e)}"))
-                self.after(0, self._restore_button_state)
-                self.after(0, lambda err=str(e): messagebox.showerror(
+                self.ui_post(lambda: self.log(f"❌ Error: {str(e)}"))
+                self.ui_post(self._restore_button_state)
+                self.ui_post(lambda err=str(e): messagebox.showerror(
                     "Error",
                     f"Error durante la descarga:\n{err}\n\n"
                     "Puedes descargar manualmente desde GitHub."
@@ -6047,8 +6284,7 @@ Licencia: Open Source
         self.optipatcher_action_btn.configure(text="⏳ Descargando...", state="disabled")
         
         # Ejecutar descarga
-        thread = threading.Thread(target=download_in_thread, daemon=True)
-        thread.start()
+        self.task_runner.submit(download_in_thread, name='optipatcher-download', priority=Priority.INTERACTIVE)
     
     def _open_logs_folder(self):
         """Abre la carpeta de logs en el explorador."""
@@ -6087,8 +6323,11 @@ Licencia: Open Source
             seven_days_ago = time.time() - (7 * 24 * 60 * 60)
             deleted_count = 0
             
-            # Buscar y eliminar archivos .log antiguos
-            for log_file in logs_dir.glob("*.log"):
+            # Buscar y eliminar logs antiguos (.log y segmentos rotados .log.gz)
+            active_log = Path(self.log_manager.log_file).resolve()
+            for log_file in [*logs_dir.glob("*.log"), *logs_dir.glob("*.log.gz")]:
+                if log_file.resolve() == active_log:
+                    continue
                 if log_file.stat().st_mtime < seven_days_ago:
                     log_file.unlink()
                     deleted_count += 1
@@ -6292,31 +6531,60 @@ Licencia: Open Source
         else:
             messagebox.showwarning("Carpeta no encontrada", f"La carpeta de mods no existe:\n{MOD_SOURCE_DIR}")
     
+    def cleanup_unused_versions(self):
+        """Busca versiones de OptiScaler que ningún juego usa y ofrece borrarlas (en segundo plano)."""
+        from ..core.version_gc import start_gc_job, run_gc
+        
+        def on_planned(plan, _freed):
+            self.ui_post(lambda: confirm(plan))
+        
+        def confirm(plan):
+            if plan.refused:
+                messagebox.showwarning("Limpieza de versiones", plan.refused)
+                return
+            if not plan.folders:
+                messagebox.showinfo("Sin versiones sin uso", "Todas las versiones descargadas están en uso o son recientes.")
+                return
+            mb = plan.reclaimable_bytes / (1024 * 1024)
+            if not messagebox.askyesno(
+                "Liberar espacio",
+                f"Se pueden eliminar {len(plan.folders)} versión(es) sin uso ({mb:.1f} MB):\n\n"
+                + "\n".join(plan.folders[:10])
+                + ("\n..." if len(plan.folders) > 10 else "")
+                + "\n\n¿Eliminar?"
+            ):
+                return
+            
+            def gc_thread():
+                run_gc(plan, self.log)
+                self.ui_post(self.update_version_combos)
+            
+            self.task_runner.submit(gc_thread, name='version-gc', priority=Priority.BACKGROUND)
+        
+        self.log('INFO', 'Analizando versiones de OptiScaler sin uso...')
+        start_gc_job(
+            self.log,
+            game_dirs=list(self.games_data.keys()) or None,
+            keep=[self.optiscaler_version_var.get().replace("[Custom] ", "")],
+            dry_run=True,
+            on_done=on_planned
+        )
+    
     def get_downloaded_optiscaler_versions(self):
         """Obtiene lista de versiones de OptiScaler descargadas.
         
         Returns:
             list: Lista de versiones disponibles
         """
-        import glob
-        
         if not os.path.exists(OPTISCALER_DIR):
             return ["Sin versiones descargadas"]
         
-        # Buscar carpetas de OptiScaler
-        optiscaler_folders = glob.glob(os.path.join(OPTISCALER_DIR, "OptiScaler*"))
+        # Carpetas del catálogo, ya ordenadas por versión (más reciente primero)
+        versions = get_version_catalog().folder_names()
         
-        if not optiscaler_folders:
+        if not versions:
             return ["Sin versiones descargadas"]
         
-        versions = []
-        for folder in optiscaler_folders:
-            folder_name = os.path.basename(folder)
-            versions.append(folder_name)
-        
-        # Ordenar por versión (más reciente primero)
-        versions.sort(reverse=True)
-        
         return versions
     
     def update_version_combos(self):
@@ -6501,6 +6769,69 @@ Licencia: Open Source
         webbrowser.open("https://www.nexusmods.com/site/mods/738")
         self.log("🔗 Abriendo Nexus Mods en el navegador...")
         
+    def show_skipped_folders(self):
+        """Lista las carpetas sin juego que el escáner ya no recorre (y cuánto costaban)."""
+        index = get_scan_index()
+        window = ctk.CTkToplevel(self)
+        window.title("🚫 Carpetas Omitidas")
+        window.geometry("800x500")
+        window.transient(self)
+        
+        ctk.CTkLabel(
+            window,
+            text="Carpetas sin .exe válido (herramientas, redistribuibles, descargas incompletas).\n"
+                 "No se vuelven a recorrer mientras no cambien; se muestra lo que tardaba cada una.",
+            font=ctk.CTkFont(size=FONT_NORMAL),
+            text_color="#AAAAAA"
+        ).pack(pady=(15, 10))
+        
+        list_scroll = ctk.CTkScrollableFrame(window, fg_color="#2b2b2b")
+        list_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        
+        def refresh():
+            for widget in list_scroll.winfo_children():
+                widget.destroy()
+            entries = index.skipped()
+            if not entries:
+                ctk.CTkLabel(
+                    list_scroll,
+                    text="✅ No hay carpetas omitidas",
+                    font=ctk.CTkFont(size=FONT_NORMAL),
+                    text_color="#666666"
+                ).pack(pady=20)
+            for entry in entries:
+                row = ctk.CTkFrame(list_scroll, fg_color="#1a1a1a", corner_radius=5)
+                row.pack(fill="x", pady=2, padx=5)
+                ctk.CTkLabel(
+                    row,
+                    text=f"{entry.get('cost_ms', 0):>8.1f} ms",
+                    width=90,
+                    font=ctk.CTkFont(family="Consolas", size=FONT_TINY),
+                    text_color="#FFA500"
+                ).pack(side="left", padx=(10, 5), pady=5)
+                ctk.CTkLabel(
+                    row,
+                    text=f"[{entry.get('platform') or '?'}] {entry['path']}",
+                    anchor="w",
+                    font=ctk.CTkFont(size=FONT_TINY)
+                ).pack(side="left", fill="x", expand=True, padx=5, pady=5)
+        
+        def recheck_all():
+            count = index.clear_skipped()
+            index.save()
+            self.log('INFO', f"{count} carpeta(s) omitida(s) se volverán a comprobar en el próximo escaneo")
+            refresh()
+        
+        ctk.CTkButton(
+            window,
+            text="🔄 Volver a comprobar todas en el próximo escaneo",
+            command=recheck_all,
+            height=35,
+            fg_color="#3a3a3a",
+            hover_color="#4a4a4a"
+        ).pack(pady=(0, 15))
+        refresh()
+    
     def manage_scan_folders(self):
         """Gestiona carpetas personalizadas de escaneo."""
         from tkinter import filedialog
@@ -6679,15 +7010,36 @@ Licencia: Open Source
         )
         cancel_btn.pack(side="left", padx=5, fill="x", expand=True)
         
+    def show_live_log(self):
+        """Ventana con el registro de la sesión, rellenada por lotes con after()."""
+        window = self._live_log_window
+        if window is not None and window.winfo_exists():
+            window.lift()
+            return
+        window = ctk.CTkToplevel(self)
+        window.title("Registro en vivo")
+        window.geometry("900x500")
+        textbox = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Consolas", size=FONT_TINY), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.auto_scroll = True
+        textbox.configure(state="disabled")
+        # El LogManager vacía su cola en el textbox cada UI_LOG_FLUSH_MS desde el hilo de Tk
+        self.log_manager.attach_textbox(textbox, after_func=self.after)
+        
+        def on_close():
+            self.log_manager.detach_textbox()
+            self._live_log_window = None
+            window.destroy()
+        
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        window.transient(self)
+        self._live_log_window = window
+    
     def save_log(self):
         """Guarda el log en un archivo."""
         from tkinter import filedialog
-        import shutil
         
         try:
-            # Obtener el archivo de log actual del LogManager
-            current_log_file = self.log_manager.logger.handlers[0].baseFilename
-            
             # Sugerir nombre de archivo con timestamp
             from datetime import datetime
             default_name = f"gestor_optiscaler_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
@@ -6701,8 +7053,8 @@ Licencia: Open Source
             )
             
             if save_path:
-                # Copiar el archivo de log
-                shutil.copy2(current_log_file, save_path)
+                # Log de esta sesión (incluye los segmentos ya rotados y comprimidos)
+                self.log_manager.export_session(save_path)
                 messagebox.showinfo("Éxito", f"Log guardado en:\n{save_path}")
                 self.log('OK', f"Log guardado en: {save_path}")
         except Exception as e:
@@ -6797,6 +7149,12 @@ Licencia: Open Source
         save_config(self.config)
         
         if messagebox.askokcancel("Salir", "¿Seguro que quieres salir?"):
+            # Cancelar tareas en segundo plano (espera breve para que limpien sus
+            # archivos parciales), detener la cola de la UI y volcar el log pendiente
+            self.task_runner.shutdown(cancel=True, timeout=2.0)
+            self.ui_queue.stop_pump()
+            self.log_manager.shutdown()
+            get_tracer().close()
             self.quit()
 
 
@@ -6966,15 +7324,15 @@ class DownloadWindow(ctk.CTkToplevel):
         def load_thread():
             try:
                 releases = self.github_client.get_releases(use_cache=False)
-                self.after(0, lambda: self.populate_releases(releases))
+                self.parent.ui_post(lambda: self.populate_releases(releases))
             except Exception as e:
-                self.after(0, lambda: messagebox.showerror(
+                self.parent.ui_post(lambda: messagebox.showerror(
                     "Error",
                     f"Error al cargar releases:\n{e}"
                 ))
-                self.after(0, lambda: self.progress_label.configure(text="Error al cargar releases"))
+                self.parent.ui_post(lambda: self.progress_label.configure(text="Error al cargar releases"))
         
-        threading.Thread(target=load_thread, daemon=True).start()
+        self.parent.task_runner.submit(load_thread, name='load-releases', priority=Priority.INTERACTIVE)
         
     def populate_releases(self, releases):
         """Puebla la lista de releases."""
@@ -7081,8 +7439,6 @@ class DownloadWindow(ctk.CTkToplevel):
         Returns:
             bool: True si está descargado
         """
-        import glob
-        
         # Para dlssg-to-fsr3, buscar carpeta con el tag
         if self.mod_type == "nukem":
             if not os.path.exists(DLSSG_TO_FSR3_DIR):
@@ -7099,21 +7455,9 @@ class DownloadWindow(ctk.CTkToplevel):
         # Para OptiScaler, buscar por tag o nombre
         if not os.path.exists(OPTISCALER_DIR):
             return False
-        # Buscar carpetas que contengan el tag (ej: "0.7.9" en "OptiScaler_0.7.9")
-        tag_clean = tag.replace('v', '').replace('V', '')
-        
-        patterns = [
-            os.path.join(OPTISCALER_DIR, f"*{tag_clean}*"),
-            os.path.join(OPTISCALER_DIR, f"*{tag}*"),
-        ]
-        
-        for pattern in patterns:
-            matches = glob.glob(pattern)
-            for match in matches:
-                if os.path.isdir(match):
-                    return True
-        
-        return False
+        # Buscar en el catálogo por tag (ej: "v0.7.9" -> "OptiScaler_0.7.9");
+        # path_for comprueba que la carpeta siga existiendo (y olvida la entrada si no)
+        return get_version_catalog().path_for(tag) is not None
         
     def select_release(self, release):
         """Selecciona un release para descargar."""
@@ -7142,22 +7486,26 @@ class DownloadWindow(ctk.CTkToplevel):
         
         def progress_callback(downloaded, total, complete, message):
             if complete:
-                self.after(0, lambda: self.progress_bar.set(1.0))
-                self.after(0, lambda: self.progress_label.configure(text=message))
+                self.parent.ui_post(lambda: self.progress_bar.set(1.0))
+                self.parent.ui_post(lambda: self.progress_label.configure(text=message))
                 # Recargar lista para mostrar botón de eliminar
-                self.after(1000, self.load_releases)
+                self.parent.ui_post(lambda: self.after(1000, self.load_releases))
             else:
                 progress = downloaded / total if total > 0 else 0
-                self.after(0, lambda: self.progress_bar.set(progress))
-                self.after(0, lambda: self.progress_label.configure(text=message or f"{progress:.1%}"))
+                # Un único redibujado por lote aunque lleguen cientos de chunks
+                def show_progress(p=progress, m=message):
+                    self.progress_bar.set(p)
+                    self.progress_label.configure(text=m or f"{p:.1%}")
+                self.parent.ui_post(show_progress, key='download_progress')
         
+        @profiled('download')
         def download_thread():
             try:
                 # Verificar y descargar 7-Zip si es necesario (solo para OptiScaler)
                 if self.mod_type == "optiscaler":
                     from ..core.installer import check_and_download_7zip
                     
-                    self.after(0, lambda: self.progress_label.configure(text="Verificando 7-Zip..."))
+                    self.parent.ui_post(lambda: self.progress_label.configure(text="Verificando 7-Zip..."))
                     
                     if not check_and_download_7zip(self.parent.log):
                         raise Exception("No se pudo obtener 7-Zip. La extracción podría fallar.")
@@ -7179,19 +7527,22 @@ class DownloadWindow(ctk.CTkToplevel):
                         progress_callback
                     )
                 
-                self.after(0, lambda: messagebox.showinfo(
+                self.parent.ui_post(lambda: messagebox.showinfo(
                     "Éxito",
                     f"{name} descargado correctamente"
                 ))
                 
+            except OperationCancelled:
+                # Ventana cerrada durante la descarga: los parciales ya se borraron
+                self.parent.log('WARN', f"Descarga de {name} cancelada")
             except Exception as e:
-                self.after(0, lambda: messagebox.showerror(
+                self.parent.ui_post(lambda: messagebox.showerror(
                     "Error",
                     f"Error durante la descarga:\n{e}"
                 ))
-                self.after(0, lambda: self.progress_label.configure(text="Error en descarga"))
+                self.parent.ui_post(lambda: self.progress_label.configure(text="Error en descarga"))
         
-        threading.Thread(target=download_thread, daemon=True).start()
+        self.download_task = self.parent.task_runner.submit(download_thread, name='download-release', priority=Priority.INTERACTIVE)
     
     def delete_release(self, release, name):
         """Elimina un release descargado.
@@ -7206,7 +7557,6 @@ class DownloadWindow(ctk.CTkToplevel):
         ):
             return
         
-        import glob
         import shutil
         
         tag = release.get('tag_name', '')
@@ -7225,22 +7575,19 @@ class DownloadWindow(ctk.CTkToplevel):
                 except Exception as e:
                     self.parent.log('ERROR', f"Error al eliminar {nukem_path}: {e}")
         else:
-            # Para OptiScaler, buscar por tag en OPTISCALER_DIR
-            patterns = [
-                os.path.join(OPTISCALER_DIR, f"*{tag_clean}*"),
-                os.path.join(OPTISCALER_DIR, f"*{tag}*"),
-            ]
-            
-            for pattern in patterns:
-                matches = glob.glob(pattern)
-                for match in matches:
-                    try:
-                        if os.path.isdir(match):
-                            shutil.rmtree(match)
-                            self.parent.log('OK', f"Eliminado: {match}")
-                            deleted = True
-                    except Exception as e:
-                        self.parent.log('ERROR', f"Error al eliminar {match}: {e}")
+            # Para OptiScaler, resolver la carpeta con el catálogo de versiones
+            catalog = get_version_catalog()
+            entry = catalog.find(tag)
+            if entry:
+                match = os.path.join(OPTISCALER_DIR, entry['folder'])
+                try:
+                    if os.path.isdir(match):
+                        shutil.rmtree(match)
+                        self.parent.log('OK', f"Eliminado: {match}")
+                        deleted = True
+                    catalog.unregister(entry['folder'])
+                except Exception as e:
+                    self.parent.log('ERROR', f"Error al eliminar {match}: {e}")
         
         if deleted:
             messagebox.showinfo("Éxito", f"{name} eliminado correctamente")
@@ -7251,6 +7598,10 @@ class DownloadWindow(ctk.CTkToplevel):
     
     def on_closing(self):
         """Maneja el cierre de la ventana y actualiza los combos de versión."""
+        # Cancelar la descarga en curso (no deja .7z parciales)
+        download_task = getattr(self, 'download_task', None)
+        if download_task and not download_task.done:
+            download_task.cancel()
         try:
             self.parent.log('INFO', 'Cerrando gestor de descargas, actualizando versiones...')
             # Actualizar los combos de versión en la ventana principal
@@ -7271,8 +7622,7 @@ class DownloadWindow(ctk.CTkToplevel):
 # ==================================================================================
 
 def check_app_updates_async(app_instance):
-    """Verifica actualizaciones en thread separado."""
-    import threading
+    """Verifica actualizaciones en una tarea de fondo."""
     from ..core.app_updater import check_for_updates
     
     def check_thread():
@@ -7282,12 +7632,11 @@ def check_app_updates_async(app_instance):
             if result:
                 latest_version, release_info = result
                 # Mostrar ventana de actualización en el hilo principal
-                app_instance.after(0, lambda: show_update_dialog(app_instance, latest_version, release_info))
+                app_instance.ui_post(lambda: show_update_dialog(app_instance, latest_version, release_info))
         except Exception as e:
             app_instance.log("ERROR", f"Error verificando actualizaciones de la app: {e}")
     
-    thread = threading.Thread(target=check_thread, daemon=True)
-    thread.start()
+    app_instance.task_runner.submit(check_thread, name='app-update-check', priority=Priority.BACKGROUND)
 
 
 def show_update_dialog(app_instance, latest_version: str, release_info: dict):
@@ -7311,7 +7660,6 @@ def show_update_dialog(app_instance, latest_version: str, release_info: dict):
 def download_and_install_app_update(app_instance, release_info: dict):
     """Descarga e instala la actualización de la aplicación."""
     from tkinter import messagebox
-    import threading
     from ..core.app_updater import download_and_install_update
     
     def download_thread():
@@ -7327,23 +7675,22 @@ def download_and_install_app_update(app_instance, release_info: dict):
             if success:
                 app_instance.log("OK", "Actualización descargada. Cerrando aplicación...")
                 # Cerrar la aplicación
-                app_instance.after(1000, lambda: app_instance.quit())
+                app_instance.ui_post(lambda: app_instance.after(1000, app_instance.quit))
             else:
-                app_instance.after(0, lambda: messagebox.showerror(
+                app_instance.ui_post(lambda: messagebox.showerror(
                     "Error",
                     "No se pudo descargar la actualización.\n\n"
                     "Puedes descargarla manualmente desde GitHub."
                 ))
         except Exception as e:
             app_instance.log("ERROR", f"Error durante la actualización: {e}")
-            app_instance.after(0, lambda: messagebox.showerror(
+            app_instance.ui_post(lambda: messagebox.showerror(
                 "Error",
                 f"Error durante la actualización:\n{str(e)}\n\n"
                 "Puedes descargar manualmente desde GitHub."
             ))
     
-    thread = threading.Thread(target=download_thread, daemon=True)
-    thread.start()
+    app_instance.task_runner.submit(download_thread, name='app-update-download', priority=Priority.INTERACTIVE)
 
 
 if __name__ == "__main__":
@@ -30,6 +30,11 @@ def main():
     # Inicializar estructura de directorios
     initialize_directories()
     
+    # Servicio de índice en segundo plano (lo lanza la GUI en el ejecutable compilado)
+    if '--index-daemon' in sys.argv[1:]:
+        from src.core.index_daemon import main as daemon_main
+        return daemon_main([a for a in sys.argv[1:] if a != '--index-daemon'])
+    
     # SKIP_ADMIN: Variable de entorno para omitir verificación (solo para desarrollo/debug)
     skip_admin_check = os.environ.get('SKIP_ADMIN_CHECK', '0') == '1'
     
@@ -53,6 +58,12 @@ def main():
         
         print("[DEBUG] Continuando con privilegios de administrador...")
     
+    # Modo de perfilado de Ajustes antes de crear la ventana, para que
+    # @profiled('startup') lo vea (la variable de entorno sigue teniendo prioridad)
+    from src.core.config_manager import load_config
+    from src.utils.profiling import set_profiling_mode
+    set_profiling_mode(load_config().get("profiling_mode", "off"))
+    
     # Iniciar aplicación
     try:
         from src.gui.gaming_app import GamingApp
@@ -32,6 +32,18 @@ class PathNotFoundError(FSRError):
     """Raised when a required path is not found."""
     pass
 
+class DeltaPatchError(FSRError):
+    """Raised when a binary delta cannot be applied or verified."""
+    pass
+
+class OperationCancelled(FSRError):
+    """Raised when a running operation is cancelled by the user."""
+    pass
+
+class IndexDaemonError(FSRError):
+    """Raised when the index daemon rejects or fails a request."""
+    pass
+
 def error_handler(logger: Optional[Callable] = None) -> Callable:
     """Decorator for handling errors in functions.
     
@@ -46,6 +58,9 @@ def error_handler(logger: Optional[Callable] = None) -> Callable:
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             try:
                 return func(*args, **kwargs)
+            except OperationCancelled:
+                # Cancelling is not an error: let the task runner see it
+                raise
             except FSRError as e:
                 # Handle known application errors
                 error_msg = str(e)
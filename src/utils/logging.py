@@ -1,25 +1,202 @@
-"""Logging utilities for FSR Injector."""
+"""Logging utilities for FSR Injector.
 
+Log calls from worker threads only enqueue records: a QueueListener thread
+writes the file/console log, and the UI textbox (if attached) is filled in
+batches by a periodic drainer that keeps only the last lines on screen.
+
+The file log is fsr_injector.log. It rotates by size (and on every launch)
+into fsr_injector.<timestamp>.log segments that are gzip-compressed in the
+background; the oldest segments are deleted to stay within a size budget.
+"""
+
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import shutil
+import threading
+from collections import deque
 from datetime import datetime
 from ..config.paths import LOG_DIR
 
+# Lines kept in the UI textbox and in the in-memory ring buffer
+UI_LOG_MAX_LINES = 2000
+# UI drain period (~30 fps) and maximum lines inserted per frame
+UI_LOG_FLUSH_MS = 33
+UI_LOG_BATCH = 500
+
+# File log rotation: segment size and budget for the whole log directory
+LOG_BASENAME = "fsr_injector"
+LOG_SEGMENT_MAX_BYTES = 5 * 1024 * 1024
+LOG_TOTAL_MAX_BYTES = 50 * 1024 * 1024
+
+
+def _segment_regex(base_filename):
+    """Rotated segments of base_filename (plus the per-launch logs of older versions)."""
+    root, ext = os.path.splitext(os.path.basename(base_filename))
+    return re.compile(re.escape(root) + r'[._]\d{8}_\d{6}(?:_\d+)?' + re.escape(ext) + r'(?:\.gz)?$')
+
+
+def _open_segment(path):
+    """Open a (possibly gzip-compressed) log file for text reading."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def _tail_file(path, n, block_size=64 * 1024):
+    """Last n lines of a plain text file, reading backwards from the end."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode('utf-8', errors='replace').splitlines()[-n:] if n else []
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotating file handler that gzips rotated segments in the background.
+    
+    Rotated segments get a timestamp (no renaming chain), so compression and
+    budget enforcement never race with a later rollover.
+    """
+    
+    def __init__(self, filename, max_bytes=LOG_SEGMENT_MAX_BYTES, total_max_bytes=LOG_TOTAL_MAX_BYTES,
+                 encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, encoding=encoding)
+        self.total_max_bytes = total_max_bytes
+        self._segment_re = _segment_regex(self.baseFilename)
+        self._compress_lock = threading.Lock()
+        self._compressors = []
+        self.session_segments = []
+        self.rollover_error = None   # last OSError of a rollover that kept the current file
+    
+    def _segment_path(self):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        root, ext = os.path.splitext(self.baseFilename)
+        return f"{root}.{stamp}{ext}"
+    
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        try:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                segment = self._segment_path()
+                os.replace(self.baseFilename, segment)
+                self.session_segments.append(segment + '.gz')
+                self.compress_async(segment)
+        except OSError as e:
+            # File held by another instance or an antivirus scan (Windows):
+            # keep appending to the current file instead of failing
+            self.rollover_error = e
+        if not self.delay:
+            self.stream = self._open()
+    
+    def compress_async(self, path):
+        """Compress a rotated segment on a background thread."""
+        worker = threading.Thread(target=self._compress, args=(path,), daemon=True,
+                                  name="log-compress")
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [worker]
+        worker.start()
+    
+    def _compress(self, path):
+        with self._compress_lock:
+            try:
+                tmp = path + '.gz.tmp'
+                with open(path, 'rb') as src, gzip.open(tmp, 'wb', compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp, path + '.gz')
+                os.remove(path)
+            except OSError:
+                # Retried on next launch by sweep_segments()
+                return
+            self.enforce_budget()
+    
+    def segments(self):
+        """Rotated segment paths, oldest first."""
+        log_dir = os.path.dirname(self.baseFilename)
+        found = []
+        for name in os.listdir(log_dir):
+            if self._segment_re.match(name):
+                path = os.path.join(log_dir, name)
+                try:
+                    found.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        return [path for _, path in sorted(found)]
+    
+    def sweep_segments(self):
+        """Compress segments left uncompressed (older versions, interrupted runs)."""
+        for path in self.segments():
+            if not path.endswith('.gz') and not os.path.exists(path + '.gz'):
+                self.compress_async(path)
+        self.enforce_budget()
+    
+    def enforce_budget(self):
+        """Delete the oldest compressed segments while the directory exceeds the budget."""
+        if not self.total_max_bytes:
+            return
+        segments = [p for p in self.segments() if p.endswith('.gz')]
+        sizes = {}
+        for path in segments:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        try:
+            total = sum(sizes.values()) + os.path.getsize(self.baseFilename)
+        except OSError:
+            total = sum(sizes.values())
+        for path in segments:
+            if total <= self.total_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= sizes[path]
+            except OSError:
+                continue
+    
+    def wait_compression(self, timeout=None):
+        for worker in list(self._compressors):
+            worker.join(timeout)
+
+
 class LogManager:
     """Manages logging operations for FSR Injector."""
     
-    def __init__(self, log_dir=None):
+    def __init__(self, log_dir=None, max_segment_bytes=LOG_SEGMENT_MAX_BYTES,
+                 max_total_bytes=LOG_TOTAL_MAX_BYTES):
         """Initialize the log manager.
         
         Args:
             log_dir (str): Directory to store log files. If None, uses LOG_DIR from paths.py
+            max_segment_bytes (int): Size at which the active log file is rotated
+            max_total_bytes (int): Budget for the active file plus compressed segments
         """
         self.log_dir = str(log_dir) if log_dir else str(LOG_DIR)
         os.makedirs(self.log_dir, exist_ok=True)
         
-        # Configure file handler
-        log_file = os.path.join(self.log_dir, f"fsr_injector_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # Configure file handler: each launch starts a fresh active file
+        log_file = os.path.join(self.log_dir, f"{LOG_BASENAME}.log")
+        self.log_file = log_file
+        file_handler = CompressingRotatingFileHandler(log_file, max_segment_bytes, max_total_bytes)
+        file_handler.doRollover()
+        file_handler.session_segments.clear()
+        startup_warnings = []
+        if file_handler.rollover_error is not None:
+            startup_warnings.append(f"Could not rotate {log_file}, appending to it: {file_handler.rollover_error}")
+        try:
+            file_handler.sweep_segments()
+        except OSError as e:
+            startup_warnings.append(f"Could not sweep old log segments: {e}")
+        self._file_handler = file_handler
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(file_formatter)
@@ -30,11 +207,26 @@ class LogManager:
         console_formatter = logging.Formatter('%(levelname)s: %(message)s')
         console_handler.setFormatter(console_formatter)
         
-        # Configure root logger
+        # Configure root logger: producers only enqueue, the listener thread does the I/O
+        self._log_queue = queue.Queue()
+        self._listener = logging.handlers.QueueListener(
+            self._log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._listener.start()
         self.logger = logging.getLogger('fsr_injector')
         self.logger.setLevel(logging.DEBUG)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self._queue_handler = logging.handlers.QueueHandler(self._log_queue)
+        self.logger.addHandler(self._queue_handler)
+        for warning in startup_warnings:
+            self.logger.warning(warning)
+        
+        # UI side: pending lines for the textbox and a capped history of recent lines
+        self.ui_max_lines = UI_LOG_MAX_LINES
+        self._ui_pending = deque(maxlen=UI_LOG_MAX_LINES)
+        self.recent = deque(maxlen=UI_LOG_MAX_LINES)
+        self._ui_lock = threading.Lock()
+        self._textbox = None
+        self._flush_after_id = None
         
         # Map log levels to colors/prefixes for UI
         self.ui_log_config = {
@@ -46,12 +238,15 @@ class LogManager:
         }
 
     def log_to_ui(self, log_type, message, textbox=None):
-        """Log a message to both the logger and UI textbox if provided.
+        """Log a message to both the logger and the UI textbox.
+        
+        Safe to call from any thread: the record is only queued here. The
+        textbox is updated by flush_ui() on the Tk thread.
         
         Args:
             log_type (str): Type of log message ('INFO', 'WARN', 'ERROR', etc.)
             message (str): The message to log
-            textbox (CTkTextbox, optional): CustomTkinter textbox to display the message
+            textbox (CTkTextbox, optional): Textbox to attach if none is attached yet
         """
         # Map UI log types to logging levels
         level_map = {
@@ -66,87 +261,190 @@ class LogManager:
         level = level_map.get(log_type, logging.INFO)
         self.logger.log(level, message)
         
-        # Log to UI if textbox provided
-        if textbox:
+        # Queue for the UI (old lines drop off)
+        with self._ui_lock:
+            self.recent.append((log_type, message))
+            self._ui_pending.append((log_type, message))
+        if textbox is not None and self._textbox is None:
+            self.attach_textbox(textbox)
+    
+    def attach_textbox(self, textbox, after_func=None, interval_ms=UI_LOG_FLUSH_MS, max_lines=UI_LOG_MAX_LINES):
+        """Show the log in a textbox, drained in batches every interval_ms.
+        
+        Must be called from the Tk thread. The recent history (up to
+        max_lines) is shown on the first flush, also when re-attaching.
+        
+        Args:
+            textbox (CTkTextbox): Textbox to fill
+            after_func (callable, optional): Tk after() to schedule the drainer (default: textbox.after)
+            interval_ms (int): Drain period in milliseconds
+            max_lines (int): Lines kept in the widget; older ones are deleted
+        """
+        self.detach_textbox()
+        with self._ui_lock:
+            self._ui_pending = deque(self.recent, maxlen=UI_LOG_MAX_LINES)
+        self._textbox = textbox
+        self.ui_max_lines = max_lines
+        self._after = after_func or textbox.after
+        self._interval_ms = interval_ms
+        # Tags are configured once, not per message
+        for log_type, (color, _) in self.ui_log_config.items():
             try:
-                color, prefix = self.ui_log_config.get(log_type, ('white', ''))
-                textbox.configure(state="normal")
-                textbox.insert("end", prefix, log_type)
                 textbox.tag_config(log_type, foreground=color)
-                textbox.insert("end", f"{message}\n")
-                textbox.configure(state="disabled")
-                
-                # Scroll to end if auto-scroll is enabled
-                if hasattr(textbox, 'auto_scroll') and textbox.auto_scroll:
-                    textbox.see("end")
-            except Exception as e:
-                self.logger.error(f"Failed to log to UI: {e}")
-                
-    def archive_old_logs(self, max_age_days=30):
-        """Archive log files older than specified days.
+            except Exception:
+                pass
+        self._schedule_flush()
+    
+    def detach_textbox(self):
+        """Stop draining into the attached textbox (Tk thread only)."""
+        textbox, after_id = self._textbox, self._flush_after_id
+        self._textbox = None
+        self._flush_after_id = None
+        if textbox is not None and after_id is not None:
+            try:
+                textbox.after_cancel(after_id)
+            except Exception:
+                pass
+    
+    def _schedule_flush(self):
+        if self._textbox is None:
+            return
+        try:
+            self._flush_after_id = self._after(self._interval_ms, self._flush_tick)
+        except Exception:
+            # The widget was destroyed
+            self.detach_textbox()
+    
+    def _flush_tick(self):
+        self.flush_ui()
+        self._schedule_flush()
+    
+    def flush_ui(self, max_items=UI_LOG_BATCH):
+        """Insert up to max_items pending lines into the textbox (Tk thread only).
         
-        Args:
-            max_age_days (int): Maximum age of logs in days before archiving
+        Returns:
+            int: Number of lines inserted
         """
+        textbox = self._textbox
+        if textbox is None or not self._ui_pending:
+            return 0
+        batch = []
+        while self._ui_pending and len(batch) < max_items:
+            try:
+                batch.append(self._ui_pending.popleft())
+            except IndexError:
+                break
         try:
-            now = datetime.now()
-            archive_dir = os.path.join(self.log_dir, "archive")
-            os.makedirs(archive_dir, exist_ok=True)
+            textbox.configure(state="normal")
+            for log_type, message in batch:
+                _, prefix = self.ui_log_config.get(log_type, ('white', ''))
+                textbox.insert("end", prefix, log_type)
+                textbox.insert("end", f"{message}\n")
+            # Keep only the last ui_max_lines lines in the widget
+            line_count = int(textbox.index("end-1c").split('.')[0]) - 1
+            excess = line_count - self.ui_max_lines
+            if excess > 0:
+                textbox.delete("1.0", f"{excess + 1}.0")
+            textbox.configure(state="disabled")
             
-            for file in os.listdir(self.log_dir):
-                if not file.endswith(".log"):
-                    continue
-                    
-                file_path = os.path.join(self.log_dir, file)
-                file_date = datetime.fromtimestamp(os.path.getmtime(file_path))
-                age_days = (now - file_date).days
-                
-                if age_days > max_age_days:
-                    archive_path = os.path.join(archive_dir, file)
-                    os.rename(file_path, archive_path)
-                    self.logger.info(f"Archived old log file: {file}")
+            # Scroll to end if auto-scroll is enabled
+            if hasattr(textbox, 'auto_scroll') and textbox.auto_scroll:
+                textbox.see("end")
         except Exception as e:
-            self.logger.error(f"Failed to archive old logs: {e}")
-            
-    def cleanup_archives(self, max_archive_size_mb=100):
-        """Clean up archived logs if total size exceeds limit.
+            self.logger.error(f"Failed to log to UI: {e}")
+        return len(batch)
+    
+    def recent_lines(self, max_count=None):
+        """Most recent (log_type, message) pairs kept in memory, oldest first."""
+        lines = list(self.recent)
+        return lines[-max_count:] if max_count else lines
+    
+    def flush(self):
+        """Block until every queued record has been written to the log file."""
+        self._log_queue.join()
+        for handler in self._listener.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+    
+    def shutdown(self):
+        """Flush pending records and stop the writer thread."""
+        self.detach_textbox()
+        self.logger.removeHandler(self._queue_handler)
+        try:
+            self._listener.stop()
+        except Exception:
+            pass
+        for handler in self._listener.handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass
+        self._file_handler.wait_compression(timeout=5)
+    
+    # ------------------------------------------------------------------
+    # Reading the file log (active file + compressed segments)
+    # ------------------------------------------------------------------
+    def log_files(self):
+        """Every log file, newest first: the active file, then rotated segments."""
+        return [self.log_file] + list(reversed(self._file_handler.segments()))
+    
+    def tail(self, n=200):
+        """Last n lines of the file log, oldest first (spans rotated segments)."""
+        self.flush()
+        lines = []
+        for path in self.log_files():
+            try:
+                if path == self.log_file:
+                    chunk = _tail_file(path, n - len(lines))
+                else:
+                    # Compressed segments are read sequentially; keep only the end
+                    with _open_segment(path) as f:
+                        chunk = list(deque((line.rstrip('\n') for line in f), maxlen=n - len(lines)))
+            except OSError:
+                continue
+            lines = chunk + lines
+            if len(lines) >= n:
+                break
+        return lines[-n:] if n else []
+    
+    def search(self, pattern, max_results=100, ignore_case=True):
+        """Find lines matching a regex in the active file and every segment.
         
-        Args:
-            max_archive_size_mb (int): Maximum size of archive directory in MB
+        Returns:
+            list: (file name, line) tuples, newest first
         """
-        try:
-            archive_dir = os.path.join(self.log_dir, "archive")
-            if not os.path.exists(archive_dir):
-                return
-                
-            # Get all log files with their sizes and dates
-            log_files = []
-            total_size = 0
-            for file in os.listdir(archive_dir):
-                if file.endswith(".log"):
-                    file_path = os.path.join(archive_dir, file)
-                    size = os.path.getsize(file_path)
-                    date = os.path.getmtime(file_path)
-                    log_files.append((file_path, size, date))
-                    total_size += size
-            
-            # Convert to MB
-            total_size_mb = total_size / (1024 * 1024)
-            
-            if total_size_mb > max_archive_size_mb:
-                # Sort by date (oldest first)
-                log_files.sort(key=lambda x: x[2])
+        self.flush()
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        results = []
+        for path in self.log_files():
+            try:
+                with _open_segment(path) as f:
+                    matches = [line.rstrip('\n') for line in f if regex.search(line)]
+            except (OSError, EOFError):
+                continue
+            name = os.path.basename(path)
+            for line in reversed(matches):
+                results.append((name, line))
+                if len(results) >= max_results:
+                    return results
+        return results
+    
+    def export_session(self, dest_path):
+        """Write this session's log (rotated segments + active file) to dest_path."""
+        self.flush()
+        self._file_handler.wait_compression()
+        with open(dest_path, 'w', encoding='utf-8') as out:
+            for path in self._file_handler.session_segments + [self.log_file]:
+                if not os.path.exists(path) and path.endswith('.gz'):
+                    path = path[:-3]  # compression failed: segment still plain
+                try:
+                    with _open_segment(path) as f:
+                        shutil.copyfileobj(f, out)
+                except OSError:
+                    continue
                 
-                # Delete oldest files until under limit
-                for file_path, size, _ in log_files:
-                    os.remove(file_path)
-                    total_size_mb -= size / (1024 * 1024)
-                    self.logger.info(f"Deleted old archive: {os.path.basename(file_path)}")
-                    if total_size_mb <= max_archive_size_mb:
-                        break
-        except Exception as e:
-            self.logger.error(f"Failed to clean up archives: {e}")
-            
     def get_recent_errors(self, max_count=10):
         """Get the most recent error messages from the current log file.
         
@@ -157,14 +455,7 @@ class LogManager:
             list: List of recent error messages
         """
         try:
-            errors = []
-            with open(self.logger.handlers[0].baseFilename, 'r', encoding='utf-8') as f:
-                for line in reversed(list(f)):
-                    if 'ERROR' in line:
-                        errors.append(line.strip())
-                        if len(errors) >= max_count:
-                            break
-            return errors
+            return [line.strip() for _, line in self.search(' - ERROR - ', max_count, ignore_case=False)]
         except Exception as e:
             self.logger.error(f"Failed to retrieve recent errors: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""In-process performance metrics: counters, gauges and histograms.
+
+Usage:
+    metrics = get_metrics()
+    metrics.counter('scan_games_total', 'Games found by the scanner').inc(platform='Steam')
+    metrics.histogram('extract_seconds', 'Archive extraction time').observe(3.2)
+    with metrics.timer('install_seconds', 'Install time per game'):
+        ...
+
+Metrics only live in memory; export() writes them on demand to APP_DIR as
+    metrics.json  JSON snapshot (with app version / platform info)
+    metrics.prom  Prometheus textfile (node_exporter textfile collector format)
+so runs can be compared across app versions and machines.
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+METRICS_PREFIX = "optiscaler_"
+JSON_FILENAME = "metrics.json"
+PROMETHEUS_FILENAME = "metrics.prom"
+
+# Seconds: from a cached scan (ms) to a slow download / extraction (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+THROUGHPUT_BUCKETS = tuple(mb * 1024 * 1024 for mb in (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100))
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 500, 1000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str = '') -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def samples(self) -> Dict[LabelKey, Any]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic total (per label set)."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str = '') -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """Current value (per label set), e.g. a queue depth."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str = '') -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets (+ count / sum / max)."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = {'count': 0, 'sum': 0.0, 'max': value,
+                                            'buckets': [0] * len(self.buckets)}
+            data['count'] += 1
+            data['sum'] += value
+            data['max'] = max(data['max'], value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data['buckets'][i] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            return self._values.get(_label_key(labels), {}).get('count', 0)
+
+    def samples(self) -> Dict[LabelKey, Dict[str, Any]]:
+        with self._lock:
+            return {k: dict(v, buckets=list(v['buckets'])) for k, v in self._values.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Named metrics of the application; metrics are created on first use."""
+
+    def __init__(self, prefix: str = METRICS_PREFIX) -> None:
+        self.prefix = prefix
+        self.info: Dict[str, str] = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'frozen': str(bool(getattr(sys, 'frozen', False))).lower(),
+        }
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def _get(self, cls, name: str, help_text: str, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = '') -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = '', **labels: Any) -> Iterator[None]:
+        """Observe the duration (seconds) of the enclosed block, even if it raises."""
+        histogram = self.histogram(name, help_text)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started, **labels)
+
+    def set_info(self, **info: Any) -> None:
+        """Static labels attached to every export (e.g. app_version)."""
+        self.info.update({k: str(v) for k, v in info.items()})
+
+    def reset(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+        self._started = time.time()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view of all metrics."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        result: Dict[str, Any] = {
+            'timestamp': time.time(),
+            'since': self._started,
+            'info': dict(self.info),
+            'metrics': {},
+        }
+        for metric in metrics:
+            samples = []
+            for key, value in metric.samples().items():
+                sample: Dict[str, Any] = {'labels': dict(key)}
+                if metric.kind == 'histogram':
+                    sample.update(count=value['count'], sum=value['sum'], max=value['max'],
+                                  buckets=dict(zip(map(str, metric.buckets), value['buckets'])))
+                else:
+                    sample['value'] = value
+                samples.append(sample)
+            result['metrics'][metric.name] = {'type': metric.kind, 'help': metric.help, 'samples': samples}
+        return result
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = [f"# HELP {self.prefix}info Application and machine information",
+                 f"# TYPE {self.prefix}info gauge",
+                 f"{self.prefix}info{_format_labels(_label_key(self.info))} 1"]
+        for metric in metrics:
+            name = self.prefix + metric.name
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(metric.samples().items()):
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                for bound, count in zip(metric.buckets, value['buckets']):
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(float(bound))))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory: Optional[str] = None) -> Tuple[str, str]:
+        """Write metrics.json and metrics.prom (atomically) into directory (default APP_DIR).
+
+        Returns:
+            (json_path, prometheus_path)
+        """
+        if directory is None:
+            from ..config.paths import APP_DIR
+            directory = str(APP_DIR)
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, JSON_FILENAME)
+        prom_path = os.path.join(directory, PROMETHEUS_FILENAME)
+        for path, text in ((json_path, json.dumps(self.snapshot(), indent=1, ensure_ascii=False)),
+                           (prom_path, self.to_prometheus())):
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(text)
+            os.replace(tmp, path)
+        return json_path, prom_path
+
+
+def timed(name: str, help_text: str = '', **labels: Any) -> Callable:
+    """Decorator: observe each call's duration in the shared histogram `name`."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(name, help_text, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Shared registry of the application."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+__all__ = [
+    'Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'get_metrics', 'timed',
+    'DEFAULT_BUCKETS', 'THROUGHPUT_BUCKETS', 'COUNT_BUCKETS'
+]
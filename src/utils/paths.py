@@ -3,7 +3,10 @@
 import os
 import sys
 import glob
-import winreg
+try:
+    import winreg
+except ImportError:  # winreg sólo existe en Windows
+    winreg = None
 import ctypes
 from typing import List, Tuple, Optional
 from ..config.paths import (
@@ -39,6 +42,33 @@ def get_script_base_path() -> str:
     except Exception:
         return os.path.abspath(".")
 
+def get_app_executable() -> Optional[str]:
+    """Get the path of the shipped executable.
+
+    Nuitka onefile unpacks itself to a temp folder and runs from there, so
+    sys.executable points at that temporary copy (and sys.frozen is not set
+    reliably). The shipped .exe is sys.argv[0], which lives in
+    NUITKA_ONEFILE_DIRECTORY when that variable is set.
+
+    Returns:
+        Path of the .exe, or None when running from source
+    """
+    if 'NUITKA_ONEFILE_PARENT' in os.environ or 'NUITKA_ONEFILE_DIRECTORY' in os.environ:
+        argv0 = sys.argv[0] if sys.argv and sys.argv[0] else ''
+        if not argv0:
+            return None
+        directory = os.environ.get('NUITKA_ONEFILE_DIRECTORY')
+        candidates = [os.path.abspath(argv0)]
+        if directory:
+            candidates.append(os.path.join(directory, os.path.basename(argv0)))
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+    if getattr(sys, 'frozen', False) or '__compiled__' in globals():
+        return sys.executable
+    return None
+
 def get_steam_paths() -> List[str]:
     """Get Steam library paths.
     
@@ -0,0 +1,263 @@
+"""Opt-in profiling of long operations (cProfile + optional tracemalloc).
+
+Enable it with the OPTISCALER_PROFILE environment variable or the
+'profiling_mode' setting:
+    cpu      -> cProfile (process-wide on Python 3.12+, so one operation at a time)
+    mem      -> tracemalloc snapshot (allocations of the whole process)
+    cpu,mem  -> both
+
+Each profiled operation writes into LOG_DIR/profiles:
+    <name>_<timestamp>.prof      cProfile stats (snakeviz / pstats)
+    <name>_<timestamp>.snapshot  tracemalloc snapshot
+    <name>_<timestamp>.txt       summary (top functions / allocations)
+
+Viewer:
+    python -m src.utils.profiling [file.prof|file.snapshot|dir] [limit]
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Iterator, List, Optional, Set
+
+PROFILE_ENV_VAR = "OPTISCALER_PROFILE"
+PROFILE_DIRNAME = "profiles"
+PROFILE_KEEP = 20           # most recent operations kept on disk
+SUMMARY_LIMIT = 30          # lines per section in the summary
+TRACEMALLOC_FRAMES = 10
+
+_mode: Set[str] = set()
+_local = threading.local()
+# cProfile can only be enabled once per process on 3.12+ (sys.monitoring):
+# concurrent operations run unprofiled while another one holds the CPU profiler
+_cpu_lock = threading.Lock()
+_cpu_warned = False
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def parse_mode(value: Optional[str]) -> Set[str]:
+    """'cpu', 'mem', 'cpu,mem', '1'/'on' (cpu) or ''/'off' -> set of modes."""
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'off', 'false', 'no'):
+        return set()
+    if value in ('1', 'on', 'true', 'yes'):
+        return {'cpu'}
+    return {part for part in value.replace('+', ',').split(',') if part.strip() in ('cpu', 'mem')}
+
+
+def set_profiling_mode(value: Optional[str]) -> None:
+    """Set the mode from the settings (the environment variable still wins)."""
+    global _mode
+    _mode = parse_mode(value)
+
+
+def get_profiling_mode() -> Set[str]:
+    env = os.environ.get(PROFILE_ENV_VAR)
+    return parse_mode(env) if env is not None else set(_mode)
+
+
+def profiles_dir(log_dir: Optional[str] = None) -> str:
+    if log_dir is None:
+        from ..config.paths import LOG_DIR
+        log_dir = str(LOG_DIR)
+    return os.path.join(str(log_dir), PROFILE_DIRNAME)
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> Optional[tracemalloc.Snapshot]:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_users = max(0, _tracemalloc_users - 1)
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return snapshot
+
+
+def _prune(directory: str, keep: Optional[int] = None) -> None:
+    """Keep only the files of the `keep` most recent operations."""
+    keep = PROFILE_KEEP if keep is None else keep
+    groups = {}
+    for name in os.listdir(directory):
+        stem, _ = os.path.splitext(name)
+        path = os.path.join(directory, name)
+        groups.setdefault(stem, []).append(path)
+    ordered = sorted(groups.items(), key=lambda kv: max(os.path.getmtime(p) for p in kv[1]), reverse=True)
+    for _, paths in ordered[keep:]:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _start_cpu_profiler() -> Optional[cProfile.Profile]:
+    """Enabled profiler holding _cpu_lock, or None if profiling is busy/unavailable."""
+    global _cpu_warned
+    if not _cpu_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except (ValueError, RuntimeError) as e:
+        # Another profiling tool (debugger, coverage, an outside cProfile) is active
+        _cpu_lock.release()
+        if not _cpu_warned:
+            _cpu_warned = True
+            logging.getLogger('fsr_injector').warning(f"CPU profiling unavailable, running unprofiled: {e}")
+        return None
+    return profiler
+
+
+@contextmanager
+def profile_operation(name: str, log_dir: Optional[str] = None) -> Iterator[Optional[str]]:
+    """Profile the enclosed block if profiling is enabled.
+
+    Nested operations in the same thread are folded into the outer one; an
+    operation that starts while another one holds the CPU profiler runs
+    without CPU profiling. Profiling never makes the operation fail.
+
+    Yields:
+        Output path prefix (without extension), or None when disabled
+    """
+    mode = get_profiling_mode()
+    if not mode or getattr(_local, 'active', False):
+        yield None
+        return
+
+    directory = profiles_dir(log_dir)
+    os.makedirs(directory, exist_ok=True)
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+    prefix = os.path.join(directory, f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+
+    profiler = _start_cpu_profiler() if 'cpu' in mode else None
+    if profiler is None and 'mem' not in mode:
+        yield None
+        return
+    if 'mem' in mode:
+        _start_tracemalloc()
+    _local.active = True
+    started = time.perf_counter()
+    try:
+        yield prefix
+    finally:
+        if profiler:
+            profiler.disable()
+            _cpu_lock.release()
+        elapsed = time.perf_counter() - started
+        _local.active = False
+        snapshot = _stop_tracemalloc() if 'mem' in mode else None
+        try:
+            if profiler:
+                profiler.dump_stats(prefix + '.prof')
+            if snapshot is not None:
+                snapshot.dump(prefix + '.snapshot')
+            with open(prefix + '.txt', 'w', encoding='utf-8') as f:
+                f.write(f"Operation: {name}\nDuration: {elapsed:.3f} s\nMode: {','.join(sorted(mode))}\n\n")
+                if profiler:
+                    f.write(summarize_profile(prefix + '.prof'))
+                if snapshot is not None:
+                    f.write(summarize_snapshot(snapshot))
+            _prune(directory)
+        except Exception:
+            # Profiling must never break the profiled operation
+            pass
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """Decorator version of profile_operation (default name: the function's)."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_operation(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize_profile(path: str, limit: int = SUMMARY_LIMIT) -> str:
+    """Top functions by cumulative and by own time of a .prof file."""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out).strip_dirs()
+    out.write("== Top by cumulative time ==\n")
+    stats.sort_stats('cumulative').print_stats(limit)
+    out.write("== Top by own time ==\n")
+    stats.sort_stats('tottime').print_stats(limit)
+    return out.getvalue()
+
+
+def summarize_snapshot(snapshot, limit: int = SUMMARY_LIMIT) -> str:
+    """Top allocation sites of a tracemalloc snapshot (object or .snapshot path)."""
+    if isinstance(snapshot, str):
+        snapshot = tracemalloc.Snapshot.load(snapshot)
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    stats = snapshot.statistics('lineno')
+    total = sum(stat.size for stat in stats)
+    lines = [f"== Top allocations (total {total / 1024 / 1024:.1f} MB) =="]
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+    return '\n'.join(lines) + '\n'
+
+
+def list_profiles(log_dir: Optional[str] = None) -> List[str]:
+    """Summary files (.txt) of the profiled operations, newest first."""
+    directory = profiles_dir(log_dir)
+    if not os.path.isdir(directory):
+        return []
+    paths = [os.path.join(directory, n) for n in os.listdir(directory) if n.endswith('.txt')]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def read_summary(path: Optional[str] = None, limit: int = SUMMARY_LIMIT) -> str:
+    """Summary of a profile file or directory (default: the latest operation)."""
+    if path is None or os.path.isdir(path):
+        summaries = list_profiles(os.path.dirname(path) if path else None)
+        if not summaries:
+            return "No profiles recorded yet."
+        path = summaries[0]
+    if path.endswith('.prof'):
+        return summarize_profile(path, limit)
+    if path.endswith('.snapshot'):
+        return summarize_snapshot(path, limit)
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+__all__ = [
+    'PROFILE_ENV_VAR', 'parse_mode', 'set_profiling_mode', 'get_profiling_mode',
+    'profile_operation', 'profiled', 'summarize_profile', 'summarize_snapshot',
+    'list_profiles', 'read_summary', 'profiles_dir'
+]
+
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    path = argv[0] if argv else None
+    limit = int(argv[1]) if len(argv) > 1 else SUMMARY_LIMIT
+    print(read_summary(path, limit))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
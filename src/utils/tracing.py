@@ -0,0 +1,223 @@
+"""Lightweight tracing: nested, timed spans written as JSON lines.
+
+Usage:
+    with span('scan.library', platform='Steam', path=base_dir) as s:
+        ...
+        s.set(games=len(found))
+
+    @traced('extract')
+    def extract(...): ...
+
+Each finished span is one JSON line in LOG_DIR/fsr_injector.trace.jsonl
+(next to the regular log, rotated and compressed the same way):
+    {"ts": ..., "name": ..., "trace": ..., "span": ..., "parent": ...,
+     "ms": ..., "status": "ok|error|cancelled", "thread": ..., "attrs": {...}}
+
+Spans nest per thread; a span started in another thread is a new root.
+"""
+
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from .error_handling import OperationCancelled
+from .logging import CompressingRotatingFileHandler
+
+TRACE_FILENAME = "fsr_injector.trace.jsonl"
+TRACE_SEGMENT_MAX_BYTES = 2 * 1024 * 1024
+TRACE_TOTAL_MAX_BYTES = 10 * 1024 * 1024
+
+_local = threading.local()
+_ids = itertools.count(1)
+
+
+def _new_id() -> str:
+    return f"{os.getpid():x}-{next(_ids):x}"
+
+
+def _stack() -> list:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Span:
+    """A timed operation with key/value attributes."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any], parent: Optional["Span"]) -> None:
+        self.name = name
+        self.attrs = dict(attrs)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = 'ok'
+
+    def set(self, **attrs: Any) -> "Span":
+        self.attrs.update(attrs)
+        return self
+
+    def end(self, status: Optional[str] = None) -> None:
+        """Finish the span and emit it (only the first call counts)."""
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+        if status:
+            self.status = status
+        stack = _stack()
+        if self in stack:
+            # Also closes children that were left open (early return without end())
+            del stack[stack.index(self):]
+        get_tracer().emit(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ts': round(self.start, 3),
+            'name': self.name,
+            'trace': self.trace_id,
+            'span': self.span_id,
+            'parent': self.parent_id,
+            'ms': round(self.duration_ms or 0.0, 3),
+            'status': self.status,
+            'thread': threading.current_thread().name,
+            'attrs': self.attrs,
+        }
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.end()
+        elif issubclass(exc_type, OperationCancelled):
+            self.end('cancelled')
+        else:
+            self.attrs.setdefault('error', str(exc))
+            self.end('error')
+        return False
+
+
+class Tracer:
+    """Writes finished spans as JSON lines through a background queue listener."""
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True) -> None:
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+
+    def _ensure_sink(self) -> logging.Logger:
+        with self._lock:
+            if self._logger is None:
+                if self.path is None:
+                    from ..config.paths import LOG_DIR
+                    self.path = os.path.join(str(LOG_DIR), TRACE_FILENAME)
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                handler = CompressingRotatingFileHandler(
+                    self.path, TRACE_SEGMENT_MAX_BYTES, TRACE_TOTAL_MAX_BYTES
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._listener = logging.handlers.QueueListener(self._queue, handler)
+                self._listener.start()
+                logger = logging.getLogger(f"fsr_injector.trace.{id(self)}")
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                logger.addHandler(logging.handlers.QueueHandler(self._queue))
+                self._logger = logger
+            return self._logger
+
+    def emit(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._ensure_sink().info(json.dumps(span.to_dict(), default=str, ensure_ascii=False))
+        except Exception:
+            # Tracing must never break the traced operation
+            pass
+
+    def flush(self) -> None:
+        if self._listener is not None:
+            self._queue.join()
+            for handler in self._listener.handlers:
+                handler.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+                    handler.wait_compression(timeout=5)
+                self._listener = None
+            if self._logger is not None:
+                self._logger.handlers.clear()
+                self._logger = None
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def configure_tracing(path: Optional[str] = None, enabled: bool = True) -> Tracer:
+    """Replace the global tracer (e.g. to write elsewhere or to disable tracing)."""
+    global _tracer
+    with _tracer_lock:
+        old, _tracer = _tracer, Tracer(path, enabled)
+    if old is not None:
+        old.close()
+    return _tracer
+
+
+def start_span(name: str, **attrs: Any) -> Span:
+    """Start a span as a child of the current one; finish it with end() or `with`."""
+    stack = _stack()
+    new_span = Span(name, attrs, stack[-1] if stack else None)
+    stack.append(new_span)
+    return new_span
+
+
+span = start_span
+
+
+def current_span() -> Optional[Span]:
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def traced(name: Optional[str] = None, **attrs: Any) -> Callable:
+    """Decorator: run the function inside a span (default name: the function's)."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name, **attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+__all__ = [
+    'Span', 'Tracer', 'span', 'start_span', 'current_span', 'traced',
+    'get_tracer', 'configure_tracing', 'TRACE_FILENAME'
+]
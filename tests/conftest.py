@@ -0,0 +1,26 @@
+"""Shared fixtures: keep tests away from the real application folders."""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import paths
+from src.core import archive_cache, scan_index
+from src.utils.tracing import configure_tracing
+
+
+@pytest.fixture(autouse=True)
+def isolated_app_dirs(tmp_path_factory, monkeypatch):
+    """Disable tracing and point CACHE_DIR and the scan index at a temp folder."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(paths, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(archive_cache, "ARCHIVE_CACHE_DIR", cache_dir / "archives")
+    monkeypatch.setattr(scan_index, "SCAN_INDEX_FILE", cache_dir / "scan_index.json")
+    monkeypatch.setattr(scan_index, "_index", None)
+    configure_tracing(enabled=False)
+    yield cache_dir
+    configure_tracing(enabled=False)
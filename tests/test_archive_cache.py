@@ -0,0 +1,59 @@
+"""Tests for the bounded LRU archive cache."""
+
+import os
+import sys
+import hashlib
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.archive_cache import ArchiveCache
+
+
+def make_archive(tmp_path, name: str, payload: bytes):
+    path = tmp_path / name
+    path.write_bytes(payload)
+    asset = {
+        'id': abs(hash(name)) % 100000,
+        'name': name,
+        'size': len(payload),
+        'digest': 'sha256:' + hashlib.sha256(payload).hexdigest(),
+    }
+    return path, asset
+
+
+def test_store_then_lookup_reuses_archive(tmp_path):
+    cache = ArchiveCache(root=tmp_path / 'cache', max_bytes=1024)
+    path, asset = make_archive(tmp_path, 'OptiScaler_1.7z', b'x' * 100)
+
+    stored = cache.store(asset, path)
+
+    assert stored is not None and not path.exists()
+    assert cache.lookup(asset) == stored
+    assert cache.total_size() == 100
+
+
+def test_digest_mismatch_is_not_cached(tmp_path):
+    cache = ArchiveCache(root=tmp_path / 'cache', max_bytes=1024)
+    path, asset = make_archive(tmp_path, 'OptiScaler_1.7z', b'x' * 100)
+    asset['digest'] = 'sha256:' + '0' * 64
+
+    assert cache.store(asset, path) is None
+    assert path.exists()
+    assert cache.lookup(asset) is None
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = ArchiveCache(root=tmp_path / 'cache', max_bytes=250)
+    path_a, asset_a = make_archive(tmp_path, 'a.7z', b'a' * 100)
+    path_b, asset_b = make_archive(tmp_path, 'b.7z', b'b' * 100)
+    path_c, asset_c = make_archive(tmp_path, 'c.7z', b'c' * 100)
+
+    cache.store(asset_a, path_a)
+    cache.store(asset_b, path_b)
+    cache.lookup(asset_a)  # 'a' pasa a ser el más reciente
+    cache.store(asset_c, path_c)
+
+    assert cache.lookup(asset_b) is None
+    assert cache.lookup(asset_a) is not None
+    assert cache.lookup(asset_c) is not None
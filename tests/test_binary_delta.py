@@ -0,0 +1,133 @@
+"""Tests for the pure-Python binary delta used by the app self-update."""
+
+import os
+import sys
+import random
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.binary_delta import make_delta, apply_delta, read_delta_header, HEADER
+from src.core.app_updater import _find_delta_asset, _try_delta_update
+from src.utils.error_handling import DeltaPatchError
+from src.utils.paths import get_app_executable
+
+
+def synthetic_binaries(size=256 * 1024, seed=1234):
+    """Viejo aleatorio y nuevo con cambios puntuales, inserciones y borrados."""
+    rng = random.Random(seed)
+    old = bytes(rng.getrandbits(8) for _ in range(size))
+    new = bytearray(old)
+    new[1000:1010] = b'PATCHED!!!'
+    new[50_000:50_000] = b'inserted section ' * 40
+    del new[120_000:121_500]
+    new += b'appended resources' * 100
+    return old, bytes(new)
+
+
+def test_roundtrip_and_delta_is_small(tmp_path):
+    old, new = synthetic_binaries()
+    old_path = tmp_path / 'app_old.exe'
+    old_path.write_bytes(old)
+
+    delta = make_delta(old, new)
+    out = tmp_path / 'app_new.exe'
+    sha = apply_delta(old_path, delta, out)
+
+    assert out.read_bytes() == new
+    assert sha == read_delta_header(delta)[3]
+    assert len(delta) < len(new) // 20
+
+
+def test_matches_after_unrelated_data_are_still_found(tmp_path):
+    old, _ = synthetic_binaries()
+    fresh = random.Random(99).randbytes(1024 * 1024)
+    new = fresh + old[7:]  # odd shift, far past the byte-by-byte window
+    old_path = tmp_path / 'app_old.exe'
+    old_path.write_bytes(old)
+
+    delta = make_delta(old, new)
+    assert len(delta) < len(fresh) + len(old) // 20
+    apply_delta(old_path, delta, tmp_path / 'app_new.exe')
+    assert (tmp_path / 'app_new.exe').read_bytes() == new
+
+
+def test_wrong_base_is_rejected(tmp_path):
+    old, new = synthetic_binaries()
+    other = tmp_path / 'other.exe'
+    other.write_bytes(old[::-1])
+
+    with pytest.raises(DeltaPatchError):
+        apply_delta(other, make_delta(old, new), tmp_path / 'out.exe')
+    assert not (tmp_path / 'out.exe').exists()
+
+
+def test_corrupted_delta_is_rejected_and_cleaned(tmp_path):
+    old, new = synthetic_binaries()
+    old_path = tmp_path / 'app_old.exe'
+    old_path.write_bytes(old)
+    delta = bytearray(make_delta(old, new))
+    delta[HEADER.size - 1] ^= 0xFF  # sha256 esperado del resultado
+
+    with pytest.raises(DeltaPatchError):
+        apply_delta(old_path, bytes(delta), tmp_path / 'out.exe')
+    assert not (tmp_path / 'out.exe').exists()
+
+
+def test_find_delta_asset_matches_versions():
+    assets = [
+        {'name': 'Gestor.exe'},
+        {'name': 'Gestor-2.4.1-to-2.5.0.delta'},
+        {'name': 'Gestor-2.4.2-to-2.5.0.delta'},
+    ]
+    assert _find_delta_asset(assets, '2.4.2', '2.5.0')['name'] == 'Gestor-2.4.2-to-2.5.0.delta'
+    assert _find_delta_asset(assets, '2.3.0', '2.5.0') is None
+
+
+def test_delta_update_falls_back_on_digest_mismatch(tmp_path, monkeypatch):
+    old, new = synthetic_binaries(size=32 * 1024)
+    current = tmp_path / 'Gestor.exe'
+    current.write_bytes(old)
+    delta = make_delta(old, new)
+
+    class Response:
+        content = delta
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr('src.core.app_updater.requests.get', lambda *a, **k: Response())
+    target = tmp_path / 'Gestor_new.exe'
+    delta_asset = {'name': 'Gestor-1-to-2.delta', 'browser_download_url': 'x'}
+
+    ok = _try_delta_update(delta_asset, {'digest': 'sha256:' + '0' * 64}, str(current), str(target))
+    assert not ok and not target.exists()
+
+    ok = _try_delta_update(delta_asset, {}, str(current), str(target))
+    assert ok and target.read_bytes() == new
+
+
+def test_onefile_resolves_the_shipped_exe_not_the_temp_copy(tmp_path, monkeypatch):
+    shipped = tmp_path / 'dist' / 'Gestor.exe'
+    shipped.parent.mkdir()
+    shipped.write_bytes(b'MZ')
+    temp_copy = tmp_path / 'onefile_1234' / 'Gestor.exe'
+    monkeypatch.setattr(sys, 'executable', str(temp_copy))
+    monkeypatch.setattr(sys, 'frozen', True, raising=False)
+    monkeypatch.setenv('NUITKA_ONEFILE_PARENT', '1234')
+    monkeypatch.setattr(sys, 'argv', [str(shipped)])
+    assert get_app_executable() == str(shipped)
+
+    # argv[0] without a folder: look next to NUITKA_ONEFILE_DIRECTORY
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('NUITKA_ONEFILE_DIRECTORY', str(shipped.parent))
+    monkeypatch.setattr(sys, 'argv', ['Gestor.exe'])
+    assert get_app_executable() == str(shipped)
+
+    monkeypatch.delenv('NUITKA_ONEFILE_PARENT')
+    monkeypatch.delenv('NUITKA_ONEFILE_DIRECTORY')
+    assert get_app_executable() == str(temp_copy)
+    monkeypatch.delattr(sys, 'frozen')
+    assert get_app_executable() is None
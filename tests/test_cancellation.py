@@ -0,0 +1,72 @@
+"""Tests for cooperative cancellation of downloads, scans and installs."""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.installer import inject_fsr_mod
+from src.core.platform_probe import FixtureProbe
+from src.core.tasks import CancellationToken, TaskRunner, current_task, write_chunks
+from src.utils.error_handling import OperationCancelled
+
+
+def test_write_chunks_cancel_keeps_previous_file(tmp_path):
+    dest = tmp_path / "OptiPatcher.asi"
+    dest.write_bytes(b"old")
+    token = CancellationToken()
+
+    def chunks():
+        yield b"new-1"
+        token.cancel()
+        yield b"new-2"
+
+    with pytest.raises(OperationCancelled):
+        write_chunks(chunks(), dest, token=token)
+    assert dest.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["OptiPatcher.asi"]
+
+    assert write_chunks([b"ab", b"", b"cd"], dest) == 4
+    assert dest.read_bytes() == b"abcd"
+
+
+def test_cancelled_scan_keeps_previous_cache(tmp_path, monkeypatch):
+    probe = FixtureProbe(folders={"xbox_games": str(tmp_path / "no-xbox")})
+    (tmp_path / "GameA").mkdir()
+    previous = [("old", "[CUSTOM] Old", "ok", "old.exe", "Custom")]
+    monkeypatch.setattr(scanner, "_scan_cache", previous)
+
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        scanner.scan_games(lambda level, msg: None, [str(tmp_path)], use_cache=False, token=token,
+                            probe=probe)
+    assert scanner.get_scan_cache() == previous
+
+
+def test_cancelled_install_rolls_back_current_game(tmp_path):
+    source = tmp_path / "OptiScaler_1.0"
+    source.mkdir()
+    for name in ("OptiScaler.dll", "a.dll", "b.dll", "c.dll"):
+        (source / name).write_bytes(b"mod")
+    game = tmp_path / "Game"
+    game.mkdir()
+    (game / "a.dll").write_bytes(b"original")
+
+    def log(level, msg):
+        # Cancel as soon as the first file has been copied
+        if "Copiando archivo" in msg:
+            current_task().cancel()
+
+    runner = TaskRunner(max_workers=1)
+    handle = runner.submit(inject_fsr_mod, str(source), str(game), log)
+    assert handle.wait(5)
+    runner.shutdown()
+
+    assert isinstance(handle.error, OperationCancelled)
+    assert sorted(os.listdir(game)) == ["a.dll"]
+    assert (game / "a.dll").read_bytes() == b"original"
@@ -0,0 +1,60 @@
+"""Tests for the headless JSON-lines CLI (python -m src.cli)."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(argv):
+    stream = io.StringIO()
+    code = cli.main(argv, stream=stream)
+    return code, [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_scan_emits_games_and_result(tmp_path):
+    game = tmp_path / "lib" / "GameA"
+    game.mkdir(parents=True)
+    (game / "GameA.exe").write_bytes(b"MZ")
+    code, events = _run(["--config", str(tmp_path / "cfg.json"), "--no-daemon", "scan", "--folder", str(tmp_path / "lib")])
+    assert code == cli.EXIT_OK
+    games = [e for e in events if e["event"] == "game"]
+    assert [g["name"] for g in games] == ["[CUSTOM] GameA"]
+    assert games[0]["platform"] == "Custom"
+    assert events[-1]["event"] == "result" and events[-1]["games"] == 1
+
+
+def test_install_and_uninstall_roundtrip(tmp_path):
+    source = tmp_path / "OptiScaler_1.0"
+    source.mkdir()
+    for name in ("OptiScaler.dll", "OptiScaler.ini", "libxess.dll"):
+        (source / name).write_bytes(b"mod")
+    game = tmp_path / "Game"
+    game.mkdir()
+    config = ["--config", str(tmp_path / "cfg.json"), "--no-daemon"]
+
+    code, events = _run(config + ["install", str(game), "--source", str(source), "--dll", "dxgi.dll"])
+    assert code == cli.EXIT_OK, events
+    assert events[-1]["installed"] == [str(game)]
+    assert (game / "dxgi.dll").exists()
+
+    code, events = _run(config + ["uninstall", str(game), str(tmp_path / "missing")])
+    assert code == cli.EXIT_FAILED
+    assert not (game / "dxgi.dll").exists()
+    assert events[-1]["uninstalled"] == [str(game)]
+    assert events[-1]["failed"] == [str(tmp_path / "missing")]
+
+
+def test_cli_does_not_import_gui_modules():
+    code = ("import sys, src.cli; "
+            "print([m for m in sys.modules if m.startswith(('src.gui', 'customtkinter', 'pygame', 'PIL'))])")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
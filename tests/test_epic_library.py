@@ -0,0 +1,73 @@
+"""Tests for Epic launcher manifests and the cached registry fallback."""
+
+import json
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.epic_library import read_epic_manifests
+from src.core.platform_probe import FixtureProbe
+from src.core.scan_index import ScanIndex
+
+UNINSTALL = r"HKLM\SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+
+
+def _noop(level, msg):
+    pass
+
+
+def _item(manifests, app_name, location, launch, **extra):
+    manifests.mkdir(parents=True, exist_ok=True)
+    data = {"AppName": app_name, "MainGameAppName": app_name, "DisplayName": app_name,
+            "InstallLocation": str(location), "LaunchExecutable": launch,
+            "AppVersionString": "1.0", "AppCategories": ["public", "games", "applications"]}
+    data.update(extra)
+    (manifests / f"{app_name}.item").write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_manifests_resolve_unreal_launcher_and_skip_non_games(tmp_path):
+    game = tmp_path / "Games" / "Ember"
+    shipping = game / "Ember" / "Binaries" / "Win64"
+    shipping.mkdir(parents=True)
+    (game / "Ember.exe").write_bytes(b"MZ")
+    (shipping / "Ember-Win64-Shipping.exe").write_bytes(b"MZ")
+    manifests = tmp_path / "Manifests"
+    _item(manifests, "Ember", game, "Ember.exe")
+    _item(manifests, "EmberDLC", game, "Ember.exe", MainGameAppName="Ember", AppCategories=["addons"])
+    _item(manifests, "UE_5.3", tmp_path / "UE", "Engine/Binaries/Win64/UnrealEditor.exe", AppCategories=["engines"])
+    _item(manifests, "Half", tmp_path / "Half", "Half.exe", bIsIncompleteInstall=True)
+    (manifests / "broken.item").write_text("{", encoding="utf-8")
+
+    apps = {app.app_name: app for app in read_epic_manifests(str(manifests))}
+    assert set(apps) == {"Ember", "EmberDLC", "UE_5.3", "Half"}
+    assert [name for name, app in apps.items() if app.is_game] == ["Ember"]
+    assert apps["Ember"].resolve_executable() == (str(shipping), "Ember-Win64-Shipping.exe")
+
+    probe = FixtureProbe(registry={}, folders={"epic_manifests": str(manifests),
+                                               "xbox_games": str(tmp_path / "no-xbox")})
+    games = scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=ScanIndex(tmp_path / "idx.json"))
+    assert [(g[0], g[1], g[3]) for g in games] == [(str(shipping), "[EPIC] Ember", "Ember-Win64-Shipping.exe")]
+
+
+def test_registry_fallback_is_cached_until_subkeys_change(tmp_path):
+    game = tmp_path / "Epic Games" / "Rift"
+    game.mkdir(parents=True)
+    registry = {f"{UNINSTALL}\\App{i}": {"Publisher": "Vendor", "InstallLocation": "C:\\Apps"} for i in range(20)}
+    registry[f"{UNINSTALL}\\Rift"] = {"Publisher": "Epic Games, Inc.", "InstallLocation": str(game)}
+    probe = FixtureProbe(registry=registry, folders={"epic_manifests": str(tmp_path / "missing")})
+    reads = []
+    read_value = probe.read_value
+    probe.read_value = lambda *args: reads.append(args) or read_value(*args)
+    index = ScanIndex(tmp_path / "idx.json")
+
+    assert scanner.get_dynamic_epic_paths(_noop, probe, index) == [str(game)]
+    assert len(reads) == 22
+    assert scanner.get_dynamic_epic_paths(_noop, probe, index) == [str(game)]
+    assert len(reads) == 22
+
+    probe.set_key(f"{UNINSTALL}\\NewApp", {"Publisher": "Vendor"})
+    scanner.get_dynamic_epic_paths(_noop, probe, index)
+    assert len(reads) > 22
@@ -0,0 +1,79 @@
+"""Tests for the data-driven executable search rules."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.exe_rules import ExeRules, get_exe_rules
+
+
+def _noop(level, msg):
+    pass
+
+
+def _touch(path, size=1):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"M" * size)
+
+
+def test_blacklist_is_case_insensitive_and_anchored():
+    rules = get_exe_rules()
+    assert rules.is_blacklisted("UnityCrashHandler64.exe")
+    assert rules.is_blacklisted("EasyAntiCheat_EOS_Setup.exe")
+    assert rules.is_blacklisted("Origin.exe")
+    assert not rules.is_blacklisted("ACOrigins.exe")
+
+
+def test_engine_layouts_resolve_without_walking(tmp_path):
+    unity = tmp_path / "Valley"
+    _touch(unity / "UnityPlayer.dll")
+    _touch(unity / "UnityCrashHandler64.exe", 50)
+    _touch(unity / "Valley.exe", 5)
+    (unity / "Valley_Data").mkdir()
+    assert scanner.find_executable_path(str(unity), _noop) == (str(unity), "Valley.exe")
+
+    unreal = tmp_path / "Rift"
+    _touch(unreal / "Rift.exe")
+    _touch(unreal / "Engine" / "Binaries" / "Win64" / "CrashReportClient.exe", 50)
+    _touch(unreal / "Rift" / "Binaries" / "Win64" / "Rift-Win64-Shipping.exe", 5)
+    assert scanner.find_executable_path(str(unreal), _noop) == (
+        str(unreal / "Rift" / "Binaries" / "Win64"), "Rift-Win64-Shipping.exe")
+
+
+def test_walk_stops_at_final_match_and_honours_depth_overrides(tmp_path, monkeypatch):
+    rules = ExeRules.from_dict({
+        "max_depth": 4,
+        "patterns": [{"regex": "-shipping\\.exe$", "final": True}, {"regex": ""}],
+        "prune_dirs": ["redist"],
+        "depth_overrides": [{"folder": "shallow*", "max_depth": 1}],
+    })
+    game = tmp_path / "Deep"
+    _touch(game / "a" / "Game-Shipping.exe")
+    _touch(game / "a" / "b" / "c" / "Other.exe", 100)
+    _touch(game / "Redist" / "Huge-Shipping.exe", 100)
+    visited = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: visited.append(os.path.relpath(p, game)) or real_scandir(p))
+    assert scanner.find_executable_path(str(game), _noop, rules=rules) == (str(game / "a"), "Game-Shipping.exe")
+    # Level order: the root, then "a" (pruned "Redist" never listed); "a/b" is never reached
+    assert visited == [".", "a"]
+
+    shallow = tmp_path / "ShallowGame"
+    _touch(shallow / "x" / "y" / "Game.exe")
+    assert scanner.find_executable_path(str(shallow), _noop, rules=rules)[1] is None
+
+
+def test_lower_final_match_does_not_stop_a_deeper_better_one(tmp_path):
+    rules = ExeRules.from_dict({
+        "patterns": [{"regex": "-wingdk-shipping\\.exe$", "final": True},
+                     {"regex": "-win64-shipping\\.exe$", "final": True}, {"regex": ""}],
+    })
+    assert rules.is_final(0) and not rules.is_final(1) and not rules.is_final(2)
+    game = tmp_path / "Dual"
+    _touch(game / "Win64" / "Game-Win64-Shipping.exe", 100)
+    _touch(game / "Gaming" / "WinGDK" / "Game-WinGDK-Shipping.exe")
+    assert scanner.find_executable_path(str(game), _noop, rules=rules) == (
+        str(game / "Gaming" / "WinGDK"), "Game-WinGDK-Shipping.exe")
@@ -0,0 +1,115 @@
+"""Tests for the warm-index daemon (server, client and library watcher)."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.index_daemon import IndexDaemon, LibraryIndex, connect
+from src.core.platform_probe import FixtureProbe
+from src.utils.error_handling import IndexDaemonError
+
+
+def _make_game(lib, name):
+    game = lib / name
+    game.mkdir(parents=True)
+    (game / f"{name}.exe").write_bytes(b"MZ")
+    return game
+
+
+@pytest.fixture
+def library(tmp_path):
+    lib = tmp_path / "lib"
+    _make_game(lib, "GameA")
+    index = LibraryIndex(probe=FixtureProbe(folders={"xbox_games": str(tmp_path / "no-xbox")}))
+    index.custom_folders = [str(lib)]
+    return lib, index
+
+
+def test_poll_applies_status_changes_and_new_games(library):
+    lib, index = library
+    index.rescan()
+    assert [g[1] for g in index.games] == ["[CUSTOM] GameA"]
+    assert index.poll() is False
+
+    game = lib / "GameA"
+    (game / "OptiScaler.dll").write_bytes(b"mod")
+    os.utime(game, ns=(1, 1))
+    assert index.poll() is True
+    assert index.games[0][2] != "❌ AUSENTE"
+    assert index.events["status_updates"] == 1
+
+    _make_game(lib, "GameB")
+    os.utime(lib, ns=(2, 2))
+    assert index.poll() is True
+    assert [g[1] for g in index.games] == ["[CUSTOM] GameA", "[CUSTOM] GameB"]
+    assert index.events["rescans"] == 2
+
+
+def test_daemon_answers_queries_until_shutdown(library, tmp_path):
+    lib, index = library
+    info_file = tmp_path / "daemon.json"
+    daemon = IndexDaemon(index, info_file=info_file, watch_interval=60,
+                         socket_path=tmp_path / "d.sock")
+    thread = threading.Thread(target=daemon.serve_forever, kwargs={"warm": False}, daemon=True)
+    thread.start()
+    assert daemon.wait_ready(5)
+
+    client = connect(info_file)
+    assert client is not None
+    with client:
+        games = client.games()
+        assert [g[1] for g in games] == ["[CUSTOM] GameA"]
+        assert isinstance(games[0], tuple)
+        _make_game(lib, "GameB")
+        assert len(client.scan([str(lib)])) == 2
+        assert client.status()["generation"] == 2
+        with pytest.raises(IndexDaemonError):
+            client.request("bogus")
+        client.shutdown()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not info_file.exists()
+    assert connect(info_file) is None
+
+
+def test_queries_answer_while_a_rescan_runs(library, monkeypatch):
+    lib, index = library
+    index.rescan()
+    from src.core import scanner
+    real_scan = scanner.scan_games
+    started, release = threading.Event(), threading.Event()
+
+    def slow_scan(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return real_scan(*args, **kwargs)
+
+    monkeypatch.setattr(scanner, "scan_games", slow_scan)
+    thread = threading.Thread(target=index.rescan)
+    thread.start()
+    assert started.wait(5)
+    try:
+        # The lock is free while scanning: the previous index is still served
+        assert index.snapshot()["generation"] == 1
+        assert index.poll() is False
+    finally:
+        release.set()
+        thread.join(5)
+    assert index.generation == 2
+
+
+def test_client_times_out_when_the_daemon_hangs():
+    from multiprocessing import Pipe
+    from src.core.index_daemon import IndexClient
+
+    ours, theirs = Pipe()
+    client = IndexClient(ours, timeout=0.3)
+    with pytest.raises(IndexDaemonError):
+        client.status()
+    assert theirs.recv_bytes()  # the request was sent before giving up
+    assert ours.closed
@@ -0,0 +1,48 @@
+"""Tests for the synthetic game-library generator used by the benchmarks."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.library_gen import LibrarySpec, generate_library
+from benchmarks.runner import Result, compare
+from src.core import scanner
+from src.core.platform_probe import FixtureProbe
+
+
+def _noop(level, msg):
+    pass
+
+
+def test_generation_is_reproducible(tmp_path):
+    spec = LibrarySpec(games=8, depth=1, seed=7)
+    first = generate_library(tmp_path / 'a', spec)
+    second = generate_library(tmp_path / 'b', spec)
+    assert [(g.name, g.layout, g.mod_state) for g in first.games] == \
+           [(g.name, g.layout, g.mod_state) for g in second.games]
+    assert {g.platform for g in first.games} == {'Steam', 'Epic', 'Xbox', 'Custom'}
+
+
+def test_scanner_finds_every_generated_game(tmp_path):
+    library = generate_library(tmp_path, LibrarySpec(games=12, depth=1, seed=3))
+    probe = FixtureProbe(**library.probe_data(uninstall_noise=5))
+    games = scanner.scan_games(_noop, library.custom_dirs, use_cache=False, probe=probe)
+    scanner.invalidate_scan_cache()
+
+    assert len(games) == len(library.games)
+    found = {os.path.normpath(path): exe for path, _, _, exe, _ in games}
+    for game in library.games:
+        # Decoys (uninstallers, crash handlers) and UE launchers must never win
+        assert found[os.path.normpath(game.exe_dir)] == game.exe_name
+
+
+def test_regression_report_threshold():
+    baseline = {'results': {'scan_games': {'median_s': 0.100}, 'check_mod_status': {'median_s': 0.001}}}
+    rows = compare({'scan_games': Result('scan_games', [0.2, 0.2, 0.2]),
+                    'check_mod_status': Result('check_mod_status', [0.002])}, baseline, 0.25)
+    by_name = {row['name']: row for row in rows}
+    assert by_name['scan_games']['regression']
+    # +100 % but only 1 ms: below the noise floor
+    assert not by_name['check_mod_status']['regression']
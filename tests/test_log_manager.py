@@ -0,0 +1,134 @@
+"""Tests for the queued log pipeline and the capped UI log."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.logging import LogManager
+
+
+class FakeTextbox:
+    """Just enough of the Tk text API for LogManager.flush_ui."""
+
+    def __init__(self):
+        self.text = ""
+        self.inserts = 0
+        self.scheduled = []
+
+    def configure(self, **kwargs):
+        pass
+
+    def tag_config(self, tag, **kwargs):
+        pass
+
+    def insert(self, index, text, *tags):
+        self.inserts += 1
+        self.text += text
+
+    def index(self, index):
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def delete(self, start, end):
+        drop = int(end.split('.')[0]) - 1
+        self.text = "\n".join(self.text.split("\n")[drop:])
+
+    def after(self, ms, func):
+        self.scheduled.append(func)
+
+
+def test_ui_lines_are_batched_and_capped(tmp_path):
+    manager = LogManager(log_dir=tmp_path)
+    try:
+        textbox = FakeTextbox()
+        manager.attach_textbox(textbox, max_lines=50)
+        for i in range(120):
+            manager.log_to_ui('INFO', f"line {i}")
+        assert textbox.inserts == 0  # nothing touches the widget until the drainer runs
+
+        manager.flush_ui()
+        lines = textbox.text.splitlines()
+        assert len(lines) == 50
+        assert lines[-1] == "[INFO] line 119"
+        assert manager.recent_lines(1) == [('INFO', "line 119")]
+    finally:
+        manager.shutdown()
+
+
+def test_file_log_written_by_listener(tmp_path):
+    manager = LogManager(log_dir=tmp_path)
+    try:
+        manager.log_to_ui('ERROR', "boom")
+        manager.flush()
+        with open(manager.log_file, encoding='utf-8') as f:
+            assert "ERROR - boom" in f.read()
+        assert any("boom" in e for e in manager.get_recent_errors())
+    finally:
+        manager.shutdown()
+
+
+def test_rotation_compresses_and_respects_budget(tmp_path):
+    (tmp_path / "fsr_injector_20240101_000000.log").write_text("legacy ERROR - old\n", encoding="utf-8")
+    manager = LogManager(log_dir=tmp_path, max_segment_bytes=2000, max_total_bytes=6000)
+    try:
+        for i in range(400):
+            manager.log_to_ui('INFO', f"message {i:04d} " + "x" * 40)
+        manager.flush()
+        manager._file_handler.wait_compression()
+
+        names = os.listdir(tmp_path)
+        assert "fsr_injector.log" in names
+        assert not [n for n in names if n.endswith(".log") and n != "fsr_injector.log"]
+        assert any(n.endswith(".log.gz") for n in names)
+        total = sum(os.path.getsize(tmp_path / n) for n in names)
+        assert total <= 6000 + 2000  # budget plus the active segment being written
+
+        tail = manager.tail(30)
+        assert len(tail) == 30
+        assert tail[-1].endswith("message 0399 " + "x" * 40)
+        assert manager.search(r"message 0399")[0][0] == "fsr_injector.log"
+
+        out = tmp_path / "session.txt"
+        manager.export_session(out)
+        assert "message 0399" in out.read_text(encoding="utf-8")
+    finally:
+        manager.shutdown()
+
+
+def test_locked_log_file_does_not_block_startup(tmp_path, monkeypatch):
+    (tmp_path / "fsr_injector.log").write_text("previous session\n", encoding="utf-8")
+
+    def locked(src, dst):
+        raise PermissionError(32, "The process cannot access the file", src)
+
+    monkeypatch.setattr(os, "replace", locked)
+    manager = LogManager(log_dir=tmp_path)
+    try:
+        manager.log_to_ui('INFO', "still logging")
+        manager.flush()
+        text = (tmp_path / "fsr_injector.log").read_text(encoding="utf-8")
+        assert text.startswith("previous session")
+        assert "Could not rotate" in text and "still logging" in text
+    finally:
+        manager.shutdown()
+
+
+def test_reattaching_replays_recent_history(tmp_path):
+    manager = LogManager(log_dir=tmp_path)
+    try:
+        first = FakeTextbox()
+        manager.attach_textbox(first)
+        manager.log_to_ui('INFO', "before close")
+        manager.flush_ui()
+        manager.detach_textbox()
+        manager.log_to_ui('WARN', "while closed")
+
+        second = FakeTextbox()
+        manager.attach_textbox(second)
+        assert len(second.scheduled) == 1
+        manager.flush_ui()
+        assert second.text.splitlines() == ["[INFO] before close", "[WARN] while closed"]
+        assert "while closed" not in first.text
+    finally:
+        manager.shutdown()
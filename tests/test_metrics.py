@@ -0,0 +1,76 @@
+"""Tests for the metrics registry and its JSON / Prometheus exports."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.tasks import CancellationToken, write_chunks
+from src.utils.error_handling import OperationCancelled
+from src.utils.metrics import MetricsRegistry, get_metrics
+
+
+def test_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    games = registry.counter('scan_games_total', 'Games')
+    games.inc(platform='Steam')
+    games.inc(2, platform='Steam')
+    games.inc(platform='Epic')
+    assert games.value(platform='Steam') == 3
+    assert registry.counter('scan_games_total') is games
+    with pytest.raises(TypeError):
+        registry.gauge('scan_games_total')
+
+    registry.gauge('ui_queue_depth').set(7)
+    hist = registry.histogram('extract_seconds', buckets=(1, 10))
+    for value in (0.5, 5, 50):
+        hist.observe(value)
+
+    sample = registry.snapshot()['metrics']['extract_seconds']['samples'][0]
+    assert sample['count'] == 3 and sample['max'] == 50
+    # Buckets are cumulative
+    assert sample['buckets'] == {'1': 1, '10': 2}
+
+
+def test_prometheus_textfile_and_export(tmp_path):
+    registry = MetricsRegistry()
+    registry.set_info(app_version='2.4.0')
+    registry.counter('install_bytes_total', 'Bytes').inc(1024, op='install', mode='copied')
+    with registry.timer('install_seconds', 'Install time'):
+        pass
+
+    text = registry.to_prometheus()
+    assert 'app_version="2.4.0"' in text
+    assert '# TYPE optiscaler_install_bytes_total counter' in text
+    assert 'optiscaler_install_bytes_total{mode="copied",op="install"} 1024' in text
+    assert 'optiscaler_install_seconds_bucket{le="+Inf"} 1' in text
+    assert 'optiscaler_install_seconds_count 1' in text
+
+    json_path, prom_path = registry.export(str(tmp_path))
+    with open(json_path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['info']['app_version'] == '2.4.0'
+    assert data['metrics']['install_bytes_total']['samples'][0]['value'] == 1024
+    assert open(prom_path, encoding='utf-8').read() == text
+
+
+def test_write_chunks_records_download_metrics(tmp_path):
+    metrics = get_metrics()
+    downloads = metrics.counter('downloads_total')
+    ok_before = downloads.value(result='ok')
+    cancelled_before = downloads.value(result='cancelled')
+    bytes_before = metrics.counter('download_bytes_total').value()
+
+    write_chunks([b'a' * 100, b'b' * 50], tmp_path / 'file.bin')
+    assert downloads.value(result='ok') == ok_before + 1
+    assert metrics.counter('download_bytes_total').value() == bytes_before + 150
+
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        write_chunks([b'x'], tmp_path / 'other.bin', token=token)
+    assert downloads.value(result='cancelled') == cancelled_before + 1
@@ -0,0 +1,126 @@
+"""Tests for graphics-API detection from PE import tables."""
+
+import configparser
+import os
+import sys
+import time
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.library_gen import GAME_IMPORTS, write_pe_exe
+from src.core import installer, pe_imports
+from src.core.pe_imports import detect_exe_api, read_pe_imports
+from src.core.scan_index import ScanIndex
+
+MB = 1024 * 1024
+
+
+def test_reads_imports_delay_imports_and_machine(tmp_path):
+    exe = tmp_path / "Game-Win64-Shipping.exe"
+    write_pe_exe(str(exe), 80 * MB, *GAME_IMPORTS['dx12'])
+    info = read_pe_imports(str(exe))
+    assert info.machine == 'x64' and info.is_64bit
+    assert {'kernel32.dll', 'dxgi.dll', 'd3d12.dll'} <= info.imports
+    assert info.apis == {'dx12', 'dxgi'}
+    assert info.upscaler_apis is None
+    assert info.primary_api == 'dx12'
+    assert info.recommended_spoof_dll == 'dxgi.dll'
+
+
+def test_pe32_vulkan_only_game(tmp_path):
+    exe = tmp_path / "game.exe"
+    write_pe_exe(str(exe), 4096, ['KERNEL32.dll', 'VULKAN-1.dll'], machine='x86')
+    info = read_pe_imports(str(exe))
+    assert info.machine == 'x86' and not info.is_64bit
+    assert info.upscaler_apis == {'vulkan'}
+    assert info.recommended_spoof_dll == 'winmm.dll'
+
+
+def test_upscaler_keys_are_only_narrowed_without_d3d12_or_dxgi(tmp_path):
+    exe = tmp_path / "game.exe"
+    # D3D11 game that may still load d3d12.dll through dxgi.dll
+    write_pe_exe(str(exe), 4096, ['KERNEL32.dll', 'd3d11.dll', 'dxgi.dll'])
+    assert read_pe_imports(str(exe)).upscaler_apis is None
+    write_pe_exe(str(exe), 4096, ['KERNEL32.dll', 'd3d11.dll'])
+    assert read_pe_imports(str(exe)).upscaler_apis == {'dx11'}
+
+
+def test_rejects_files_that_are_not_pe(tmp_path):
+    empty = tmp_path / "empty.exe"
+    empty.write_bytes(b"")
+    stub = tmp_path / "stub.exe"
+    stub.write_bytes(b"MZ" + bytes(200))
+    for path in (empty, stub):
+        with pytest.raises(ValueError):
+            read_pe_imports(str(path))
+
+
+def test_parsing_stays_under_a_millisecond(tmp_path):
+    exe = tmp_path / "big.exe"
+    write_pe_exe(str(exe), 120 * MB, *GAME_IMPORTS['dx11'])
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        read_pe_imports(str(exe))
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < 0.001
+
+
+def test_detection_is_cached_by_size_and_mtime(tmp_path, monkeypatch):
+    exe = tmp_path / "game.exe"
+    write_pe_exe(str(exe), 4096, *GAME_IMPORTS['dx11'])
+    index = ScanIndex(tmp_path / "index.json")
+    assert detect_exe_api(str(exe), index).apis == {'dx11', 'dxgi'}
+
+    def fail(path):
+        raise AssertionError("exe re-read despite unchanged stamp")
+
+    monkeypatch.setattr(pe_imports, "read_pe_imports", fail)
+    assert detect_exe_api(str(exe), index).apis == {'dx11', 'dxgi'}
+    assert index.save()
+    assert detect_exe_api(str(exe), ScanIndex(tmp_path / "index.json")).machine == 'x64'
+
+    monkeypatch.undo()
+    write_pe_exe(str(exe), 8192, *GAME_IMPORTS['vulkan'])
+    assert detect_exe_api(str(exe), index).apis == {'vulkan'}
+
+    (tmp_path / "broken.exe").write_bytes(b"MZ")
+    assert detect_exe_api(str(tmp_path / "broken.exe"), index) is None
+    assert detect_exe_api(str(tmp_path / "missing.exe"), index) is None
+
+
+def test_install_uses_detected_api(tmp_path):
+    source = tmp_path / "OptiScaler_1.0"
+    source.mkdir()
+    (source / "OptiScaler.dll").write_bytes(b"mod")
+    (source / "OptiScaler.ini").write_text("[Upscalers]\nDx12Upscaler=auto\n", encoding="utf-8")
+    game = tmp_path / "Game"
+    write_pe_exe(str(game / "Game.exe"), 4096, *GAME_IMPORTS['vulkan'])
+
+    index = ScanIndex(tmp_path / "index.json")
+    assert installer.inject_fsr_mod(str(source), str(game), lambda level, msg: None,
+                                    spoof_dll_name="dxgi.dll", upscaler_selected="XeSS", index=index)
+    assert (game / "winmm.dll").exists()
+    assert not (game / "dxgi.dll").exists()
+    config = configparser.ConfigParser()
+    config.read(game / "OptiScaler.ini", encoding="utf-8")
+    assert dict(config["Upscalers"]) == {"dx12upscaler": "auto", "vulkanupscaler": "xess"}
+
+
+def test_explicit_dll_choice_is_kept_on_vulkan_games(tmp_path):
+    source = tmp_path / "OptiScaler_1.0"
+    source.mkdir()
+    (source / "OptiScaler.dll").write_bytes(b"mod")
+    (source / "OptiScaler.ini").write_text("[Upscalers]\nDx12Upscaler=auto\n", encoding="utf-8")
+    game = tmp_path / "Game"
+    write_pe_exe(str(game / "Game.exe"), 4096, *GAME_IMPORTS['vulkan'])
+    logs = []
+
+    assert installer.inject_fsr_mod(str(source), str(game), lambda level, msg: logs.append((level, msg)),
+                                    spoof_dll_name="d3d12.dll", index=ScanIndex(tmp_path / "index.json"))
+    assert (game / "d3d12.dll").exists()
+    assert not (game / "winmm.dll").exists()
+    assert any(level == 'WARN' and "d3d12.dll" in msg and "winmm.dll" in msg for level, msg in logs)
@@ -0,0 +1,60 @@
+"""Tests for the pluggable platform probe (registry, known folders, GPUs)."""
+
+import json
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.platform_probe import HKLM, FixtureProbe
+from src.core.utils import detect_gpu_vendor
+
+
+def _log(level, msg):
+    pass
+
+
+def test_fixture_probe_registry_is_case_insensitive(tmp_path):
+    probe = FixtureProbe({
+        r"HKLM\SOFTWARE\Vendor\App": {"InstallPath": "C:\\App"},
+        r"HKLM\SOFTWARE\Vendor\Other": {},
+    })
+    assert probe.has_registry
+    assert probe.read_value(HKLM, r"software\vendor\app", "InstallPath") == "C:\\App"
+    assert probe.read_value(HKLM, r"SOFTWARE\Vendor\App", "Missing") is None
+    assert probe.subkeys(HKLM, r"SOFTWARE\Vendor") == ["App", "Other"]
+    assert probe.subkeys(HKLM, r"SOFTWARE\Nope") == []
+
+    fixture = tmp_path / "probe.json"
+    fixture.write_text(json.dumps(probe.to_dict()), encoding="utf-8")
+    loaded = FixtureProbe.from_file(fixture)
+    assert loaded.subkeys(HKLM, r"SOFTWARE\Vendor") == ["App", "Other"]
+    assert loaded.read_value(HKLM, r"SOFTWARE\Vendor\App", "InstallPath") == "C:\\App"
+
+
+def test_detect_gpu_vendor_prefers_nvidia():
+    assert detect_gpu_vendor(FixtureProbe(gpus=["Intel(R) UHD Graphics 770", "NVIDIA GeForce RTX 4070"])) == "nvidia"
+    assert detect_gpu_vendor(FixtureProbe(gpus=["AMD Radeon RX 7800 XT"])) == "amd"
+    assert detect_gpu_vendor(FixtureProbe()) == "unknown"
+
+
+def test_registry_override_and_dynamic_paths(tmp_path):
+    assert scanner.check_registry_override(_log, FixtureProbe()) is True
+    nvapi = "HKLM\\" + scanner.NVAPI_REGISTRY_KEY
+    assert scanner.check_registry_override(_log, FixtureProbe({nvapi: {"DisableSignatureChecks": 1}})) is True
+    assert scanner.check_registry_override(_log, FixtureProbe({nvapi: {"DisableSignatureChecks": 0}})) is False
+
+    common = tmp_path / "Steam" / "steamapps" / "common"
+    common.mkdir(parents=True)
+    epic_game = tmp_path / "Epic" / "Game"
+    epic_game.mkdir(parents=True)
+    uninstall = "HKLM\\" + scanner.UNINSTALL_REGISTRY_KEY
+    probe = FixtureProbe({
+        "HKLM\\" + scanner.STEAM_REGISTRY_KEY: {"InstallPath": str(tmp_path / "Steam")},
+        uninstall + "\\Game": {"Publisher": "Epic Games, Inc.", "InstallLocation": str(epic_game)},
+        uninstall + "\\Other": {"Publisher": "Someone", "InstallLocation": str(tmp_path)},
+    })
+    assert scanner.get_dynamic_steam_paths(_log, probe) == [str(common)]
+    assert scanner.get_dynamic_epic_paths(_log, probe) == [str(epic_game)]
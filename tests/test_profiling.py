@@ -0,0 +1,107 @@
+"""Tests for the opt-in cProfile / tracemalloc profiling mode."""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import profiling
+from src.utils.profiling import (
+    PROFILE_ENV_VAR, list_profiles, parse_mode, profile_operation, profiled,
+    read_summary, set_profiling_mode
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_mode(monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    yield
+    set_profiling_mode('off')
+
+
+def test_parse_mode():
+    assert parse_mode('off') == set()
+    assert parse_mode('1') == {'cpu'}
+    assert parse_mode('cpu+mem') == {'cpu', 'mem'}
+    assert parse_mode('mem') == {'mem'}
+
+
+def test_disabled_writes_nothing(tmp_path):
+    with profile_operation('scan', log_dir=str(tmp_path)) as prefix:
+        pass
+    assert prefix is None
+    assert not (tmp_path / 'profiles').exists()
+
+
+def test_cpu_and_memory_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, 'cpu,mem')
+    with profile_operation('install', log_dir=str(tmp_path)) as prefix:
+        # Nested operations fold into the outer profile
+        with profile_operation('inner', log_dir=str(tmp_path)) as inner:
+            data = [bytes(1024) for _ in range(200)]
+    assert inner is None and data
+    assert not tracemalloc.is_tracing()
+    for ext in ('.prof', '.snapshot', '.txt'):
+        assert os.path.exists(prefix + ext)
+
+    summaries = list_profiles(str(tmp_path))
+    assert len(summaries) == 1
+    text = read_summary(summaries[0])
+    assert 'Operation: install' in text
+    assert 'Top by cumulative time' in text
+    assert 'Top allocations' in text
+
+
+def test_decorator_uses_settings_mode_and_prunes(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_KEEP', 2)
+    monkeypatch.setattr(profiling, 'profiles_dir', lambda log_dir=None: str(tmp_path))
+    set_profiling_mode('cpu')
+
+    @profiled('scan')
+    def scan():
+        return sum(range(1000))
+
+    for _ in range(4):
+        assert scan() == 499500
+    assert len([n for n in os.listdir(tmp_path) if n.endswith('.txt')]) == 2
+
+
+def test_concurrent_operations_never_fail(tmp_path, monkeypatch):
+    import threading
+    monkeypatch.setenv(PROFILE_ENV_VAR, 'cpu')
+    inside, release = threading.Event(), threading.Event()
+    prefixes = []
+
+    def outer():
+        with profile_operation('scan', log_dir=str(tmp_path)) as prefix:
+            prefixes.append(prefix)
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=outer)
+    thread.start()
+    assert inside.wait(5)
+    # The CPU profiler is process-wide: the second operation runs unprofiled
+    with profile_operation('install', log_dir=str(tmp_path)) as prefix:
+        assert prefix is None
+    release.set()
+    thread.join(5)
+    assert prefixes[0] is not None and os.path.exists(prefixes[0] + '.prof')
+
+
+def test_profiler_that_cannot_start_is_skipped(tmp_path, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setenv(PROFILE_ENV_VAR, 'cpu')
+    monkeypatch.setattr(profiling.cProfile, 'Profile', BusyProfile)
+    with profile_operation('download', log_dir=str(tmp_path)) as prefix:
+        assert prefix is None
+    with profile_operation('download', log_dir=str(tmp_path)) as prefix:
+        assert prefix is None
+    assert not profiling._cpu_lock.locked()
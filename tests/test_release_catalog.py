@@ -0,0 +1,113 @@
+"""Tests for the compact release catalog in GitHubClient.get_releases."""
+
+import os
+import sys
+import json
+from datetime import datetime, timedelta
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.github import GitHubClient, RELEASES_PER_PAGE
+
+
+def make_release(release_id: int, day: int) -> dict:
+    """Build a GitHub-like release payload."""
+    return {
+        'id': release_id,
+        'tag_name': f"v0.{release_id}",
+        'name': f"OptiScaler 0.{release_id}",
+        'published_at': f"2025-01-{day:02d}T10:00:00Z",
+        'created_at': f"2025-01-{day:02d}T09:00:00Z",
+        'body': "Long release notes " * 200,
+        'author': {'login': 'someone'},
+        'assets': [{
+            'id': release_id * 10,
+            'name': f"OptiScaler_0.{release_id}.7z",
+            'size': 1234,
+            'browser_download_url': f"https://example.invalid/{release_id}.7z",
+            'digest': f"sha256:{release_id:064x}",
+            'uploader': {'login': 'someone'},
+        }],
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Serves releases newest-first honouring per_page/page."""
+
+    def __init__(self, releases):
+        self.releases = sorted(releases, key=lambda r: r['id'], reverse=True)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        params = params or {}
+        self.calls.append(params)
+        per_page = params.get('per_page', 30)
+        page = params.get('page', 1)
+        start = (page - 1) * per_page
+        return FakeResponse(self.releases[start:start + per_page])
+
+
+def make_client(tmp_path, releases):
+    client = GitHubClient(logger=lambda level, msg: None)
+    client.cache_dir = str(tmp_path)
+    client.session = FakeSession(releases)
+    return client
+
+
+def test_catalog_is_written_compact_and_sorted(tmp_path):
+    client = make_client(tmp_path, [make_release(1, 1), make_release(3, 3), make_release(2, 2)])
+
+    releases = client.get_releases()
+
+    assert [r['id'] for r in releases] == [3, 2, 1]
+    assert 'body' not in releases[0]
+    assert releases[0]['assets'][0]['digest'].startswith('sha256:')
+    with open(os.path.join(tmp_path, 'releases_catalog.json'), encoding='utf-8') as f:
+        catalog = json.load(f)
+    assert catalog['newest_id'] == 3
+    assert client.session.calls[0]['per_page'] == RELEASES_PER_PAGE
+
+
+def test_fresh_catalog_skips_network(tmp_path):
+    client = make_client(tmp_path, [make_release(1, 1)])
+    client.get_releases()
+    client.session.calls.clear()
+
+    assert [r['id'] for r in client.get_releases()] == [1]
+    assert client.session.calls == []
+
+
+def test_incremental_refresh_only_fetches_newer(tmp_path):
+    client = make_client(tmp_path, [make_release(1, 1), make_release(2, 2)])
+    client.get_releases()
+
+    client.session = FakeSession([make_release(1, 1), make_release(2, 2), make_release(5, 5)])
+    releases = client.get_releases(use_cache=False)
+
+    assert [r['id'] for r in releases] == [5, 2, 1]
+    assert len(client.session.calls) == 1
+
+
+def test_stale_full_refresh_drops_deleted_releases(tmp_path):
+    client = make_client(tmp_path, [make_release(1, 1), make_release(2, 2)])
+    client.get_releases()
+    catalog = client._load_release_catalog()
+    catalog['full_refresh_at'] = (datetime.now() - timedelta(days=30)).isoformat(timespec='seconds')
+    client._cache_response('releases_catalog', catalog)
+
+    client.session = FakeSession([make_release(2, 2)])
+    releases = client.get_releases(use_cache=False)
+
+    assert [r['id'] for r in releases] == [2]
@@ -0,0 +1,59 @@
+"""Tests for identity-based dedup of overlapping libraries, junctions and symlinks."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.platform_probe import FixtureProbe
+from src.core.scan_index import ScanIndex
+
+STEAM_KEY = r"HKLM\SOFTWARE\WOW6432Node\Valve\Steam"
+
+
+def _noop(level, msg):
+    pass
+
+
+def _steam_library(tmp_path):
+    common = tmp_path / "Steam" / "steamapps" / "common"
+    for name in ("GameA", "GameB"):
+        (common / name).mkdir(parents=True)
+        (common / name / f"{name}.exe").write_bytes(b"MZ")
+    probe = FixtureProbe(registry={STEAM_KEY: {"InstallPath": str(tmp_path / "Steam")}},
+                         folders={"xbox_games": str(tmp_path / "no-xbox")})
+    return common, probe
+
+
+def _scan(tmp_path, probe, custom, monkeypatch):
+    walks = []
+    real_find = scanner.find_executable_path
+    monkeypatch.setattr(scanner, "find_executable_path",
+                        lambda *a, **k: walks.append(os.path.basename(a[0])) or real_find(*a, **k))
+    games = scanner.scan_games(_noop, custom, use_cache=False, probe=probe, index=ScanIndex(tmp_path / "idx.json"))
+    return games, walks
+
+
+def test_custom_folder_reaching_a_library_through_a_symlink_is_merged(tmp_path, monkeypatch):
+    common, probe = _steam_library(tmp_path)
+    link = tmp_path / "LinkToCommon"
+    link.symlink_to(common, target_is_directory=True)
+    (tmp_path / "Mine").mkdir()
+    (tmp_path / "Mine" / "GameB").symlink_to(common / "GameB", target_is_directory=True)
+
+    games, walks = _scan(tmp_path, probe, [str(link), str(tmp_path / "Mine")], monkeypatch)
+    assert sorted(g[1] for g in games) == ["[STEAM] GameA", "[STEAM] GameB"]
+    assert sorted(walks) == ["GameA", "GameB"]
+
+
+def test_custom_folder_containing_a_library_skips_it(tmp_path, monkeypatch):
+    _, probe = _steam_library(tmp_path)
+    (tmp_path / "Other").mkdir()
+    (tmp_path / "Other" / "Other.exe").write_bytes(b"MZ")
+
+    games, walks = _scan(tmp_path, probe, [str(tmp_path)], monkeypatch)
+    assert sorted(g[1] for g in games) == ["[CUSTOM] Other", "[STEAM] GameA", "[STEAM] GameB"]
+    # "Steam" holds the library that was already scanned: never walked
+    assert "Steam" not in walks
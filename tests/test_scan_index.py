@@ -0,0 +1,68 @@
+"""Tests for the persistent scan index (negative cache of non-game folders)."""
+
+import os
+import sys
+import time
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scan_index, scanner
+from src.core.platform_probe import FixtureProbe
+from src.core.scan_index import ScanIndex
+
+
+def _noop(level, msg):
+    pass
+
+
+def test_folders_without_exe_are_skipped_until_they_change(tmp_path, monkeypatch):
+    lib = tmp_path / "lib"
+    (lib / "Redist" / "data").mkdir(parents=True)
+    (lib / "Redist" / "readme.txt").write_text("tools")
+    probe = FixtureProbe(registry={}, folders={"xbox_games": str(tmp_path / "no-xbox")})
+    index = ScanIndex(tmp_path / "idx.json")
+    assert scanner.scan_games(_noop, [str(lib)], use_cache=False, probe=probe, index=index) == []
+    [entry] = index.skipped()
+    assert entry["path"] == os.path.normpath(str(lib / "Redist")) and entry["platform"] == "Custom"
+
+    walks = []
+    real_find = scanner.find_executable_path
+    monkeypatch.setattr(scanner, "find_executable_path", lambda *a, **k: walks.append(a[0]) or real_find(*a, **k))
+    reloaded = ScanIndex(tmp_path / "idx.json")
+    assert scanner.scan_games(_noop, [str(lib)], use_cache=False, probe=probe, index=reloaded) == []
+    assert walks == []
+
+    (lib / "Redist" / "Redist.exe").write_bytes(b"MZ")
+    games = scanner.scan_games(_noop, [str(lib)], use_cache=False, probe=probe, index=reloaded)
+    assert [g[3] for g in games] == ["Redist.exe"]
+    assert reloaded.skipped() == []
+
+
+def test_skipped_folder_is_rewalked_when_an_exe_appears_in_a_nested_folder(tmp_path):
+    lib = tmp_path / "lib"
+    win64 = lib / "Game" / "Binaries" / "Win64"
+    win64.mkdir(parents=True)
+    (win64 / "readme.txt").write_text("pending download")
+    probe = FixtureProbe(registry={}, folders={"xbox_games": str(tmp_path / "no-xbox")})
+    index = ScanIndex(tmp_path / "idx.json")
+    assert scanner.scan_games(_noop, [str(lib)], use_cache=False, probe=probe, index=index) == []
+    assert index.is_skipped(str(lib / "Game"))
+
+    # Only Win64's mtime changes; the game folder itself is untouched
+    (win64 / "Game-Win64-Shipping.exe").write_bytes(b"MZ")
+    os.utime(win64, ns=(10**18, 10**18))
+    assert not index.is_skipped(str(lib / "Game"))
+    games = scanner.scan_games(_noop, [str(lib)], use_cache=False, probe=probe, index=index)
+    assert [g[3] for g in games] == ["Game-Win64-Shipping.exe"]
+
+
+def test_skipped_entries_expire(tmp_path, monkeypatch):
+    folder = tmp_path / "Tools"
+    folder.mkdir()
+    index = ScanIndex(tmp_path / "idx.json")
+    index.mark_skipped(str(folder))
+    assert index.is_skipped(str(folder))
+    now = time.time()
+    monkeypatch.setattr(scan_index.time, "time", lambda: now + scan_index.SKIPPED_TTL + 1)
+    assert not index.is_skipped(str(folder))
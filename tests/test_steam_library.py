@@ -0,0 +1,127 @@
+"""Tests for Steam library enumeration from VDF/ACF files and the scan index."""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.platform_probe import FixtureProbe
+from src.core.scan_index import ScanIndex
+from src.core.steam_library import library_folders, parse_vdf, read_app_manifests
+
+
+def _noop(level, msg):
+    pass
+
+
+def _manifest(steamapps, appid, name, installdir, buildid, state_flags="4"):
+    (steamapps / f"appmanifest_{appid}.acf").write_text(
+        '"AppState"\n{\n'
+        f'\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name}"\n\t"StateFlags"\t\t"{state_flags}"\n'
+        f'\t"installdir"\t\t"{installdir}"\n\t"buildid"\t\t"{buildid}"\n}}\n',
+        encoding="utf-8")
+
+
+def _game(steamapps, installdir, exe):
+    folder = steamapps / "common" / installdir
+    folder.mkdir(parents=True)
+    (folder / exe).write_bytes(b"MZ")
+    return folder
+
+
+def test_parse_vdf_handles_escapes_comments_and_case():
+    data = parse_vdf('// header\n"LibraryFolders"\n{\n\t"0"\n\t{\n\t\t"path"\t\t"C:\\\\Program Files (x86)\\\\Steam"\n'
+                     '\t\t"label"\t\t"say \\"hi\\""\t[$WIN32]\n\t}\n}\n')
+    assert data == {"libraryfolders": {"0": {"path": "C:\\Program Files (x86)\\Steam", "label": 'say "hi"'}}}
+    with pytest.raises(ValueError):
+        parse_vdf('"AppState"\n{\n\t"appid"\t"1"\n')
+
+
+def test_library_folders_reads_current_and_legacy_formats(tmp_path):
+    steamapps = tmp_path / "Steam" / "steamapps"
+    steamapps.mkdir(parents=True)
+    (steamapps / "libraryfolders.vdf").write_text(
+        f'"libraryfolders"\n{{\n\t"0"\n\t{{\n\t\t"path"\t\t"{tmp_path / "Steam"}"\n\t}}\n'
+        f'\t"1"\n\t{{\n\t\t"path"\t\t"{tmp_path / "Lib2"}"\n\t}}\n}}\n', encoding="utf-8")
+    assert library_folders(str(tmp_path / "Steam")) == [
+        os.path.normpath(str(steamapps)), os.path.normpath(str(tmp_path / "Lib2" / "steamapps"))]
+
+    (steamapps / "libraryfolders.vdf").write_text(
+        f'"LibraryFolders"\n{{\n\t"TimeNextStatsReport"\t\t"1"\n\t"1"\t\t"{tmp_path / "Old"}"\n}}\n', encoding="utf-8")
+    assert library_folders(str(tmp_path / "Steam"))[1:] == [os.path.normpath(str(tmp_path / "Old" / "steamapps"))]
+
+
+def test_read_app_manifests_classifies_tools(tmp_path):
+    _manifest(tmp_path, "228980", "Steamworks Common Redistributables", "Steamworks Shared", "1")
+    _manifest(tmp_path, "1493710", "Proton Experimental", "Proton - Experimental", "2")
+    _manifest(tmp_path, "620", "Portal 2", "Portal 2", "0")
+    (tmp_path / "appmanifest_999.acf").write_text('"AppState"\n{\n', encoding="utf-8")
+    apps = {app.appid: app for app in read_app_manifests(str(tmp_path))}
+    assert set(apps) == {"228980", "1493710", "620"}
+    assert [a for a, app in apps.items() if app.is_game] == ["620"]
+    assert apps["620"].install_path == os.path.normpath(str(tmp_path / "common" / "Portal 2"))
+
+
+def test_scan_uses_manifests_and_reuses_exe_while_buildid_is_unchanged(tmp_path, monkeypatch):
+    steamapps = tmp_path / "Steam" / "steamapps"
+    _game(steamapps, "GameA", "GameA.exe")
+    _game(steamapps, "Steamworks Shared", "DXSETUP.exe")
+    _manifest(steamapps, "1001", "Game A", "GameA", "100")
+    _manifest(steamapps, "228980", "Steamworks Common Redistributables", "Steamworks Shared", "1")
+    probe = FixtureProbe(registry={r"HKLM\SOFTWARE\WOW6432Node\Valve\Steam": {"InstallPath": str(tmp_path / "Steam")}},
+                         folders={"xbox_games": str(tmp_path / "no-xbox")})
+    index = ScanIndex(tmp_path / "idx.json")
+
+    games = scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=index)
+    assert [(g[1], g[3]) for g in games] == [("[STEAM] GameA", "GameA.exe")]
+    assert (tmp_path / "idx.json").exists()
+
+    walks = []
+    real_find = scanner.find_executable_path
+    monkeypatch.setattr(scanner, "find_executable_path", lambda *a, **k: walks.append(a[0]) or real_find(*a, **k))
+    reloaded = ScanIndex(tmp_path / "idx.json")
+    assert scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=reloaded) == games
+    assert walks == []
+
+    _manifest(steamapps, "1001", "Game A", "GameA", "101")
+    assert scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=reloaded) == games
+    assert walks == [os.path.normpath(str(steamapps / "common" / "GameA"))]
+
+
+def test_scan_skips_apps_that_are_not_fully_installed(tmp_path):
+    steamapps = tmp_path / "Steam" / "steamapps"
+    _game(steamapps, "GameA", "GameA.exe")
+    _game(steamapps, "GameB", "GameB.exe")
+    _game(steamapps, "GameC", "GameC.exe")
+    _manifest(steamapps, "1001", "Game A", "GameA", "100", state_flags="1030")  # installed, updating
+    _manifest(steamapps, "1002", "Game B", "GameB", "100", state_flags="1024")  # first download running
+    _manifest(steamapps, "1003", "Game C", "GameC", "100", state_flags="2")     # update required, not installed
+    apps = {app.appid: app for app in read_app_manifests(str(steamapps))}
+    assert [a for a, app in sorted(apps.items()) if app.is_installed] == ["1001"]
+
+    probe = FixtureProbe(registry={r"HKLM\SOFTWARE\WOW6432Node\Valve\Steam": {"InstallPath": str(tmp_path / "Steam")}},
+                         folders={"xbox_games": str(tmp_path / "no-xbox")})
+    games = scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=ScanIndex(tmp_path / "idx.json"))
+    assert [g[1] for g in games] == ["[STEAM] GameA"]
+
+
+def test_folders_without_manifest_are_still_scanned(tmp_path):
+    steamapps = tmp_path / "Steam" / "steamapps"
+    _game(steamapps, "GameA", "GameA.exe")
+    _game(steamapps, "CopiedGame", "CopiedGame.exe")
+    _manifest(steamapps, "1001", "Game A", "GameA", "100")
+    probe = FixtureProbe(registry={r"HKLM\SOFTWARE\WOW6432Node\Valve\Steam": {"InstallPath": str(tmp_path / "Steam")}},
+                         folders={"xbox_games": str(tmp_path / "no-xbox")})
+    games = scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=ScanIndex(tmp_path / "idx.json"))
+    assert [g[1] for g in games] == ["[STEAM] CopiedGame", "[STEAM] GameA"]
+
+
+def test_malformed_libraryfolders_keeps_the_main_library(tmp_path):
+    steamapps = tmp_path / "Steam" / "steamapps"
+    steamapps.mkdir(parents=True)
+    (steamapps / "libraryfolders.vdf").write_text('"libraryfolders"\n{\n\t"0"\n\t{\n', encoding="utf-8")
+    assert library_folders(str(tmp_path / "Steam")) == [os.path.normpath(str(steamapps))]
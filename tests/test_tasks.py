@@ -0,0 +1,88 @@
+"""Tests for the bounded task runner and the UI dispatch queue."""
+
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.tasks import Priority, TaskRunner, UIDispatcher, current_task, OperationCancelled
+
+
+def test_thread_count_is_bounded():
+    runner = TaskRunner(max_workers=2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    handles = [runner.submit(work) for _ in range(8)]
+    assert all(h.wait(2) for h in handles)
+    assert peak[0] <= 2
+    runner.shutdown()
+
+
+def test_burst_fans_out_to_max_workers():
+    runner = TaskRunner(max_workers=4)
+    # Leave one idle worker behind: it must not absorb the whole burst
+    assert runner.submit(lambda: None).wait(2)
+    time.sleep(0.05)
+    # Only passes if all four tasks run at the same time
+    barrier = threading.Barrier(4, timeout=2)
+    handles = [runner.submit(barrier.wait) for _ in range(4)]
+    assert all(h.wait(3) for h in handles)
+    assert all(h.error is None for h in handles)
+    runner.shutdown()
+
+
+def test_interactive_tasks_run_before_background():
+    runner = TaskRunner(max_workers=1)
+    gate = threading.Event()
+    order = []
+    runner.submit(gate.wait, 2)
+    runner.submit(order.append, 'background', priority=Priority.BACKGROUND)
+    last = runner.submit(order.append, 'interactive', priority=Priority.INTERACTIVE)
+    gate.set()
+    runner.shutdown(cancel=False, timeout=2)
+    assert last.done
+    assert order == ['interactive', 'background']
+
+
+def test_cancellation_token_reaches_task():
+    runner = TaskRunner(max_workers=1)
+    started = threading.Event()
+
+    def loop():
+        task = current_task()
+        task.progress.update(total=100)
+        started.set()
+        for i in range(100):
+            task.token.raise_if_cancelled()
+            task.progress.update(done=i)
+            time.sleep(0.01)
+
+    handle = runner.submit(loop)
+    started.wait(1)
+    handle.cancel()
+    assert handle.wait(2)
+    assert isinstance(handle.error, OperationCancelled)
+    assert handle.progress.fraction < 1.0
+    runner.shutdown()
+
+
+def test_dispatcher_coalesces_keyed_posts():
+    dispatcher = UIDispatcher()
+    seen = []
+    for i in range(50):
+        dispatcher.post(seen.append, i, key='progress')
+    dispatcher.post(seen.append, 'done')
+
+    assert dispatcher.drain() == 2
+    assert seen == [49, 'done']
@@ -0,0 +1,60 @@
+"""Tests for the JSON-lines tracing spans."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.error_handling import OperationCancelled
+from src.utils.tracing import configure_tracing, current_span, span, traced
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = configure_tracing(str(path))
+    yield path, tracer
+    configure_tracing(enabled=False)
+
+
+def _read(path, tracer):
+    tracer.flush()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_nested_spans_are_linked_and_timed(trace_file):
+    path, tracer = trace_file
+
+    @traced('scan.game')
+    def probe(folder):
+        current_span().set(folder=folder)
+
+    with span('scan', library='Steam') as root:
+        probe('GameA')
+        root.set(games=1)
+
+    child, parent = _read(path, tracer)
+    assert parent['name'] == 'scan' and parent['parent'] is None
+    assert parent['attrs'] == {'library': 'Steam', 'games': 1}
+    assert child['parent'] == parent['span'] and child['trace'] == parent['trace']
+    assert child['attrs'] == {'folder': 'GameA'}
+    assert child['ms'] <= parent['ms']
+
+
+def test_span_status_reflects_exceptions(trace_file):
+    path, tracer = trace_file
+    with pytest.raises(OperationCancelled):
+        with span('download'):
+            raise OperationCancelled("stop")
+    with pytest.raises(ValueError):
+        with span('install'):
+            raise ValueError("bad ini")
+
+    cancelled, failed = _read(path, tracer)
+    assert cancelled['status'] == 'cancelled'
+    assert failed['status'] == 'error' and failed['attrs']['error'] == 'bad ini'
+    assert current_span() is None
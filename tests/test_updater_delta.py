@@ -0,0 +1,132 @@
+"""Tests for manifest-diff game updates in OptiScalerUpdater."""
+
+import os
+import sys
+import json
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.updater import OptiScalerUpdater
+from src.core.version_catalog import get_version_catalog
+
+
+def make_version(base, folder, dll, libxess=b'xess-1'):
+    path = base / folder
+    (path / 'D3D12_Optiscaler').mkdir(parents=True)
+    (path / 'OptiScaler.dll').write_bytes(dll)
+    (path / 'OptiScaler.ini').write_text('[Upscalers]\nDx12Upscaler=auto\n')
+    (path / 'libxess.dll').write_bytes(libxess)
+    (path / 'D3D12_Optiscaler' / 'D3D12Core.dll').write_bytes(b'core')
+    (path / 'README.md').write_text('not deployed')
+    return path
+
+
+def install_game(tmp_path, source, spoof='dxgi.dll'):
+    game = tmp_path / 'Game'
+    (game / 'D3D12_Optiscaler').mkdir(parents=True)
+    (game / spoof).write_bytes((source / 'OptiScaler.dll').read_bytes())
+    (game / 'OptiScaler.ini').write_text('[Upscalers]\nDx12Upscaler=xess\n')
+    (game / 'libxess.dll').write_bytes((source / 'libxess.dll').read_bytes())
+    (game / 'D3D12_Optiscaler' / 'D3D12Core.dll').write_bytes(b'core')
+    (game / 'version.json').write_text(json.dumps({
+        'version': '0.7.8', 'source_folder': source.name, 'spoof_dll': spoof
+    }))
+    return game
+
+
+def test_only_changed_files_are_written(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    make_version(base, 'OptiScaler_0.7.9', b'dll-new-bigger')
+    game = install_game(tmp_path, old)
+    updater = OptiScalerUpdater(base)
+
+    results = updater.update_multiple_games([game])
+
+    report = results[str(game)]
+    assert report['ok'] and report['errors'] == []
+    assert report['files_written'] == 1
+    assert report['bytes_written'] == len(b'dll-new-bigger')
+    assert (game / 'dxgi.dll').read_bytes() == b'dll-new-bigger'
+    assert not (game / 'OptiScaler.dll').exists()
+    assert 'xess' in (game / 'OptiScaler.ini').read_text()
+    assert not (game / 'README.md').exists()
+    meta = json.loads((game / 'version.json').read_text())
+    assert meta['version'] == '0.7.9' and meta['source_folder'] == 'OptiScaler_0.7.9'
+
+
+def test_unknown_previous_version_compares_deployed_files(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    make_version(base, 'OptiScaler_0.7.9', b'dll-new', libxess=b'xess-2')
+    game = install_game(tmp_path, old)
+    (game / 'version.json').write_text(json.dumps({'spoof_dll': 'dxgi.dll'}))
+    (game / 'D3D12_Optiscaler' / 'D3D12Core.dll').unlink()
+    get_version_catalog(base).unregister('OptiScaler_0.7.8')
+
+    report = OptiScalerUpdater(base).update_multiple_games([game])[str(game)]
+
+    assert report['ok']
+    assert report['files_written'] == 3  # dxgi.dll, libxess.dll, D3D12Core.dll
+    assert (game / 'libxess.dll').read_bytes() == b'xess-2'
+
+
+def test_nested_archive_deploys_from_the_mod_root(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    make_version(base / 'OptiScaler_0.7.9', 'OptiScaler_0.7.9', b'dll-new-bigger')
+    game = install_game(tmp_path, old)
+
+    report = OptiScalerUpdater(base).update_multiple_games([game])[str(game)]
+
+    assert report['ok'] and report['files_written'] == 1
+    assert (game / 'dxgi.dll').read_bytes() == b'dll-new-bigger'
+    assert not (game / 'OptiScaler_0.7.9').exists()
+
+
+def test_version_without_mod_files_fails_and_keeps_metadata(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    broken = base / 'OptiScaler_0.7.9'
+    broken.mkdir()
+    (broken / 'README.md').write_text('no dll here')
+    game = install_game(tmp_path, old)
+
+    report = OptiScalerUpdater(base).update_multiple_games([game])[str(game)]
+
+    assert not report['ok'] and report['files_written'] == 0
+    assert json.loads((game / 'version.json').read_text())['version'] == '0.7.8'
+
+
+def test_unidentified_spoof_dll_is_not_overwritten(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    make_version(base, 'OptiScaler_0.7.9', b'dll-new')
+    game = install_game(tmp_path, old)
+    (game / 'version.json').unlink()
+    (game / 'dxgi.dll').write_bytes(b'reshade, not optiscaler')
+
+    report = OptiScalerUpdater(base).deploy_to_game(game, get_version_catalog(base).find('0.7.9'))
+
+    assert not report.ok and report.files_written == 0
+    assert (game / 'dxgi.dll').read_bytes() == b'reshade, not optiscaler'
+
+
+def test_plan_classifies_and_skips_up_to_date(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    old = make_version(base, 'OptiScaler_0.7.8', b'dll-old')
+    make_version(base, 'OptiScaler_0.7.9', b'dll-new-bigger')
+    game = install_game(tmp_path, old)
+    empty = tmp_path / 'NoMod'
+    empty.mkdir()
+    updater = OptiScalerUpdater(base)
+
+    plan = updater.plan_updates([game, empty])
+    assert plan.outdated == [str(game)] and plan.not_installed == [str(empty)]
+    assert plan.total_bytes == len(b'dll-new-bigger')
+
+    updater.update_multiple_games([game, empty])
+    plan = updater.plan_updates([game, empty])
+    assert plan.up_to_date == [str(game)] and plan.to_update == []
+    assert updater.update_multiple_games([game, empty]) == {}
@@ -0,0 +1,72 @@
+"""Tests for the local OptiScaler version catalog."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.version_catalog import VersionCatalog, version_key
+
+
+def make_version(base, folder: str):
+    path = base / folder
+    path.mkdir()
+    (path / 'OptiScaler.dll').write_bytes(b'x' * 10)
+    (path / 'OptiScaler.ini').write_text('[Upscalers]\n')
+    return path
+
+
+def test_version_key_orders_numerically():
+    names = ['OptiScaler_0.9.0', 'OptiScaler_0.10.0', 'OptiScaler_0.10.0-pre1']
+    assert sorted(names, key=version_key, reverse=True) == [
+        'OptiScaler_0.10.0', 'OptiScaler_0.10.0-pre1', 'OptiScaler_0.9.0'
+    ]
+
+
+def test_rebuild_then_lookup_by_tag_and_folder(tmp_path):
+    make_version(tmp_path, 'OptiScaler_0.9.0')
+    make_version(tmp_path, 'OptiScaler_0.10.0')
+    catalog = VersionCatalog(tmp_path)
+
+    assert catalog.folder_names() == ['OptiScaler_0.10.0', 'OptiScaler_0.9.0']
+    assert catalog.path_for('v0.9.0') == tmp_path / 'OptiScaler_0.9.0'
+    assert catalog.path_for('OptiScaler_0.10.0') == tmp_path / 'OptiScaler_0.10.0'
+    entry = catalog.find('0.9.0')
+    assert entry['size'] == 10 + len('[Upscalers]\n')
+    assert 'OptiScaler.dll' in entry['files']
+
+
+def test_register_and_unregister_are_persisted(tmp_path):
+    catalog = VersionCatalog(tmp_path)
+    assert catalog.latest() is None
+
+    path = make_version(tmp_path, 'OptiScaler_0.7.9')
+    catalog.register(path, tag='v0.7.9')
+    assert VersionCatalog(tmp_path).find('v0.7.9')['folder'] == 'OptiScaler_0.7.9'
+
+    catalog.unregister(path)
+    assert VersionCatalog(tmp_path).find('v0.7.9') is None
+
+
+def test_manually_deleted_folder_is_forgotten(tmp_path):
+    path = make_version(tmp_path, 'OptiScaler_0.7.9')
+    catalog = VersionCatalog(tmp_path)
+    assert catalog.latest_path() == path
+
+    for child in path.iterdir():
+        child.unlink()
+    path.rmdir()
+
+    assert catalog.latest_path() is None
+    assert catalog.entries() == []
+
+
+def test_unversioned_entries_do_not_match_arbitrary_names(tmp_path):
+    make_version(tmp_path, 'OptiScaler_0.9.0')
+    make_version(tmp_path, 'OptiScaler_nightly')
+    catalog = VersionCatalog(tmp_path)
+    assert catalog.find('OptiScaler_nightly')['folder'] == 'OptiScaler_nightly'
+    assert catalog.find('OptiScaler') is None
+    assert catalog.find('something else') is None
+    assert catalog.find_for_game({'source_folder': 'Inner'}) is None
@@ -0,0 +1,99 @@
+"""Tests for reference-counted cleanup of unused OptiScaler versions."""
+
+import os
+import sys
+import json
+import time
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.archive_cache import ArchiveCache
+from src.core.version_catalog import VersionCatalog
+from src.core.version_gc import RetentionPolicy, plan_gc, run_gc
+
+
+def make_library(tmp_path):
+    base = tmp_path / 'OptiScaler'
+    base.mkdir()
+    old = time.time() - 30 * 86400
+    for folder in ('OptiScaler_0.7.7', 'OptiScaler_0.7.8', 'OptiScaler_0.7.9', 'OptiScaler_0.8.0'):
+        path = base / folder
+        path.mkdir()
+        (path / 'OptiScaler.dll').write_bytes(b'x' * 100)
+        os.utime(path, (old, old))
+    game = tmp_path / 'Game'
+    game.mkdir()
+    (game / 'version.json').write_text(json.dumps({'version': '0.7.7', 'source_folder': 'OptiScaler_0.7.7'}))
+    return VersionCatalog(base), str(game)
+
+
+def test_plan_keeps_referenced_and_newest(tmp_path):
+    catalog, game = make_library(tmp_path)
+
+    plan = plan_gc([game], RetentionPolicy(keep_latest=2), catalog=catalog,
+                   archive_cache=ArchiveCache(root=tmp_path / 'archives'))
+
+    assert plan.references == {'OptiScaler_0.7.7': [game]}
+    assert plan.folders == ['OptiScaler_0.7.8']
+    assert plan.reclaimable_bytes == 100
+
+
+def test_recent_downloads_are_kept(tmp_path):
+    catalog, game = make_library(tmp_path)
+    catalog.register(catalog.base_dir / 'OptiScaler_0.7.8')  # re-registrada ahora
+
+    plan = plan_gc([game], RetentionPolicy(keep_latest=2), catalog=catalog,
+                   archive_cache=ArchiveCache(root=tmp_path / 'archives'))
+
+    assert plan.folders == []
+
+
+def test_run_gc_deletes_folder_and_archive(tmp_path):
+    catalog, game = make_library(tmp_path)
+    cache = ArchiveCache(root=tmp_path / 'archives', max_bytes=10_000)
+    archive = tmp_path / 'OptiScaler_0.7.8.7z'
+    archive.write_bytes(b'a' * 50)
+    cache.store({'id': 1, 'name': archive.name, 'size': 50}, archive)
+
+    plan = plan_gc([game], RetentionPolicy(keep_latest=2), catalog=catalog, archive_cache=cache)
+    freed = run_gc(plan, lambda level, msg: None, catalog=catalog, archive_cache=cache)
+
+    assert freed == 150
+    assert not (catalog.base_dir / 'OptiScaler_0.7.8').exists()
+    assert catalog.find('0.7.8') is None
+    assert cache.entries() == {}
+
+
+def test_default_games_come_from_the_persisted_index(tmp_path, monkeypatch):
+    from src.core import scanner
+    from src.core.scan_index import get_scan_index
+    monkeypatch.setattr(scanner, '_scan_cache', None)
+    catalog, game = make_library(tmp_path)
+    cache = ArchiveCache(root=tmp_path / 'archives')
+
+    # Never scanned: no references, so nothing may be planned for deletion
+    plan = plan_gc(None, RetentionPolicy(keep_latest=0), catalog=catalog, archive_cache=cache)
+    assert plan.refused and plan.folders == []
+
+    get_scan_index().put_games([game])
+    plan = plan_gc(None, RetentionPolicy(keep_latest=0), catalog=catalog, archive_cache=cache)
+    assert plan.references == {'OptiScaler_0.7.7': [game]}
+    assert 'OptiScaler_0.7.7' not in plan.folders
+
+
+def test_game_version_json_records_the_catalog_folder(tmp_path, monkeypatch):
+    from src.core import installer
+    from src.core.mod_detector import read_version_json
+    catalog, _ = make_library(tmp_path)
+    monkeypatch.setattr(installer, 'OPTISCALER_DIR', str(catalog.base_dir))
+    nested = catalog.base_dir / 'OptiScaler_0.7.9' / 'OptiScaler'
+    nested.mkdir()
+    game = tmp_path / 'Nested'
+    game.mkdir()
+
+    installer._write_game_version_json(str(game), str(nested), lambda level, msg: None)
+
+    meta = read_version_json(game / 'version.json')
+    assert meta['source_folder'] == 'OptiScaler_0.7.9' and meta['version'] == '0.7.9'
+    assert catalog.find_for_game(meta)['folder'] == 'OptiScaler_0.7.9'
@@ -0,0 +1,92 @@
+"""Tests for Xbox manifest parsing and the unreadable-directory cache."""
+
+import os
+import sys
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import scanner
+from src.core.platform_probe import FixtureProbe
+from src.core.scan_index import ScanIndex
+from src.core.xbox_library import read_xbox_manifest
+
+CONFIG = """<?xml version="1.0" encoding="utf-8"?>
+<Game configVersion="1">
+  <Identity Name="Studio.Vault" Publisher="CN=Studio" Version="1.2.3.0"/>
+  <ExecutableList>
+    <Executable Name="Vault\\Binaries\\WinGDK\\Vault-WinGDK-Shipping.exe" TargetDeviceFamily="PC" Id="Game"/>
+    <Executable Name="Vault-Xbox.exe" TargetDeviceFamily="Scarlett" Id="Console"/>
+  </ExecutableList>
+</Game>
+"""
+APPX = """<?xml version="1.0" encoding="utf-8"?>
+<Package xmlns="http://schemas.microsoft.com/appx/manifest/foundation/windows10">
+  <Identity Name="Studio.Vault" Version="1.2.3.0"/>
+  <Applications><Application Id="Game" Executable="gamelaunchhelper.exe"/></Applications>
+</Package>
+"""
+
+
+def _noop(level, msg):
+    pass
+
+
+def _xbox_game(xbox, config=True):
+    content = xbox / "Vault" / "Content"
+    exe_dir = content / "Vault" / "Binaries" / "WinGDK"
+    exe_dir.mkdir(parents=True)
+    (exe_dir / "Vault-WinGDK-Shipping.exe").write_bytes(b"MZ")
+    (content / "gamelaunchhelper.exe").write_bytes(b"MZ")
+    (content / "appxmanifest.xml").write_text(APPX, encoding="utf-8")
+    if config:
+        (content / "MicrosoftGame.config").write_text(CONFIG, encoding="utf-8")
+    return content, exe_dir
+
+
+def test_game_config_wins_over_launch_helper(tmp_path):
+    content, exe_dir = _xbox_game(tmp_path)
+    manifest = read_xbox_manifest(str(content))
+    assert manifest.version == "1.2.3.0"
+    assert manifest.executables == ["Vault\\Binaries\\WinGDK\\Vault-WinGDK-Shipping.exe"]
+    assert manifest.resolve_executable() == (str(exe_dir), "Vault-WinGDK-Shipping.exe")
+
+    (content / "MicrosoftGame.config").unlink()
+    # The appxmanifest only declares the GDK launch helper: no usable exe
+    assert read_xbox_manifest(str(content)).resolve_executable() is None
+
+
+def test_scan_uses_manifest_without_walking(tmp_path, monkeypatch):
+    _, exe_dir = _xbox_game(tmp_path / "XboxGames")
+    monkeypatch.setattr(scanner, "find_executable_path",
+                        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("walked")))
+    probe = FixtureProbe(registry={}, folders={"xbox_games": str(tmp_path / "XboxGames")})
+    games = scanner.scan_games(_noop, [], use_cache=False, probe=probe, index=ScanIndex(tmp_path / "idx.json"))
+    assert [(g[0], g[3], g[4]) for g in games] == [(str(exe_dir), "Vault-WinGDK-Shipping.exe", "Xbox")]
+
+
+def test_unreadable_directories_are_not_retried(tmp_path, monkeypatch):
+    game = tmp_path / "Game"
+    locked = game / "Locked"
+    locked.mkdir(parents=True)
+    (game / "Release").mkdir()
+    (game / "Release" / "Game.exe").write_bytes(b"MZ")
+    attempts = []
+    real_scandir = os.scandir
+
+    def scandir(path="."):
+        if os.fspath(path) == str(locked):
+            attempts.append(path)
+            raise PermissionError(13, "Access is denied", os.fspath(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    index_path = tmp_path / "idx.json"
+    index = ScanIndex(index_path)
+    # One attempt per search, even though every exe pattern walks the tree again
+    assert scanner.find_executable_path(str(game), _noop, index=index) == (str(game / "Release"), "Game.exe")
+    assert len(attempts) == 1
+    assert index.save() and index_path.exists()
+
+    assert scanner.find_executable_path(str(game), _noop, index=ScanIndex(index_path))[1] == "Game.exe"
+    assert len(attempts) == 1